@@ -3,7 +3,7 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from app.services.portfolio import get_portfolio_summary
 from app.services.external.exa_service import discover_defi_protocols
-from app.api.v1.websocket import perform_portfolio_analysis, ConnectionManager
+from app.api.v1.websocket import perform_portfolio_analysis, manager as ws_manager
 from typing import Optional, Dict, Any, Union
 import logging
 import json
@@ -11,8 +11,7 @@ import asyncio
 from datetime import datetime
 
 router = APIRouter()
-# Create a connection manager for WebSockets
-ws_manager = ConnectionManager()
+# WebSocket connections go through the shared hub (ws_manager)
 logger = logging.getLogger(__name__)
 
 def analyze_stablecoin_allocation(raw_data: dict) -> dict:
@@ -11,6 +11,7 @@ from typing import Dict, Any, Optional
 import redis
 
 from app.core.dependencies import get_redis_client
+from app.services.bridge_status_tracker import bridge_status_tracker
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/bridge", tags=["bridge"])
@@ -93,8 +94,9 @@ async def get_bridge_status(
     """
     Get real-time status of a bridge transaction.
     
-    Fetches cached bridge status from Redis or Axelar API.
-    Status updates are pushed from transaction handlers.
+    Served from the background bridge tracker when this worker tracks the
+    transfer, otherwise from the Redis status written by the tracker.
+    Clients with an open websocket receive the same updates as pushes.
     
     Args:
         bridge_id: Unique bridge transaction ID
@@ -107,9 +109,14 @@ async def get_bridge_status(
         HTTPException: If bridge not found or status unavailable
     """
     try:
+        # Live status from the background tracker
+        tracked_status = await bridge_status_tracker.get_status(bridge_id)
+        if tracked_status:
+            return tracked_status
+
         # Try to get cached status from Redis
         cache_key = f"bridge_status:{bridge_id}"
-        cached_status = redis_client.get(cache_key)
+        cached_status = redis_client.get(cache_key) if redis_client else None
 
         if cached_status:
             import json
@@ -201,3 +208,32 @@ async def update_bridge_status(
             status_code=500,
             detail=f"Failed to update bridge status: {str(e)}",
         )
+
+
+@router.post("/status/{bridge_id}/tx")
+async def attach_bridge_transaction(
+    bridge_id: str,
+    payload: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Attach the submitted source transaction to a tracked bridge.
+
+    Starts background status polling for the transfer. Expects
+    ``wallet_address`` and ``tx_hash`` in the payload, plus the step's
+    ``step_type`` when known (approve / pay_gas hashes are not tracked).
+    """
+    wallet_address = payload.get("wallet_address")
+    tx_hash = payload.get("tx_hash")
+    if not wallet_address or not tx_hash:
+        raise HTTPException(
+            status_code=400,
+            detail="wallet_address and tx_hash are required",
+        )
+
+    tracked_id = await bridge_status_tracker.attach_tx_hash(
+        wallet_address, tx_hash, bridge_id=bridge_id, step_type=payload.get("step_type")
+    )
+    if not tracked_id:
+        raise HTTPException(status_code=404, detail=f"Bridge {bridge_id} is not being tracked")
+
+    return {"status": "tracking", "bridge_id": tracked_id}
@@ -79,7 +79,7 @@ async def process_command(
         )
 
         # Add to chat history
-        chat_history_service.add_entry(
+        await chat_history_service.add_entry(
             command.wallet_address,
             command.user_name,
             unified_command.command_type.value,
@@ -0,0 +1,33 @@
+"""
+Gas price endpoints.
+
+Serves per-chain fee data from the in-memory gas oracle; no RPC call is
+made unless the chain's snapshot is older than one block.
+"""
+
+import logging
+from fastapi import APIRouter, HTTPException
+from typing import Dict, Any
+
+from app.services.gas_oracle import gas_oracle
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/gas", tags=["gas"])
+
+
+@router.get("/{chain_id}")
+async def get_gas_prices(chain_id: int) -> Dict[str, Any]:
+    """Get base fee and priority fee percentiles for a chain."""
+    if not gas_oracle.is_supported(chain_id):
+        raise HTTPException(status_code=404, detail=f"Gas data not available for chain {chain_id}")
+
+    snapshot = await gas_oracle.get_fees(chain_id)
+    if not snapshot:
+        raise HTTPException(status_code=503, detail="Gas data temporarily unavailable")
+
+    return {
+        **snapshot.to_dict(),
+        "fee_params": {
+            speed: snapshot.fee_params(speed) for speed in ("slow", "standard", "fast")
+        },
+    }
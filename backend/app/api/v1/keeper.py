@@ -83,7 +83,7 @@ async def get_action_execution_status(wallet_address: str, action_id: str):
         from app.domains.payment_actions.keeper import get_recurring_payment_keeper
         
         keeper = await get_recurring_payment_keeper()
-        history = keeper.get_execution_log(action_id, limit=50)
+        history = await keeper.get_execution_log(action_id, limit=50)
         
         return JSONResponse(
             status_code=200,
@@ -4,76 +4,26 @@ import logging
 import time
 import asyncio
 import os
+import uuid
 from datetime import datetime
 
 # Import services
 from app.services.portfolio.portfolio_service import Web3Helper
 from app.services.external.exa_service import discover_defi_protocols
 from app.models.unified_models import UnifiedCommand, CommandType, AgentType
+from app.services.websocket_hub import WebSocketHub, websocket_hub
+from app.services.command_dispatcher import CommandDispatcher
 
 # Set up logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
-# Active connections manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-    
-    async def connect(self, wallet_address: str, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections[wallet_address] = websocket
-        logger.info(f"WebSocket connected for wallet: {wallet_address}")
-    
-    def disconnect(self, wallet_address: str):
-        if wallet_address in self.active_connections:
-            del self.active_connections[wallet_address]
-            logger.info(f"WebSocket disconnected for wallet: {wallet_address}")
-    
-    async def send_progress(self, wallet_address: str, stage: str, completion: int, details: str = "", type: str = "progress"):
-        """Send progress update to specific client"""
-        if wallet_address in self.active_connections:
-            try:
-                await self.active_connections[wallet_address].send_json({
-                    "type": type,
-                    "data": {
-                        "stage": stage,
-                        "completion": completion,
-                        "details": details,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                })
-            except Exception as e:
-                logger.error(f"Error sending progress update: {str(e)}")
-    
-    async def send_data(self, wallet_address: str, data: Dict[str, Any], data_type: str = "result"):
-        """Send data payload to specific client"""
-        if wallet_address in self.active_connections:
-            try:
-                await self.active_connections[wallet_address].send_json({
-                    "type": data_type,
-                    "data": data
-                })
-            except Exception as e:
-                logger.error(f"Error sending data: {str(e)}")
-    
-    async def send_error(self, wallet_address: str, error_message: str, error_code: str = "ERROR"):
-        """Send error message to specific client"""
-        if wallet_address in self.active_connections:
-            try:
-                await self.active_connections[wallet_address].send_json({
-                    "type": "error",
-                    "data": {
-                        "message": error_message,
-                        "code": error_code,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                })
-            except Exception as e:
-                logger.error(f"Error sending error message: {str(e)}")
+# Active connections are shared across workers through the websocket hub
+ConnectionManager = WebSocketHub
+manager = websocket_hub
 
-# Create manager instance
-manager = ConnectionManager()
+# Commands a single chat connection may run at once
+MAX_CONCURRENT_COMMANDS = int(os.getenv("WS_MAX_CONCURRENT_COMMANDS", "4"))
 
 # Progress callback type
 ProgressCallback = Callable[[str, int, str], Awaitable[None]]
@@ -87,6 +37,11 @@ async def chat_websocket(
     """
     Unified chat WebSocket for real-time command processing with status updates.
     Inspired by AG-UI agent interaction protocol for 'Thinking...', 'IPFS Uploading...', etc.
+
+    Commands run concurrently. Frames answering a command go only to the
+    connection that sent it and carry its "request_id" (client-supplied or
+    generated); send {"type": "cancel", "request_id": ...} to cancel one in
+    flight. Wallet-level pushes (keeper, bridge, batch, IPFS) reach every tab.
     """
     try:
         await manager.connect(wallet_address, websocket)
@@ -98,48 +53,19 @@ async def chat_websocket(
         container = get_service_container(get_settings())
         command_processor = container.command_processor
 
-        while True:
-            try:
-                # Receive command from client
-                data = await websocket.receive_json()
-                logger.info(f"WebSocket command received for {wallet_address}: {data.get('command')}")
-            except WebSocketDisconnect:
-                break
-            except Exception as e:
-                logger.error(f"Error receiving WebSocket message: {e}")
-                await manager.send_error(wallet_address, "Invalid message format - expected JSON.")
-                continue
-
-            command_text = data.get("command")
-            if not command_text and data.get("type") != "transaction_step_complete":
-                await manager.send_error(wallet_address, "Empty command received.")
-                continue
-
-            # Create unified command using the new parser architecture
-            unified_command = command_processor.create_unified_command(
-                command=command_text or "complete_transaction_step",
-                wallet_address=wallet_address,
-                chain_id=data.get("chain_id"),
-                user_name=data.get("user_name", user_name),
-                openai_api_key=data.get("openai_api_key")
-            )
-            
-            # Handle specialized command types (e.g. multi-step transactions)
-            if data.get("type") == "transaction_step_complete":
-                unified_command.command_type = CommandType.TRANSACTION_STEP_COMPLETE
-                unified_command.details = data.get("details", {})
-            
-            # Set research mode if provided
-            if "research_mode" in data:
-                unified_command.research_mode = data["research_mode"]
+        # Commands run concurrently; responses carry the client's request_id
+        dispatcher = CommandDispatcher(max_concurrent=MAX_CONCURRENT_COMMANDS)
 
+        async def run_command(unified_command: UnifiedCommand, request_id: str):
             # Define status callback for real-time Sovereign Agent updates
             async def status_callback(message: str, progress: int):
                 await manager.send_progress(
                     wallet_address, 
                     stage=message, 
                     completion=progress, 
-                    type="agent_status"
+                    type="agent_status",
+                    request_id=request_id,
+                    websocket=websocket
                 )
 
             # Process command with real-time feedback
@@ -160,18 +86,97 @@ async def chat_websocket(
                     response_data["agent_type"] = response_data["agent_type"].value
                 
                 # Send result
-                await manager.send_data(wallet_address, response_data, data_type="agent_response")
+                await manager.send_data(
+                    wallet_address, response_data, data_type="agent_response",
+                    request_id=request_id, websocket=websocket
+                )
                 
             except Exception as e:
                 logger.exception(f"Error processing command in WebSocket: {e}")
-                await manager.send_error(wallet_address, f"Processing failed: {str(e)}")
+                await manager.send_error(
+                    wallet_address, f"Processing failed: {str(e)}", request_id=request_id, websocket=websocket
+                )
+
+        try:
+            while True:
+                try:
+                    # Receive command from client
+                    data = await websocket.receive_json()
+                    logger.info(f"WebSocket command received for {wallet_address}: {data.get('command')}")
+                except WebSocketDisconnect:
+                    break
+                except Exception as e:
+                    logger.error(f"Error receiving WebSocket message: {e}")
+                    await manager.send_error(wallet_address, "Invalid message format - expected JSON.", websocket=websocket)
+                    continue
+
+                request_id = str(data.get("request_id") or uuid.uuid4().hex)
+
+                # Cancel an in-flight command
+                if data.get("type") == "cancel":
+                    if dispatcher.cancel(request_id):
+                        await manager.send_data(
+                            wallet_address, {"cancelled": True}, data_type="cancelled",
+                            request_id=request_id, websocket=websocket
+                        )
+                    else:
+                        await manager.send_error(
+                            wallet_address, "No command in flight for this request_id.",
+                            error_code="NOT_FOUND", request_id=request_id, websocket=websocket
+                        )
+                    continue
+
+                command_text = data.get("command")
+                if not command_text and data.get("type") != "transaction_step_complete":
+                    await manager.send_error(
+                        wallet_address, "Empty command received.", request_id=request_id, websocket=websocket
+                    )
+                    continue
+
+                if request_id in dispatcher:
+                    await manager.send_error(
+                        wallet_address, "A command with this request_id is already running.",
+                        error_code="DUPLICATE_REQUEST", request_id=request_id, websocket=websocket
+                    )
+                    continue
+                if dispatcher.full:
+                    await manager.send_error(
+                        wallet_address, "Too many commands in flight. Please wait for one to finish.",
+                        error_code="TOO_MANY_REQUESTS", request_id=request_id, websocket=websocket
+                    )
+                    continue
+
+                # Create unified command using the new parser architecture
+                unified_command = command_processor.create_unified_command(
+                    command=command_text or "complete_transaction_step",
+                    wallet_address=wallet_address,
+                    chain_id=data.get("chain_id"),
+                    user_name=data.get("user_name", user_name),
+                    openai_api_key=data.get("openai_api_key")
+                )
+                
+                # Handle specialized command types (e.g. multi-step transactions)
+                if data.get("type") == "transaction_step_complete":
+                    unified_command.command_type = CommandType.TRANSACTION_STEP_COMPLETE
+                    unified_command.details = data.get("details", {})
+                
+                # Set research mode if provided
+                if "research_mode" in data:
+                    unified_command.research_mode = data["research_mode"]
+
+                dispatcher.submit(
+                    request_id,
+                    lambda command=unified_command, rid=request_id: run_command(command, rid)
+                )
+        finally:
+            await dispatcher.cancel_all()
 
     except WebSocketDisconnect:
         logger.info(f"Chat WebSocket disconnected: {wallet_address}")
-        manager.disconnect(wallet_address)
     except Exception as e:
         logger.exception(f"Error in chat WebSocket for {wallet_address}: {e}")
-        manager.disconnect(wallet_address)
+    finally:
+        await manager.disconnect(wallet_address, websocket)
 
 @router.websocket("/portfolio/{wallet_address}")
 async def portfolio_websocket(
@@ -226,11 +231,11 @@ async def portfolio_websocket(
                 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected during initialization: {wallet_address}")
-        manager.disconnect(wallet_address)
     except Exception as e:
         logger.exception(f"Error in portfolio websocket: {str(e)}")
         await manager.send_error(wallet_address, f"Analysis failed: {str(e)}")
-        manager.disconnect(wallet_address)
+    finally:
+        await manager.disconnect(wallet_address, websocket)
 
 async def perform_portfolio_analysis(
     wallet_address: str, 
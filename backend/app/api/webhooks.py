@@ -22,6 +22,7 @@ async def webhook_execute_action(
     request: Request,
     x_webhook_signature: str = Header(None),
     x_agent_id: str = Header(None),
+    idempotency_key: str = Header(None),
 ):
     """
     Webhook endpoint for AI agents to execute payment actions.
@@ -35,6 +36,12 @@ async def webhook_execute_action(
     
     Include as header: `X-Webhook-Signature: {signature}`
     
+    **Idempotency (Recommended)**
+    
+    Send `Idempotency-Key: {unique key}` (or a top-level `idempotency_key`).
+    Redeliveries with the same key return the first successful response
+    instead of executing again; failed requests can be retried.
+    
     **Request Example**
     ```json
     {
@@ -86,7 +93,12 @@ async def webhook_execute_action(
         
         # Process webhook
         webhook_service = await get_webhook_service()
-        response = await webhook_service.handle_webhook(webhook_req, agent_secret)
+        response = await webhook_service.handle_webhook(
+            webhook_req,
+            agent_secret,
+            idempotency_key=idempotency_key or payload.get("idempotency_key"),
+            agent_id=x_agent_id,
+        )
         
         return JSONResponse(
             status_code=200 if response.success else 400,
@@ -121,6 +133,7 @@ async def webhook_execute_batch(
     request: Request,
     x_webhook_signature: str = Header(None),
     x_agent_id: str = Header(None),
+    idempotency_key: str = Header(None),
 ):
     """
     Webhook endpoint for AI agents to execute batch payments.
@@ -134,6 +147,7 @@ async def webhook_execute_batch(
         "token": "MNEE",
         "chain_id": 1,
         "amount": "10",
+        "batch_id": "payroll-2024-01",
         "recipients": [
           {
             "address": "0xabc1...",
@@ -150,6 +164,15 @@ async def webhook_execute_batch(
     }
     ```
     
+    Recipients are paid concurrently with one shared quote. Each recipient is
+    claimed in the execution journal before it is paid, so retrying with the
+    same `batch_id` (on any worker sharing the journal) does not pay it again:
+    recipients already submitted are returned with `"deduplicated": true`,
+    ones still being paid by another request come back as `"in_progress"`,
+    and only failed ones are retried.
+    Send `"wait": false` to get an immediate response, then follow progress via
+    `batch_progress` websocket messages or `GET /api/webhooks/batch/{batch_id}`.
+    
     **Response Example**
     ```json
     {
@@ -157,8 +180,12 @@ async def webhook_execute_batch(
       "request_id": "webhook_abc123",
       "message": "Batch payment processed (2 recipients)",
       "result": {
+        "batch_id": "payroll-2024-01",
+        "status": "completed",
         "total_recipients": 2,
+        "completed": 2,
         "successful": 2,
+        "failed": 0,
         "results": [
           {
             "recipient": "0xabc1...",
@@ -190,7 +217,11 @@ async def webhook_execute_batch(
         )
         
         webhook_service = await get_webhook_service()
-        response = await webhook_service.handle_webhook(webhook_req)
+        response = await webhook_service.handle_webhook(
+            webhook_req,
+            idempotency_key=idempotency_key or payload.get("idempotency_key"),
+            agent_id=x_agent_id,
+        )
         
         return JSONResponse(
             status_code=200 if response.success else 400,
@@ -214,6 +245,7 @@ async def webhook_create_action(
     request: Request,
     x_webhook_signature: str = Header(None),
     x_agent_id: str = Header(None),
+    idempotency_key: str = Header(None),
 ):
     """
     Webhook endpoint for AI agents to create payment actions programmatically.
@@ -251,7 +283,11 @@ async def webhook_create_action(
         )
         
         webhook_service = await get_webhook_service()
-        response = await webhook_service.handle_webhook(webhook_req)
+        response = await webhook_service.handle_webhook(
+            webhook_req,
+            idempotency_key=idempotency_key or payload.get("idempotency_key"),
+            agent_id=x_agent_id,
+        )
         
         return JSONResponse(
             status_code=200 if response.success else 400,
@@ -270,6 +306,33 @@ async def webhook_create_action(
         )
 
 
+@router.get("/batch/{batch_id}")
+async def get_batch_status(batch_id: str, wallet_address: str):
+    """
+    Get progress and per-recipient results of a batch payment.
+    
+    Batch IDs are unique per wallet: pass the paying `wallet_address`.
+    
+    **Response Example**
+    ```json
+    {
+      "batch_id": "payroll-2024-01",
+      "status": "processing",
+      "total_recipients": 100,
+      "completed": 40,
+      "successful": 39,
+      "failed": 1,
+      "results": [...]
+    }
+    ```
+    """
+    webhook_service = await get_webhook_service()
+    batch = await webhook_service.get_batch_status(wallet_address, batch_id)
+    if batch is None:
+        raise HTTPException(status_code=404, detail=f"Batch {batch_id} not found")
+    return JSONResponse(status_code=200, content=batch)
+
+
 @router.get("/history/{wallet_address}")
 async def get_webhook_history(
     wallet_address: str,
@@ -296,7 +359,7 @@ async def get_webhook_history(
     """
     try:
         webhook_service = await get_webhook_service()
-        history = webhook_service.get_execution_history(wallet_address, limit)
+        history = await webhook_service.get_execution_history(wallet_address, limit)
         return JSONResponse(
             status_code=200,
             content=history,
@@ -49,10 +49,20 @@ class DatabaseSettings:
     redis_db: int = field(default_factory=lambda: int(os.getenv("REDIS_DB", "0")))
     redis_max_connections: int = field(default_factory=lambda: int(os.getenv("REDIS_MAX_CONNECTIONS", "10")))
     
-    # Payment actions storage backend
-    payment_actions_backend: str = field(default_factory=lambda: os.getenv("PAYMENT_ACTIONS_BACKEND", "redis"))
-    # Options: "memory" (dev), "redis" (default), "postgresql" (production)
-    
+    # Payment actions storage backend; defaults to "sql" when a database URL is configured
+    payment_actions_backend: str = field(default_factory=lambda: os.getenv("PAYMENT_ACTIONS_BACKEND") or (
+        "sql" if os.getenv("PAYMENT_ACTIONS_DATABASE_URL") else "file"
+    ))
+    # Options: "file" (append-only log, default), "memory" (dev), "redis", "sql"/"postgresql" (production)
+    # SQLAlchemy async URL for the "sql" backend (e.g. postgresql+asyncpg://...)
+    payment_actions_database_url: str = field(default_factory=lambda: os.getenv(
+        "PAYMENT_ACTIONS_DATABASE_URL", "sqlite+aiosqlite:///payment_actions.db"
+    ))
+    # SQLAlchemy async URL for protocol_research_logs (empty disables persistence)
+    research_logs_database_url: str = field(default_factory=lambda: os.getenv(
+        "RESEARCH_LOGS_DATABASE_URL", "sqlite+aiosqlite:///research_logs.db"
+    ))
+
     # Cache TTL settings (in seconds)
     cache_ttl_short: int = field(default_factory=lambda: int(os.getenv("CACHE_TTL_SHORT", "60")))      # 1 minute
     cache_ttl_medium: int = field(default_factory=lambda: int(os.getenv("CACHE_TTL_MEDIUM", "300")))   # 5 minutes
@@ -13,7 +13,7 @@ Core Principles:
 
 import asyncio
 import logging
-from typing import Dict, List, Optional, Set, Any, Union
+from typing import Callable, Dict, List, Optional, Set, Any, Union
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
@@ -118,6 +118,9 @@ class ConfigurationManager:
         # HTTP session for validation
         self._session: Optional[aiohttp.ClientSession] = None
 
+        # Callbacks run after configuration is (re)loaded
+        self._reload_listeners: List[Callable[[], Any]] = []
+
     async def initialize(self):
         """Initialize the configuration manager."""
         logger.info("Initializing Configuration Manager")
@@ -154,6 +157,19 @@ class ConfigurationManager:
         if self.redis:
             await self.redis.close()
 
+    def add_reload_listener(self, callback: Callable[[], Any]):
+        """Register a callback to run whenever configuration is (re)loaded."""
+        if callback not in self._reload_listeners:
+            self._reload_listeners.append(callback)
+
+    def _notify_reload(self):
+        """Let dependents rebuild state derived from configuration."""
+        for callback in self._reload_listeners:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Configuration reload listener failed: {e}")
+
     # Token Management
     async def get_token(self, token_id: str) -> Optional[TokenConfig]:
         """Get token configuration by ID."""
@@ -245,6 +261,7 @@ class ConfigurationManager:
             logger.warning(f"Failed to schedule validation: {e}")
 
         logger.info(f"Loaded {len(self._tokens)} tokens, {len(self._chains)} chains, {len(self._protocols)} protocols")
+        self._notify_reload()
 
     async def _load_tokens_from_file(self):
         """Load token configuration from central COMMON_TOKENS config."""
@@ -398,6 +415,7 @@ class ConfigurationManager:
             datetime.now() - self._last_chain_refresh > self._cache_ttl):
             await self._load_chains_from_file()
             self._last_chain_refresh = datetime.now()
+            self._notify_reload()
 
     async def _ensure_protocols_loaded(self):
         """Ensure protocols are loaded and fresh."""
@@ -406,6 +424,7 @@ class ConfigurationManager:
             datetime.now() - self._last_protocol_refresh > self._cache_ttl):
             await self._load_protocols_from_file()
             self._last_protocol_refresh = datetime.now()
+            self._notify_reload()
 
     async def _load_from_cache(self):
         """Load configuration from Redis cache."""
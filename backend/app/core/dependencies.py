@@ -51,8 +51,8 @@ class ServiceContainer:
                 # Initialize transaction flow service first to avoid circular dependency
                 transaction_flow_service = None
                 try:
-                    from app.services.transaction_flow_service import TransactionFlowService
-                    transaction_flow_service = TransactionFlowService()
+                    # Shared instance; flow state itself lives in Redis across workers
+                    from app.services.transaction_flow_service import transaction_flow_service
                 except Exception as tfs_error:
                     logger.warning(f"Transaction flow service initialization failed: {tfs_error}")
 
@@ -730,6 +730,8 @@ class UnifiedParser:
                 missing_requirements.append("valid_bridge_amount")
             elif not unified_command.details.destination_chain:
                 missing_requirements.append("destination_chain")
+            elif unified_command.chain_id and not self._has_bridge_route(unified_command):
+                missing_requirements.append("supported_route")
 
         elif unified_command.command_type == CommandType.TRANSFER:
             if not unified_command.details:
@@ -754,6 +756,11 @@ class UnifiedParser:
                 error_message = "Please specify a valid amount to bridge (greater than 0)."
             elif "valid_transfer_amount" in missing_requirements:
                 error_message = "Please specify a valid amount to transfer (greater than 0)."
+            elif "supported_route" in missing_requirements:
+                error_message = (
+                    f"Bridging from this network to {unified_command.details.destination_chain} "
+                    "is not supported yet."
+                )
             else:
                 error_message = f"Missing required information: {', '.join(missing_requirements)}"
 
@@ -763,6 +770,26 @@ class UnifiedParser:
             missing_requirements=missing_requirements
         )
 
+    def _has_bridge_route(self, unified_command: UnifiedCommand) -> bool:
+        """Check the precomputed route table for a bridge route between the two chains."""
+        from app.protocols.registry import protocol_registry
+        from app.protocols.route_table import token_key
+
+        route_table = protocol_registry.route_table
+        details = unified_command.details
+        from_chain = route_table.resolve_chain(unified_command.chain_id)
+        to_chain = route_table.resolve_chain(details.destination_chain)
+
+        # Only reject routes between chains the table knows about; anything
+        # else is left to the bridge processor's own handling
+        if from_chain is None or to_chain is None or from_chain == to_chain:
+            return True
+        if not route_table.supported(from_chain) or not route_table.supported(to_chain):
+            return True
+
+        token_symbol = details.token_in.symbol if details.token_in else None
+        return bool(route_table.routes(from_chain, to_chain, token_key(token_symbol)))
+
     def create_unified_command(
         self,
         command: str,
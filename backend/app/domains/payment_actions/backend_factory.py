@@ -2,7 +2,12 @@
 import redis.asyncio as redis
 from typing import Optional
 from app.config.settings import get_settings
-from .storage import BaseStorageBackend, InMemoryStorageBackend, RedisStorageBackend, PostgreSQLStorageBackend
+from .storage import (
+    AppendLogStorageBackend,
+    BaseStorageBackend,
+    InMemoryStorageBackend,
+    RedisStorageBackend,
+)
 
 
 async def get_payment_actions_backend() -> BaseStorageBackend:
@@ -15,7 +20,11 @@ async def get_payment_actions_backend() -> BaseStorageBackend:
     settings = get_settings()
     backend_type = settings.database.payment_actions_backend.lower()
     
-    if backend_type == "memory":
+    if backend_type == "file":
+        # PAYMENT_STORAGE_LOG_PATH; imports an existing PAYMENT_STORAGE_PATH JSON store on first start
+        return AppendLogStorageBackend.from_env()
+    
+    elif backend_type == "memory":
         return InMemoryStorageBackend()
     
     elif backend_type == "redis":
@@ -28,10 +37,15 @@ async def get_payment_actions_backend() -> BaseStorageBackend:
         )
         return RedisStorageBackend(redis_client)
     
-    elif backend_type == "postgresql":
-        # TODO: Implement PostgreSQL backend initialization
-        # Requires SQLAlchemy async session factory setup
-        raise NotImplementedError("PostgreSQL backend not yet configured")
+    elif backend_type in ("postgresql", "sql"):
+        # Optional dependency: SQLAlchemy async + driver (asyncpg / aiosqlite)
+        from .sql_storage import SQLStorageBackend
+        
+        backend = SQLStorageBackend.from_url(settings.database.payment_actions_database_url)
+        if backend.engine.dialect.name == "sqlite":
+            # Production databases are provisioned by migrations/002
+            await backend.create_schema()
+        return backend
     
     else:
         raise ValueError(f"Unknown payment actions backend: {backend_type}")
@@ -0,0 +1,268 @@
+"""
+Keeper execution engine - concurrent, lease-protected execution of due actions.
+
+Several keeper replicas can run at once: each action is leased in Redis
+(SET NX EX) before execution, so only one replica pays it, and the lease is
+renewed while the payment runs. Due actions are processed by a bounded pool
+of workers. Each successful run is recorded right away as a field-level
+update of ``last_used`` / ``usage_count`` (``mark_used``) before its lease
+is released, so no replica sees the action as still due. Outcomes are
+therefore persisted one write per run; they are no longer batched into a
+single ``update_many`` at the end of the tick.
+"""
+import asyncio
+import inspect
+import logging
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+
+from app.config.settings import get_settings
+from .models import PaymentAction
+from .next_run import next_run_at
+
+logger = logging.getLogger(__name__)
+
+# Delete the lease only if we still own it
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Extend the lease only if we still own it
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('expire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class ActionLeaseManager:
+    """Short per-action leases shared by keeper replicas through Redis."""
+
+    def __init__(self, lease_seconds: int = 300, redis_client: Optional[redis.Redis] = None):
+        """
+        Initialize lease manager.
+
+        Args:
+            lease_seconds: Lease lifetime; held leases are renewed every third of it
+            redis_client: Redis client (created from settings when omitted)
+        """
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._redis = redis_client
+        self._redis_checked = redis_client is not None
+        # In-process fallback when Redis is unavailable (single replica only)
+        self._local: Dict[str, float] = {}
+
+    def _key(self, wallet_address: str, action_id: str) -> str:
+        return f"payment_actions:lease:{wallet_address}:{action_id}"
+
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        if not self._redis_checked:
+            self._redis_checked = True
+            try:
+                settings = get_settings()
+                self._redis = redis.from_url(
+                    settings.database.redis_url,
+                    db=settings.database.redis_db,
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                logger.warning(f"Keeper leases running in-process only (no Redis): {e}")
+                self._redis = None
+        return self._redis
+
+    async def acquire(self, wallet_address: str, action_id: str) -> bool:
+        """Take the lease for an action; False if another keeper holds it."""
+        key = self._key(wallet_address, action_id)
+        client = await self._get_redis()
+        if client:
+            return bool(await client.set(key, self.owner, nx=True, ex=self.lease_seconds))
+
+        now = time.monotonic()
+        if self._local.get(key, 0) > now:
+            return False
+        self._local[key] = now + self.lease_seconds
+        return True
+
+    async def renew(self, wallet_address: str, action_id: str) -> bool:
+        """Extend a lease we hold; False if it was lost."""
+        key = self._key(wallet_address, action_id)
+        client = await self._get_redis()
+        if client:
+            try:
+                return bool(await client.eval(_RENEW_SCRIPT, 1, key, self.owner, self.lease_seconds))
+            except Exception as e:
+                logger.warning(f"Failed to renew keeper lease {key}: {e}")
+                return False
+        if key not in self._local:
+            return False
+        self._local[key] = time.monotonic() + self.lease_seconds
+        return True
+
+    async def release(self, wallet_address: str, action_id: str) -> None:
+        """Release a lease we hold."""
+        key = self._key(wallet_address, action_id)
+        client = await self._get_redis()
+        if client:
+            try:
+                await client.eval(_RELEASE_SCRIPT, 1, key, self.owner)
+            except Exception as e:
+                # The lease expires on its own
+                logger.debug(f"Failed to release keeper lease {key}: {e}")
+            return
+        self._local.pop(key, None)
+
+
+@dataclass
+class EngineResult:
+    """Counters for one engine run."""
+    checked: int = 0
+    executed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    wallets: set = field(default_factory=set)
+
+
+class KeeperExecutionEngine:
+    """Runs due actions with bounded concurrency under per-action leases."""
+
+    def __init__(
+        self,
+        service: Any,
+        executor: Any,
+        leases: Optional[ActionLeaseManager] = None,
+        max_concurrency: int = 20,
+    ):
+        """
+        Initialize engine.
+
+        Args:
+            service: PaymentActionService (reads fresh actions, records runs)
+            executor: PaymentExecutor
+            leases: Lease manager shared with other replicas
+            max_concurrency: Maximum actions executing at once
+        """
+        self.service = service
+        self.executor = executor
+        self.leases = leases or ActionLeaseManager()
+        self.max_concurrency = max_concurrency
+
+    async def run(
+        self,
+        actions: List[PaymentAction],
+        on_outcome: Optional[Callable[..., None]] = None,
+        now: Optional[datetime] = None,
+    ) -> EngineResult:
+        """
+        Execute due actions.
+
+        Args:
+            actions: Due actions (e.g. from the next-run index)
+            on_outcome: Callback (sync or async) (action, status, ticket_id=None, error=None) per executed action
+            now: Reference time for re-checking due-ness
+
+        Returns:
+            EngineResult counters
+        """
+        now = now or datetime.utcnow()
+        result = EngineResult()
+        queue: asyncio.Queue = asyncio.Queue()
+        for action in actions:
+            queue.put_nowait(action)
+
+        async def worker():
+            while True:
+                try:
+                    action = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self._run_one(action, now, result, on_outcome)
+
+        workers = min(self.max_concurrency, len(actions)) or 1
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return result
+
+    async def _run_one(
+        self,
+        action: PaymentAction,
+        now: datetime,
+        result: EngineResult,
+        on_outcome: Optional[Callable[..., None]],
+    ) -> None:
+        wallet_address = action.wallet_address
+        if not await self.leases.acquire(wallet_address, action.id):
+            result.skipped += 1
+            return
+
+        keep_lease = False
+        try:
+            # Another replica may have run it between our index read and the lease
+            current = await self.service.get_action(wallet_address, action.id)
+            run_at = next_run_at(current) if current else None
+            if run_at is None or run_at > now:
+                result.skipped += 1
+                return
+
+            result.checked += 1
+            result.wallets.add(wallet_address)
+            logger.info(f"Executing due recurring action: {current.id} ({current.name})")
+
+            renewer = asyncio.create_task(self._hold_lease(wallet_address, current.id))
+            try:
+                outcome = await self.executor.execute_action(current, wallet_address)
+            except Exception as e:
+                result.failed += 1
+                await self._notify(on_outcome, current, "error", error=str(e))
+                logger.error(f"Error executing action {current.id}: {e}")
+                return
+            finally:
+                renewer.cancel()
+
+            if outcome.status.value in ["submitted", "completed"]:
+                result.executed += 1
+                try:
+                    # Recorded before the lease is released, so no replica re-runs it
+                    await self.service.mark_used(wallet_address, current.id, ticket_id=outcome.ticket_id)
+                except Exception as e:
+                    # Lease stays until expiry so the action is not re-run meanwhile
+                    keep_lease = True
+                    logger.error(f"Failed to record keeper run of {current.id}: {e}")
+                await self._notify(on_outcome, current, "success", ticket_id=outcome.ticket_id)
+                logger.info(f"✓ Executed {current.name} (ticket: {outcome.ticket_id})")
+            else:
+                result.failed += 1
+                await self._notify(on_outcome, current, "failed", error=outcome.error_message)
+                logger.warning(f"✗ Failed to execute {current.name}: {outcome.error_message}")
+        finally:
+            if not keep_lease:
+                await self.leases.release(wallet_address, action.id)
+
+    @staticmethod
+    async def _notify(on_outcome, action: PaymentAction, status: str, **kwargs) -> None:
+        if on_outcome:
+            try:
+                result = on_outcome(action, status, **kwargs)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Keeper outcome callback failed: {e}")
+
+    async def _hold_lease(self, wallet_address: str, action_id: str) -> None:
+        """Renew an action's lease while it executes."""
+        while True:
+            await asyncio.sleep(self.leases.lease_seconds / 3)
+            if not await self.leases.renew(wallet_address, action_id):
+                logger.warning(f"Lost keeper lease for {action_id} during execution")
+                return
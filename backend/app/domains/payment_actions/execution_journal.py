@@ -0,0 +1,393 @@
+"""
+Durable execution journal for webhook and keeper executions.
+
+Append-only SQLite log (one row per execution record) indexed by wallet
+and action, plus idempotency keys for incoming webhooks (and per-recipient
+batch payouts) so duplicate deliveries return the first response instead
+of running twice. Batch progress is kept here too, so any worker sharing
+the journal can answer status queries.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .sqlite_store import SQLiteStore, to_us
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS execution_journal (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT NOT NULL,
+    request_id TEXT,
+    wallet_address TEXT NOT NULL,
+    action_id TEXT,
+    status TEXT NOT NULL,
+    created_us INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_execution_journal_wallet
+    ON execution_journal(wallet_address, seq);
+CREATE INDEX IF NOT EXISTS idx_execution_journal_action
+    ON execution_journal(action_id, seq);
+CREATE INDEX IF NOT EXISTS idx_execution_journal_request
+    ON execution_journal(request_id);
+CREATE TABLE IF NOT EXISTS webhook_idempotency (
+    key TEXT PRIMARY KEY,
+    request_id TEXT NOT NULL,
+    response TEXT,
+    created_us INTEGER NOT NULL,
+    in_progress_until INTEGER,
+    request_hash TEXT
+);
+CREATE TABLE IF NOT EXISTS batch_progress (
+    wallet_address TEXT NOT NULL,
+    batch_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_us INTEGER NOT NULL,
+    PRIMARY KEY (wallet_address, batch_id)
+);
+"""
+
+# Journal sources
+SOURCE_WEBHOOK = "webhook"
+SOURCE_KEEPER = "keeper"
+
+
+class IdempotencyClaim:
+    """Outcome of claiming an idempotency key."""
+
+    def __init__(
+        self,
+        acquired: bool,
+        request_id: str,
+        response: Optional[Dict[str, Any]] = None,
+        request_hash: Optional[str] = None,
+    ):
+        self.acquired = acquired  # True: caller runs the request
+        self.request_id = request_id  # Request that owns the key
+        self.response = response  # Stored response (None while still in progress)
+        self.request_hash = request_hash  # Payload hash stored by the owning request
+
+    @property
+    def in_progress(self) -> bool:
+        return not self.acquired and self.response is None
+
+
+class ExecutionJournal(SQLiteStore):
+    """
+    Append-only execution journal in SQLite.
+
+    PERSISTENT: Survives restarts when given a file path (WAL mode).
+    PERFORMANT: Indexed by wallet and action; concurrent appends share one
+    commit; replay walks the log by sequence number.
+    """
+
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        retention_days: Optional[int] = 90,
+        idempotency_ttl: float = 86400.0,
+        retention_interval: float = 3600.0,
+        claim_lease: float = 300.0,
+    ):
+        """
+        Initialize journal storage.
+
+        Args:
+            db_path: SQLite file (":memory:" keeps the journal for the process lifetime)
+            retention_days: Entries older than this are removed (None keeps all)
+            idempotency_ttl: Seconds a completed request's response is remembered
+            retention_interval: Minimum seconds between automatic retention passes
+            claim_lease: Seconds an in-progress claim blocks other requests; after
+                that (e.g. the worker crashed) a new claim takes the key over
+        """
+        self.retention_days = retention_days
+        self.idempotency_ttl = idempotency_ttl
+        self.claim_lease = claim_lease
+        super().__init__(db_path, _SCHEMA, retention_interval)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _migrate(self) -> None:
+        batch_keys = [row[1] for row in self._conn.execute("PRAGMA table_info(batch_progress)") if row[5]]
+        if batch_keys == ["batch_id"]:
+            # Progress keyed by batch ID alone (shared across wallets); it is transient, start over
+            self._conn.execute("DROP TABLE batch_progress")
+
+    def _upgrade(self) -> None:
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(webhook_idempotency)")}
+        if "in_progress_until" not in columns:
+            # Journals created before claims had leases
+            self._conn.execute("ALTER TABLE webhook_idempotency ADD COLUMN in_progress_until INTEGER")
+        if "request_hash" not in columns:
+            # Journals created before claims recorded the payload they were made for
+            self._conn.execute("ALTER TABLE webhook_idempotency ADD COLUMN request_hash TEXT")
+
+    def _write(self, rows: List[Tuple]) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO execution_journal "
+                "(source, request_id, wallet_address, action_id, status, created_us, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def _prune(self) -> int:
+        removed = 0
+        with self._conn:
+            if self.retention_days is not None:
+                cutoff = to_us(datetime.utcnow() - timedelta(days=self.retention_days))
+                removed = self._conn.execute(
+                    "DELETE FROM execution_journal WHERE created_us < ?", (cutoff,)
+                ).rowcount
+                self._conn.execute("DELETE FROM batch_progress WHERE updated_us < ?", (cutoff,))
+            now_us = to_us(datetime.utcnow())
+            self._conn.execute(
+                "DELETE FROM webhook_idempotency WHERE created_us < ? "
+                "OR (response IS NULL AND in_progress_until < ?)",
+                (now_us - int(self.idempotency_ttl * 1_000_000), now_us),
+            )
+        if removed:
+            logger.info(f"Removed {removed} execution journal entries older than {self.retention_days} days")
+        return removed
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    async def append(
+        self,
+        source: str,
+        record: Dict[str, Any],
+        request_id: Optional[str] = None,
+    ) -> None:
+        """
+        Append an execution record; appends arriving during a commit share the next one.
+
+        Args:
+            source: SOURCE_WEBHOOK or SOURCE_KEEPER
+            record: JSON-serializable record with wallet_address/status (action_id optional)
+            request_id: Webhook request ID, if any
+        """
+        await self._append((
+            source,
+            request_id,
+            record.get("wallet_address") or "unknown",
+            record.get("action_id"),
+            record.get("status") or "unknown",
+            to_us(datetime.utcnow()),
+            json.dumps(record, default=str),
+        ))
+
+    async def get_by_wallet(
+        self,
+        wallet_address: str,
+        source: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Records for a wallet, newest first."""
+        sql = "SELECT data FROM execution_journal WHERE wallet_address = ?"
+        params: List[Any] = [wallet_address]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        return [json.loads(r[0]) for r in await self._query(sql, tuple(params))]
+
+    async def get_by_action(
+        self,
+        action_id: str,
+        source: Optional[str] = None,
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Records for a payment action, newest first."""
+        sql = "SELECT data FROM execution_journal WHERE action_id = ?"
+        params: List[Any] = [action_id]
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY seq DESC LIMIT ?"
+        params.append(limit)
+        return [json.loads(r[0]) for r in await self._query(sql, tuple(params))]
+
+    async def replay(
+        self,
+        after_seq: int = 0,
+        wallet_address: Optional[str] = None,
+        source: Optional[str] = None,
+        limit: int = 500,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Read the journal in append order, for audit export or rebuilding downstream state.
+
+        Args:
+            after_seq: Resume after this sequence number (0 = from the start)
+            wallet_address: Only entries for this wallet
+            source: Only entries from this source
+            limit: Maximum entries returned
+
+        Returns:
+            (entries with seq/source/request_id/record, last seq to resume from)
+        """
+        sql = "SELECT seq, source, request_id, data FROM execution_journal WHERE seq > ?"
+        params: List[Any] = [after_seq]
+        if wallet_address:
+            sql += " AND wallet_address = ?"
+            params.append(wallet_address)
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY seq LIMIT ?"
+        params.append(limit)
+
+        rows = await self._query(sql, tuple(params))
+        entries = [
+            {"seq": seq, "source": src, "request_id": request_id, "record": json.loads(data)}
+            for seq, src, request_id, data in rows
+        ]
+        return entries, rows[-1][0] if rows else after_seq
+
+    # ------------------------------------------------------------------
+    # Idempotency
+    # ------------------------------------------------------------------
+
+    async def claim(
+        self,
+        key: str,
+        request_id: str,
+        lease: Optional[float] = None,
+        request_hash: Optional[str] = None,
+    ) -> IdempotencyClaim:
+        """
+        Claim an idempotency key for a request.
+
+        Returns acquired=True if the caller should run the request; otherwise the
+        owning request and its stored response (None while it is still running).
+        An in-progress claim whose lease has lapsed is taken over.
+
+        Args:
+            key: Idempotency key
+            request_id: Request claiming the key
+            lease: Seconds the claim stays in progress (default claim_lease)
+            request_hash: Hash of the request payload, returned to later claimants
+                so a key reused for a different payload can be rejected
+        """
+        now_us = to_us(datetime.utcnow())
+        expired_us = now_us - int(self.idempotency_ttl * 1_000_000)
+        lease_until = now_us + int((self.claim_lease if lease is None else lease) * 1_000_000)
+
+        def claim() -> Tuple[bool, str, Optional[str], Optional[str]]:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "DELETE FROM webhook_idempotency WHERE key = ? "
+                    "AND (created_us < ? OR (response IS NULL AND in_progress_until < ?))",
+                    (key, expired_us, now_us),
+                )
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO webhook_idempotency "
+                    "(key, request_id, created_us, in_progress_until, request_hash) VALUES (?, ?, ?, ?, ?)",
+                    (key, request_id, now_us, lease_until, request_hash),
+                ).rowcount
+                if inserted:
+                    return True, request_id, None, request_hash
+                owner, response, stored_hash = self._conn.execute(
+                    "SELECT request_id, response, request_hash FROM webhook_idempotency WHERE key = ?", (key,)
+                ).fetchone()
+                return False, owner, response, stored_hash
+
+        acquired, owner, response, stored_hash = await self._run(claim)
+        return IdempotencyClaim(acquired, owner, json.loads(response) if response else None, stored_hash)
+
+    async def renew(self, key: str, request_id: str, lease: Optional[float] = None) -> bool:
+        """Extend an in-progress claim held by ``request_id``; False if it was lost."""
+        lease_until = to_us(datetime.utcnow()) + int((self.claim_lease if lease is None else lease) * 1_000_000)
+        return bool(await self._execute(
+            "UPDATE webhook_idempotency SET in_progress_until = ? "
+            "WHERE key = ? AND request_id = ? AND response IS NULL",
+            (lease_until, key, request_id),
+        ))
+
+    async def complete(self, key: str, response: Dict[str, Any]) -> None:
+        """Store the response returned to duplicate deliveries (kept for idempotency_ttl)."""
+        await self._execute(
+            "UPDATE webhook_idempotency SET response = ?, created_us = ?, in_progress_until = NULL WHERE key = ?",
+            (json.dumps(response, default=str), to_us(datetime.utcnow()), key),
+        )
+
+    async def release(self, key: str) -> None:
+        """Forget a claimed key (e.g. the request failed) so a retry runs again."""
+        await self._execute("DELETE FROM webhook_idempotency WHERE key = ?", (key,))
+
+    # ------------------------------------------------------------------
+    # Batch progress
+    # ------------------------------------------------------------------
+
+    async def save_batch(
+        self,
+        batch: Dict[str, Any],
+        merge: Optional[Callable[[Optional[Dict[str, Any]], Dict[str, Any]], Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Store the progress of a wallet's batch payout.
+
+        Args:
+            batch: Progress with wallet_address and batch_id
+            merge: Combines the stored progress (or None) with ``batch`` inside the
+                write transaction, so concurrent runs of a batch do not overwrite
+                each other; without it ``batch`` replaces the stored progress
+
+        Returns:
+            The progress as stored
+        """
+        wallet_address, batch_id = batch["wallet_address"], batch["batch_id"]
+
+        def write() -> Dict[str, Any]:
+            with self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                stored = batch
+                if merge is not None:
+                    row = self._conn.execute(
+                        "SELECT data FROM batch_progress WHERE wallet_address = ? AND batch_id = ?",
+                        (wallet_address, batch_id),
+                    ).fetchone()
+                    stored = merge(json.loads(row[0]) if row else None, batch)
+                self._conn.execute(
+                    "INSERT INTO batch_progress (wallet_address, batch_id, data, updated_us) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(wallet_address, batch_id) DO UPDATE SET "
+                    "data = excluded.data, updated_us = excluded.updated_us",
+                    (wallet_address, batch_id, json.dumps(stored, default=str), to_us(datetime.utcnow())),
+                )
+                return stored
+
+        return await self._run(write)
+
+    async def get_batch(self, wallet_address: str, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Progress of a wallet's batch payout, if known."""
+        rows = await self._query(
+            "SELECT data FROM batch_progress WHERE wallet_address = ? AND batch_id = ?",
+            (wallet_address, batch_id),
+        )
+        return json.loads(rows[0][0]) if rows else None
+
+
+# Singleton instance
+_execution_journal: Optional[ExecutionJournal] = None
+
+
+async def get_execution_journal() -> ExecutionJournal:
+    """Get or create singleton execution journal."""
+    global _execution_journal
+    if _execution_journal is None:
+        # Persistent by default; ":memory:" disables persistence
+        _execution_journal = ExecutionJournal(
+            db_path=os.getenv("EXECUTION_JOURNAL_PATH", "execution_journal.db"),
+        )
+    return _execution_journal
@@ -1,8 +1,9 @@
 """Payment execution service - handles real MNEE transfers for payment actions."""
+import asyncio
 import logging
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Callable, Awaitable
 from enum import Enum
 
 from app.protocols.mnee_adapter import MNEEAdapter
@@ -77,6 +78,7 @@ class PaymentExecutor:
         action: PaymentAction,
         from_wallet: str,
         signing_function=None,  # Optional: async function that signs rawtx
+        quote: Optional[Dict[str, Any]] = None,  # Optional: precomputed quote (batch payouts)
     ) -> ExecutionResult:
         """
         Execute a payment action.
@@ -93,6 +95,7 @@ class PaymentExecutor:
             action: PaymentAction to execute
             from_wallet: Wallet executing the action
             signing_function: Optional async function(rawtx) -> signed_rawtx
+            quote: Optional quote to use instead of fetching one
         
         Returns:
             ExecutionResult with status and ticket_id
@@ -137,13 +140,14 @@ class PaymentExecutor:
                 )
             
             # Step 2: Get quote (validates amounts, calculates fees)
-            quote = await self.mnee_adapter.get_quote(
-                from_token=token_info,
-                to_token=token_info,  # Same token (MNEE to MNEE)
-                amount=Decimal(action.amount),
-                chain_id=action.chain_id,
-                wallet_address=from_wallet,
-            )
+            if quote is None:
+                quote = await self.mnee_adapter.get_quote(
+                    from_token=token_info,
+                    to_token=token_info,  # Same token (MNEE to MNEE)
+                    amount=Decimal(action.amount),
+                    chain_id=action.chain_id,
+                    wallet_address=from_wallet,
+                )
             
             if not quote.get("success"):
                 return ExecutionResult(
@@ -257,6 +261,66 @@ class PaymentExecutor:
                 "error": str(e),
             }
     
+    async def execute_batch(
+        self,
+        actions: List[PaymentAction],
+        from_wallet: str,
+        max_concurrency: int = 10,
+        on_result: Optional[Callable[[int, ExecutionResult], Awaitable[None]]] = None,
+    ) -> List[ExecutionResult]:
+        """
+        Execute several payments (e.g. batch payout recipients) concurrently.
+        
+        One quote (price and fee config) is fetched for the whole batch and
+        re-priced per recipient; actions on another token/chain than the
+        first are quoted individually.
+        
+        Args:
+            actions: Payment actions to execute
+            from_wallet: Wallet executing the batch
+            max_concurrency: Maximum executions in flight
+            on_result: Awaited with (index, result) as each execution finishes
+        
+        Returns:
+            ExecutionResults in the same order as ``actions``
+        """
+        if not actions:
+            return []
+        
+        first = actions[0]
+        shared_quote = None
+        token_info = token_registry.get_token(first.token.lower())
+        if token_info and self.mnee_adapter.is_supported(first.chain_id):
+            try:
+                shared_quote = await self.mnee_adapter.get_quote(
+                    from_token=token_info,
+                    to_token=token_info,
+                    amount=Decimal(first.amount),
+                    chain_id=first.chain_id,
+                    wallet_address=from_wallet,
+                )
+            except Exception as e:
+                logger.warning(f"Shared batch quote failed, quoting per recipient: {e}")
+        
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: List[Optional[ExecutionResult]] = [None] * len(actions)
+        
+        async def run(index: int, action: PaymentAction):
+            quote = None
+            if shared_quote and (action.token, action.chain_id) == (first.token, first.chain_id):
+                try:
+                    quote = self.mnee_adapter.quote_for_amount(shared_quote, Decimal(action.amount))
+                except Exception:
+                    quote = None  # execute_action reports the invalid amount
+            async with semaphore:
+                result = await self.execute_action(action, from_wallet, quote=quote)
+            results[index] = result
+            if on_result:
+                await on_result(index, result)
+        
+        await asyncio.gather(*(run(i, action) for i, action in enumerate(actions)))
+        return results
+    
     async def validate_action_for_execution(
         self,
         action: PaymentAction,
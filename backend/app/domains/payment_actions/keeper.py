@@ -4,7 +4,7 @@ Keeper job for automatic recurring payment execution.
 Runs periodically (e.g., every hour) to:
 1. Find all due recurring payment actions
 2. Validate they're enabled and executable
-3. Execute them automatically
+3. Execute them automatically (concurrently, under per-action leases)
 4. Track execution history
 
 Can be run as:
@@ -20,6 +20,10 @@ from decimal import Decimal
 from app.domains.payment_actions.service import get_payment_action_service
 from app.domains.payment_actions.executor import get_payment_executor
 from app.domains.payment_actions.models import PaymentAction, PaymentActionType, PaymentActionFrequency
+from app.domains.payment_actions.next_run import next_run_at
+from app.domains.payment_actions.execution_engine import ActionLeaseManager, KeeperExecutionEngine
+from app.domains.payment_actions.execution_journal import SOURCE_KEEPER, get_execution_journal
+from app.services.websocket_hub import publish_to_wallet
 
 
 logger = logging.getLogger(__name__)
@@ -30,16 +34,26 @@ class RecurringPaymentKeeper:
     Manages automatic execution of recurring payment actions.
     
     Keeps payments on schedule by:
-    - Checking all recurring actions daily
+    - Querying the next-run index for due recurring actions
     - Identifying due payments
     - Executing them automatically
     - Recording results for audit trail
     """
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 20, lease_seconds: int = 300):
+        """
+        Initialize keeper.
+        
+        Args:
+            max_concurrency: Maximum actions executed at once
+            lease_seconds: Per-action lease lifetime shared with other keeper replicas
+        """
         self.service = None
         self.executor = None
-        self.execution_log = {}  # In-memory, upgrade to DB later
+        self.engine: Optional[KeeperExecutionEngine] = None
+        self.max_concurrency = max_concurrency
+        self.leases = ActionLeaseManager(lease_seconds=lease_seconds)
+        self.journal = None
     
     async def _init_services(self):
         """Lazy initialize services."""
@@ -47,6 +61,15 @@ class RecurringPaymentKeeper:
             self.service = await get_payment_action_service()
         if self.executor is None:
             self.executor = await get_payment_executor()
+        if self.journal is None:
+            self.journal = await get_execution_journal()
+        if self.engine is None:
+            self.engine = KeeperExecutionEngine(
+                self.service,
+                self.executor,
+                leases=self.leases,
+                max_concurrency=self.max_concurrency,
+            )
     
     async def run_check(self) -> Dict[str, Any]:
         """
@@ -61,74 +84,22 @@ class RecurringPaymentKeeper:
             start_time = datetime.utcnow()
             logger.info("Starting recurring payment keeper check...")
             
-            # Get all payment actions (could optimize to only recurring)
-            all_wallets = await self.service.get_all_wallets()
-            logger.info(f"Checking recurring payments for {len(all_wallets)} wallets")
-            
-            total_checked = 0
-            total_executed = 0
-            total_failed = 0
+            # Only due actions come back from the next-run index
+            due_actions = await self.service.get_due_actions(start_time)
+            wallets_checked = {a.wallet_address for a in due_actions}
+            logger.info(f"Found {len(due_actions)} due recurring payments across {len(wallets_checked)} wallets")
             
-            # Check each wallet's actions
-            for wallet_address in all_wallets:
-                try:
-                    actions = await self.service.get_actions(wallet_address, enabled_only=True)
-                    
-                    # Filter to recurring actions
-                    recurring_actions = [
-                        a for a in actions
-                        if a.action_type == PaymentActionType.RECURRING and a.schedule
-                    ]
-                    
-                    for action in recurring_actions:
-                        total_checked += 1
-                        
-                        # Check if action is due
-                        if self._is_due(action):
-                            logger.info(f"Executing due recurring action: {action.id} ({action.name})")
-                            
-                            try:
-                                # Execute the action
-                                result = await self.executor.execute_action(action, wallet_address)
-                                
-                                if result.status.value in ["submitted", "completed"]:
-                                    total_executed += 1
-                                    
-                                    # Mark as used
-                                    await self.service.mark_used(wallet_address, action.id)
-                                    
-                                    # Record execution
-                                    self._log_execution(
-                                        action.id,
-                                        wallet_address,
-                                        "success",
-                                        result.ticket_id,
-                                    )
-                                    
-                                    logger.info(f"✓ Executed {action.name} (ticket: {result.ticket_id})")
-                                
-                                else:
-                                    total_failed += 1
-                                    self._log_execution(
-                                        action.id,
-                                        wallet_address,
-                                        "failed",
-                                        error=result.error_message,
-                                    )
-                                    logger.warning(f"✗ Failed to execute {action.name}: {result.error_message}")
-                            
-                            except Exception as e:
-                                total_failed += 1
-                                self._log_execution(
-                                    action.id,
-                                    wallet_address,
-                                    "error",
-                                    error=str(e),
-                                )
-                                logger.error(f"Error executing action {action.id}: {e}")
-                
-                except Exception as e:
-                    logger.error(f"Error checking wallet {wallet_address}: {e}")
+            # Bounded-concurrency execution; per-action leases keep replicas from double-paying
+            result = await self.engine.run(
+                due_actions,
+                on_outcome=lambda action, status, **kw: self._log_execution(
+                    action.id, action.wallet_address, status, **kw
+                ),
+                now=start_time,
+            )
+            total_checked = result.checked
+            total_executed = result.executed
+            total_failed = result.failed
             
             end_time = datetime.utcnow()
             duration = (end_time - start_time).total_seconds()
@@ -136,10 +107,11 @@ class RecurringPaymentKeeper:
             summary = {
                 "timestamp": start_time.isoformat(),
                 "duration_seconds": duration,
-                "wallets_checked": len(all_wallets),
+                "wallets_checked": len(wallets_checked),
                 "actions_checked": total_checked,
                 "actions_executed": total_executed,
                 "actions_failed": total_failed,
+                "actions_skipped": result.skipped,
                 "success_rate": (total_executed / total_checked * 100) if total_checked > 0 else 0,
             }
             
@@ -158,61 +130,19 @@ class RecurringPaymentKeeper:
         """
         Check if a recurring action is due for execution.
         
+        Once due, an action stays due until it runs, so a missed tick does not
+        skip a weekly or monthly payment.
+        
         Args:
             action: Payment action to check
         
         Returns:
             True if action should be executed now
         """
-        if not action.schedule:
-            return False
-        
-        schedule = action.schedule
-        now = datetime.utcnow()
-        last_used = action.last_used
-        
-        # First execution: always execute
-        if last_used is None:
-            return True
-        
-        # Daily: execute every 24 hours
-        if schedule.frequency == PaymentActionFrequency.DAILY:
-            return (now - last_used) >= timedelta(days=1)
-        
-        # Weekly: execute on specified day if enough time has passed
-        if schedule.frequency == PaymentActionFrequency.WEEKLY:
-            target_day = schedule.day_of_week
-            if target_day is None:
-                target_day = last_used.weekday()  # Use original day if not specified
-            
-            # Check if enough time passed and it's the right day
-            days_since = (now - last_used).days
-            current_weekday = now.weekday()
-            
-            if days_since >= 7 and current_weekday == target_day:
-                return True
-            
-            # Also execute if overdue (>14 days) and roughly right day
-            if days_since >= 14:
-                return True
-        
-        # Monthly: execute on specified day if enough time has passed
-        if schedule.frequency == PaymentActionFrequency.MONTHLY:
-            target_day = schedule.day_of_month or last_used.day
-            
-            # Check if enough time passed and it's the right day
-            days_since = (now - last_used).days
-            
-            if days_since >= 28 and now.day == target_day:
-                return True
-            
-            # Also execute if significantly overdue (>35 days)
-            if days_since >= 35:
-                return True
-        
-        return False
+        run_at = next_run_at(action)
+        return run_at is not None and run_at <= datetime.utcnow()
     
-    def _log_execution(
+    async def _log_execution(
         self,
         action_id: str,
         wallet_address: str,
@@ -220,7 +150,7 @@ class RecurringPaymentKeeper:
         ticket_id: Optional[str] = None,
         error: Optional[str] = None,
     ):
-        """Log recurring payment execution for audit."""
+        """Log recurring payment execution to the execution journal."""
         record = {
             "action_id": action_id,
             "wallet_address": wallet_address,
@@ -230,18 +160,15 @@ class RecurringPaymentKeeper:
             "timestamp": datetime.utcnow().isoformat(),
         }
         
-        key = f"{action_id}_{datetime.utcnow().timestamp()}"
-        self.execution_log[key] = record
+        await self.journal.append(SOURCE_KEEPER, record)
+        await publish_to_wallet(wallet_address, record, data_type="recurring_payment")
         
         logger.debug(f"Logged execution: {record}")
     
-    def get_execution_log(self, action_id: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get execution history for an action."""
-        records = [
-            r for r in self.execution_log.values()
-            if r.get("action_id") == action_id
-        ]
-        return sorted(records, key=lambda x: x["timestamp"], reverse=True)[:limit]
+    async def get_execution_log(self, action_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get execution history for an action (newest first)."""
+        await self._init_services()
+        return await self.journal.get_by_action(action_id, source=SOURCE_KEEPER, limit=limit)
 
 
 # Singleton instance
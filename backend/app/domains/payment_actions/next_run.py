@@ -0,0 +1,69 @@
+"""Next-run computation for recurring payment actions (drives the due index)."""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from .models import PaymentAction, PaymentActionFrequency, PaymentActionType
+
+
+def _midnight(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_run_at(action: PaymentAction) -> Optional[datetime]:
+    """
+    Earliest time (naive UTC) at which a recurring action becomes due.
+
+    Mirrors the keeper's rules: first execution is immediate, daily/hourly
+    after a full interval, weekly on the target weekday once 7 days have
+    passed (or after 14 days regardless), monthly on the target day once
+    28 days have passed (or after 35 days regardless).
+
+    Returns:
+        None for actions the keeper never runs (disabled, not recurring, or
+        without a schedule)
+    """
+    if not action.is_enabled or not action.schedule:
+        return None
+    if action.action_type != PaymentActionType.RECURRING:
+        return None
+
+    schedule = action.schedule
+    last_used = action.last_used
+
+    # First execution: due as soon as it exists
+    if last_used is None:
+        return action.created_at
+
+    if schedule.frequency == PaymentActionFrequency.HOURLY:
+        return last_used + timedelta(hours=1)
+
+    if schedule.frequency == PaymentActionFrequency.DAILY:
+        return last_used + timedelta(days=1)
+
+    if schedule.frequency == PaymentActionFrequency.WEEKLY:
+        target_day = schedule.day_of_week
+        if target_day is None:
+            target_day = last_used.weekday()
+        earliest = last_used + timedelta(days=7)
+        overdue = last_used + timedelta(days=14)
+        days_ahead = (target_day - earliest.weekday()) % 7
+        on_target = earliest if days_ahead == 0 else _midnight(earliest) + timedelta(days=days_ahead)
+        return min(on_target, overdue)
+
+    if schedule.frequency == PaymentActionFrequency.MONTHLY:
+        target_day = schedule.day_of_month or last_used.day
+        earliest = last_used + timedelta(days=28)
+        overdue = last_used + timedelta(days=35)
+        candidate = earliest
+        while candidate < overdue:
+            if candidate.day == target_day:
+                return candidate
+            candidate = _midnight(candidate) + timedelta(days=1)
+        return overdue
+
+    return None
+
+
+def to_score(value: datetime) -> float:
+    """Convert a naive UTC datetime to a sortable epoch score."""
+    return value.replace(tzinfo=timezone.utc).timestamp()
@@ -55,19 +55,21 @@ class RecurringScheduler:
     
     CLEAN: Single responsibility - schedule management
     MODULAR: Works with PaymentAction, ready for cron integration
-    PERFORMANT: O(n) scan without database queries
+    PERFORMANT: O(n) scan of given actions, or O(due) via the next-run index
     """
     
     async def get_due_actions(
         self,
-        actions: List[PaymentAction],
+        actions: Optional[List[PaymentAction]] = None,
         now: Optional[datetime] = None,
     ) -> List[ScheduleInfo]:
         """
         Get actions that are due or overdue for execution.
         
         Args:
-            actions: List of payment actions to check
+            actions: List of payment actions to check; when omitted, candidates
+                come from the payment action service's next-run index instead
+                of a scan over every wallet
             now: Reference time (defaults to now)
         
         Returns:
@@ -76,6 +78,11 @@ class RecurringScheduler:
         if now is None:
             now = datetime.utcnow()
         
+        if actions is None:
+            from .service import get_payment_action_service
+            service = await get_payment_action_service()
+            actions = await service.get_due_actions(now)
+        
         due_actions = []
         
         for action in actions:
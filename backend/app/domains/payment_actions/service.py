@@ -9,6 +9,7 @@ from .models import (
     UpdatePaymentActionRequest,
 )
 from .storage import BaseStorageBackend, InMemoryStorageBackend
+from .suggestions import invalidate_suggestion_features
 
 
 class PaymentActionService:
@@ -50,6 +51,7 @@ class PaymentActionService:
         
         # Store via backend
         await self._backend.create(wallet_address, action_id, action)
+        invalidate_suggestion_features(wallet_address)
         return action
     
     async def get_action(
@@ -107,6 +109,7 @@ class PaymentActionService:
         
         # Store updated action via backend
         await self._backend.update(wallet_address, action_id, updated)
+        invalidate_suggestion_features(wallet_address)
         return updated
     
     async def delete_action(
@@ -115,26 +118,27 @@ class PaymentActionService:
         action_id: str,
     ) -> bool:
         """Delete an action."""
-        return await self._backend.delete(wallet_address, action_id)
+        deleted = await self._backend.delete(wallet_address, action_id)
+        invalidate_suggestion_features(wallet_address)
+        return deleted
     
     async def mark_used(
         self,
         wallet_address: str,
         action_id: str,
+        ticket_id: Optional[str] = None,
     ) -> Optional[PaymentAction]:
-        """Mark action as used (increment counter, update timestamp)."""
-        action = await self.get_action(wallet_address, action_id)
-        if not action:
-            return None
-        
-        updated = action.model_copy(update={
-            'last_used': datetime.utcnow(),
-            'usage_count': action.usage_count + 1,
-        })
-        
-        await self._backend.update(wallet_address, action_id, updated)
+        """
+        Mark action as used (increment counter, update timestamp, remember the ticket).
+        
+        Only those fields are written, so edits saved meanwhile are kept.
+        """
+        updated = await self._backend.mark_used(wallet_address, action_id, datetime.utcnow(), ticket_id)
+        if updated:
+            # Suggestion scores depend on last_used / usage_count
+            invalidate_suggestion_features(wallet_address)
         return updated
-    
+
     async def get_quick_actions(
         self,
         wallet_address: str,
@@ -154,6 +158,14 @@ class PaymentActionService:
         """Export all user actions (for backup/migration)."""
         return await self.get_actions(wallet_address)
     
+    async def get_due_actions(
+        self,
+        now: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[PaymentAction]:
+        """Get recurring actions due for execution, soonest first (from the next-run index)."""
+        return await self._backend.get_due_actions(now or datetime.utcnow(), limit)
+    
     async def get_all_wallets(self) -> List[str]:
         """Get all wallets that have payment actions (for keeper jobs)."""
         return await self._backend.list_wallets()
@@ -172,13 +184,10 @@ async def get_payment_action_service() -> PaymentActionService:
     global _service_instance
     if _service_instance is None:
         # Import here to avoid circular imports
-        # Default to Persistent JSON Storage for Hackathon/Dev
-        from .storage import JsonFileStorageBackend
-        import os
+        from .backend_factory import get_payment_actions_backend
         
-        # Use a path in the project root or temp dir to persist
-        storage_path = os.getenv("PAYMENT_STORAGE_PATH", "payment_actions_db.json")
-        backend = JsonFileStorageBackend(file_path=storage_path)
+        # PAYMENT_ACTIONS_BACKEND (append-only log file unless a database is configured)
+        backend = await get_payment_actions_backend()
         _service_instance = PaymentActionService(backend=backend)
     
     return _service_instance
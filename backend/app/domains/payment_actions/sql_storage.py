@@ -0,0 +1,310 @@
+"""
+SQL storage backend for payment actions (SQLAlchemy async).
+
+Works with PostgreSQL (asyncpg) in production and SQLite (aiosqlite)
+locally. Besides the full action document, rows carry the columns the
+keeper and analytics filter on, so due-action and ticket lookups are
+indexed queries instead of scans over every wallet.
+
+Schema: migrations/002_create_payment_actions.sql
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Text,
+    bindparam,
+    delete,
+    func,
+    select,
+    true,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from .models import PaymentAction, PaymentActionType
+from .next_run import next_run_at
+from .storage import BaseStorageBackend, record_use
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+payment_actions_table = Table(
+    "payment_actions",
+    metadata,
+    Column("id", String(64), primary_key=True),
+    Column("wallet_address", String(255), nullable=False),
+    Column("action_type", String(20), nullable=False),
+    Column("is_enabled", Boolean, nullable=False, default=True),
+    Column("next_run_at", DateTime, nullable=True),
+    Column("ticket_id", String(255), nullable=True),
+    Column("usage_count", Integer, nullable=False, default=0),
+    Column("created_at", DateTime, nullable=False),
+    Column("last_used", DateTime, nullable=True),
+    Column("updated_at", DateTime, nullable=False),
+    Column("data", Text, nullable=False),
+    # (wallet_address, id) also serves keyset pagination within a wallet
+    Index("idx_payment_actions_wallet", "wallet_address", "id"),
+    Index("idx_payment_actions_due", "action_type", "is_enabled", "next_run_at"),
+    Index("idx_payment_actions_ticket", "ticket_id"),
+)
+
+_UPSERT_COLUMNS = (
+    "wallet_address", "action_type", "is_enabled", "next_run_at", "ticket_id",
+    "usage_count", "created_at", "last_used", "updated_at", "data",
+)
+
+
+class SQLStorageBackend(BaseStorageBackend):
+    """
+    SQL storage backend (DURABLE: indexed queries for keeper and analytics).
+    """
+
+    def __init__(self, engine: AsyncEngine, page_size: int = 500):
+        """
+        Initialize with an async engine.
+
+        Args:
+            engine: SQLAlchemy async engine (postgresql+asyncpg or sqlite+aiosqlite)
+            page_size: Rows fetched per keyset page when listing a wallet
+        """
+        self.engine = engine
+        self.page_size = page_size
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "SQLStorageBackend":
+        """Create a backend from a database URL."""
+        return cls(create_async_engine(url, pool_pre_ping=True), **kwargs)
+
+    async def create_schema(self) -> None:
+        """Create the table and indexes if missing (dev/SQLite; production uses migrations)."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    # ------------------------------------------------------------------
+    # Row mapping
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _row(action: PaymentAction) -> Dict[str, Any]:
+        return {
+            "id": action.id,
+            "wallet_address": action.wallet_address,
+            "action_type": action.action_type.value,
+            "is_enabled": action.is_enabled,
+            "next_run_at": next_run_at(action),
+            "ticket_id": (action.metadata or {}).get("last_ticket_id"),
+            "usage_count": action.usage_count,
+            "created_at": action.created_at,
+            "last_used": action.last_used,
+            "updated_at": datetime.utcnow(),
+            "data": action.model_dump_json(),
+        }
+
+    @staticmethod
+    def _action(data: str) -> PaymentAction:
+        return PaymentAction(**json.loads(data))
+
+    def _insert(self):
+        """Dialect-specific INSERT supporting ON CONFLICT."""
+        if self.engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        return insert(payment_actions_table)
+
+    # ------------------------------------------------------------------
+    # BaseStorageBackend
+    # ------------------------------------------------------------------
+
+    async def create(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
+        """Store a new action."""
+        await self.create_many([action])
+
+    async def create_many(self, actions: List[PaymentAction]) -> None:
+        """Upsert several actions in one statement."""
+        if not actions:
+            return
+        stmt = self._insert()
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={c: getattr(stmt.excluded, c) for c in _UPSERT_COLUMNS},
+        )
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt, [self._row(a) for a in actions])
+
+    async def get(self, wallet_address: str, action_id: str) -> Optional[PaymentAction]:
+        """Retrieve a single action."""
+        t = payment_actions_table
+        async with self.engine.connect() as conn:
+            data = await conn.scalar(
+                select(t.c.data).where(t.c.id == action_id, t.c.wallet_address == wallet_address)
+            )
+        return self._action(data) if data else None
+
+    async def list_page(
+        self,
+        wallet_address: str,
+        limit: int = 100,
+        after_id: Optional[str] = None,
+    ) -> Tuple[List[PaymentAction], Optional[str]]:
+        """
+        One keyset page of a wallet's actions, ordered by id.
+
+        Args:
+            wallet_address: Wallet to list
+            limit: Page size
+            after_id: Cursor returned by the previous page
+
+        Returns:
+            (actions, next cursor or None when exhausted)
+        """
+        t = payment_actions_table
+        query = select(t.c.id, t.c.data).where(t.c.wallet_address == wallet_address)
+        if after_id is not None:
+            query = query.where(t.c.id > after_id)
+        query = query.order_by(t.c.id).limit(limit)
+
+        async with self.engine.connect() as conn:
+            rows = (await conn.execute(query)).all()
+        next_cursor = rows[-1].id if len(rows) == limit else None
+        return [self._action(r.data) for r in rows], next_cursor
+
+    async def list(self, wallet_address: str) -> List[PaymentAction]:
+        """List all actions for a user (paged internally)."""
+        actions: List[PaymentAction] = []
+        cursor = None
+        while True:
+            page, cursor = await self.list_page(wallet_address, self.page_size, cursor)
+            actions.extend(page)
+            if cursor is None:
+                return actions
+
+    async def update(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
+        """Update an action."""
+        await self.update_many([action])
+
+    async def update_many(self, actions: List[PaymentAction]) -> None:
+        """Update several existing actions in one executemany (missing rows are skipped)."""
+        if not actions:
+            return
+        t = payment_actions_table
+        # SET clause comes from the column keys of each parameter set
+        stmt = update(t).where(
+            t.c.id == bindparam("b_id"), t.c.wallet_address == bindparam("b_wallet")
+        )
+        params = []
+        for action in actions:
+            row = self._row(action)
+            row["b_id"] = row.pop("id")
+            row["b_wallet"] = row.pop("wallet_address")
+            params.append(row)
+        async with self.engine.begin() as conn:
+            await conn.execute(stmt, params)
+
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """
+        Record one use of an action in a single transaction.
+
+        The row is locked (SELECT ... FOR UPDATE on PostgreSQL; SQLite serializes
+        writers) and only ``last_used``, ``usage_count``, ``ticket_id``,
+        ``next_run_at`` and the matching fields of the document are written.
+        """
+        t = payment_actions_table
+        where = (t.c.id == action_id, t.c.wallet_address == wallet_address)
+        async with self.engine.begin() as conn:
+            data = await conn.scalar(select(t.c.data).where(*where).with_for_update())
+            if not data:
+                return None
+            updated = record_use(self._action(data), used_at, ticket_id)
+            values = {
+                "last_used": updated.last_used,
+                "usage_count": updated.usage_count,
+                "next_run_at": next_run_at(updated),
+                "updated_at": datetime.utcnow(),
+                "data": updated.model_dump_json(),
+            }
+            if ticket_id:
+                values["ticket_id"] = ticket_id
+            await conn.execute(update(t).where(*where).values(**values))
+        return updated
+
+    async def delete(self, wallet_address: str, action_id: str) -> bool:
+        """Delete an action."""
+        t = payment_actions_table
+        async with self.engine.begin() as conn:
+            result = await conn.execute(
+                delete(t).where(t.c.id == action_id, t.c.wallet_address == wallet_address)
+            )
+        return result.rowcount > 0
+
+    async def delete_all(self, wallet_address: str) -> int:
+        """Delete all actions for a user."""
+        t = payment_actions_table
+        async with self.engine.begin() as conn:
+            result = await conn.execute(delete(t).where(t.c.wallet_address == wallet_address))
+        return result.rowcount
+
+    async def list_wallets(self) -> List[str]:
+        """List all wallets that have payment actions."""
+        t = payment_actions_table
+        async with self.engine.connect() as conn:
+            return list(await conn.scalars(select(t.c.wallet_address).distinct()))
+
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """Recurring actions due at ``now`` (range scan on the due index)."""
+        t = payment_actions_table
+        query = (
+            select(t.c.data)
+            .where(
+                t.c.action_type == PaymentActionType.RECURRING.value,
+                t.c.is_enabled == true(),
+                t.c.next_run_at <= now,
+            )
+            .order_by(t.c.next_run_at)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        async with self.engine.connect() as conn:
+            return [self._action(data) for data in await conn.scalars(query)]
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    async def get_by_ticket(self, ticket_id: str) -> Optional[PaymentAction]:
+        """Find the action whose latest execution produced a ticket."""
+        t = payment_actions_table
+        async with self.engine.connect() as conn:
+            data = await conn.scalar(select(t.c.data).where(t.c.ticket_id == ticket_id).limit(1))
+        return self._action(data) if data else None
+
+    async def count_by_type(self) -> Dict[str, Dict[str, int]]:
+        """Action counts per type, split into enabled/disabled."""
+        t = payment_actions_table
+        query = select(t.c.action_type, t.c.is_enabled, func.count()).group_by(
+            t.c.action_type, t.c.is_enabled
+        )
+        counts: Dict[str, Dict[str, int]] = {}
+        async with self.engine.connect() as conn:
+            for action_type, is_enabled, count in (await conn.execute(query)).all():
+                bucket = counts.setdefault(action_type, {"enabled": 0, "disabled": 0})
+                bucket["enabled" if is_enabled else "disabled"] += count
+        return counts
@@ -0,0 +1,102 @@
+"""
+Shared SQLite plumbing for the payment action stores.
+
+Transaction history and the execution journal each keep one SQLite
+connection (WAL when file-backed) behind an asyncio lock, run statements in
+a worker thread, group concurrent writes into one commit and prune expired
+rows at most every ``retention_interval`` seconds. Timestamps are stored as
+integer microseconds since the epoch so they sort and compare as keys.
+"""
+import asyncio
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+US_PER_DAY = 86_400_000_000
+
+
+def to_us(value: datetime) -> int:
+    """Datetime (naive = UTC) -> integer microseconds since epoch (exact day arithmetic)."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    delta = value - _EPOCH
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+class SQLiteStore:
+    """
+    Base for SQLite-backed stores.
+
+    Subclasses implement ``_write(rows)`` (one transaction for a batch of
+    rows) and ``_prune()`` (retention; returns rows removed).
+    """
+
+    def __init__(self, db_path: str, schema: str, retention_interval: float):
+        """
+        Open the database.
+
+        Args:
+            db_path: SQLite file (":memory:" keeps data for the process lifetime)
+            schema: DDL script run on open (must be idempotent)
+            retention_interval: Minimum seconds between automatic retention passes
+        """
+        self.db_path = db_path
+        self.retention_interval = retention_interval
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        if db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._conn.executescript(schema)
+        self._upgrade()
+
+        self._lock = asyncio.Lock()
+        self._pending: List[Tuple] = []
+        self._last_retention = time.monotonic()
+
+    def _migrate(self) -> None:
+        """Hook run before the schema script (e.g. drop incompatible tables)."""
+
+    def _upgrade(self) -> None:
+        """Hook run after the schema script (e.g. add columns to existing tables)."""
+
+    def _write(self, rows: List[Tuple]) -> None:
+        raise NotImplementedError
+
+    def _prune(self) -> int:
+        raise NotImplementedError
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn`` in a worker thread while holding the connection lock."""
+        async with self._lock:
+            return await asyncio.to_thread(fn, *args)
+
+    async def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        return await self._run(lambda: self._conn.execute(sql, params).fetchall())
+
+    async def _execute(self, sql: str, params: Tuple = ()) -> int:
+        return await self._run(lambda: self._conn.execute(sql, params).rowcount)
+
+    async def _append(self, row: Tuple) -> None:
+        """Persist a row via ``_write``; rows arriving during a commit share the next one."""
+        self._pending.append(row)
+        async with self._lock:
+            if self._pending:
+                batch, self._pending = self._pending, []
+                await asyncio.to_thread(self._write, batch)
+            if time.monotonic() - self._last_retention >= self.retention_interval:
+                self._last_retention = time.monotonic()
+                await asyncio.to_thread(self._prune)
+
+    async def apply_retention(self) -> int:
+        """Run a retention pass now; returns the number of rows removed."""
+        async with self._lock:
+            self._last_retention = time.monotonic()
+            return await asyncio.to_thread(self._prune)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
@@ -1,10 +1,79 @@
-"""Storage backends for payment actions - abstraction for Redis and PostgreSQL."""
+"""Storage backends for payment actions - abstraction for Redis and PostgreSQL (see sql_storage)."""
+import asyncio
 import json
+import logging
+import os
 import redis.asyncio as redis
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from .models import PaymentAction
+from .next_run import next_run_at, to_score
+
+logger = logging.getLogger(__name__)
+
+
+def _index_due(due: Dict[Tuple[str, str], float], action: PaymentAction) -> None:
+    """Add, move or drop an action in an in-process due index."""
+    run_at = next_run_at(action)
+    key = (action.wallet_address, action.id)
+    if run_at is None:
+        due.pop(key, None)
+    else:
+        due[key] = to_score(run_at)
+
+
+def _select_due(
+    due: Dict[Tuple[str, str], float],
+    store: Dict[str, Dict[str, PaymentAction]],
+    now: datetime,
+    limit: Optional[int],
+) -> List[PaymentAction]:
+    """Resolve due entries of an in-process index to actions, soonest first."""
+    cutoff = to_score(now)
+    entries = sorted((score, key) for key, score in due.items() if score <= cutoff)
+    if limit is not None:
+        entries = entries[:limit]
+    return [
+        store[wallet][action_id]
+        for _, (wallet, action_id) in entries
+        if action_id in store.get(wallet, {})
+    ]
+
+
+def record_use(action: PaymentAction, used_at: datetime, ticket_id: Optional[str]) -> PaymentAction:
+    """Copy of ``action`` with one more use (``last_used``, ``usage_count``, ``last_ticket_id``)."""
+    update: Dict[str, Any] = {"last_used": used_at, "usage_count": action.usage_count + 1}
+    if ticket_id:
+        update["metadata"] = {**action.metadata, "last_ticket_id": ticket_id}
+    return action.model_copy(update=update)
+
+
+# Replace an action only if it still holds the value it was read as, and move
+# it in the due index (ARGV[4] is its next-run score, "" when not scheduled)
+_COMPARE_AND_SET_SCRIPT = """
+if redis.call('hget', KEYS[1], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('hset', KEYS[1], ARGV[1], ARGV[3])
+if ARGV[4] == '' then
+    redis.call('zrem', KEYS[2], ARGV[5])
+else
+    redis.call('zadd', KEYS[2], ARGV[4], ARGV[5])
+end
+return 1
+"""
+
+# Remove an action, its due-index entry and, once the hash is empty, the
+# wallet from the wallet set; returns the number of fields removed
+_DELETE_SCRIPT = """
+local removed = redis.call('hdel', KEYS[1], ARGV[1])
+redis.call('zrem', KEYS[3], ARGV[3])
+if redis.call('hlen', KEYS[1]) == 0 then
+    redis.call('srem', KEYS[2], ARGV[2])
+end
+return removed
+"""
 
 
 class BaseStorageBackend(ABC):
@@ -44,6 +113,55 @@ class BaseStorageBackend(ABC):
     async def list_wallets(self) -> List[str]:
         """List all wallets that have payment actions."""
         pass
+    
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """
+        Recurring actions whose next run is at or before ``now``, soonest first.
+        
+        Backends keep a next-run index; this default falls back to a full scan.
+        """
+        due = []
+        for wallet_address in await self.list_wallets():
+            for action in await self.list(wallet_address):
+                run_at = next_run_at(action)
+                if run_at is not None and run_at <= now:
+                    due.append((run_at, action))
+        due.sort(key=lambda item: item[0])
+        return [action for _, action in due[:limit]]
+    
+    async def create_many(self, actions: List[PaymentAction]) -> None:
+        """Store several actions (keyed by each action's wallet and id)."""
+        for action in actions:
+            await self.create(action.wallet_address, action.id, action)
+    
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """
+        Record one use of an action: set ``last_used``, increment ``usage_count``
+        and remember ``ticket_id`` as ``metadata.last_ticket_id``.
+        
+        Only those fields change, so edits saved concurrently are kept.
+        Backends apply it atomically; this default is a plain read and update.
+        
+        Returns:
+            The updated action, or None if it does not exist
+        """
+        action = await self.get(wallet_address, action_id)
+        if not action:
+            return None
+        updated = record_use(action, used_at, ticket_id)
+        await self.update(wallet_address, action_id, updated)
+        return updated
+    
+    async def update_many(self, actions: List[PaymentAction]) -> None:
+        """Update several actions (keyed by each action's wallet and id)."""
+        for action in actions:
+            await self.update(action.wallet_address, action.id, action)
 
 
 class InMemoryStorageBackend(BaseStorageBackend):
@@ -52,12 +170,14 @@ class InMemoryStorageBackend(BaseStorageBackend):
     def __init__(self):
         """Initialize with empty store."""
         self._store: Dict[str, Dict[str, PaymentAction]] = {}
+        self._due: Dict[Tuple[str, str], float] = {}
     
     async def create(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
         """Store a new action."""
         if wallet_address not in self._store:
             self._store[wallet_address] = {}
         self._store[wallet_address][action_id] = action
+        _index_due(self._due, action)
     
     async def get(self, wallet_address: str, action_id: str) -> Optional[PaymentAction]:
         """Retrieve a single action."""
@@ -71,12 +191,30 @@ class InMemoryStorageBackend(BaseStorageBackend):
         """Update an action."""
         if wallet_address in self._store and action_id in self._store[wallet_address]:
             self._store[wallet_address][action_id] = action
+            _index_due(self._due, action)
+    
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """Record one use of an action (no await between read and write)."""
+        action = self._store.get(wallet_address, {}).get(action_id)
+        if not action:
+            return None
+        updated = record_use(action, used_at, ticket_id)
+        self._store[wallet_address][action_id] = updated
+        _index_due(self._due, updated)
+        return updated
     
     async def delete(self, wallet_address: str, action_id: str) -> bool:
         """Delete an action."""
         user_actions = self._store.get(wallet_address, {})
         if action_id in user_actions:
             del user_actions[action_id]
+            self._due.pop((wallet_address, action_id), None)
             return True
         return False
     
@@ -84,10 +222,16 @@ class InMemoryStorageBackend(BaseStorageBackend):
         """Delete all actions for a user."""
         if wallet_address in self._store:
             count = len(self._store[wallet_address])
+            for action_id in self._store[wallet_address]:
+                self._due.pop((wallet_address, action_id), None)
             del self._store[wallet_address]
             return count
         return 0
     
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """Recurring actions due at ``now`` from the next-run index."""
+        return _select_due(self._due, self._store, now, limit)
+    
     async def list_wallets(self) -> List[str]:
         """List all wallets that have payment actions."""
         return list(self._store.keys())
@@ -103,6 +247,7 @@ class JsonFileStorageBackend(BaseStorageBackend):
         """Initialize with file path."""
         self.file_path = file_path
         self._store: Dict[str, Dict[str, PaymentAction]] = {}
+        self._due: Dict[Tuple[str, str], float] = {}
         self._load()
     
     def _load(self):
@@ -117,6 +262,7 @@ class JsonFileStorageBackend(BaseStorageBackend):
                         self._store[wallet] = {}
                         for action_id, action_data in actions.items():
                             self._store[wallet][action_id] = PaymentAction(**action_data)
+                            _index_due(self._due, self._store[wallet][action_id])
             except Exception as e:
                 print(f"Error loading payment actions: {e}")
                 self._store = {}
@@ -141,8 +287,17 @@ class JsonFileStorageBackend(BaseStorageBackend):
         if wallet_address not in self._store:
             self._store[wallet_address] = {}
         self._store[wallet_address][action_id] = action
+        _index_due(self._due, action)
         self._save()
     
+    async def create_many(self, actions: List[PaymentAction]) -> None:
+        """Store several actions with a single save."""
+        for action in actions:
+            self._store.setdefault(action.wallet_address, {})[action.id] = action
+            _index_due(self._due, action)
+        if actions:
+            self._save()
+    
     async def get(self, wallet_address: str, action_id: str) -> Optional[PaymentAction]:
         """Retrieve a single action."""
         return self._store.get(wallet_address, {}).get(action_id)
@@ -155,6 +310,36 @@ class JsonFileStorageBackend(BaseStorageBackend):
         """Update an action."""
         if wallet_address in self._store and action_id in self._store[wallet_address]:
             self._store[wallet_address][action_id] = action
+            _index_due(self._due, action)
+            self._save()
+    
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """Record one use of an action (no await between read and write)."""
+        action = self._store.get(wallet_address, {}).get(action_id)
+        if not action:
+            return None
+        updated = record_use(action, used_at, ticket_id)
+        self._store[wallet_address][action_id] = updated
+        _index_due(self._due, updated)
+        self._save()
+        return updated
+    
+    async def update_many(self, actions: List[PaymentAction]) -> None:
+        """Update several actions with a single save."""
+        changed = False
+        for action in actions:
+            user_actions = self._store.get(action.wallet_address, {})
+            if action.id in user_actions:
+                user_actions[action.id] = action
+                _index_due(self._due, action)
+                changed = True
+        if changed:
             self._save()
     
     async def delete(self, wallet_address: str, action_id: str) -> bool:
@@ -162,6 +347,7 @@ class JsonFileStorageBackend(BaseStorageBackend):
         user_actions = self._store.get(wallet_address, {})
         if action_id in user_actions:
             del user_actions[action_id]
+            self._due.pop((wallet_address, action_id), None)
             self._save()
             return True
         return False
@@ -170,155 +356,594 @@ class JsonFileStorageBackend(BaseStorageBackend):
         """Delete all actions for a user."""
         if wallet_address in self._store:
             count = len(self._store[wallet_address])
+            for action_id in self._store[wallet_address]:
+                self._due.pop((wallet_address, action_id), None)
             del self._store[wallet_address]
             self._save()
             return count
         return 0
     
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """Recurring actions due at ``now`` from the next-run index."""
+        return _select_due(self._due, self._store, now, limit)
+    
     async def list_wallets(self) -> List[str]:
         """List all wallets that have payment actions."""
         return list(self._store.keys())
 
 
-class RedisStorageBackend(BaseStorageBackend):
-    """
-    Redis storage backend (PERFORMANT: fast, distributed-ready).
-    Key structure: payment_actions:{wallet_address}:{action_id}
+def detect_storage_format(path: str) -> str:
     """
+    Classify a payment action storage file.
     
-    def __init__(self, redis_client: redis.Redis):
-        """Initialize with redis client."""
-        self.redis = redis_client
-        self._prefix = "payment_actions"
+    Returns "missing", "empty", "log" (append-log records), "json" (a
+    JsonFileStorageBackend document) or "unknown".
+    """
+    if not os.path.exists(path):
+        return "missing"
+    with open(path, "r") as f:
+        first = next((line.strip() for line in f if line.strip()), None)
+    if first is None:
+        return "empty"
+    try:
+        record = json.loads(first)
+    except ValueError:
+        if first.startswith('{"op"'):
+            return "log"  # Torn first record
+        try:
+            with open(path, "r") as f:
+                document = json.load(f)  # Pretty-printed document spanning several lines
+        except ValueError:
+            return "unknown"
+        return "json" if isinstance(document, dict) else "unknown"
+    if isinstance(record, dict) and "op" in record:
+        return "log"
+    # The first line is a whole JSON document (a compact JSON store)
+    return "json" if isinstance(record, dict) else "unknown"
+
+
+class AppendLogStorageBackend(BaseStorageBackend):
+    """
+    Append-only log storage backend (PERSISTENT: local default for dev/small deployments).
     
-    def _key(self, wallet_address: str, action_id: Optional[str] = None) -> str:
-        """Generate Redis key."""
-        if action_id:
-            return f"{self._prefix}:{wallet_address}:{action_id}"
-        return f"{self._prefix}:{wallet_address}"
+    Every change is appended to a JSON-lines operation log instead of
+    rewriting the whole dataset. Concurrent writes are group-committed with
+    one fsync per batch, file I/O runs off the event loop, and the log is
+    compacted into a snapshot once it outgrows the live data. The log is
+    replayed lazily on first access.
+    """
     
-    def _index_key(self, wallet_address: str) -> str:
-        """Generate index key for listing."""
-        return f"{self._prefix}:{wallet_address}:index"
+    def __init__(
+        self,
+        file_path: str = "payment_actions.log",
+        legacy_json_path: Optional[str] = None,
+        fsync: bool = True,
+        compact_min_records: int = 1000,
+        compact_ratio: float = 2.0,
+    ):
+        """
+        Initialize with log file path.
+        
+        Args:
+            file_path: Operation log path
+            legacy_json_path: JsonFileStorageBackend file imported when the log does not exist yet
+            fsync: Flush each write batch to disk before acknowledging it
+            compact_min_records: Never compact logs shorter than this
+            compact_ratio: Compact once log records exceed this multiple of live actions
+        """
+        self.file_path = file_path
+        self.legacy_json_path = legacy_json_path
+        self.fsync = fsync
+        self.compact_min_records = compact_min_records
+        self.compact_ratio = compact_ratio
+        
+        self._store: Dict[str, Dict[str, PaymentAction]] = {}
+        self._due: Dict[Tuple[str, str], float] = {}
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._pending: List[Dict[str, Any]] = []
+        self._log_records = 0
+    
+    @classmethod
+    def from_env(cls, **kwargs) -> "AppendLogStorageBackend":
+        """
+        Create the backend from PAYMENT_STORAGE_PATH / PAYMENT_STORAGE_LOG_PATH.
+        
+        PAYMENT_STORAGE_PATH keeps its original meaning (the JSON store); it is
+        imported into the log, which defaults to the same path with a .log
+        suffix. A PAYMENT_STORAGE_PATH that already holds a log is used as is.
+        
+        Raises:
+            ValueError: If the files are not in the expected formats
+        """
+        configured = os.getenv("PAYMENT_STORAGE_PATH")
+        log_path = os.getenv("PAYMENT_STORAGE_LOG_PATH")
+        if configured and detect_storage_format(configured) == "log":
+            log_path, legacy_path = log_path or configured, None
+        else:
+            legacy_path = configured or "payment_actions_db.json"
+            log_path = log_path or f"{os.path.splitext(legacy_path)[0]}.log"
+        backend = cls(file_path=log_path, legacy_json_path=legacy_path, **kwargs)
+        backend.check_files()
+        return backend
+    
+    def check_files(self) -> None:
+        """
+        Refuse to replay or append to a file that is not an operation log.
+        
+        Raises:
+            ValueError: If the log path holds something else, or the legacy
+                file due for import is not a JSON store
+        """
+        log_format = detect_storage_format(self.file_path)
+        if log_format == "missing" and self.file_path.endswith(".json"):
+            raise ValueError(f"Payment action log path {self.file_path} looks like a JSON store; use a .log path")
+        if log_format not in ("missing", "empty", "log"):
+            raise ValueError(
+                f"{self.file_path} is not a payment action log ({log_format}); "
+                f"set PAYMENT_STORAGE_PATH to import it and PAYMENT_STORAGE_LOG_PATH to a new log file"
+            )
+        if log_format == "missing" and self.legacy_json_path:
+            legacy_format = detect_storage_format(self.legacy_json_path)
+            if legacy_format not in ("missing", "empty", "json"):
+                raise ValueError(f"Cannot import {self.legacy_json_path}: not a payment action JSON store ({legacy_format})")
+    
+    # ------------------------------------------------------------------
+    # Log replay and writes
+    # ------------------------------------------------------------------
+    
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if not self._loaded:
+                await asyncio.to_thread(self._load)
+                self._loaded = True
+    
+    def _load(self) -> None:
+        self.check_files()
+        if os.path.exists(self.file_path):
+            with open(self.file_path, "r") as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._apply(json.loads(line))
+                    except Exception as e:
+                        # A torn final line from a crash mid-append is expected
+                        logger.warning(f"Skipping unreadable payment action log line {line_no}: {e}")
+                        continue
+                    self._log_records += 1
+            logger.info(
+                f"Loaded {sum(len(a) for a in self._store.values())} payment actions "
+                f"from {self._log_records} log records"
+            )
+        elif self.legacy_json_path and detect_storage_format(self.legacy_json_path) == "json":
+            with open(self.legacy_json_path, "r") as f:
+                data = json.load(f)
+            for actions in data.values():
+                for action_data in actions.values():
+                    self._apply({"op": "put", "action": action_data})
+            self._compact()
+            logger.info(f"Imported payment actions from {self.legacy_json_path}")
+    
+    def _apply(self, record: Dict[str, Any]) -> None:
+        op = record["op"]
+        if op == "put":
+            action = PaymentAction(**record["action"])
+            self._store.setdefault(action.wallet_address, {})[action.id] = action
+            _index_due(self._due, action)
+        elif op == "del":
+            self._store.get(record["wallet"], {}).pop(record["id"], None)
+            self._due.pop((record["wallet"], record["id"]), None)
+        elif op == "del_wallet":
+            for action_id in self._store.pop(record["wallet"], {}):
+                self._due.pop((record["wallet"], action_id), None)
+    
+    @staticmethod
+    def _put(action: PaymentAction) -> Dict[str, Any]:
+        return {"op": "put", "action": action.model_dump(mode='json')}
+    
+    async def _append(self, records: List[Dict[str, Any]]) -> None:
+        """Durably append records; writers arriving during a flush share the next one."""
+        self._pending.extend(records)
+        async with self._write_lock:
+            if not self._pending:
+                # An earlier writer already flushed our records
+                return
+            batch, self._pending = self._pending, []
+            await asyncio.to_thread(self._write, batch)
+            self._log_records += len(batch)
+            
+            live = sum(len(a) for a in self._store.values())
+            if self._log_records > max(self.compact_min_records, self.compact_ratio * live):
+                # Snapshot on the loop: the store may change while the thread writes
+                await asyncio.to_thread(self._compact, self._snapshot())
+    
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(r, default=str) + "\n" for r in batch)
+        with open(self.file_path, "a") as f:
+            f.write(lines)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        """One put record per live action."""
+        return [self._put(a) for actions in list(self._store.values()) for a in list(actions.values())]
+    
+    def _compact(self, records: Optional[List[Dict[str, Any]]] = None) -> None:
+        """Rewrite the log as the given snapshot (default: the current store), atomically."""
+        if records is None:
+            records = self._snapshot()
+        tmp_path = f"{self.file_path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("".join(json.dumps(r, default=str) + "\n" for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.file_path)
+        self._log_records = len(records)
+        logger.info(f"Compacted payment action log to {len(records)} records")
+    
+    # ------------------------------------------------------------------
+    # BaseStorageBackend
+    # ------------------------------------------------------------------
     
     async def create(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
         """Store a new action."""
-        key = self._key(wallet_address, action_id)
-        data = action.json()
-        await self.redis.set(key, data)
-        # Add to user's index for efficient listing
-        await self.redis.sadd(self._index_key(wallet_address), action_id)
+        await self._ensure_loaded()
+        self._store.setdefault(wallet_address, {})[action_id] = action
+        _index_due(self._due, action)
+        await self._append([self._put(action)])
+    
+    async def create_many(self, actions: List[PaymentAction]) -> None:
+        """Store several actions with a single append."""
+        await self._ensure_loaded()
+        for action in actions:
+            self._store.setdefault(action.wallet_address, {})[action.id] = action
+            _index_due(self._due, action)
+        if actions:
+            await self._append([self._put(a) for a in actions])
     
     async def get(self, wallet_address: str, action_id: str) -> Optional[PaymentAction]:
         """Retrieve a single action."""
-        key = self._key(wallet_address, action_id)
-        data = await self.redis.get(key)
-        if data:
-            return PaymentAction.parse_raw(data)
-        return None
+        await self._ensure_loaded()
+        return self._store.get(wallet_address, {}).get(action_id)
     
     async def list(self, wallet_address: str) -> List[PaymentAction]:
         """List all actions for a user."""
-        index_key = self._index_key(wallet_address)
-        action_ids = await self.redis.smembers(index_key)
-        
-        actions = []
-        for action_id in action_ids:
-            action = await self.get(wallet_address, action_id.decode() if isinstance(action_id, bytes) else action_id)
-            if action:
-                actions.append(action)
-        
-        return actions
+        await self._ensure_loaded()
+        return list(self._store.get(wallet_address, {}).values())
     
     async def update(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
         """Update an action."""
-        key = self._key(wallet_address, action_id)
-        data = action.json()
-        await self.redis.set(key, data)
+        await self._ensure_loaded()
+        if action_id in self._store.get(wallet_address, {}):
+            self._store[wallet_address][action_id] = action
+            _index_due(self._due, action)
+            await self._append([self._put(action)])
+    
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """Record one use of an action (read and update happen without an await in between)."""
+        await self._ensure_loaded()
+        action = self._store.get(wallet_address, {}).get(action_id)
+        if not action:
+            return None
+        updated = record_use(action, used_at, ticket_id)
+        self._store[wallet_address][action_id] = updated
+        _index_due(self._due, updated)
+        await self._append([self._put(updated)])
+        return updated
+    
+    async def update_many(self, actions: List[PaymentAction]) -> None:
+        """Update several actions with a single append."""
+        await self._ensure_loaded()
+        changed = []
+        for action in actions:
+            user_actions = self._store.get(action.wallet_address, {})
+            if action.id in user_actions:
+                user_actions[action.id] = action
+                _index_due(self._due, action)
+                changed.append(self._put(action))
+        if changed:
+            await self._append(changed)
     
     async def delete(self, wallet_address: str, action_id: str) -> bool:
         """Delete an action."""
-        key = self._key(wallet_address, action_id)
-        index_key = self._index_key(wallet_address)
-        
-        result = await self.redis.delete(key)
-        await self.redis.srem(index_key, action_id)
-        
-        return result > 0
+        await self._ensure_loaded()
+        user_actions = self._store.get(wallet_address, {})
+        if action_id not in user_actions:
+            return False
+        del user_actions[action_id]
+        if not user_actions:
+            del self._store[wallet_address]
+        self._due.pop((wallet_address, action_id), None)
+        await self._append([{"op": "del", "wallet": wallet_address, "id": action_id}])
+        return True
     
     async def delete_all(self, wallet_address: str) -> int:
         """Delete all actions for a user."""
-        index_key = self._index_key(wallet_address)
-        action_ids = await self.redis.smembers(index_key)
-        
-        count = 0
-        for action_id in action_ids:
-            action_id_str = action_id.decode() if isinstance(action_id, bytes) else action_id
-            key = self._key(wallet_address, action_id_str)
-            await self.redis.delete(key)
-            count += 1
-        
-        await self.redis.delete(index_key)
-        return count
+        await self._ensure_loaded()
+        user_actions = self._store.pop(wallet_address, None)
+        if not user_actions:
+            return 0
+        for action_id in user_actions:
+            self._due.pop((wallet_address, action_id), None)
+        await self._append([{"op": "del_wallet", "wallet": wallet_address}])
+        return len(user_actions)
+    
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """Recurring actions due at ``now`` from the next-run index."""
+        await self._ensure_loaded()
+        return _select_due(self._due, self._store, now, limit)
     
     async def list_wallets(self) -> List[str]:
         """List all wallets that have payment actions."""
-        # Scan for all keys matching pattern payment_actions:{wallet}:index
-        pattern = f"{self._prefix}:*:index"
-        wallets = set()
-        
-        async for key in self.redis.scan_iter(match=pattern):
-            # Extract wallet address from key pattern payment_actions:{wallet}:index
-            key_str = key.decode() if isinstance(key, bytes) else key
-            parts = key_str.split(":")
-            if len(parts) == 3:
-                wallets.add(parts[1])
-        
-        return list(wallets)
+        await self._ensure_loaded()
+        return list(self._store.keys())
 
 
-class PostgreSQLStorageBackend(BaseStorageBackend):
+class RedisStorageBackend(BaseStorageBackend):
     """
-    PostgreSQL storage backend (fallback for production).
-    Requires: sqlalchemy async driver, migration needed.
+    Redis storage backend (PERFORMANT: fast, distributed-ready).
+    Key structure: payment_actions:{wallet_address} -> hash of action_id -> JSON,
+    payment_actions:wallets -> set of wallets with actions, and
+    payment_actions:due -> sorted set of {wallet}:{action_id} scored by next run time.
+    Every operation is a single round-trip (pipelined or a Lua script where it touches several keys).
     """
     
-    def __init__(self, session_factory):
-        """Initialize with SQLAlchemy async session factory."""
-        self.session_factory = session_factory
+    def __init__(self, redis_client: redis.Redis):
+        """Initialize with redis client."""
+        self.redis = redis_client
+        self._prefix = "payment_actions"
+        self._wallets_key = f"{self._prefix}:wallets"
+        self._due_key = f"{self._prefix}:due"
+        self._due_ready_key = f"{self._prefix}:due:built"
+        # Wallets already checked for the legacy one-key-per-action layout
+        self._migrated: Set[str] = set()
+        self._legacy_scanned = False
+        self._due_index_ready = False
+        self._compare_and_set = redis_client.register_script(_COMPARE_AND_SET_SCRIPT)
+        self._delete = redis_client.register_script(_DELETE_SCRIPT)
+    
+    @staticmethod
+    def _decode(value: Any) -> Any:
+        return value.decode() if isinstance(value, bytes) else value
+    
+    def _key(self, wallet_address: str, action_id: Optional[str] = None) -> str:
+        """Generate Redis key (per-wallet hash, or legacy per-action key)."""
+        if action_id:
+            return f"{self._prefix}:{wallet_address}:{action_id}"
+        return f"{self._prefix}:{wallet_address}"
+    
+    def _index_key(self, wallet_address: str) -> str:
+        """Generate legacy index key for listing."""
+        return f"{self._prefix}:{wallet_address}:index"
+    
+    @staticmethod
+    def _due_member(wallet_address: str, action_id: str) -> str:
+        return f"{wallet_address}:{action_id}"
+    
+    def _queue_index(self, pipe, action: PaymentAction) -> None:
+        """Queue the due-index update for an action onto a pipeline."""
+        member = self._due_member(action.wallet_address, action.id)
+        run_at = next_run_at(action)
+        if run_at is None:
+            pipe.zrem(self._due_key, member)
+        else:
+            pipe.zadd(self._due_key, {member: to_score(run_at)})
+    
+    async def _migrate_legacy(self, wallet_address: str) -> None:
+        """Move actions stored under the legacy per-action keys into the wallet hash."""
+        if wallet_address in self._migrated:
+            return
+        self._migrated.add(wallet_address)
+        
+        index_key = self._index_key(wallet_address)
+        action_ids = [self._decode(a) for a in await self.redis.smembers(index_key)]
+        if not action_ids:
+            return
+        
+        keys = [self._key(wallet_address, action_id) for action_id in action_ids]
+        values = await self.redis.mget(keys)
+        mapping = {
+            action_id: self._decode(data)
+            for action_id, data in zip(action_ids, values)
+            if data
+        }
+        
+        pipe = self.redis.pipeline(transaction=True)
+        if mapping:
+            # HSETNX semantics: never overwrite newer data written to the hash
+            for action_id, data in mapping.items():
+                pipe.hsetnx(self._key(wallet_address), action_id, data)
+                self._queue_index(pipe, PaymentAction.parse_raw(data))
+            pipe.sadd(self._wallets_key, wallet_address)
+        pipe.delete(*keys, index_key)
+        await pipe.execute()
+    
+    async def _ensure_due_index(self) -> None:
+        """Backfill the due index once for data written before it existed."""
+        if self._due_index_ready:
+            return
+        if not await self.redis.exists(self._due_ready_key):
+            wallets = await self.list_wallets()
+            pipe = self.redis.pipeline(transaction=False)
+            for wallet_address in wallets:
+                for action in await self.list(wallet_address):
+                    self._queue_index(pipe, action)
+            pipe.set(self._due_ready_key, "1")
+            await pipe.execute()
+        self._due_index_ready = True
     
     async def create(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
         """Store a new action."""
-        # TODO: Implement with SQLAlchemy ORM
-        # INSERT INTO payment_actions VALUES (...)
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._key(wallet_address), action_id, action.json())
+        pipe.sadd(self._wallets_key, wallet_address)
+        self._queue_index(pipe, action)
+        await pipe.execute()
+    
+    async def create_many(self, actions: List[PaymentAction]) -> None:
+        """Store several actions in one pipelined round-trip."""
+        if not actions:
+            return
+        pipe = self.redis.pipeline(transaction=True)
+        for wallet_address, mapping in self._group_by_wallet(actions).items():
+            pipe.hset(self._key(wallet_address), mapping=mapping)
+            pipe.sadd(self._wallets_key, wallet_address)
+        for action in actions:
+            self._queue_index(pipe, action)
+        await pipe.execute()
     
     async def get(self, wallet_address: str, action_id: str) -> Optional[PaymentAction]:
         """Retrieve a single action."""
-        # TODO: SELECT * FROM payment_actions WHERE action_id = ?
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        data = await self.redis.hget(self._key(wallet_address), action_id)
+        if data is None and wallet_address not in self._migrated:
+            await self._migrate_legacy(wallet_address)
+            data = await self.redis.hget(self._key(wallet_address), action_id)
+        if data:
+            return PaymentAction.parse_raw(data)
+        return None
     
     async def list(self, wallet_address: str) -> List[PaymentAction]:
-        """List all actions for a user."""
-        # TODO: SELECT * FROM payment_actions WHERE wallet_address = ?
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        """List all actions for a user (single HGETALL)."""
+        await self._migrate_legacy(wallet_address)
+        entries = await self.redis.hgetall(self._key(wallet_address))
+        return [PaymentAction.parse_raw(data) for data in entries.values()]
     
     async def update(self, wallet_address: str, action_id: str, action: PaymentAction) -> None:
         """Update an action."""
-        # TODO: UPDATE payment_actions SET ... WHERE action_id = ?
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(self._key(wallet_address), action_id, action.json())
+        self._queue_index(pipe, action)
+        await pipe.execute()
+    
+    async def mark_used(
+        self,
+        wallet_address: str,
+        action_id: str,
+        used_at: datetime,
+        ticket_id: Optional[str] = None,
+    ) -> Optional[PaymentAction]:
+        """
+        Record one use of an action as a read-modify-write of its hash field.
+        
+        The new document is written by a Lua compare-and-set that fails if the
+        field changed since it was read; the update is then retried on the
+        fresh value, so a concurrent edit is never overwritten.
+        """
+        while True:
+            current = await self.redis.hget(self._key(wallet_address), action_id)
+            if current is None and wallet_address not in self._migrated:
+                await self._migrate_legacy(wallet_address)
+                current = await self.redis.hget(self._key(wallet_address), action_id)
+            if not current:
+                return None
+            updated = record_use(PaymentAction.parse_raw(current), used_at, ticket_id)
+            run_at = next_run_at(updated)
+            if await self._compare_and_set(
+                keys=[self._key(wallet_address), self._due_key],
+                args=[
+                    action_id,
+                    current,
+                    updated.json(),
+                    to_score(run_at) if run_at is not None else "",
+                    self._due_member(wallet_address, action_id),
+                ],
+            ):
+                return updated
+    
+    async def update_many(self, actions: List[PaymentAction]) -> None:
+        """Update several actions in one pipelined round-trip."""
+        if not actions:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for wallet_address, mapping in self._group_by_wallet(actions).items():
+            pipe.hset(self._key(wallet_address), mapping=mapping)
+        for action in actions:
+            self._queue_index(pipe, action)
+        await pipe.execute()
     
     async def delete(self, wallet_address: str, action_id: str) -> bool:
-        """Delete an action."""
-        # TODO: DELETE FROM payment_actions WHERE action_id = ?
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        """Delete an action (one script: HDEL, ZREM and SREM of the wallet once it is empty)."""
+        await self._migrate_legacy(wallet_address)
+        removed = await self._delete(
+            keys=[self._key(wallet_address), self._wallets_key, self._due_key],
+            args=[action_id, wallet_address, self._due_member(wallet_address, action_id)],
+        )
+        return removed > 0
     
     async def delete_all(self, wallet_address: str) -> int:
         """Delete all actions for a user."""
-        # TODO: DELETE FROM payment_actions WHERE wallet_address = ?
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        await self._migrate_legacy(wallet_address)
+        action_ids = [self._decode(a) for a in await self.redis.hkeys(self._key(wallet_address))]
+        
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.delete(self._key(wallet_address))
+        pipe.srem(self._wallets_key, wallet_address)
+        if action_ids:
+            pipe.zrem(self._due_key, *[self._due_member(wallet_address, a) for a in action_ids])
+        await pipe.execute()
+        return len(action_ids)
     
     async def list_wallets(self) -> List[str]:
         """List all wallets that have payment actions."""
-        # TODO: SELECT DISTINCT wallet_address FROM payment_actions
-        raise NotImplementedError("PostgreSQL backend requires ORM setup")
+        if not self._legacy_scanned:
+            # One-time scan for wallets still using the legacy layout
+            self._legacy_scanned = True
+            async for key in self.redis.scan_iter(match=f"{self._prefix}:*:index"):
+                parts = self._decode(key).split(":")
+                if len(parts) == 3:
+                    await self._migrate_legacy(parts[1])
+        
+        wallets = await self.redis.smembers(self._wallets_key)
+        return [self._decode(w) for w in wallets]
+    
+    async def get_due_actions(self, now: datetime, limit: Optional[int] = None) -> List[PaymentAction]:
+        """
+        Recurring actions due at ``now``: one ZRANGEBYSCORE plus one pipelined fetch.
+        
+        Cost depends on the number of due actions, not on the number of wallets.
+        """
+        await self._ensure_due_index()
+        members = await self.redis.zrangebyscore(
+            self._due_key,
+            "-inf",
+            to_score(now),
+            start=0 if limit is not None else None,
+            num=limit,
+        )
+        if not members:
+            return []
+        
+        pairs = [self._decode(m).rsplit(":", 1) for m in members]
+        pipe = self.redis.pipeline(transaction=False)
+        for wallet_address, action_id in pairs:
+            pipe.hget(self._key(wallet_address), action_id)
+        values = await pipe.execute()
+        
+        actions = []
+        stale = []
+        for member, data in zip(members, values):
+            if data:
+                actions.append(PaymentAction.parse_raw(data))
+            else:
+                stale.append(member)
+        if stale:
+            await self.redis.zrem(self._due_key, *stale)
+        return actions
+    
+    def _group_by_wallet(self, actions: List[PaymentAction]) -> Dict[str, Dict[str, str]]:
+        grouped: Dict[str, Dict[str, str]] = {}
+        for action in actions:
+            grouped.setdefault(action.wallet_address, {})[action.id] = action.json()
+        return grouped
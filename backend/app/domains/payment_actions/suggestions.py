@@ -1,11 +1,58 @@
 """Smart suggestion engine for payment actions based on usage patterns."""
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+
+import numpy as np
+
 from .models import PaymentAction
+from .sqlite_store import US_PER_DAY, to_us
 
 logger = logging.getLogger(__name__)
 
+# Schedule interval used for overdue checks (unknown frequencies count as monthly)
+_INTERVAL_DAYS = {"daily": 1, "weekly": 7, "monthly": 30}
+
+
+class ActionFeatures:
+    """Columnar snapshot of a wallet's actions for vectorized scoring."""
+    
+    def __init__(self, actions: List[PaymentAction]):
+        """Extract per-action feature arrays (one pass over the models)."""
+        self.actions = actions
+        n = len(actions)
+        self.enabled = np.zeros(n, dtype=bool)
+        self.has_last_used = np.zeros(n, dtype=bool)
+        self.last_used_us = np.zeros(n, dtype=np.int64)
+        self.usage_count = np.zeros(n, dtype=np.int64)
+        self.pinned = np.zeros(n, dtype=bool)
+        self.recurring = np.zeros(n, dtype=bool)
+        self.shortcut = np.zeros(n, dtype=bool)
+        self.has_schedule = np.zeros(n, dtype=bool)
+        self.schedule_day = np.full(n, -1, dtype=np.int64)
+        self.interval_days = np.full(n, 30, dtype=np.int64)
+        
+        for i, action in enumerate(actions):
+            self.enabled[i] = action.is_enabled
+            if action.last_used:
+                self.has_last_used[i] = True
+                self.last_used_us[i] = to_us(action.last_used)
+            self.usage_count[i] = action.usage_count
+            self.pinned[i] = action.is_pinned
+            self.recurring[i] = action.action_type.value == "recurring"
+            self.shortcut[i] = action.action_type.value == "shortcut"
+            if action.schedule:
+                self.has_schedule[i] = True
+                if action.schedule.day_of_week is not None:
+                    self.schedule_day[i] = action.schedule.day_of_week
+                self.interval_days[i] = _INTERVAL_DAYS.get(action.schedule.frequency.value, 30)
+    
+    def days_since_used(self, now: datetime) -> np.ndarray:
+        """Whole days since last use (floor, like ``timedelta.days``); 0 if never used."""
+        days = (to_us(now) - self.last_used_us) // US_PER_DAY
+        return np.where(self.has_last_used, days, 0)
+
 
 class ActionSuggestion:
     """Suggestion for a payment action."""
@@ -37,22 +84,46 @@ class SuggestionEngine:
     Suggest payment actions based on usage patterns.
     
     MODULAR: Pluggable scoring algorithms
-    PERFORMANT: O(n) analysis without external ML
+    PERFORMANT: Vectorized O(n) scoring over cached feature arrays
     ORGANIZED: Single engine for all suggestion logic
     """
     
-    def __init__(self):
+    def __init__(self, max_wallets: int = 1000):
         """Initialize suggestion engine."""
         # Scoring weights
         self.weight_recent = 0.4  # Recency matters most
         self.weight_frequent = 0.4  # Frequency matters too
         self.weight_pinned = 0.2  # Pinned actions get slight boost
+        
+        # wallet -> (action ids, features); every mutation invalidates its wallet,
+        # the ids only catch a list that does not match the cached one
+        self.max_wallets = max_wallets
+        self._features: "OrderedDict[str, Tuple[Tuple[str, ...], ActionFeatures]]" = OrderedDict()
+    
+    def invalidate(self, wallet_address: str) -> None:
+        """Drop cached features for a wallet (after mark_used or any edit)."""
+        self._features.pop(wallet_address, None)
+    
+    def _features_for(self, wallet_address: Optional[str], actions: List[PaymentAction]) -> ActionFeatures:
+        if wallet_address is None:
+            return ActionFeatures(actions)
+        cached = self._features.get(wallet_address)
+        if cached and cached[0] == tuple(a.id for a in actions):
+            self._features.move_to_end(wallet_address)
+            return cached[1]
+        
+        features = ActionFeatures(actions)
+        self._features[wallet_address] = (tuple(a.id for a in actions), features)
+        if len(self._features) > self.max_wallets:
+            self._features.popitem(last=False)
+        return features
     
     async def suggest_actions(
         self,
         actions: List[PaymentAction],
         context: Optional[Dict[str, Any]] = None,
         limit: int = 3,
+        wallet_address: Optional[str] = None,
     ) -> List[ActionSuggestion]:
         """
         Suggest payment actions based on usage patterns.
@@ -67,6 +138,8 @@ class SuggestionEngine:
             actions: List of user's payment actions
             context: Optional context (time of day, day of week, etc.)
             limit: Number of suggestions to return
+            wallet_address: Owner of the actions; their features are cached
+                per wallet (None computes them uncached)
         
         Returns:
             Sorted list of ActionSuggestion
@@ -74,71 +147,65 @@ class SuggestionEngine:
         if not actions:
             return []
         
-        suggestions = []
+        f = self._features_for(wallet_address, actions)
         now = datetime.utcnow()
+        days_ago = f.days_since_used(now)
         
-        for action in actions:
-            if not action.is_enabled:
-                continue
-            
-            score = 0.0
-            reason = ""
-            
-            # Score by recency
-            if action.last_used:
-                days_ago = (now - action.last_used).days
-                recency_score = self._score_recency(days_ago)
-                score += recency_score * self.weight_recent
-                
-                if days_ago == 0:
-                    reason += "Used today. "
-                elif days_ago == 1:
-                    reason += "Used yesterday. "
-                elif days_ago < 7:
-                    reason += "Recently used. "
-            else:
-                # Never used - low recency score
-                reason += "Available. "
-            
-            # Score by frequency
-            if action.usage_count > 0:
-                frequency_score = self._score_frequency(action.usage_count)
-                score += frequency_score * self.weight_frequent
-                
-                if action.usage_count >= 10:
-                    reason += "Frequently used. "
-                elif action.usage_count >= 3:
-                    reason += "Regularly used. "
-            
-            # Boost pinned actions
-            if action.is_pinned:
-                score += 0.1 * self.weight_pinned
-                reason += "Your favorite. "
-            
-            # Boost recurring payments
-            if action.action_type.value == "recurring":
-                score += 0.1
-                reason += "Recurring payment. "
-            
-            # Apply context-based boosting
-            if context:
-                context_boost = self._score_context(action, context)
-                score += context_boost
-            
-            # Normalize score to 0.0-1.0
-            score = min(1.0, max(0.0, score))
-            
-            if score > 0:
-                suggestions.append(ActionSuggestion(
-                    action=action,
-                    reason=reason.strip(),
-                    score=score,
-                ))
+        # Same accumulation order as the per-action rules, over all actions at once
+        score = np.zeros(len(actions))
+        recency = np.select([days_ago < 1, days_ago < 7, days_ago < 30], [1.0, 0.8, 0.5], 0.2)
+        score += np.where(f.has_last_used, recency * self.weight_recent, 0.0)
+        frequency = np.select(
+            [f.usage_count >= 20, f.usage_count >= 10, f.usage_count >= 5, f.usage_count >= 2],
+            [1.0, 0.8, 0.6, 0.4],
+            0.2,
+        )
+        score += np.where(f.usage_count > 0, frequency * self.weight_frequent, 0.0)
+        score += np.where(f.pinned, 0.1 * self.weight_pinned, 0.0)
+        score += np.where(f.recurring, 0.1, 0.0)
+        if context:
+            score += self._score_context_vector(f, context)
+        score = np.clip(score, 0.0, 1.0)
+        
+        # Stable sort keeps input order among equal scores
+        candidates = np.flatnonzero(f.enabled & (score > 0))
+        top = candidates[np.argsort(-score[candidates], kind="stable")][:limit]
+        
+        return [
+            ActionSuggestion(
+                action=actions[i],
+                reason=self._reason(actions[i], int(days_ago[i])),
+                score=float(score[i]),
+            )
+            for i in top.tolist()
+        ]
+    
+    def _reason(self, action: PaymentAction, days_ago: int) -> str:
+        """Explain a suggestion (built only for returned suggestions)."""
+        reason = ""
+        if action.last_used:
+            if days_ago == 0:
+                reason += "Used today. "
+            elif days_ago == 1:
+                reason += "Used yesterday. "
+            elif days_ago < 7:
+                reason += "Recently used. "
+        else:
+            # Never used - low recency score
+            reason += "Available. "
+        
+        if action.usage_count >= 10:
+            reason += "Frequently used. "
+        elif action.usage_count >= 3:
+            reason += "Regularly used. "
+        
+        if action.is_pinned:
+            reason += "Your favorite. "
         
-        # Sort by score (highest first)
-        suggestions.sort(key=lambda s: -s.score)
+        if action.action_type.value == "recurring":
+            reason += "Recurring payment. "
         
-        return suggestions[:limit]
+        return reason.strip()
     
     async def suggest_based_on_time(
         self,
@@ -146,6 +213,7 @@ class SuggestionEngine:
         hour: int = None,
         day_of_week: int = None,
         limit: int = 3,
+        wallet_address: Optional[str] = None,
     ) -> List[ActionSuggestion]:
         """
         Suggest actions based on time of day and day of week.
@@ -160,6 +228,7 @@ class SuggestionEngine:
             hour: Hour of day (0-23), defaults to current
             day_of_week: Day of week (0=Mon, 6=Sun), defaults to current
             limit: Number of suggestions
+            wallet_address: Owner of the actions (enables the feature cache)
         
         Returns:
             Sorted list of ActionSuggestion
@@ -178,12 +247,13 @@ class SuggestionEngine:
             "is_friday": day_of_week == 4,
         }
         
-        return await self.suggest_actions(actions, context, limit)
+        return await self.suggest_actions(actions, context, limit, wallet_address)
     
     async def suggest_overdue_recurring(
         self,
         actions: List[PaymentAction],
         limit: int = 5,
+        wallet_address: Optional[str] = None,
     ) -> List[ActionSuggestion]:
         """
         Suggest recurring payments that are due or overdue.
@@ -191,112 +261,68 @@ class SuggestionEngine:
         Args:
             actions: List of user's payment actions
             limit: Number of suggestions
+            wallet_address: Owner of the actions (enables the feature cache)
         
         Returns:
             List of recurring actions that should be executed soon
         """
-        suggestions = []
+        if not actions:
+            return []
+        
+        f = self._features_for(wallet_address, actions)
         now = datetime.utcnow()
         
-        for action in actions:
-            if not action.is_enabled or not action.schedule:
-                continue
-            
-            if action.action_type.value != "recurring":
-                continue
-            
-            # Check if action should run based on schedule
-            days_overdue = self._days_overdue(action, now)
-            
-            if days_overdue >= 0:  # Action is due or overdue
-                suggestion = ActionSuggestion(
-                    action=action,
-                    reason=f"Due {days_overdue} days ago" if days_overdue > 0 else "Due today",
-                    score=min(1.0, 0.5 + days_overdue * 0.1),  # Higher score if more overdue
-                )
-                suggestions.append(suggestion)
+        # Due or overdue: every enabled recurring action with a schedule
+        eligible = np.flatnonzero(f.enabled & f.has_schedule & f.recurring)
+        days_overdue = np.where(
+            f.has_last_used,
+            np.maximum(0, f.days_since_used(now) - f.interval_days),
+            0,
+        )
+        score = np.minimum(1.0, 0.5 + days_overdue * 0.1)  # Higher score if more overdue
         
         # Sort by overdue days (most overdue first)
-        suggestions.sort(key=lambda s: -s.score)
+        top = eligible[np.argsort(-score[eligible], kind="stable")][:limit]
         
-        return suggestions[:limit]
-    
-    def _score_recency(self, days_ago: int) -> float:
-        """Score action by recency (0.0-1.0)."""
-        if days_ago < 1:
-            return 1.0
-        elif days_ago < 7:
-            return 0.8
-        elif days_ago < 30:
-            return 0.5
-        else:
-            return 0.2
+        return [
+            ActionSuggestion(
+                action=actions[i],
+                reason=f"Due {int(days_overdue[i])} days ago" if days_overdue[i] > 0 else "Due today",
+                score=float(score[i]),
+            )
+            for i in top.tolist()
+        ]
     
-    def _score_frequency(self, usage_count: int) -> float:
-        """Score action by frequency of use (0.0-1.0)."""
-        if usage_count >= 20:
-            return 1.0
-        elif usage_count >= 10:
-            return 0.8
-        elif usage_count >= 5:
-            return 0.6
-        elif usage_count >= 2:
-            return 0.4
-        else:
-            return 0.2
-    
-    def _score_context(
-        self,
-        action: PaymentAction,
-        context: Dict[str, Any],
-    ) -> float:
-        """Apply context-based scoring."""
-        score = 0.0
+    def _score_context_vector(self, f: ActionFeatures, context: Dict[str, Any]) -> np.ndarray:
+        """Context-based scoring over all actions."""
+        score = np.zeros(len(f.actions))
         
         # Recurring payments more relevant on weekdays
-        if action.action_type.value == "recurring" and not context.get("is_weekend"):
-            score += 0.1
+        if not context.get("is_weekend"):
+            score += np.where(f.recurring, 0.1, 0.0)
         
         # Personal transfers more relevant in evenings
-        if action.action_type.value == "shortcut" and context.get("is_evening"):
-            score += 0.1
+        if context.get("is_evening"):
+            score += np.where(f.shortcut, 0.1, 0.0)
         
-        # Check schedule alignment
-        if action.schedule and action.schedule.day_of_week is not None:
-            if action.schedule.day_of_week == context.get("day_of_week"):
-                score += 0.2  # Action scheduled for today
+        # Check schedule alignment (action scheduled for today)
+        day_of_week = context.get("day_of_week")
+        if isinstance(day_of_week, int):
+            score += np.where((f.schedule_day >= 0) & (f.schedule_day == day_of_week), 0.2, 0.0)
         
         return score
-    
-    def _days_overdue(self, action: PaymentAction, now: datetime) -> int:
-        """
-        Calculate days overdue for a recurring action.
-        
-        Returns:
-            Days overdue (negative if not yet due, 0 if due today)
-        """
-        if not action.schedule or not action.last_used:
-            return 0
-        
-        frequency = action.schedule.frequency.value
-        
-        # Map frequency to days
-        interval_days = {
-            "daily": 1,
-            "weekly": 7,
-            "monthly": 30,
-        }.get(frequency, 30)
-        
-        days_since = (now - action.last_used).days
-        days_overdue = days_since - interval_days
-        
-        return max(0, days_overdue)
 
 
 # Singleton instance
 _engine_instance: Optional[SuggestionEngine] = None
 
 
+def invalidate_suggestion_features(wallet_address: str) -> None:
+    """Invalidate the singleton engine's cached features for a wallet."""
+    if _engine_instance is not None:
+        _engine_instance.invalidate(wallet_address)
+
+
 async def get_suggestion_engine() -> SuggestionEngine:
     """Get or create singleton suggestion engine."""
     global _engine_instance
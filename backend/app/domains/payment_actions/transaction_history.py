@@ -1,9 +1,18 @@
 """Payment transaction history tracking."""
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Dict, Any, Tuple
 from enum import Enum
 from pydantic import BaseModel, Field
 
+from .sqlite_store import SQLiteStore, to_us
+
+logger = logging.getLogger(__name__)
+
 
 class TransactionStatus(Enum):
     """Status of executed payment transaction."""
@@ -43,13 +52,115 @@ class PaymentTransaction(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional data")
 
 
-class TransactionHistoryService:
-    """Manages payment transaction history (in-memory for now, ready for persistence)."""
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS payment_transactions (
+    wallet_address TEXT NOT NULL,
+    id TEXT NOT NULL,
+    action_id TEXT NOT NULL,
+    ticket_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_us INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (wallet_address, id)
+);
+CREATE INDEX IF NOT EXISTS idx_payment_transactions_ticket
+    ON payment_transactions(wallet_address, ticket_id);
+CREATE INDEX IF NOT EXISTS idx_payment_transactions_created
+    ON payment_transactions(wallet_address, created_us, id);
+CREATE INDEX IF NOT EXISTS idx_payment_transactions_status
+    ON payment_transactions(wallet_address, status, created_us, id);
+CREATE INDEX IF NOT EXISTS idx_payment_transactions_action
+    ON payment_transactions(wallet_address, action_id, status);
+"""
+
+# Statuses that never change again; only these are removed by retention
+_TERMINAL_STATUSES = ("confirmed", "failed", "cancelled")
+
+
+class TransactionHistoryService(SQLiteStore):
+    """
+    Manages payment transaction history in SQLite.
+    
+    PERSISTENT: Survives restarts when given a file path (WAL mode).
+    PERFORMANT: Indexed by ticket, (wallet, created_at) and status, with
+    keyset-cursor pagination; concurrent writes share one commit.
+    """
+    
+    def __init__(
+        self,
+        db_path: str = ":memory:",
+        retention_days: Optional[int] = 365,
+        retention_interval: float = 3600.0,
+    ):
+        """
+        Initialize history storage.
+        
+        Args:
+            db_path: SQLite file (":memory:" keeps history for the process lifetime)
+            retention_days: Terminal transactions older than this are removed (None keeps all)
+            retention_interval: Minimum seconds between automatic retention passes
+        """
+        self.retention_days = retention_days
+        super().__init__(db_path, _SCHEMA, retention_interval)
+    
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    
+    @staticmethod
+    def _row(txn: PaymentTransaction) -> Tuple:
+        return (
+            txn.wallet_address,
+            txn.id,
+            txn.action_id,
+            txn.ticket_id,
+            txn.status.value,
+            to_us(txn.created_at),
+            txn.model_dump_json(),
+        )
+    
+    @staticmethod
+    def _model(data: str) -> PaymentTransaction:
+        return PaymentTransaction(**json.loads(data))
+    
+    def _write(self, rows: List[Tuple]) -> None:
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO payment_transactions "
+                "(wallet_address, id, action_id, ticket_id, status, created_us, data) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+    
+    async def _save(self, txn: PaymentTransaction) -> None:
+        """Persist a transaction; writers arriving during a commit share the next one."""
+        await self._append(self._row(txn))
+    
+    def _prune(self, days: Optional[int] = None) -> int:
+        days = days if days is not None else self.retention_days
+        if days is None:
+            return 0
+        cutoff = to_us(datetime.utcnow() - timedelta(days=days))
+        placeholders = ", ".join("?" for _ in _TERMINAL_STATUSES)
+        with self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM payment_transactions WHERE created_us < ? AND status IN ({placeholders})",
+                (cutoff, *_TERMINAL_STATUSES),
+            )
+        if cursor.rowcount:
+            logger.info(f"Removed {cursor.rowcount} payment transactions older than {days} days")
+        return cursor.rowcount
+    
+    async def apply_retention(self, days: Optional[int] = None) -> int:
+        """Remove terminal transactions older than ``days`` (defaults to retention_days)."""
+        async with self._lock:
+            self._last_retention = time.monotonic()
+            return await asyncio.to_thread(self._prune, days)
     
-    def __init__(self):
-        """Initialize history storage."""
-        # Structure: {wallet_address: {transaction_id: PaymentTransaction}}
-        self._history: Dict[str, Dict[str, PaymentTransaction]] = {}
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
     
     async def record_transaction(
         self,
@@ -57,10 +168,9 @@ class TransactionHistoryService:
         transaction: PaymentTransaction,
     ) -> PaymentTransaction:
         """Record a new transaction in history."""
-        if wallet_address not in self._history:
-            self._history[wallet_address] = {}
-        
-        self._history[wallet_address][transaction.id] = transaction
+        if transaction.wallet_address != wallet_address:
+            transaction = transaction.model_copy(update={"wallet_address": wallet_address})
+        await self._save(transaction)
         return transaction
     
     async def get_transaction(
@@ -69,7 +179,11 @@ class TransactionHistoryService:
         transaction_id: str,
     ) -> Optional[PaymentTransaction]:
         """Get a specific transaction."""
-        return self._history.get(wallet_address, {}).get(transaction_id)
+        rows = await self._query(
+            "SELECT data FROM payment_transactions WHERE wallet_address = ? AND id = ?",
+            (wallet_address, transaction_id),
+        )
+        return self._model(rows[0][0]) if rows else None
     
     async def get_transaction_by_ticket(
         self,
@@ -77,29 +191,57 @@ class TransactionHistoryService:
         ticket_id: str,
     ) -> Optional[PaymentTransaction]:
         """Get transaction by MNEE ticket ID."""
-        user_txns = self._history.get(wallet_address, {})
-        for txn in user_txns.values():
-            if txn.ticket_id == ticket_id:
-                return txn
-        return None
+        rows = await self._query(
+            "SELECT data FROM payment_transactions WHERE wallet_address = ? AND ticket_id = ? LIMIT 1",
+            (wallet_address, ticket_id),
+        )
+        return self._model(rows[0][0]) if rows else None
     
-    async def get_transactions(
+    async def get_transactions_page(
         self,
         wallet_address: str,
         status: Optional[TransactionStatus] = None,
         limit: int = 50,
-    ) -> List[PaymentTransaction]:
-        """Get user's transaction history."""
-        user_txns = list(self._history.get(wallet_address, {}).values())
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[PaymentTransaction], Optional[str]]:
+        """
+        One page of a wallet's history, newest first.
         
-        # Filter by status if provided
-        if status:
-            user_txns = [t for t in user_txns if t.status == status]
+        Args:
+            wallet_address: Wallet to list
+            status: Only transactions with this status
+            limit: Page size
+            cursor: ``next_cursor`` from the previous page
         
-        # Sort by created_at descending (newest first)
-        user_txns.sort(key=lambda t: t.created_at, reverse=True)
+        Returns:
+            (transactions, next_cursor or None when exhausted)
+        """
+        sql = "SELECT created_us, id, data FROM payment_transactions WHERE wallet_address = ?"
+        params: List[Any] = [wallet_address]
+        if status:
+            sql += " AND status = ?"
+            params.append(status.value)
+        if cursor:
+            created_us, last_id = cursor.split(":", 1)
+            sql += " AND (created_us, id) < (?, ?)"
+            params.extend([int(created_us), last_id])
+        sql += " ORDER BY created_us DESC, id DESC LIMIT ?"
+        params.append(limit)
         
-        return user_txns[:limit]
+        rows = await self._query(sql, tuple(params))
+        next_cursor = f"{rows[-1][0]}:{rows[-1][1]}" if len(rows) == limit else None
+        return [self._model(r[2]) for r in rows], next_cursor
+    
+    async def get_transactions(
+        self,
+        wallet_address: str,
+        status: Optional[TransactionStatus] = None,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> List[PaymentTransaction]:
+        """Get user's transaction history (newest first)."""
+        transactions, _ = await self.get_transactions_page(wallet_address, status, limit, cursor)
+        return transactions
     
     async def update_transaction_status(
         self,
@@ -130,6 +272,7 @@ class TransactionHistoryService:
         if metadata:
             txn.metadata.update(metadata)
         
+        await self._save(txn)
         return txn
     
     async def get_action_execution_count(
@@ -138,8 +281,12 @@ class TransactionHistoryService:
         action_id: str,
     ) -> int:
         """Get number of times an action has been executed."""
-        user_txns = self._history.get(wallet_address, {}).values()
-        return sum(1 for t in user_txns if t.action_id == action_id and t.status != TransactionStatus.FAILED)
+        rows = await self._query(
+            "SELECT COUNT(*) FROM payment_transactions "
+            "WHERE wallet_address = ? AND action_id = ? AND status != ?",
+            (wallet_address, action_id, TransactionStatus.FAILED.value),
+        )
+        return rows[0][0]
     
     async def get_recent_transactions(
         self,
@@ -147,15 +294,13 @@ class TransactionHistoryService:
         days: int = 7,
     ) -> List[PaymentTransaction]:
         """Get transactions from last N days."""
-        from datetime import timedelta
-        
-        user_txns = list(self._history.get(wallet_address, {}).values())
-        cutoff = datetime.utcnow() - timedelta(days=days)
-        
-        recent = [t for t in user_txns if t.created_at >= cutoff]
-        recent.sort(key=lambda t: t.created_at, reverse=True)
-        
-        return recent
+        cutoff = to_us(datetime.utcnow() - timedelta(days=days))
+        rows = await self._query(
+            "SELECT data FROM payment_transactions WHERE wallet_address = ? AND created_us >= ? "
+            "ORDER BY created_us DESC, id DESC",
+            (wallet_address, cutoff),
+        )
+        return [self._model(r[0]) for r in rows]
 
 
 # Singleton instance
@@ -166,5 +311,8 @@ async def get_transaction_history_service() -> TransactionHistoryService:
     """Get or create singleton history service."""
     global _history_service
     if _history_service is None:
-        _history_service = TransactionHistoryService()
+        # Persistent by default; ":memory:" disables persistence
+        _history_service = TransactionHistoryService(
+            db_path=os.getenv("TRANSACTION_HISTORY_PATH", "transaction_history.db"),
+        )
     return _history_service
@@ -1,12 +1,21 @@
 """Natural language trigger matching for payment actions."""
 import logging
-from typing import List, Tuple, Optional
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Optional, Set
 from difflib import SequenceMatcher
+
+import numpy as np
+
 from .models import PaymentAction
 
 logger = logging.getLogger(__name__)
 
 
+def _trigrams(text: str) -> Set[str]:
+    """Distinct character trigrams of a (lower-cased) string."""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
 class TriggerMatch:
     """Result of trigger matching."""
     
@@ -30,6 +39,121 @@ class TriggerMatch:
         }
 
 
+class TriggerIndex:
+    """
+    Inverted index over one wallet's triggers.
+    
+    Word and character-trigram postings map to trigger slots, so a query
+    only looks at triggers sharing at least one word or trigram with the
+    input. Slots are reused and postings updated per action, so changing
+    one action never rebuilds the whole index.
+    """
+    
+    def __init__(self):
+        # slot -> (action, trigger position, trigger_lower); None for free slots
+        self.slots: List[Optional[Tuple[PaymentAction, int, str]]] = []
+        self.free: List[int] = []
+        # action_id -> (signature, slots)
+        self.by_action: Dict[str, Tuple[Tuple, List[int]]] = {}
+        self.word_postings: Dict[str, Set[int]] = {}
+        self.gram_postings: Dict[str, Set[int]] = {}
+        # Triggers too short for trigrams are always scored directly
+        self.short_slots: Set[int] = set()
+        self._word_counts: List[int] = []
+        self._gram_counts: List[int] = []
+        self._arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+    
+    @staticmethod
+    def _signature(action: PaymentAction) -> Tuple:
+        return (action.is_enabled, tuple(action.triggers or ()))
+    
+    def sync(self, actions: List[PaymentAction]) -> None:
+        """Bring the index in line with ``actions``, touching only changed actions."""
+        seen = set()
+        for action in actions:
+            seen.add(action.id)
+            signature = self._signature(action)
+            entry = self.by_action.get(action.id)
+            if entry and entry[0] == signature:
+                # Unchanged triggers: refresh the action object only
+                for slot in entry[1]:
+                    _, order, lower = self.slots[slot]
+                    self.slots[slot] = (action, order, lower)
+                continue
+            if entry:
+                self._remove(action.id)
+            self._add(action, signature)
+        
+        for action_id in [a for a in self.by_action if a not in seen]:
+            self._remove(action_id)
+    
+    def _add(self, action: PaymentAction, signature: Tuple) -> None:
+        slots = []
+        # Only enabled actions with triggers are matchable
+        if action.is_enabled and action.triggers:
+            for order, trigger in enumerate(action.triggers):
+                lower = trigger.lower()
+                slot = self.free.pop() if self.free else len(self.slots)
+                if slot == len(self.slots):
+                    self.slots.append(None)
+                    self._word_counts.append(0)
+                    self._gram_counts.append(0)
+                self.slots[slot] = (action, order, lower)
+                
+                words = set(lower.split())
+                grams = _trigrams(lower)
+                for word in words:
+                    self.word_postings.setdefault(word, set()).add(slot)
+                for gram in grams:
+                    self.gram_postings.setdefault(gram, set()).add(slot)
+                if not grams:
+                    self.short_slots.add(slot)
+                self._word_counts[slot] = len(words)
+                self._gram_counts[slot] = len(grams)
+                slots.append(slot)
+        self.by_action[action.id] = (signature, slots)
+        self._arrays = None
+    
+    def _remove(self, action_id: str) -> None:
+        _, slots = self.by_action.pop(action_id)
+        for slot in slots:
+            _, _, lower = self.slots[slot]
+            for word in set(lower.split()):
+                postings = self.word_postings.get(word)
+                if postings is not None:
+                    postings.discard(slot)
+                    if not postings:
+                        del self.word_postings[word]
+            for gram in _trigrams(lower):
+                postings = self.gram_postings.get(gram)
+                if postings is not None:
+                    postings.discard(slot)
+                    if not postings:
+                        del self.gram_postings[gram]
+            self.short_slots.discard(slot)
+            self.slots[slot] = None
+            self._word_counts[slot] = 0
+            self._gram_counts[slot] = 0
+            self.free.append(slot)
+        self._arrays = None
+    
+    def counts(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-slot distinct word and trigram counts."""
+        if self._arrays is None:
+            self._arrays = (
+                np.asarray(self._word_counts, dtype=np.int32),
+                np.asarray(self._gram_counts, dtype=np.int32),
+            )
+        return self._arrays
+    
+    def overlap(self, keys: Set[str], postings: Dict[str, Set[int]]) -> np.ndarray:
+        """Number of ``keys`` each slot shares with the query (one bincount)."""
+        hits = [np.fromiter(postings[k], dtype=np.int64) for k in keys if k in postings]
+        if not hits:
+            return np.zeros(len(self.slots), dtype=np.int64)
+        return np.bincount(np.concatenate(hits), minlength=len(self.slots))
+
+
 class TriggerMatcher:
     """
     Match user input against payment action triggers.
@@ -39,9 +163,19 @@ class TriggerMatcher:
     PERFORMANT: Fast string similarity matching
     """
     
-    def __init__(self):
-        """Initialize trigger matcher."""
+    def __init__(self, top_k: int = 20, max_wallets: int = 1000):
+        """
+        Initialize trigger matcher.
+        
+        Args:
+            top_k: Fuzzy candidates per query scored with SequenceMatcher
+            max_wallets: Wallet indexes kept in memory (least recently used dropped)
+        """
         self.min_confidence = 0.6  # Require 60% similarity
+        self.top_k = top_k
+        self.max_wallets = max_wallets
+        # Per-wallet inverted indexes, updated incrementally on each call
+        self._indexes: "OrderedDict[str, TriggerIndex]" = OrderedDict()
     
     async def find_matching_actions(
         self,
@@ -60,30 +194,120 @@ class TriggerMatcher:
         Returns:
             List of TriggerMatch sorted by confidence (descending)
         """
-        matches = []
         user_input_lower = user_input.lower().strip()
         
+        # Index per wallet; each index is synced to exactly the given actions
+        by_wallet: Dict[str, List[PaymentAction]] = {}
         for action in actions:
-            # Only check enabled actions with triggers
-            if not action.is_enabled or not action.triggers:
-                continue
-            
-            # Check each trigger
-            for trigger in action.triggers:
-                confidence = self._calculate_similarity(user_input_lower, trigger.lower())
-                
-                if confidence >= threshold:
-                    matches.append(TriggerMatch(
-                        action=action,
-                        trigger=trigger,
-                        confidence=confidence,
-                    ))
-                    logger.debug(f"Matched trigger '{trigger}' for action {action.name}: {confidence:.2f}")
+            by_wallet.setdefault(action.wallet_address, []).append(action)
+        
+        position = {action.id: i for i, action in enumerate(actions)}
+        scored = []
+        for wallet, wallet_actions in by_wallet.items():
+            index = self._get_index(wallet)
+            index.sync(wallet_actions)
+            scored.extend(self._score(index, user_input_lower, threshold))
+        
+        matches = []
+        for (action, trigger, trigger_order), confidence in scored:
+            matches.append((position.get(action.id, 0), trigger_order, TriggerMatch(
+                action=action,
+                trigger=trigger,
+                confidence=confidence,
+            )))
+            logger.debug(f"Matched trigger '{trigger}' for action {action.name}: {confidence:.2f}")
         
         # Sort by confidence (highest first), then by action name
-        matches.sort(key=lambda m: (-m.confidence, m.action.name))
+        matches.sort(key=lambda m: (-m[2].confidence, m[2].action.name, m[0], m[1]))
+        
+        return [m[2] for m in matches]
+    
+    def _get_index(self, wallet_address: str) -> TriggerIndex:
+        index = self._indexes.get(wallet_address)
+        if index is None:
+            index = self._indexes[wallet_address] = TriggerIndex()
+            if len(self._indexes) > self.max_wallets:
+                self._indexes.popitem(last=False)
+        else:
+            self._indexes.move_to_end(wallet_address)
+        return index
+    
+    def _score(
+        self,
+        index: TriggerIndex,
+        text: str,
+        threshold: float,
+    ) -> List[Tuple[Tuple[PaymentAction, str, int], float]]:
+        """
+        Score indexed triggers against the input.
+        
+        Exact, substring and word-overlap rules are decided from postings
+        overlap for every candidate; ``SequenceMatcher`` only runs on the
+        ``top_k`` remaining candidates by trigram overlap.
+        """
+        results = []
+        
+        def emit(slot: int, confidence: float):
+            action, order, _ = index.slots[slot]
+            results.append(((action, action.triggers[order], order), confidence))
+        
+        grams = _trigrams(text)
+        if not grams:
+            # Very short input can be a substring of anything: score directly
+            for slot in (s for s, entry in enumerate(index.slots) if entry is not None):
+                confidence = self._calculate_similarity(text, index.slots[slot][2])
+                if confidence >= threshold:
+                    emit(slot, confidence)
+            return results
+        
+        words = set(text.split())
+        word_counts, gram_counts = index.counts()
+        shared_words = index.overlap(words, index.word_postings)
+        shared_grams = index.overlap(grams, index.gram_postings)
+        
+        candidates = np.flatnonzero((shared_words > 0) | (shared_grams > 0))
+        # Word overlap and trigram Dice for every candidate at once
+        word_overlap = shared_words[candidates] / np.maximum(
+            np.maximum(word_counts[candidates], len(words)), 1
+        )
+        dice = 2 * shared_grams[candidates] / (gram_counts[candidates] + len(grams))
+        
+        candidate_slots = candidates.tolist()
+        fuzzy = []
+        for i, slot in enumerate(candidate_slots):
+            lower = index.slots[slot][2]
+            if lower == text:
+                confidence = 1.0
+            elif (
+                # A substring shares all of its own trigrams
+                (shared_grams[slot] == gram_counts[slot] or shared_grams[slot] == len(grams))
+                and (lower in text or text in lower)
+            ):
+                confidence = 0.9
+            elif word_overlap[i] > 0.3:
+                confidence = min(0.8, 0.5 + float(word_overlap[i]) * 0.3)
+            else:
+                fuzzy.append((float(dice[i]), slot))
+                continue
+            if confidence >= threshold:
+                emit(slot, confidence)
+        
+        # Short triggers have no trigrams to match on
+        for slot in index.short_slots.difference(candidate_slots):
+            confidence = self._calculate_similarity(text, index.slots[slot][2])
+            if confidence >= threshold:
+                emit(slot, confidence)
+        
+        fuzzy.sort(reverse=True)
+        for _, slot in fuzzy[:self.top_k]:
+            matcher = SequenceMatcher(None, text, index.slots[slot][2])
+            if matcher.real_quick_ratio() < threshold or matcher.quick_ratio() < threshold:
+                continue
+            confidence = matcher.ratio()
+            if confidence >= threshold:
+                emit(slot, confidence)
         
-        return matches
+        return results
     
     async def find_best_match(
         self,
@@ -36,6 +36,14 @@ class WebhookPayloadExecuteBatch(BaseModel):
         description="List of recipients: [{address, amount}, ...]"
     )
     metadata: Optional[Dict[str, Any]] = Field(default_factory=dict, description="Additional context")
+    batch_id: Optional[str] = Field(
+        default=None,
+        description="Client batch ID; retries with the same ID never pay a recipient twice",
+    )
+    wait: bool = Field(
+        default=True,
+        description="Wait for all payouts; if false, respond immediately and poll/stream progress",
+    )
 
 
 class WebhookRequest(BaseModel):
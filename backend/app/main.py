@@ -17,10 +17,16 @@ from app.core.dependencies import get_service_container
 from app.core.config_manager import config_manager
 
 # Import API routers
-from app.api.v1 import chat, swap, agno, health, bridge, keeper, payments, x402, payment, mnee, payment_actions
+from app.api.v1 import chat, swap, agno, health, bridge, gas, keeper, payments, x402, payment, mnee, payment_actions
 from app.api.v1.websocket import router as websocket_router
 from app.api import webhooks
 from app.protocols.registry import protocol_registry
+from app.services.bridge_status_tracker import bridge_status_tracker
+from app.services.cctp_attestation_poller import cctp_attestation_poller
+from app.services.gas_oracle import gas_oracle
+from app.services.ipfs_pin_queue import ipfs_pin_queue
+from app.services.research.research_logger import research_logger
+from app.services.websocket_hub import websocket_hub
 
 # Configure logging
 settings = get_settings()
@@ -52,11 +58,54 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize service container: {e}")
         raise
 
+    # Route websocket messages between workers (local delivery only without Redis)
+    await websocket_hub.start()
+
+    # Start background bridge tracking with websocket push delivery
+    try:
+        async def push_bridge_status(wallet_address, payload):
+            await websocket_hub.send_data(wallet_address, payload, data_type="bridge_status")
+
+        bridge_status_tracker.set_notifier(push_bridge_status)
+        await bridge_status_tracker.start()
+    except Exception as e:
+        logger.warning(f"Bridge status tracker unavailable: {e}")
+
+    # Push webhook batch payout progress to the paying wallet
+    try:
+        from app.services.webhook_service import get_webhook_service
+
+        async def push_batch_progress(wallet_address, payload):
+            await websocket_hub.send_data(wallet_address, payload, data_type="batch_progress")
+
+        (await get_webhook_service()).set_notifier(push_batch_progress)
+    except Exception as e:
+        logger.warning(f"Batch progress push unavailable: {e}")
+
+    # Keep per-chain gas fees warm for transaction builders
+    await gas_oracle.start()
+
+    # Pin Proof-of-Research off the request path and push CIDs to the wallet
+    async def push_ipfs_pin(wallet_address, payload):
+        await websocket_hub.send_data(wallet_address, payload, data_type="ipfs_pin")
+
+    ipfs_pin_queue.set_notifier(push_ipfs_pin)
+    await ipfs_pin_queue.start()
+
+    # Write research logs to protocol_research_logs in batches
+    await research_logger.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down SNEL API")
     try:
+        await bridge_status_tracker.stop()
+        await cctp_attestation_poller.stop()
+        await gas_oracle.stop()
+        await ipfs_pin_queue.stop()
+        await research_logger.stop()
+        await websocket_hub.stop()
         await protocol_registry.close()
         await container.close()
         await config_manager.close()
@@ -90,6 +139,7 @@ app.include_router(health.router, prefix="/api/v1")
 app.include_router(chat.router, prefix="/api/v1")
 app.include_router(swap.router, prefix="/api/v1")  # Legacy support for direct swap access
 app.include_router(bridge.router, prefix="/api/v1")  # Bridge status tracking
+app.include_router(gas.router, prefix="/api/v1")  # Cached gas prices
 app.include_router(agno.router, prefix="/api/v1/agno")
 app.include_router(payments.router, prefix="/api/v1")  # Payment signature submission
 app.include_router(x402.router, prefix="/api/v1")  # X402 agentic payments
@@ -282,11 +282,16 @@ class MNEEAdapter:
             to_atomic = self.to_atomic_amount(output_amount)
             
             # Get real fee structure from MNEE API
+            fee_source = "estimate"
             try:
                 config = await self.get_config()
                 # Get base fee from config (in atomic units)
                 fees = config.get("fees", [])
-                estimated_fee_atomic = fees[0]["fee"] if fees else self._estimate_fee(from_atomic, chain_id)
+                if fees:
+                    estimated_fee_atomic = fees[0]["fee"]
+                    fee_source = "config"
+                else:
+                    estimated_fee_atomic = self._estimate_fee(from_atomic, chain_id)
             except Exception as e:
                 logger.warning(f"Failed to get MNEE config, using estimate: {str(e)}")
                 estimated_fee_atomic = self._estimate_fee(from_atomic, chain_id)
@@ -326,6 +331,7 @@ class MNEEAdapter:
                     "description": f"Transfer {amount} MNEE on {network_info['name']}",
                     "mnee_price_usd": str(mnee_price),
                     "usd_value": str(usd_value),
+                    "fee_source": fee_source,
                     "atomic_units_info": "1 MNEE = 100,000 atomic units",
                     "collateral": "1:1 USD backed by U.S. Treasury bills and cash equivalents",
                     "regulation": "Regulated in Antigua with full AML/KYC compliance"
@@ -336,6 +342,41 @@ class MNEEAdapter:
             logger.error(f"Error in MNEE quote: {str(e)}")
             raise ValueError(f"MNEE quote failed: {str(e)}")
 
+    def quote_for_amount(self, quote: Dict[str, Any], amount: Decimal) -> Dict[str, Any]:
+        """
+        Re-price an MNEE-to-MNEE quote for another amount without API calls.
+        
+        Lets batch payouts share one price/fee-config lookup across recipients.
+        The flat fee from the MNEE config is kept; estimated fees are tiered by
+        amount and recomputed.
+        """
+        metadata = dict(quote.get("metadata", {}))
+        mnee_price = Decimal(metadata.get("mnee_price_usd", "1.0"))
+        atomic = self.to_atomic_amount(amount)
+        chain_id = quote["chain_id"]
+        
+        if metadata.get("fee_source") == "config":
+            fee_atomic = quote["estimated_fee_atomic"]
+        else:
+            fee_atomic = self._estimate_fee(atomic, chain_id)
+        fee_mnee = self.from_atomic_amount(fee_atomic)
+        
+        metadata.update({
+            "description": f"Transfer {amount} MNEE on {quote.get('network')}",
+            "usd_value": str(amount * mnee_price),
+        })
+        return {
+            **quote,
+            "from_amount": str(amount),
+            "to_amount": str(amount),
+            "from_amount_atomic": atomic,
+            "to_amount_atomic": atomic,
+            "estimated_fee_atomic": fee_atomic,
+            "estimated_fee_mnee": str(fee_mnee),
+            "estimated_fee_usd": f"${float(fee_mnee * mnee_price):.4f}",
+            "metadata": metadata,
+        }
+
     def _get_network_info(self, chain_id: int) -> Dict[str, Any]:
         """Get network-specific information."""
         if chain_id == 236:  # 1Sat Ordinals
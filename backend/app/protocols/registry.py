@@ -5,6 +5,7 @@ from typing import Dict, List, Optional, Any
 import logging
 from app.models.token import TokenInfo, token_registry
 from app.services.token_service import token_service
+from app.core.config_manager import config_manager
 from .zerox_adapter import ZeroXAdapter
 from .axelar_adapter import AxelarAdapter
 from .uniswap_adapter import UniswapAdapter
@@ -12,6 +13,7 @@ from .circle_cctp_adapter import CircleCCTPAdapter
 from .mnee_adapter import MNEEAdapter
 from .vvs_adapter import VVSAdapter
 from .mm_adapter import MMAdapter
+from .route_table import RouteTable, TOKEN_ANY, TOKEN_USDC, token_key
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +24,11 @@ class ProtocolRegistry:
         """Initialize available protocols."""
         self.protocols: Dict[str, Any] = {}
         self._initialize_protocols()
+        self.route_table = RouteTable(self.protocols)
+
+    def rebuild_routes(self):
+        """Rebuild the precomputed route table (called on configuration reload)."""
+        self.route_table = RouteTable(self.protocols)
 
     async def close(self):
         """Close all protocol clients."""
@@ -79,52 +86,17 @@ class ProtocolRegistry:
 
     def get_supported_protocols(self, chain_id: int) -> List[Any]:
         """Get list of protocols that support the given chain."""
-        return [
-            protocol for protocol in self.protocols.values()
-            if protocol.is_supported(chain_id)
-        ]
+        return [self.protocols[p] for p in self.route_table.supported(chain_id)]
 
     def get_preferred_protocol(self, chain_id: int, is_cross_chain: bool = False) -> Optional[Any]:
         """Get the preferred protocol for a given chain."""
-        # For cross-chain operations, prefer Axelar
-        if is_cross_chain:
-            axelar = self.get_protocol("axelar")
-            if axelar and axelar.is_supported(chain_id):
-                return axelar
-
-        # For Cronos, prefer VVS Finance (dominant DEX with 64.6% volume share)
-        if chain_id in [25, 338]:  # Cronos Mainnet and Testnet
-            vvs = self.get_protocol("vvs")
-            if vvs and vvs.is_supported(chain_id):
-                return vvs
-
-        # For same-chain operations, prefer 0x (best rates), then Uniswap (reliable)
-        zerox = self.get_protocol("0x")
-        if zerox and zerox.is_supported(chain_id):
-            return zerox
-
-        uniswap = self.get_protocol("uniswap")
-        if uniswap and uniswap.is_supported(chain_id):
-            return uniswap
-
-        # No supported protocols
-        return None
+        protocol_id = self.route_table.preferred(chain_id, is_cross_chain)
+        return self.protocols[protocol_id] if protocol_id else None
 
     def get_cross_chain_protocol(self, from_chain_id: int, to_chain_id: int, token_symbol: str = None) -> Optional[Any]:
         """Get the best protocol for cross-chain operations."""
-        # For USDC transfers, prefer Circle CCTP V2 (faster and cheaper)
-        if token_symbol and token_symbol.upper() == "USDC":
-            cctp = self.get_protocol("cctp_v2")
-            if cctp and cctp.is_supported(from_chain_id) and cctp.is_supported(to_chain_id):
-                return cctp
-        
-        # Axelar is designed for cross-chain (fallback for other tokens)
-        axelar = self.get_protocol("axelar")
-        if axelar and axelar.is_supported(from_chain_id) and axelar.is_supported(to_chain_id):
-            return axelar
-        
-        # No cross-chain protocols available
-        return None
+        bridges = self.route_table.bridges(from_chain_id, to_chain_id, token_key(token_symbol))
+        return self.protocols[bridges[0]] if bridges else None
 
     async def resolve_token(self, chain_id: int, token_identifier: str) -> Optional[TokenInfo]:
         """
@@ -194,57 +166,18 @@ class ProtocolRegistry:
         # Determine if this is cross-chain
         is_cross_chain = from_chain != to_chain
         
-        # Get protocols in priority order
-        protocols_to_try = []
-        
+        # Get protocols in priority order from the precomputed route table
         if is_cross_chain:
-            # For cross-chain USDC transfers, prioritize Circle CCTP V2
-            if from_token.upper() == "USDC" and to_token.upper() == "USDC":
-                cctp = self.get_protocol("cctp_v2")
-                if cctp and cctp.is_supported(from_chain) and cctp.is_supported(to_chain):
-                    protocols_to_try.append(("cctp_v2", cctp))
-            
-            # For cross-chain, also try Axelar as fallback
-            axelar = self.get_protocol("axelar")
-            if axelar and axelar.is_supported(from_chain) and axelar.is_supported(to_chain):
-                protocols_to_try.append(("axelar", axelar))
+            # Circle CCTP V2 only applies to USDC -> USDC transfers
+            token = token_key(from_token, to_token)
         else:
-            # For same-chain, check if MNEE is involved and prioritize MNEE adapter
-            if from_chain == 236:  # Bitcoin SV
-                mnee_adapter = self.get_protocol("mnee")
-                if mnee_adapter and mnee_adapter.is_supported(from_chain):
-                    protocols_to_try.append(("mnee", mnee_adapter))
-            
-            # For Cronos, use smart routing based on token pairs
-            if from_chain in [25, 338]:  # Cronos Mainnet and Testnet
-                # For USDC pairs, prioritize MM Finance (60% trading volume for WCRO/USDC)
-                if from_token.upper() == "USDC" or to_token.upper() == "USDC":
-                    mm = self.get_protocol("mm")
-                    if mm and mm.is_supported(from_chain):
-                        protocols_to_try.append(("mm", mm))
-                    # VVS as fallback
-                    vvs = self.get_protocol("vvs")
-                    if vvs and vvs.is_supported(from_chain):
-                        protocols_to_try.append(("vvs", vvs))
-                else:
-                    # For non-USDC pairs, prioritize VVS Finance (64.6% overall volume)
-                    vvs = self.get_protocol("vvs")
-                    if vvs and vvs.is_supported(from_chain):
-                        protocols_to_try.append(("vvs", vvs))
-                    # MM Finance as fallback
-                    mm = self.get_protocol("mm")
-                    if mm and mm.is_supported(from_chain):
-                        protocols_to_try.append(("mm", mm))
-            
-            # For same-chain, try 0x first (best rates), then Uniswap (reliable)
-            zerox = self.get_protocol("0x")
-            if zerox and zerox.is_supported(from_chain):
-                protocols_to_try.append(("0x", zerox))
+            # Cronos routing favours MM Finance whenever USDC is on either side
+            token = TOKEN_USDC if TOKEN_USDC in (from_token.upper(), to_token.upper()) else TOKEN_ANY
+        protocols_to_try = [
+            (protocol_id, self.protocols[protocol_id])
+            for protocol_id in self.route_table.routes(from_chain, to_chain, token)
+        ]
 
-            uniswap = self.get_protocol("uniswap")
-            if uniswap and uniswap.is_supported(from_chain):
-                protocols_to_try.append(("uniswap", uniswap))
-        
         # Try each protocol in order
         for protocol_name, protocol in protocols_to_try:
             try:
@@ -305,3 +238,4 @@ class ProtocolRegistry:
 
 # Global instance
 protocol_registry = ProtocolRegistry()
+config_manager.add_reload_listener(protocol_registry.rebuild_routes)
@@ -0,0 +1,161 @@
+"""
+Precomputed protocol route table.
+
+Protocol eligibility only changes when configuration is reloaded, so the
+registry resolves every (from_chain, to_chain, token) combination once and
+answers routing questions with a single dictionary lookup.
+"""
+from typing import Any, Dict, Iterable, Optional, Tuple
+import logging
+
+from app.config.chains import CHAINS
+
+logger = logging.getLogger(__name__)
+
+# Token dimension of the table: only USDC changes protocol ordering today
+TOKEN_USDC = "USDC"
+TOKEN_ANY = "*"
+
+# Cronos Mainnet and Testnet
+CRONOS_CHAINS = (25, 338)
+# Bitcoin SV (MNEE)
+BSV_CHAIN = 236
+
+RouteKey = Tuple[Any, Any, str]
+
+
+def token_key(*token_symbols: Optional[str]) -> str:
+    """Map token symbols to the table's token dimension (USDC only if all are USDC)."""
+    if token_symbols and all(s and s.upper() == TOKEN_USDC for s in token_symbols):
+        return TOKEN_USDC
+    return TOKEN_ANY
+
+
+class RouteTable:
+    """Immutable snapshot of protocol routing for every supported chain pair."""
+
+    def __init__(self, protocols: Dict[str, Any]):
+        """
+        Build the table from initialized protocol adapters.
+
+        Args:
+            protocols: Protocol ID -> adapter, in registry order
+        """
+        self.protocol_ids: Tuple[str, ...] = tuple(protocols.keys())
+
+        # chain_id -> protocol IDs supporting it, in registry order
+        self._supported: Dict[Any, Tuple[str, ...]] = {}
+        for protocol_id, protocol in protocols.items():
+            for chain_id in self._chains_of(protocol):
+                self._supported.setdefault(chain_id, ())
+                self._supported[chain_id] += (protocol_id,)
+
+        self.chain_ids: Tuple[Any, ...] = tuple(self._supported.keys())
+
+        # (from_chain, to_chain, token) -> ordered protocol IDs
+        self._routes: Dict[RouteKey, Tuple[str, ...]] = {}
+        # (from_chain, to_chain, token) -> bridge protocol IDs, also for from == to
+        self._bridges: Dict[RouteKey, Tuple[str, ...]] = {}
+        # (chain_id, is_cross_chain) -> preferred protocol ID
+        self._preferred: Dict[Tuple[Any, bool], Optional[str]] = {}
+
+        for from_chain in self.chain_ids:
+            for is_cross_chain in (False, True):
+                self._preferred[(from_chain, is_cross_chain)] = self._resolve_preferred(
+                    from_chain, is_cross_chain
+                )
+            for to_chain in self.chain_ids:
+                for token in (TOKEN_USDC, TOKEN_ANY):
+                    bridge = self._resolve_bridge(from_chain, to_chain, token)
+                    if bridge:
+                        self._bridges[(from_chain, to_chain, token)] = bridge
+                    route = bridge if from_chain != to_chain else self._resolve_swap(from_chain, token)
+                    if route:
+                        self._routes[(from_chain, to_chain, token)] = route
+
+        # Lower-cased chain name -> chain ID for command validation
+        self._chain_names: Dict[str, Any] = {
+            info.name.lower(): chain_id for chain_id, info in CHAINS.items()
+        }
+
+        logger.info(
+            f"Built route table: {len(self.chain_ids)} chains, {len(self._routes)} routes"
+        )
+
+    @staticmethod
+    def _chains_of(protocol: Any) -> Iterable[Any]:
+        chains = getattr(protocol, "supported_chains", None)
+        if chains is not None:
+            return list(chains)
+        # Adapters without a chain list are probed against the known chains
+        return [chain_id for chain_id in CHAINS if protocol.is_supported(chain_id)]
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def supported(self, chain_id: Any) -> Tuple[str, ...]:
+        """Protocol IDs supporting a chain."""
+        return self._supported.get(chain_id, ())
+
+    def routes(self, from_chain: Any, to_chain: Any, token: str = TOKEN_ANY) -> Tuple[str, ...]:
+        """Protocol IDs to try, in priority order."""
+        return self._routes.get((from_chain, to_chain, token), ())
+
+    def bridges(self, from_chain: Any, to_chain: Any, token: str = TOKEN_ANY) -> Tuple[str, ...]:
+        """Cross-chain protocol IDs supporting both chains, in priority order (even when they are equal)."""
+        return self._bridges.get((from_chain, to_chain, token), ())
+
+    def preferred(self, chain_id: Any, is_cross_chain: bool = False) -> Optional[str]:
+        """Preferred protocol ID for a chain."""
+        return self._preferred.get((chain_id, is_cross_chain))
+
+    def resolve_chain(self, chain: Any) -> Optional[Any]:
+        """Resolve a chain ID or chain name to a chain ID."""
+        if chain in CHAINS or chain in self._supported:
+            return chain
+        if isinstance(chain, str):
+            return self._chain_names.get(chain.lower())
+        return None
+
+    # ------------------------------------------------------------------
+    # Routing rules (evaluated once per rebuild)
+    # ------------------------------------------------------------------
+
+    def _supports(self, protocol_id: str, chain_id: Any) -> bool:
+        return protocol_id in self._supported.get(chain_id, ())
+
+    def _resolve_preferred(self, chain_id: Any, is_cross_chain: bool) -> Optional[str]:
+        # For cross-chain operations, prefer Axelar
+        if is_cross_chain and self._supports("axelar", chain_id):
+            return "axelar"
+        # For Cronos, prefer VVS Finance (dominant DEX)
+        if chain_id in CRONOS_CHAINS and self._supports("vvs", chain_id):
+            return "vvs"
+        # For same-chain operations, prefer 0x (best rates), then Uniswap (reliable)
+        for protocol_id in ("0x", "uniswap"):
+            if self._supports(protocol_id, chain_id):
+                return protocol_id
+        return None
+
+    def _resolve_bridge(self, from_chain: Any, to_chain: Any, token: str) -> Tuple[str, ...]:
+        ordered = []
+        # Circle CCTP V2 is faster and cheaper for USDC
+        if token == TOKEN_USDC:
+            ordered.append("cctp_v2")
+        # Axelar is designed for cross-chain (fallback for other tokens)
+        ordered.append("axelar")
+        return tuple(
+            p for p in ordered
+            if self._supports(p, from_chain) and self._supports(p, to_chain)
+        )
+
+    def _resolve_swap(self, chain_id: Any, token: str) -> Tuple[str, ...]:
+        ordered = []
+        if chain_id == BSV_CHAIN:
+            ordered.append("mnee")
+        if chain_id in CRONOS_CHAINS:
+            # MM Finance leads USDC pairs, VVS Finance everything else
+            ordered.extend(("mm", "vvs") if token == TOKEN_USDC else ("vvs", "mm"))
+        ordered.extend(("0x", "uniswap"))
+        return tuple(p for p in ordered if self._supports(p, chain_id))
@@ -13,6 +13,8 @@ from eth_utils import function_signature_to_4byte_selector, to_checksum_address
 
 from app.models.token import TokenInfo
 from app.core.errors import ProtocolError
+from app.services.gas_oracle import gas_oracle
+from app.services.gas_estimate_memo import GasShape, gas_estimate_memo
 from .permit2_handler import Permit2Handler, Permit2Data
 
 # Rate limiting and circuit breaker constants
@@ -728,7 +730,6 @@ class UniswapAdapter:
             gas_limit = None
             simulation_success = False
             
-            # Prepare estimation tasks for all RPCs in parallel
             async def try_gas_estimation(rpc_url: str) -> Optional[int]:
                 """Try gas estimation on single RPC."""
                 try:
@@ -751,8 +752,10 @@ class UniswapAdapter:
                         return int(gas_estimate, 16)
                 except Exception as e:
                     logger.debug(f"Gas estimation failed on {rpc_url}: {e}")
-                
-                # Fallback: try eth_call simulation
+                return None
+
+            async def try_simulation(rpc_url: str) -> Optional[int]:
+                """Fallback: try eth_call simulation on single RPC."""
                 try:
                     call_payload = {
                         "jsonrpc": "2.0",
@@ -778,20 +781,41 @@ class UniswapAdapter:
                     logger.debug(f"Simulation failed on {rpc_url}: {revert_reason or str(sim_err)}")
                 
                 return None
-            
-            # Try all RPCs in parallel, return first successful result
-            if chain_cfg.rpc_urls:
-                results = await asyncio.gather(
-                    *[try_gas_estimation(rpc) for rpc in chain_cfg.rpc_urls],
-                    return_exceptions=False
-                )
-                # Use first successful result
-                for result in results:
-                    if result is not None:
-                        gas_limit = result
-                        simulation_success = True
-                        logger.debug(f"Gas estimation successful: {gas_limit}")
-                        break
+
+            async def first_result(attempt) -> Optional[int]:
+                """Try all RPCs in parallel; return the first success and cancel the rest."""
+                tasks = [asyncio.ensure_future(attempt(rpc)) for rpc in chain_cfg.rpc_urls]
+                try:
+                    for next_done in asyncio.as_completed(tasks):
+                        result = await next_done
+                        if result is not None:
+                            return result
+                    return None
+                finally:
+                    for task in tasks:
+                        task.cancel()
+
+            async def measure_gas() -> Optional[int]:
+                return await first_result(try_gas_estimation)
+
+            # Fee data comes from the gas oracle, fetched alongside estimation
+            fees_task = asyncio.ensure_future(gas_oracle.get_fees(chain_id))
+
+            # exactInputSingle is a single-hop path; familiar shapes skip eth_estimateGas
+            shape = GasShape.from_calldata(chain_id, quote["router_address"], data, path_length=1)
+            if gas_estimate_memo.lookup(shape) is not None:
+                # eth_estimateGas doubled as the revert preflight, so memoized
+                # gas is only used once an eth_call simulation of the swap passes
+                if await first_result(try_simulation) is not None:
+                    gas_limit = await gas_estimate_memo.estimate(shape, measure_gas)
+            else:
+                gas_limit = await gas_estimate_memo.estimate(shape, measure_gas)
+                if gas_limit is None:
+                    gas_limit = await first_result(try_simulation)
+
+            if gas_limit is not None:
+                simulation_success = True
+                logger.debug(f"Gas estimation successful: {gas_limit}")
             
             # If all RPCs failed, return detailed error
             if not simulation_success:
@@ -809,6 +833,16 @@ class UniswapAdapter:
                 "gasLimit": hex(gas_limit) if gas_limit else quote.get("estimated_gas", "200000"),
                 "chainId": chain_id
             }
+
+            try:
+                gas_snapshot = await fees_task
+            except Exception as e:
+                logger.debug(f"Gas oracle unavailable for chain {chain_id}: {e}")
+                gas_snapshot = None
+            if gas_snapshot:
+                transaction_data.update({
+                    key: hex(value) for key, value in gas_snapshot.fee_params().items()
+                })
             
             # Add permit2 information if enabled
             if enable_permit2 and permit2_data:
@@ -11,6 +11,11 @@ import json
 from dataclasses import dataclass
 from eth_abi import encode as abi_encode
 from app.core.config_manager import config_manager
+from app.services.bridge_status_tracker import (
+    bridge_status_tracker,
+    PROTOCOL_AXELAR_GMP,
+    PROTOCOL_AXELAR_PRIVACY,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -222,8 +227,17 @@ class AxelarGMPService:
                 }
             ]
 
+            # Track the transfer in the background once the user submits it
+            bridge_id = await bridge_status_tracker.register(
+                wallet_address=wallet_address,
+                protocol=PROTOCOL_AXELAR_GMP,
+                source_chain_id=source_chain_id,
+                dest_chain_id=dest_chain_id,
+            )
+
             return {
                 "success": True,
+                "bridge_id": bridge_id,
                 "protocol": "axelar_gmp",
                 "type": "cross_chain_swap",
                 "source_chain": params.source_chain,
@@ -412,8 +426,16 @@ class AxelarGMPService:
                 }
             ]
 
+            bridge_id = await bridge_status_tracker.register(
+                wallet_address=wallet_address,
+                protocol=PROTOCOL_AXELAR_PRIVACY,
+                source_chain_id=source_chain_id,
+                dest_chain_id=destination_chain_id,
+            )
+
             return {
                 "success": True,
+                "bridge_id": bridge_id,
                 "protocol": "axelar_gmp_privacy",
                 "type": "bridge_to_privacy",
                 "source_chain_id": source_chain_id,
@@ -450,8 +472,8 @@ class AxelarGMPService:
         """
         try:
             from app.services.axelar_service import axelar_service
-            source_chain = axelar_service.get_axelar_chain_name(source_chain_id)
-            dest_chain = axelar_service.get_axelar_chain_name(dest_chain_id)
+            source_chain = await axelar_service.get_axelar_chain_name(source_chain_id)
+            dest_chain = await axelar_service.get_axelar_chain_name(dest_chain_id)
             
             if not source_chain or not dest_chain:
                 return {
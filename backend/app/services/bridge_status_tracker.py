@@ -0,0 +1,583 @@
+"""
+Background status tracker for bridge, GMP and CCTP transfers.
+
+Transfers are registered when their transaction steps are built and start
+being polled once the source transaction hash is known. Tracked transfers
+live in Redis (``bridge_transfer:{bridge_id}`` with a TTL, plus the
+``bridge_transfer:due`` schedule) so any worker can attach a hash or serve
+the status of a transfer registered by another; each due check is claimed
+by one worker. Polling cadence adapts to the expected completion time of
+the route, status transitions are written to Redis
+(``bridge_status:{bridge_id}``, the key served by ``/bridge/status``) and
+pushed to the user over the websocket connection. Without Redis an
+in-process store with the same semantics is used.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Notifier signature: (wallet_address, status_payload) -> None
+StatusNotifier = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+# Protocol identifiers used at registration
+PROTOCOL_AXELAR_GMP = "axelar_gmp"
+PROTOCOL_AXELAR_PRIVACY = "axelar_gmp_privacy"
+PROTOCOL_CCTP = "cctp_v2"
+
+# Step types whose transaction is the one tracked (approve / pay_gas steps are not)
+SOURCE_STEP_TYPES = {
+    PROTOCOL_CCTP: {"burn_and_mint"},
+    PROTOCOL_AXELAR_GMP: {"call_contract", "call_contract_with_token"},
+    PROTOCOL_AXELAR_PRIVACY: {"call_contract", "call_contract_with_token"},
+}
+
+# Terminal statuses - no further polling
+TERMINAL_STATUSES = {"completed", "failed", "timeout"}
+
+# Step names per protocol family, mirroring the /bridge/status response
+AXELAR_STEPS = [
+    ("Source Chain Confirmation", "Confirming transaction on source chain"),
+    ("Axelar Gateway Relay", "Relaying transaction through Axelar"),
+    ("Destination Chain Confirmation", "Confirming receipt on destination chain"),
+]
+CCTP_STEPS = [
+    ("Source Chain Burn", "Confirming USDC burn on source chain"),
+    ("Circle Attestation", "Waiting for Circle to attest the transfer"),
+    ("Destination Mint", "USDC ready to mint on destination chain"),
+]
+
+# Axelarscan GMP status -> (current_step, tracker status)
+AXELAR_STATUS_MAP = {
+    "called": (1, "pending"),
+    "confirming": (1, "pending"),
+    "confirmed": (2, "relaying"),
+    "approving": (2, "relaying"),
+    "approved": (3, "executing"),
+    "executing": (3, "executing"),
+    "executed": (3, "completed"),
+    "error": (3, "failed"),
+    "insufficient_fee": (2, "failed"),
+}
+
+
+@dataclass
+class TrackedTransfer:
+    """A bridge transfer being tracked in the background."""
+    bridge_id: str
+    wallet_address: str
+    protocol: str
+    source_chain_id: int
+    dest_chain_id: int
+    expected_seconds: float
+    tx_hash: Optional[str] = None
+    dest_tx_hash: Optional[str] = None
+    status: str = "awaiting_signature"
+    current_step: int = 1
+    error: Optional[str] = None
+    registered_at: float = field(default_factory=time.time)
+    submitted_at: Optional[float] = None
+    next_check_at: Optional[float] = None
+    last_interval: float = 0.0
+    attempts: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def to_status_payload(self) -> Dict[str, Any]:
+        """Render the transfer in the ``bridge_status`` response format."""
+        step_defs = CCTP_STEPS if self.protocol == PROTOCOL_CCTP else AXELAR_STEPS
+        steps = []
+        for number, (name, description) in enumerate(step_defs, start=1):
+            if self.status == "completed" or number < self.current_step:
+                step_status = "confirmed"
+            elif number == self.current_step and self.status == "failed":
+                step_status = "failed"
+            elif number == self.current_step and self.tx_hash:
+                step_status = "in_progress"
+            else:
+                step_status = "pending"
+            steps.append({
+                "step_number": number,
+                "name": name,
+                "status": step_status,
+                "description": description,
+                "tx_hash": self.tx_hash if number == 1 else (
+                    self.dest_tx_hash if number == len(step_defs) else None
+                ),
+                "confirmed_at": None,
+            })
+
+        return {
+            "type": "bridge_status",
+            "bridge_id": self.bridge_id,
+            "status": self.status,
+            "protocol": self.protocol,
+            "current_step": self.current_step,
+            "total_steps": len(step_defs),
+            "steps": steps,
+            "source_tx_hash": self.tx_hash,
+            "destination_tx_hash": self.dest_tx_hash,
+            "timestamp": datetime.utcnow().isoformat(),
+            "error": self.error,
+        }
+
+
+# Due transfers: take up to ARGV[3] ids scored <= ARGV[1] and push their score
+# to ARGV[2] so no other worker checks them meanwhile
+_CLAIM_DUE_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[3])
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[1], ARGV[2], id)
+end
+return ids
+"""
+
+
+class RedisTransferStore:
+    """Transfer storage shared by all workers."""
+
+    DUE_KEY = "bridge_transfer:due"
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._claim = client.register_script(_CLAIM_DUE_SCRIPT)
+
+    async def save(self, bridge_id: str, data: str, ttl: int, due_at: Optional[float]) -> None:
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(f"bridge_transfer:{bridge_id}", data, ex=ttl)
+            if due_at is None:
+                pipe.zrem(self.DUE_KEY, bridge_id)
+            else:
+                pipe.zadd(self.DUE_KEY, {bridge_id: due_at})
+            await pipe.execute()
+
+    async def get(self, bridge_id: str) -> Optional[str]:
+        return await self.client.get(f"bridge_transfer:{bridge_id}")
+
+    async def claim_due(self, now: float, hold_until: float, limit: int) -> List[str]:
+        return list(await self._claim(keys=[self.DUE_KEY], args=[now, hold_until, limit]))
+
+    async def next_due_at(self) -> Optional[float]:
+        first = await self.client.zrange(self.DUE_KEY, 0, 0, withscores=True)
+        return float(first[0][1]) if first else None
+
+    async def unschedule(self, bridge_id: str) -> None:
+        await self.client.zrem(self.DUE_KEY, bridge_id)
+
+
+class MemoryTransferStore:
+    """Single-process transfer storage with the same semantics (dev / Redis unavailable)."""
+
+    def __init__(self):
+        self._transfers: Dict[str, Tuple[float, str]] = {}  # id -> (expires, data)
+        self._due: Dict[str, float] = {}
+
+    async def save(self, bridge_id: str, data: str, ttl: int, due_at: Optional[float]) -> None:
+        self._transfers[bridge_id] = (time.monotonic() + ttl, data)
+        if due_at is None:
+            self._due.pop(bridge_id, None)
+        else:
+            self._due[bridge_id] = due_at
+
+    async def get(self, bridge_id: str) -> Optional[str]:
+        item = self._transfers.get(bridge_id)
+        if item is not None and item[0] < time.monotonic():
+            del self._transfers[bridge_id]
+            return None
+        return item[1] if item else None
+
+    async def claim_due(self, now: float, hold_until: float, limit: int) -> List[str]:
+        ids = sorted((i for i, due in self._due.items() if due <= now), key=self._due.get)[:limit]
+        for bridge_id in ids:
+            self._due[bridge_id] = hold_until
+        return ids
+
+    async def next_due_at(self) -> Optional[float]:
+        return min(self._due.values()) if self._due else None
+
+    async def unschedule(self, bridge_id: str) -> None:
+        self._due.pop(bridge_id, None)
+
+
+class BridgeStatusTracker:
+    """Polls bridge APIs for registered transfers and pushes status transitions."""
+
+    def __init__(
+        self,
+        min_poll_interval: float = 5.0,
+        max_poll_interval: float = 120.0,
+        max_concurrent_checks: int = 10,
+        status_ttl: int = 3600,
+        signature_timeout: float = 3600.0,
+        store: Any = None,
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            min_poll_interval: Shortest delay between checks of one transfer (seconds)
+            max_poll_interval: Longest delay between checks of one transfer (seconds)
+            max_concurrent_checks: Upper bound on in-flight API lookups
+            status_ttl: TTL of the Redis status key (seconds)
+            signature_timeout: Drop registrations never signed within this window
+            store: RedisTransferStore/MemoryTransferStore (default: Redis, in-memory if unreachable)
+        """
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.status_ttl = status_ttl
+        self.signature_timeout = signature_timeout
+
+        self._store = store
+        self._claim_batch = max_concurrent_checks * 10
+        self._semaphore = asyncio.Semaphore(max_concurrent_checks)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+        self._notifier: Optional[StatusNotifier] = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def set_notifier(self, notifier: Optional[StatusNotifier]) -> None:
+        """Set the callback used to push status transitions to users."""
+        self._notifier = notifier
+
+    async def start(self) -> None:
+        """Start the background polling loop."""
+        if self._task and not self._task.done():
+            return
+
+        await self._get_store()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Bridge status tracker started")
+
+    async def stop(self) -> None:
+        """Stop the polling loop and release resources."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+            self._store = None
+
+    async def _get_store(self):
+        """Connect to Redis on first use; fall back to the in-process store."""
+        if self._store is None:
+            try:
+                settings = get_settings()
+                client = redis.from_url(
+                    settings.database.redis_url,
+                    db=settings.database.redis_db,
+                    decode_responses=True,
+                )
+                await client.ping()
+                self._redis = client
+                self._store = RedisTransferStore(client)
+            except Exception as e:
+                logger.warning(
+                    f"Redis unavailable for bridge tracking ({e}); "
+                    "using in-process storage (single worker only)"
+                )
+                self._store = MemoryTransferStore()
+        return self._store
+
+    def _ttl(self, transfer: TrackedTransfer) -> int:
+        """How long the stored transfer outlives its last update."""
+        if transfer.is_terminal:
+            # Kept for the status TTL so late readers see the outcome
+            return self.status_ttl
+        if not transfer.tx_hash:
+            return int(self.signature_timeout)
+        return int(transfer.expected_seconds * 6 + self.status_ttl)
+
+    async def _save(self, transfer: TrackedTransfer) -> None:
+        store = await self._get_store()
+        due_at = None if transfer.is_terminal or not transfer.tx_hash else transfer.next_check_at
+        await store.save(transfer.bridge_id, json.dumps(asdict(transfer)), self._ttl(transfer), due_at)
+
+    async def _load(self, bridge_id: str) -> Optional[TrackedTransfer]:
+        store = await self._get_store()
+        data = await store.get(bridge_id)
+        return TrackedTransfer(**json.loads(data)) if data else None
+
+    # ------------------------------------------------------------------
+    # Registration
+    # ------------------------------------------------------------------
+
+    async def register(
+        self,
+        wallet_address: str,
+        protocol: str,
+        source_chain_id: int,
+        dest_chain_id: int,
+        bridge_id: Optional[str] = None,
+        tx_hash: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """
+        Register a transfer for background tracking.
+
+        Called when the transfer's transaction steps are built. Polling starts
+        once a source transaction hash is attached.
+
+        Returns:
+            The bridge ID to hand to the client
+        """
+        bridge_id = bridge_id or str(uuid.uuid4())
+        transfer = TrackedTransfer(
+            bridge_id=bridge_id,
+            wallet_address=wallet_address,
+            protocol=protocol,
+            source_chain_id=source_chain_id,
+            dest_chain_id=dest_chain_id,
+            expected_seconds=self._expected_seconds(protocol, source_chain_id, dest_chain_id),
+            metadata=metadata or {},
+        )
+        if tx_hash:
+            self._attach(transfer, tx_hash)
+        await self._save(transfer)
+        logger.info(f"Tracking {protocol} transfer {bridge_id} for {wallet_address}")
+        return bridge_id
+
+    async def attach_tx_hash(
+        self,
+        wallet_address: str,
+        tx_hash: str,
+        bridge_id: Optional[str],
+        step_type: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Attach a submitted source transaction to a registered transfer.
+
+        Hashes of steps that are not the source step (``step_type``
+        "approve", "pay_gas", ...) are ignored; without a step type, later
+        steps of a multi-step flow (approve -> burn) replace the earlier
+        hash, so the final step is what gets tracked.
+
+        Returns:
+            The bridge ID the hash was attached to, or None
+        """
+        transfer = await self._load(bridge_id) if bridge_id else None
+        if not transfer or transfer.is_terminal or transfer.wallet_address != wallet_address:
+            return None
+
+        source_steps = SOURCE_STEP_TYPES.get(transfer.protocol)
+        if step_type and source_steps and step_type not in source_steps:
+            logger.debug(f"Ignoring {step_type} tx {tx_hash} for bridge {transfer.bridge_id}")
+            return transfer.bridge_id
+        self._attach(transfer, tx_hash)
+        await self._save(transfer)
+        return transfer.bridge_id
+
+    async def get_status(self, bridge_id: str) -> Optional[Dict[str, Any]]:
+        """Get the status of a tracked transfer."""
+        transfer = await self._load(bridge_id)
+        return transfer.to_status_payload() if transfer else None
+
+    def _attach(self, transfer: TrackedTransfer, tx_hash: str) -> None:
+        if transfer.tx_hash and transfer.tx_hash != tx_hash and transfer.protocol == PROTOCOL_CCTP:
+            # The replaced hash was an earlier step (e.g. approve), not the burn
+            from app.services.cctp_attestation_poller import cctp_attestation_poller
+            cctp_attestation_poller.untrack_transaction(transfer.tx_hash)
+        transfer.tx_hash = tx_hash
+        transfer.submitted_at = time.time()
+        transfer.status = "pending"
+        transfer.current_step = 1
+        transfer.attempts = 0
+        transfer.last_interval = 0.0
+        transfer.next_check_at = transfer.submitted_at + self.min_poll_interval
+        self._wakeup.set()
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _expected_seconds(protocol: str, source_chain_id: int, dest_chain_id: int) -> float:
+        """Expected end-to-end time for a route (matches user-facing estimates)."""
+        ethereum_involved = 1 in (source_chain_id, dest_chain_id)
+        if protocol == PROTOCOL_CCTP:
+            # "3-5 minutes" with Ethereum, "1-3 minutes" otherwise
+            return 240.0 if ethereum_involved else 120.0
+        # Axelar GMP: "5-10 minutes", Ethereum finality pushes it to the top of the range
+        return 600.0 if ethereum_involved else 450.0
+
+    def _next_interval(self, transfer: TrackedTransfer, now: float) -> float:
+        """
+        Adaptive poll interval.
+
+        Sparse while the transfer cannot be done yet, dense around the expected
+        completion time, then exponential backoff once it is overdue.
+        """
+        elapsed = now - (transfer.submitted_at or now)
+        expected = transfer.expected_seconds
+
+        if elapsed < expected * 0.5:
+            interval = expected / 8
+        elif elapsed < expected * 1.5:
+            interval = expected / 20
+        else:
+            interval = (transfer.last_interval or expected / 20) * 2
+
+        return max(self.min_poll_interval, min(self.max_poll_interval, interval))
+
+    async def _due_transfers(self, now: float) -> List[TrackedTransfer]:
+        """Claim the transfers due for a check; expired ones leave the schedule."""
+        store = await self._get_store()
+        # A claim lapses after max_poll_interval in case the claiming worker dies
+        bridge_ids = await store.claim_due(now, now + self.max_poll_interval, self._claim_batch)
+        due = []
+        for bridge_id in bridge_ids:
+            transfer = await self._load(bridge_id)
+            if transfer is None or transfer.is_terminal or not transfer.tx_hash:
+                await store.unschedule(bridge_id)
+            else:
+                due.append(transfer)
+        return due
+
+    async def _seconds_until_next_check(self, now: float) -> float:
+        # Other workers add to the shared schedule, so re-read it at least
+        # every min_poll_interval
+        next_due = await (await self._get_store()).next_due_at()
+        if next_due is None:
+            return self.min_poll_interval
+        return max(0.0, min(next_due - now, self.min_poll_interval))
+
+    async def _run(self) -> None:
+        """Main loop: sleep until the next transfer is due (or a new one arrives)."""
+        while True:
+            try:
+                now = time.time()
+                due = await self._due_transfers(now)
+                if due:
+                    await asyncio.gather(*(self._check(t) for t in due))
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        self._wakeup.wait(),
+                        timeout=await self._seconds_until_next_check(time.time()),
+                    )
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Bridge tracker loop error: {e}")
+                await asyncio.sleep(self.min_poll_interval)
+
+    # ------------------------------------------------------------------
+    # Status checks
+    # ------------------------------------------------------------------
+
+    async def _check(self, transfer: TrackedTransfer) -> None:
+        """Poll the upstream API for one transfer and publish any transition."""
+        async with self._semaphore:
+            previous = (transfer.status, transfer.current_step, transfer.dest_tx_hash)
+            transfer.attempts += 1
+
+            try:
+                if transfer.protocol == PROTOCOL_CCTP:
+                    await self._check_cctp(transfer)
+                else:
+                    await self._check_axelar(transfer)
+            except Exception as e:
+                logger.warning(f"Status check failed for {transfer.bridge_id}: {e}")
+
+            now = time.time()
+            if not transfer.is_terminal:
+                if now - (transfer.submitted_at or now) > transfer.expected_seconds * 6:
+                    transfer.status = "timeout"
+                    transfer.error = "Transfer is taking much longer than expected"
+                else:
+                    transfer.last_interval = self._next_interval(transfer, now)
+                    transfer.next_check_at = now + transfer.last_interval
+
+            await self._save(transfer)
+            if (transfer.status, transfer.current_step, transfer.dest_tx_hash) != previous:
+                await self._publish(transfer)
+
+    async def _check_axelar(self, transfer: TrackedTransfer) -> None:
+        from app.services.axelar_gmp_service import axelar_gmp_service
+
+        result = await axelar_gmp_service.track_gmp_transaction(
+            transfer.tx_hash, transfer.source_chain_id, transfer.dest_chain_id
+        )
+        if result.get("error") and not result.get("success"):
+            logger.debug(f"Axelar lookup error for {transfer.bridge_id}: {result.get('technical_details')}")
+            return
+
+        if result.get("executed"):
+            step, status = AXELAR_STATUS_MAP["executed"]
+        else:
+            step, status = AXELAR_STATUS_MAP.get(
+                str(result.get("status", "")).lower(), (transfer.current_step, "pending")
+            )
+            if result.get("approved") and step < 3:
+                step, status = AXELAR_STATUS_MAP["approved"]
+
+        transfer.current_step = step
+        transfer.status = status
+        transfer.dest_tx_hash = result.get("dest_tx_hash") or transfer.dest_tx_hash
+        if status == "failed":
+            transfer.error = result.get("error") or "Cross-chain execution failed"
+
+    async def _check_cctp(self, transfer: TrackedTransfer) -> None:
+        # Reads the shared attestation poller; Circle is polled once for all users
+        from app.services.cctp_attestation_poller import cctp_attestation_poller
+
+        result = cctp_attestation_poller.get_transaction_status(
+            transfer.source_chain_id, transfer.tx_hash
+        )
+        attestations = result["attestations"]
+
+        if result["status"] == "complete":
+            # Attested: the mint can be submitted on the destination chain
+            transfer.current_step = 3
+            transfer.status = "completed"
+            transfer.metadata["attestations"] = attestations
+        elif result["status"] == "attesting":
+            transfer.current_step = 2
+            transfer.status = "attesting"
+
+    async def _publish(self, transfer: TrackedTransfer) -> None:
+        """Write the new status to Redis and push it to the user."""
+        payload = transfer.to_status_payload()
+        logger.info(f"Bridge {transfer.bridge_id} -> {transfer.status} (step {transfer.current_step})")
+
+        if self._redis:
+            try:
+                await self._redis.setex(
+                    f"bridge_status:{transfer.bridge_id}", self.status_ttl, json.dumps(payload)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to persist bridge status {transfer.bridge_id}: {e}")
+
+        if self._notifier:
+            try:
+                await self._notifier(transfer.wallet_address, payload)
+            except Exception as e:
+                logger.warning(f"Failed to push bridge status {transfer.bridge_id}: {e}")
+
+
+# Global instance
+bridge_status_tracker = BridgeStatusTracker()
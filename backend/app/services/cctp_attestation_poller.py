@@ -0,0 +1,385 @@
+"""
+Shared Circle CCTP attestation poller.
+
+One background loop polls Circle's attestation API for every pending burn,
+grouped per source domain, instead of each caller polling on its own.
+Completed attestations are immutable and cached permanently, and callers
+share a single future per message via ``wait_for_attestation``.
+"""
+import asyncio
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+import redis.asyncio as redis
+from eth_utils import encode_hex, keccak
+
+from app.config.settings import get_settings
+from app.services.circle_cctp_service import circle_cctp_service
+
+logger = logging.getLogger(__name__)
+
+
+def compute_message_hash(message: str) -> str:
+    """Compute the CCTP message hash (keccak256 of the raw message bytes)."""
+    return encode_hex(keccak(hexstr=message))
+
+
+@dataclass
+class PendingBurn:
+    """A burn transaction whose messages are not attested yet."""
+    source_chain_id: int
+    tx_hash: str
+    registered_at: float = field(default_factory=time.time)
+    message_hashes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class PendingMessage:
+    """A message someone is waiting on, polled by hash."""
+    source_chain_id: Optional[int]
+    registered_at: float = field(default_factory=time.time)
+
+
+class CCTPAttestationPoller:
+    """Polls Circle for pending attestations and fans results out to waiters."""
+
+    def __init__(
+        self,
+        poll_interval: float = 5.0,
+        max_concurrent_requests: int = 5,
+        pending_timeout: float = 3600.0,
+    ):
+        """
+        Initialize poller.
+
+        Args:
+            poll_interval: Delay between polling rounds while work is pending (seconds)
+            max_concurrent_requests: Upper bound on in-flight Circle API calls
+            pending_timeout: Stop polling burns and messages that never get attested within this window
+        """
+        self.poll_interval = poll_interval
+        self.pending_timeout = pending_timeout
+
+        # Completed attestations are immutable: message_hash -> {message, attestation}
+        self._attestations: Dict[str, Dict[str, Any]] = {}
+        self._tx_messages: Dict[str, List[str]] = {}
+
+        self._pending_burns: Dict[str, PendingBurn] = {}         # tx_hash -> burn
+        self._pending_messages: Dict[str, PendingMessage] = {}   # message_hash -> message
+        self._waiters: Dict[str, asyncio.Future] = {}
+        self._waiter_counts: Dict[str, int] = {}
+
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+        self._redis_checked = False
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_cached(self, message_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a completed attestation from memory."""
+        return self._attestations.get(message_hash.lower())
+
+    def track_transaction(self, source_chain_id: int, tx_hash: str) -> None:
+        """Register a burn transaction for attestation polling."""
+        tx_hash = tx_hash.lower()
+        if tx_hash in self._pending_burns:
+            return
+        if tx_hash in self._tx_messages and all(
+            h in self._attestations for h in self._tx_messages[tx_hash]
+        ):
+            return
+
+        self._pending_burns[tx_hash] = PendingBurn(source_chain_id=source_chain_id, tx_hash=tx_hash)
+        self._ensure_running()
+
+    def untrack_transaction(self, tx_hash: str) -> None:
+        """Stop polling a transaction that turned out not to be a burn."""
+        self._pending_burns.pop(tx_hash.lower(), None)
+
+    def get_transaction_status(self, source_chain_id: int, tx_hash: str) -> Dict[str, Any]:
+        """
+        Get the attestation status of a burn transaction without calling Circle.
+
+        Unknown transactions are registered so the shared loop picks them up.
+
+        Returns:
+            ``{"status", "attestations"}`` where status is ``complete``,
+            ``attesting`` (Circle has seen the burn) or ``pending``
+        """
+        tx_hash = tx_hash.lower()
+        message_hashes = self._tx_messages.get(tx_hash)
+        if message_hashes is None:
+            self.track_transaction(source_chain_id, tx_hash)
+            return {"status": "pending", "attestations": []}
+
+        attestations = [self._attestations[h] for h in message_hashes if h in self._attestations]
+        if message_hashes and len(attestations) == len(message_hashes):
+            return {"status": "complete", "attestations": attestations}
+
+        self.track_transaction(source_chain_id, tx_hash)
+        return {"status": "attesting", "attestations": attestations}
+
+    async def wait_for_attestation(
+        self,
+        message_hash: str,
+        timeout: float,
+        source_chain_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Wait until Circle has attested a message.
+
+        Concurrent callers for the same message share one future and one
+        polling slot; the message stops being polled once its last caller
+        times out or is cancelled.
+
+        Args:
+            message_hash: CCTP message hash (0x-prefixed keccak256)
+            timeout: Maximum time to wait (seconds)
+            source_chain_id: Source chain, if known
+
+        Returns:
+            ``{"message_hash", "message", "attestation"}``
+
+        Raises:
+            asyncio.TimeoutError: If no attestation arrived within ``timeout``
+                (or within the poller's ``pending_timeout``)
+        """
+        message_hash = message_hash.lower()
+
+        cached = self._attestations.get(message_hash) or await self._load_persisted(message_hash)
+        if cached:
+            return cached
+
+        future = self._waiters.get(message_hash)
+        if future is None or future.done():
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[message_hash] = future
+
+        if message_hash not in self._pending_messages and not any(
+            message_hash in burn.message_hashes for burn in self._pending_burns.values()
+        ):
+            self._pending_messages[message_hash] = PendingMessage(source_chain_id)
+        self._ensure_running()
+
+        self._waiter_counts[message_hash] = self._waiter_counts.get(message_hash, 0) + 1
+        try:
+            # Shield so one caller timing out does not cancel the shared future
+            return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        finally:
+            remaining = self._waiter_counts.pop(message_hash, 1) - 1
+            if remaining:
+                self._waiter_counts[message_hash] = remaining
+            elif not future.done():
+                # Nobody is waiting any more: stop polling for it
+                if self._waiters.get(message_hash) is future:
+                    del self._waiters[message_hash]
+                future.cancel()
+                self._pending_messages.pop(message_hash, None)
+
+    async def stop(self) -> None:
+        """Stop the polling loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+            self._redis_checked = False
+
+    # ------------------------------------------------------------------
+    # Polling loop
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self) -> None:
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            try:
+                self._task = asyncio.get_running_loop().create_task(self._run())
+            except RuntimeError:
+                # No running loop (sync caller); the next async caller starts it
+                self._task = None
+
+    def _has_work(self) -> bool:
+        return bool(self._pending_burns or self._pending_messages)
+
+    async def _run(self) -> None:
+        while self._has_work():
+            try:
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"CCTP attestation poll failed: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def poll_once(self) -> None:
+        """Run one polling round: one batch of lookups per source domain."""
+        self._expire_stale()
+
+        batches: Dict[Optional[int], List[Any]] = {}
+        for burn in self._pending_burns.values():
+            batches.setdefault(burn.source_chain_id, []).append(burn)
+        for message_hash, message in self._pending_messages.items():
+            batches.setdefault(message.source_chain_id, []).append(message_hash)
+
+        await asyncio.gather(*(
+            self._poll_domain(source_chain_id, items)
+            for source_chain_id, items in batches.items()
+        ))
+
+    async def _poll_domain(self, source_chain_id: Optional[int], items: List[Any]) -> None:
+        """Look up every pending burn/message of one source domain."""
+        await asyncio.gather(*(
+            self._poll_burn(item) if isinstance(item, PendingBurn) else self._poll_message(item)
+            for item in items
+        ))
+
+    async def _poll_burn(self, burn: PendingBurn) -> None:
+        async with self._semaphore:
+            try:
+                messages = await circle_cctp_service.get_transfer_messages(
+                    burn.source_chain_id, burn.tx_hash
+                )
+            except Exception as e:
+                logger.debug(f"Circle message lookup failed for {burn.tx_hash}: {e}")
+                return
+
+        if not messages:
+            return
+
+        all_complete = True
+        hashes = []
+        for entry in messages:
+            raw_message = entry.get("message")
+            if not raw_message or raw_message == "0x":
+                all_complete = False
+                continue
+
+            message_hash = compute_message_hash(raw_message)
+            hashes.append(message_hash)
+            # A burn lookup covers its messages; no separate per-message polling
+            self._pending_messages.pop(message_hash, None)
+
+            attestation = entry.get("attestation")
+            if entry.get("status") == "complete" and attestation and attestation != "PENDING":
+                await self._complete(message_hash, raw_message, attestation)
+            else:
+                all_complete = False
+
+        burn.message_hashes = hashes
+        self._tx_messages[burn.tx_hash] = hashes
+        if all_complete:
+            self._pending_burns.pop(burn.tx_hash, None)
+
+    async def _poll_message(self, message_hash: str) -> None:
+        async with self._semaphore:
+            try:
+                result = await circle_cctp_service.get_attestation(message_hash)
+            except Exception as e:
+                logger.debug(f"Circle attestation lookup failed for {message_hash}: {e}")
+                return
+
+        if result and result.get("status") == "complete" and result.get("attestation"):
+            await self._complete(message_hash, None, result["attestation"])
+
+    async def _complete(self, message_hash: str, message: Optional[str], attestation: str) -> None:
+        record = {
+            "message_hash": message_hash,
+            "message": message,
+            "attestation": attestation,
+        }
+        self._attestations[message_hash] = record
+        self._pending_messages.pop(message_hash, None)
+
+        future = self._waiters.pop(message_hash, None)
+        if future and not future.done():
+            future.set_result(record)
+
+        await self._persist(record)
+        logger.info(f"CCTP attestation available for {message_hash}")
+
+    def _expire_stale(self) -> None:
+        now = time.time()
+        for tx_hash in [
+            tx for tx, burn in self._pending_burns.items()
+            if now - burn.registered_at > self.pending_timeout
+        ]:
+            logger.warning(f"Giving up on CCTP attestation for burn {tx_hash}")
+            self._pending_burns.pop(tx_hash, None)
+
+        # Messages stay pending only while someone is waiting for them
+        for message_hash in [
+            h for h, message in self._pending_messages.items()
+            if h not in self._waiters or self._waiters[h].done()
+            or now - message.registered_at > self.pending_timeout
+        ]:
+            self._pending_messages.pop(message_hash, None)
+            future = self._waiters.pop(message_hash, None)
+            if future is not None and not future.done():
+                logger.warning(f"Giving up on CCTP attestation for message {message_hash}")
+                future.set_exception(asyncio.TimeoutError(
+                    f"No attestation for {message_hash} within {self.pending_timeout}s"
+                ))
+
+    # ------------------------------------------------------------------
+    # Persistence (attestations never change, so no TTL)
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        if not self._redis_checked:
+            self._redis_checked = True
+            try:
+                settings = get_settings()
+                self._redis = redis.from_url(
+                    settings.database.redis_url,
+                    db=settings.database.redis_db,
+                    decode_responses=True,
+                )
+                await self._redis.ping()
+            except Exception as e:
+                logger.debug(f"CCTP attestation cache running without Redis: {e}")
+                self._redis = None
+        return self._redis
+
+    async def _persist(self, record: Dict[str, Any]) -> None:
+        client = await self._get_redis()
+        if not client:
+            return
+        try:
+            await client.set(f"cctp_attestation:{record['message_hash']}", json.dumps(record))
+        except Exception as e:
+            logger.debug(f"Failed to persist CCTP attestation: {e}")
+
+    async def _load_persisted(self, message_hash: str) -> Optional[Dict[str, Any]]:
+        client = await self._get_redis()
+        if not client:
+            return None
+        try:
+            data = await client.get(f"cctp_attestation:{message_hash}")
+        except Exception:
+            return None
+        if not data:
+            return None
+        record = json.loads(data)
+        self._attestations[message_hash] = record
+        return record
+
+
+# Global instance
+cctp_attestation_poller = CCTPAttestationPoller()
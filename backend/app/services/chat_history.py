@@ -1,57 +1,215 @@
 """
 Chat history service with Redis support.
+
+Each conversation is a Redis list of JSON entries: appends are RPUSH +
+LTRIM (bounded length) and context reads are LRANGE over the tail, so a
+write costs O(1) regardless of conversation length. Without Redis, a
+bounded in-process store is used instead.
+
+Prompt context is kept separately as compact, pre-summarised turns per
+conversation (see ConversationContext), updated as entries are added.
 """
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional
-from redis import Redis
-from datetime import datetime, timedelta
+import re
+import time
+from collections import OrderedDict, deque
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Longest user command / assistant reply kept per turn in prompt context
+MAX_TURN_CHARS = 400
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (about 4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def _clip(text: str) -> str:
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text if len(text) <= MAX_TURN_CHARS else text[:MAX_TURN_CHARS - 3] + "..."
+
+
+def summarize_entry(entry: Dict[str, Any]) -> str:
+    """
+    One compact turn for prompt context.
+
+    Keeps the user command and the assistant's message; transaction
+    payloads, metadata and other structured fields are dropped.
+    """
+    response = entry.get("response")
+    content = response.get("content", "") if isinstance(response, dict) else response
+    if isinstance(content, dict):
+        reply = content.get("message") or content.get("text") or f"[{content.get('type', 'response')}]"
+    else:
+        reply = content
+    return f"User: {_clip(str(entry.get('command', '')))}\nAssistant: {_clip(str(reply or ''))}\n---\n"
+
+
+class ConversationContext:
+    """
+    Rolling prompt context for one conversation.
+
+    Holds the last ``max_turns`` summarised turns with their token
+    estimates; rendered contexts are cached per budget until the next turn.
+    """
+
+    HEADER = "\nRecent conversation:\n"
+
+    def __init__(self, max_turns: int, version: int = 0):
+        self.turns: deque = deque(maxlen=max_turns)  # (text, tokens)
+        self.version = version
+        self._rendered: Dict[int, str] = {}
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        text = summarize_entry(entry)
+        self.turns.append((text, estimate_tokens(text)))
+        self.version += 1
+        self._rendered.clear()
+
+    def render(self, max_tokens: int) -> str:
+        """Newest turns that fit in ``max_tokens``, oldest first ("" when empty)."""
+        cached = self._rendered.get(max_tokens)
+        if cached is not None:
+            return cached
+
+        budget = max_tokens - estimate_tokens(self.HEADER)
+        selected = []
+        for text, tokens in reversed(self.turns):
+            if tokens > budget:
+                break
+            selected.append(text)
+            budget -= tokens
+        rendered = self.HEADER + "".join(reversed(selected)) if selected else ""
+        self._rendered[max_tokens] = rendered
+        return rendered
+
 
 class ChatHistoryService:
-    def __init__(self):
-        """Initialize the chat history service with Redis connection."""
-        self.memory_store = {}
-        redis_url = os.getenv("REDIS_URL")
-        if redis_url:
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_entries: int = 50,
+        ttl_seconds: int = 24 * 3600,
+        max_conversations: int = 10000,
+    ):
+        """
+        Initialize the chat history service.
+
+        Args:
+            redis_url: Redis URL (defaults to REDIS_URL; unset or "" keeps history in memory)
+            max_entries: Entries kept per conversation
+            ttl_seconds: Conversations expire this long after their last message
+            max_conversations: In-memory fallback bound (least recently used evicted)
+        """
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_conversations = max_conversations
+
+        self.redis: Optional[redis.Redis] = None
+        self.use_redis = bool(self.redis_url)
+        self._connected = False
+        # key -> (expires_at, value); conversations hold a deque of entries
+        self.memory_store: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # conversation key -> rolling prompt context (bounded like memory_store)
+        self.contexts: "OrderedDict[str, ConversationContext]" = OrderedDict()
+
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        """Connect on first use; None means the in-memory store is used."""
+        if not self.use_redis:
+            return None
+        if not self._connected:
             try:
-                self.redis = Redis.from_url(redis_url, decode_responses=True)
-                # Test the connection
-                self.redis.ping()
-                self.use_redis = True
+                self.redis = redis.from_url(self.redis_url, decode_responses=True)
+                await self.redis.ping()
+                self._connected = True
             except Exception as e:
-                print(f"Redis connection failed: {str(e)}. Using in-memory storage instead.")
+                logger.warning(f"Redis connection failed: {e}. Using in-memory chat history instead.")
                 self.use_redis = False
-        else:
-            self.use_redis = False
+                return None
+        return self.redis
+
+    def _redis_failed(self, operation: str, error: Exception) -> None:
+        logger.warning(f"Redis {operation} error: {error}. Falling back to memory store.")
+        self.use_redis = False  # Disable Redis for future calls
+
+    # ------------------------------------------------------------------
+    # In-memory fallback
+    # ------------------------------------------------------------------
+
+    def _memory_get(self, key: str) -> Any:
+        item = self.memory_store.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self.memory_store[key]
+            return None
+        self.memory_store.move_to_end(key)
+        return value
+
+    def _memory_set(self, key: str, value: Any, ttl: float) -> None:
+        self.memory_store[key] = (time.monotonic() + ttl, value)
+        self.memory_store.move_to_end(key)
+        while len(self.memory_store) > self.max_conversations:
+            self.memory_store.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Conversation history
+    # ------------------------------------------------------------------
 
     def _get_key(self, wallet_address: Optional[str], user_name: Optional[str]) -> str:
-        """Generate a Redis key for the conversation history."""
-        return f"chat_history:{wallet_address or ''}:{user_name or ''}"
+        """Generate a Redis key for the conversation history (a list of JSON entries)."""
+        return f"chat_history:list:{wallet_address or ''}:{user_name or ''}"
 
-    def get_history(self, wallet_address: Optional[str], user_name: Optional[str]) -> List[Dict[str, Any]]:
-        """Get conversation history for a user."""
-        key = self._get_key(wallet_address, user_name)
+    @staticmethod
+    def _version_key(key: str) -> str:
+        """Counter bumped on every append, so workers can tell their context is stale."""
+        return f"{key}:version"
+
+    def _store_context(self, key: str, context: ConversationContext) -> None:
+        self.contexts[key] = context
+        self.contexts.move_to_end(key)
+        while len(self.contexts) > self.max_conversations:
+            self.contexts.popitem(last=False)
 
-        if self.use_redis:
+    async def _tail(self, key: str, count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Last ``count`` entries (all when None), oldest first."""
+        client = await self._get_redis()
+        if client is not None:
             try:
-                history_str = self.redis.get(key)
-                return json.loads(history_str) if history_str else []
+                start = -count if count else 0
+                return [json.loads(e) for e in await client.lrange(key, start, -1)]
             except Exception as e:
-                print(f"Redis get error: {str(e)}. Falling back to memory store.")
-                self.use_redis = False  # Disable Redis for future calls
-                return self.memory_store.get(key, [])
-        else:
-            return self.memory_store.get(key, [])
-
-    def add_entry(self,
-                 wallet_address: Optional[str],
-                 user_name: Optional[str],
-                 entry_type: str,
-                 command: str,
-                 response: Dict[str, Any]):
+                self._redis_failed("get", e)
+
+        entries = self._memory_get(key)
+        if not entries:
+            return []
+        entries = list(entries)
+        return entries[-count:] if count else entries
+
+    async def get_history(self, wallet_address: Optional[str], user_name: Optional[str]) -> List[Dict[str, Any]]:
+        """Get conversation history for a user."""
+        return await self._tail(self._get_key(wallet_address, user_name))
+
+    async def add_entry(self,
+                        wallet_address: Optional[str],
+                        user_name: Optional[str],
+                        entry_type: str,
+                        command: str,
+                        response: Dict[str, Any]):
         """Add a new entry to the conversation history."""
         key = self._get_key(wallet_address, user_name)
-        history = self.get_history(wallet_address, user_name)
 
         # Add timestamp to entry
         entry = {
@@ -61,79 +219,103 @@ class ChatHistoryService:
             'timestamp': datetime.utcnow().isoformat()
         }
 
-        # Add entry and keep only last 50 messages
-        history.append(entry)
-        if len(history) > 50:
-            history = history[-50:]
-
-        if self.use_redis:
+        client = await self._get_redis()
+        if client is not None:
             try:
-                # Store in Redis with 24-hour expiration
-                self.redis.setex(
-                    key,
-                    timedelta(hours=24),
-                    json.dumps(history)
-                )
+                # Append, keep only the last max_entries, refresh the 24-hour expiration
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.rpush(key, json.dumps(entry, default=str))
+                    pipe.ltrim(key, -self.max_entries, -1)
+                    pipe.expire(key, self.ttl_seconds)
+                    pipe.incr(self._version_key(key))
+                    pipe.expire(self._version_key(key), self.ttl_seconds)
+                    results = await pipe.execute()
+                version = results[3]
+                context = self.contexts.get(key)
+                if context is not None and context.version == version - 1:
+                    context.append(entry)
+                else:
+                    # Another worker appended in between; rebuild on next read
+                    self.contexts.pop(key, None)
+                return
             except Exception as e:
-                print(f"Redis set error: {str(e)}. Falling back to memory store.")
-                self.use_redis = False  # Disable Redis for future calls
-                self.memory_store[key] = history
-        else:
-            self.memory_store[key] = history
-
-    def should_respond_to_greeting(self,
-                                 wallet_address: Optional[str],
-                                 user_name: Optional[str],
-                                 cmd_lower: str) -> bool:
-        """Determine if we should respond to a greeting based on conversation history."""
-        history = self.get_history(wallet_address, user_name)
-        if not history:
-            return True
+                self._redis_failed("set", e)
 
-        # Don't respond to the same greeting within 5 messages
-        recent_greetings = sum(1 for msg in history[-5:] if msg.get('type') == 'greeting')
-        return recent_greetings == 0
+        entries = self._memory_get(key)
+        if entries is None:
+            entries = deque(maxlen=self.max_entries)
+        entries.append(entry)
+        self._memory_set(key, entries, self.ttl_seconds)
 
-    def get_recent_context(self,
+        context = self.contexts.get(key)
+        if context is not None:
+            context.append(entry)
+
+    async def get_context(self,
                           wallet_address: Optional[str],
                           user_name: Optional[str],
-                          num_messages: int = 5) -> str:
-        """Get recent conversation context for AI."""
-        history = self.get_history(wallet_address, user_name)
-        if not history:
-            return ""
-
-        context = "\nRecent conversation:\n"
-        for entry in history[-num_messages:]:
-            # Format user message
-            context += f"User: {entry['command']}\n"
-
-            # Format agent response
-            if isinstance(entry['response'], dict):
-                content = entry['response'].get('content', '')
-                if isinstance(content, dict):
-                    # Handle structured responses (like swap confirmations)
-                    if content.get('type') == 'brian_confirmation':
-                        context += f"Assistant: {content.get('message', '')}\n"
-                    elif content.get('type') == 'swap_confirmation':
-                        context += f"Assistant: {content.get('message', '')}\n"
-                    else:
-                        context += f"Assistant: {str(content)}\n"
-                else:
-                    context += f"Assistant: {content}\n"
-            else:
-                context += f"Assistant: {str(entry['response'])}\n"
+                          max_tokens: int = 800) -> str:
+        """
+        Compact recent conversation for AI prompts, within ``max_tokens``.
+
+        Served from the rolling per-conversation context: one version check
+        against Redis (none in memory mode); history is only re-read when
+        another worker added turns or the context was evicted.
+        """
+        key = self._get_key(wallet_address, user_name)
+        context = self.contexts.get(key)
+
+        client = await self._get_redis()
+        if client is not None:
+            try:
+                version = int(await client.get(self._version_key(key)) or 0)
+                if context is None or context.version != version:
+                    context = await self._build_context(key, version)
+            except Exception as e:
+                self._redis_failed("get", e)
+                context = None
 
-            # Add a separator between conversations
-            context += "---\n"
+        if client is None or context is None:
+            if self._memory_get(key) is None:
+                self.contexts.pop(key, None)
+                return ""
+            if context is None:
+                context = await self._build_context(key, 0)
 
+        self.contexts.move_to_end(key)
+        return context.render(max_tokens)
+
+    async def _build_context(self, key: str, version: int) -> ConversationContext:
+        """Summarise the stored history into a fresh rolling context."""
+        context = ConversationContext(self.max_entries)
+        for entry in await self._tail(key, self.max_entries):
+            context.append(entry)
+        context.version = version
+        self._store_context(key, context)
         return context
 
-    def store_pending_transaction(self,
-                                wallet_address: Optional[str],
-                                user_name: Optional[str],
-                                transaction_type: str,
-                                transaction_data: Dict[str, Any]):
+    async def should_respond_to_greeting(self,
+                                         wallet_address: Optional[str],
+                                         user_name: Optional[str],
+                                         cmd_lower: str) -> bool:
+        """Determine if we should respond to a greeting based on conversation history."""
+        recent = await self._tail(self._get_key(wallet_address, user_name), 5)
+        if not recent:
+            return True
+
+        # Don't respond to the same greeting within 5 messages
+        recent_greetings = sum(1 for msg in recent if msg.get('type') == 'greeting')
+        return recent_greetings == 0
+
+    # ------------------------------------------------------------------
+    # Pending transactions
+    # ------------------------------------------------------------------
+
+    async def store_pending_transaction(self,
+                                        wallet_address: Optional[str],
+                                        user_name: Optional[str],
+                                        transaction_type: str,
+                                        transaction_data: Dict[str, Any]):
         """Store a pending transaction for confirmation."""
         key = f"pending_tx:{wallet_address or ''}:{user_name or ''}"
 
@@ -143,55 +325,45 @@ class ChatHistoryService:
             'timestamp': datetime.utcnow().isoformat()
         }
 
-        if self.use_redis:
+        client = await self._get_redis()
+        if client is not None:
             try:
                 # Store with 10-minute expiration
-                self.redis.setex(
-                    key,
-                    timedelta(minutes=10),
-                    json.dumps(pending_tx)
-                )
+                await client.set(key, json.dumps(pending_tx, default=str), ex=600)
+                return
             except Exception as e:
-                print(f"Redis set error for pending tx: {str(e)}. Falling back to memory store.")
-                self.use_redis = False
-                self.memory_store[key] = pending_tx
-        else:
-            self.memory_store[key] = pending_tx
+                self._redis_failed("set", e)
+        self._memory_set(key, pending_tx, 600)
 
-    def get_pending_transaction(self,
-                              wallet_address: Optional[str],
-                              user_name: Optional[str]) -> Optional[Dict[str, Any]]:
+    async def get_pending_transaction(self,
+                                      wallet_address: Optional[str],
+                                      user_name: Optional[str]) -> Optional[Dict[str, Any]]:
         """Get pending transaction for confirmation."""
         key = f"pending_tx:{wallet_address or ''}:{user_name or ''}"
 
-        if self.use_redis:
+        client = await self._get_redis()
+        if client is not None:
             try:
-                pending_str = self.redis.get(key)
+                pending_str = await client.get(key)
                 return json.loads(pending_str) if pending_str else None
             except Exception as e:
-                print(f"Redis get error for pending tx: {str(e)}. Falling back to memory store.")
-                self.use_redis = False
-                return self.memory_store.get(key)
-        else:
-            return self.memory_store.get(key)
+                self._redis_failed("get", e)
+        return self._memory_get(key)
 
-    def clear_pending_transaction(self,
-                                wallet_address: Optional[str],
-                                user_name: Optional[str]):
+    async def clear_pending_transaction(self,
+                                        wallet_address: Optional[str],
+                                        user_name: Optional[str]):
         """Clear pending transaction after confirmation or cancellation."""
         key = f"pending_tx:{wallet_address or ''}:{user_name or ''}"
 
-        if self.use_redis:
+        client = await self._get_redis()
+        if client is not None:
             try:
-                self.redis.delete(key)
+                await client.delete(key)
+                return
             except Exception as e:
-                print(f"Redis delete error for pending tx: {str(e)}. Falling back to memory store.")
-                self.use_redis = False
-                if key in self.memory_store:
-                    del self.memory_store[key]
-        else:
-            if key in self.memory_store:
-                del self.memory_store[key]
+                self._redis_failed("delete", e)
+        self.memory_store.pop(key, None)
 
 # Create a singleton instance
-chat_history_service = ChatHistoryService()
\ No newline at end of file
+chat_history_service = ChatHistoryService()
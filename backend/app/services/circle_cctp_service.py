@@ -15,6 +15,7 @@ from eth_utils import function_signature_to_4byte_selector, to_checksum_address
 from ..core.config_manager import config_manager
 from ..core.errors import ProtocolError, ProtocolAPIError, NetworkError, ValidationError
 from .utils.transaction_utils import transaction_utils
+from .bridge_status_tracker import bridge_status_tracker, PROTOCOL_CCTP
 
 logger = logging.getLogger(__name__)
 
@@ -31,11 +32,9 @@ class CircleCCTPService:
         self._failure_threshold = 3
         self._cooldown_seconds = 60
         self._api_state = {}  # Track API health per endpoint
-        # Response cache for attestations and quotes
+        # Response cache for quotes (attestations are cached by cctp_attestation_poller)
         self._quote_cache = {}
         self._quote_cache_ttl = 60  # 1 minute for quotes
-        self._attestation_cache = {}
-        self._attestation_cache_ttl = 300  # 5 minutes for attestations
         
         # Initialize chain mappings immediately
         self.chain_mappings = {
@@ -137,7 +136,12 @@ class CircleCCTPService:
                 state["failures"] = 0
             
             return response.json()
-            
+
+        except httpx.HTTPStatusError as e:
+            # 404 means "not indexed yet" for lookups, not an unhealthy API
+            if e.response.status_code != 404:
+                self._record_failure(endpoint)
+            raise e
         except Exception as e:
             self._record_failure(endpoint)
             raise e
@@ -249,8 +253,17 @@ class CircleCCTPService:
                 token_messenger, usdc_address
             )
 
+            # Track the burn -> attestation -> mint lifecycle in the background
+            bridge_id = await bridge_status_tracker.register(
+                wallet_address=wallet_address,
+                protocol=PROTOCOL_CCTP,
+                source_chain_id=from_chain_id,
+                dest_chain_id=to_chain_id,
+            )
+
             return {
                 "success": True,
+                "bridge_id": bridge_id,
                 "protocol": "cctp_v2",
                 "type": "cross_chain_usdc_transfer",
                 "from_chain": from_chain,
@@ -543,6 +556,55 @@ class CircleCCTPService:
             
         return domain_id
 
+    async def get_transfer_messages(self, source_chain_id: int, tx_hash: str) -> List[Dict[str, Any]]:
+        """
+        Look up the CCTP messages emitted by a burn transaction.
+
+        Args:
+            source_chain_id: Chain ID the burn was submitted on
+            tx_hash: Burn transaction hash
+
+        Returns:
+            Circle message entries (``message``, ``attestation``, ``status``);
+            empty while Circle has not indexed the transaction yet
+        """
+        if not self.session:
+            await self.initialize()
+
+        domain_id = self._get_circle_domain_id(source_chain_id)
+        api_endpoint = self.config.api_endpoints.get("attestation")
+        endpoint = f"{api_endpoint}/v2/messages/{domain_id}"
+
+        try:
+            data = await self._api_call(endpoint, params={"transactionHash": tx_hash})
+        except httpx.HTTPStatusError as e:
+            # Circle answers 404 until the burn has been observed
+            if e.response.status_code == 404:
+                return []
+            raise
+
+        return data.get("messages", []) or []
+
+    async def get_attestation(self, message_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up the attestation for a single CCTP message hash.
+
+        Returns:
+            ``{"status", "attestation"}`` or None while Circle has not seen the message
+        """
+        if not self.session:
+            await self.initialize()
+
+        api_endpoint = self.config.api_endpoints.get("attestation")
+        endpoint = f"{api_endpoint}/v1/attestations/{message_hash}"
+
+        try:
+            return await self._api_call(endpoint)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+
     async def get_supported_tokens_for_chain(self, chain_id: int) -> List[str]:
         """Get list of tokens supported on a specific chain."""
         if not self.is_chain_supported(chain_id):
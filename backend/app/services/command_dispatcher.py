@@ -0,0 +1,83 @@
+"""
+Per-connection command dispatcher.
+
+Runs the commands received on one websocket connection as concurrent tasks,
+keyed by the client-supplied request id, so a quick command is not stuck
+behind a long research query. At most ``max_concurrent`` commands run at
+once; further commands wait their turn, up to ``max_pending`` in total.
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class CommandDispatcher:
+    """Concurrent, cancellable command tasks for a single connection."""
+
+    def __init__(self, max_concurrent: int = 4, max_pending: int = 16):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            max_concurrent: Commands running at the same time
+            max_pending: Commands accepted (running or waiting) before new ones are rejected
+        """
+        self.max_concurrent = max_concurrent
+        self.max_pending = max(max_pending, max_concurrent)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def __contains__(self, request_id: str) -> bool:
+        return request_id in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    @property
+    def full(self) -> bool:
+        return len(self._tasks) >= self.max_pending
+
+    def submit(self, request_id: str, run: Callable[[], Awaitable[None]]) -> bool:
+        """
+        Schedule a command.
+
+        Args:
+            request_id: Client request id (must not be in flight)
+            run: Coroutine function executing the command and sending its response
+
+        Returns:
+            False if the id is already in flight or the dispatcher is full
+        """
+        if request_id in self._tasks or self.full:
+            return False
+        self._tasks[request_id] = asyncio.create_task(self._run(request_id, run))
+        return True
+
+    async def _run(self, request_id: str, run: Callable[[], Awaitable[None]]) -> None:
+        try:
+            async with self._semaphore:
+                await run()
+        except asyncio.CancelledError:
+            logger.info(f"Command {request_id} cancelled")
+        except Exception as e:
+            logger.exception(f"Unhandled error in command {request_id}: {e}")
+        finally:
+            self._tasks.pop(request_id, None)
+
+    def cancel(self, request_id: str) -> bool:
+        """Cancel a running or waiting command; False if it is not in flight."""
+        task = self._tasks.get(request_id)
+        if task is None or task.done():
+            return False
+        task.cancel()
+        return True
+
+    async def cancel_all(self) -> None:
+        """Cancel every command (connection closed) and wait for them to unwind."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -129,10 +129,10 @@ class CommandProcessor:
 
         try:
             # Get recent conversation context
-            context = chat_history_service.get_recent_context(
+            context = await chat_history_service.get_context(
                 unified_command.wallet_address,
                 unified_command.user_name,
-                num_messages=5,
+                max_tokens=600,
             )
 
             # Get LLM client (Venice primary, OpenAI fallback)
@@ -392,6 +392,8 @@ Respond with ONLY the command type name (e.g., "CROSS_CHAIN_SWAP").
             if hasattr(step_data, "model_dump"):
                 data_dict = step_data.model_dump()
                 logger.info(f"Transaction step complete - model_dump: {data_dict}")
+            elif isinstance(step_data, dict):
+                data_dict = step_data
             elif hasattr(step_data, "__dict__"):
                 data_dict = step_data.__dict__
                 logger.info(f"Transaction step complete - __dict__: {data_dict}")
@@ -415,8 +417,27 @@ Respond with ONLY the command type name (e.g., "CROSS_CHAIN_SWAP").
                 f"Completing transaction step for {wallet_address}, tx: {tx_hash}"
             )
 
+            # Hand the submitted hash to the bridge tracker; bridge flows carry
+            # their bridge_id and each step's type in the flow metadata
+            flow = await self.transaction_flow_service.get_current_flow(wallet_address)
+            bridge_id = data_dict.get("bridge_id") or (
+                flow.metadata.get("bridge_id") if flow else None
+            )
+            if success and bridge_id:
+                from .bridge_status_tracker import bridge_status_tracker
+
+                step_type = data_dict.get("step_type")
+                if not step_type and flow and flow.current_step < len(flow.steps):
+                    step_type = (flow.steps[flow.current_step].metadata or {}).get("type")
+                try:
+                    await bridge_status_tracker.attach_tx_hash(
+                        wallet_address, tx_hash, bridge_id, step_type=step_type
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to attach {tx_hash} to bridge {bridge_id}: {e}")
+
             # Complete the current step
-            step_completed = self.transaction_flow_service.complete_step(
+            step_completed = await self.transaction_flow_service.complete_step(
                 wallet_address=wallet_address,
                 tx_hash=tx_hash,
                 success=success,
@@ -436,7 +457,7 @@ Respond with ONLY the command type name (e.g., "CROSS_CHAIN_SWAP").
                 )
 
             # Get the next step if available
-            next_step = self.transaction_flow_service.get_next_step(wallet_address)
+            next_step = await self.transaction_flow_service.get_next_step(wallet_address)
 
             if next_step:
                 logger.info(f"Next step found: type={next_step.step_type.value}")
@@ -450,7 +471,7 @@ Respond with ONLY the command type name (e.g., "CROSS_CHAIN_SWAP").
                     chainId=chain_id or 1,
                 )
 
-                current_flow = self.transaction_flow_service.get_current_flow(
+                current_flow = await self.transaction_flow_service.get_current_flow(
                     wallet_address
                 )
 
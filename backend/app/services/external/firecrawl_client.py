@@ -247,6 +247,31 @@ class FirecrawlClient:
             logger.error(f"Batch scrape error: {e}")
             raise FirecrawlError(f"Batch scrape failed: {str(e)}")
 
+    async def search_urls(self, query: str, max_urls: int = 3) -> List[str]:
+        """
+        Search for a query and return the best URLs to scrape, most relevant first.
+        
+        Args:
+            query: Search query
+            max_urls: Maximum URLs to return
+            
+        Returns:
+            Prioritized list of URLs (empty if nothing was found)
+        """
+        search_results = await self.search(query, limit=max_urls)
+        
+        if not search_results.get("data"):
+            logger.warning(f"No search results for query: {query}")
+            return []
+        
+        urls = self._prioritize_urls(
+            [r.get("url") for r in search_results["data"] if r.get("url")]
+        )[:max_urls]
+        
+        if not urls:
+            logger.warning(f"No valid URLs from search results for: {query}")
+        return urls
+
     async def search_and_scrape(
         self,
         query: str,
@@ -268,20 +293,10 @@ class FirecrawlClient:
             List of scraped results
         """
         try:
-            # Step 1: Search
-            search_results = await self.search(query, limit=max_urls)
-            
-            if not search_results.get("data"):
-                logger.warning(f"No search results for query: {query}")
-                return []
-            
-            # Step 2: Extract URLs and prioritize
-            urls = self._prioritize_urls(
-                [r.get("url") for r in search_results["data"] if r.get("url")]
-            )[:max_urls]
+            # Step 1-2: Search, extract URLs and prioritize
+            urls = await self.search_urls(query, max_urls=max_urls)
             
             if not urls:
-                logger.warning(f"No valid URLs from search results for: {query}")
                 return []
             
             # Step 3: Batch scrape (efficient)
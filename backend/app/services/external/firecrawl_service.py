@@ -3,6 +3,7 @@ Protocol research service using Firecrawl API.
 Handles scraping, searching, and AI analysis of DeFi protocols.
 Note: AI analysis moved to app.services.analysis.ProtocolAnalyzer
 """
+import asyncio
 import logging
 import os
 from typing import Dict, Any, Optional, List
@@ -108,6 +109,62 @@ async def get_protocol_details(
         }
 
 
+async def find_protocol_sources(
+    client: FirecrawlClient,
+    protocol_name: str,
+    max_urls: int = 5,
+) -> List[str]:
+    """
+    Find candidate documentation URLs for a protocol, most relevant first.
+    
+    Args:
+        client: FirecrawlClient instance
+        protocol_name: Name of the protocol to research
+        max_urls: Maximum URLs to return
+        
+    Returns:
+        Prioritized list of URLs
+    """
+    return await client.search_urls(
+        f"{protocol_name} defi protocol documentation features",
+        max_urls=max_urls,
+    )
+
+
+async def scrape_protocol_source(
+    client: FirecrawlClient,
+    url: str,
+    use_llm_extraction: bool = True,
+) -> Optional[Dict[str, Any]]:
+    """
+    Scrape one protocol source.
+    
+    Args:
+        client: FirecrawlClient instance
+        url: URL to scrape
+        use_llm_extraction: Whether to use LLM for structured extraction
+        
+    Returns:
+        Dictionary with source_url/raw_content/extracted_data, or None if the scrape failed
+    """
+    try:
+        response = await client.scrape(
+            url,
+            use_llm_extraction=use_llm_extraction,
+            extraction_schema=PROTOCOL_EXTRACTION_SCHEMA if use_llm_extraction else None,
+        )
+    except FirecrawlError as e:
+        logger.warning(f"Scrape failed for {url}: {e}")
+        return None
+    
+    data = response.get("data", response)
+    return {
+        "source_url": url,
+        "raw_content": data.get("markdown", ""),
+        "extracted_data": data.get("llm_extraction") or data.get("extract") or data.get("llm_extraction_output") or {},
+    }
+
+
 # NOTE: analyze_protocol_with_ai() has been consolidated into ProtocolAnalyzer service
 # See: app/services/analysis/protocol_analyzer.py
 # This function is deprecated but kept for backward compatibility if needed elsewhere
@@ -187,14 +244,16 @@ async def get_multi_protocol_details(
     client: FirecrawlClient,
     protocol_names: List[str],
     use_llm_extraction: bool = True,
+    max_concurrent: int = 3,
 ) -> Dict[str, Any]:
     """
-    Get details for multiple protocols efficiently using batch processing.
+    Get details for multiple protocols concurrently.
     
     Args:
         client: FirecrawlClient instance
         protocol_names: List of protocol names
         use_llm_extraction: Whether to use LLM extraction
+        max_concurrent: Protocols researched at the same time
         
     Returns:
         Dictionary with aggregated results
@@ -207,34 +266,32 @@ async def get_multi_protocol_details(
             "protocols": [],
         }
     
-    protocols = []
-    successful_scrapes = 0
+    semaphore = asyncio.Semaphore(max_concurrent)
     
-    for name in protocol_names:
-        try:
-            result = await get_protocol_details(
-                client,
-                name,
-                use_llm_extraction=use_llm_extraction,
-            )
-            
-            protocols.append(result)
-            
-            if result.get("scraping_success"):
-                successful_scrapes += 1
-                
-        except Exception as e:
-            logger.error(f"Error researching {name}: {e}")
-            protocols.append({
-                "protocol_name": name,
-                "error": str(e),
-                "scraping_success": False,
-            })
+    async def research(name: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await get_protocol_details(
+                    client,
+                    name,
+                    use_llm_extraction=use_llm_extraction,
+                )
+            except Exception as e:
+                logger.error(f"Error researching {name}: {e}")
+                return {
+                    "protocol_name": name,
+                    "error": str(e),
+                    "scraping_success": False,
+                }
+    
+    # Protocols are researched concurrently; results keep the input order
+    protocols = await asyncio.gather(*(research(name) for name in protocol_names))
+    successful_scrapes = sum(1 for result in protocols if result.get("scraping_success"))
     
     return {
         "scraping_success": successful_scrapes > 0,
         "protocols_scraped": successful_scrapes,
-        "protocols": protocols,
+        "protocols": list(protocols),
     }
 
 
@@ -0,0 +1,146 @@
+"""
+Gas estimate memoization keyed by calldata shape.
+
+Gas used by a given contract function barely varies for the same path
+length, so estimates are learned per (chain, contract, selector,
+path_length) and served from a high percentile of past observations.
+A real ``eth_estimateGas`` is only needed for unfamiliar shapes and for a
+small background validation sample.
+"""
+import asyncio
+import logging
+import random
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class GasShape(NamedTuple):
+    """Calldata shape that determines gas usage."""
+    chain_id: Any
+    contract: str
+    selector: str
+    path_length: int = 0
+
+    @classmethod
+    def from_calldata(cls, chain_id: Any, contract: str, data: str, path_length: int = 0) -> "GasShape":
+        """Build a shape from a transaction's target and calldata."""
+        data = data[2:] if data.startswith("0x") else data
+        return cls(chain_id, contract.lower(), data[:8].lower(), path_length)
+
+
+class GasEstimateMemo:
+    """Learns per-shape gas distributions and serves a safe percentile."""
+
+    def __init__(
+        self,
+        min_samples: int = 3,
+        max_samples: int = 100,
+        percentile: float = 0.95,
+        safety_margin: float = 1.2,
+        validation_rate: float = 0.05,
+    ):
+        """
+        Initialize memo.
+
+        Args:
+            min_samples: Observations required before a shape is served from memory
+            max_samples: Observations kept per shape (oldest dropped first)
+            percentile: Percentile of observed gas served to callers
+            safety_margin: Multiplier applied on top of the percentile
+            validation_rate: Fraction of memoized lookups re-estimated in the background
+        """
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.percentile = percentile
+        self.safety_margin = safety_margin
+        self.validation_rate = validation_rate
+
+        self._samples: Dict[GasShape, Deque[int]] = {}
+        self._limits: Dict[GasShape, int] = {}
+        self._validating: Dict[GasShape, asyncio.Task] = {}
+
+    def observe(self, shape: GasShape, gas: int) -> None:
+        """Record gas from an ``eth_estimateGas`` result."""
+        if gas <= 0:
+            return
+        samples = self._samples.get(shape)
+        if samples is None:
+            samples = self._samples[shape] = deque(maxlen=self.max_samples)
+        samples.append(int(gas))
+        # Recompute once per observation so lookups stay O(1)
+        if len(samples) >= self.min_samples:
+            ordered = sorted(samples)
+            index = min(int(len(ordered) * self.percentile), len(ordered) - 1)
+            self._limits[shape] = int(ordered[index] * self.safety_margin)
+
+    def lookup(self, shape: GasShape) -> Optional[int]:
+        """Get a safe gas limit for a familiar shape, or None if unfamiliar."""
+        return self._limits.get(shape)
+
+    def should_validate(self) -> bool:
+        return random.random() < self.validation_rate
+
+    async def estimate(
+        self,
+        shape: GasShape,
+        estimator: Callable[[], Awaitable[Optional[int]]],
+    ) -> Optional[int]:
+        """
+        Get a gas limit, calling ``estimator`` only when needed.
+
+        Familiar shapes return immediately; a sample of them are re-estimated
+        in the background. Unfamiliar shapes await ``estimator`` and learn
+        from its result.
+
+        Args:
+            shape: Calldata shape of the transaction
+            estimator: Coroutine factory running a real gas estimate
+
+        Returns:
+            Gas limit, or None if the shape is unfamiliar and estimation failed
+        """
+        limit = self.lookup(shape)
+        if limit is not None:
+            if self.should_validate():
+                self._validate_in_background(shape, estimator)
+            return limit
+
+        gas = await estimator()
+        if gas:
+            self.observe(shape, gas)
+        return gas
+
+    def schedule(self, shape: GasShape, estimator: Callable[[], Awaitable[Optional[int]]]) -> None:
+        """Learn an unfamiliar shape in the background without blocking the caller."""
+        if self.lookup(shape) is None or self.should_validate():
+            self._validate_in_background(shape, estimator)
+
+    def _validate_in_background(
+        self,
+        shape: GasShape,
+        estimator: Callable[[], Awaitable[Optional[int]]],
+    ) -> None:
+        if shape in self._validating:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        async def run():
+            try:
+                gas = await estimator()
+                if gas:
+                    self.observe(shape, gas)
+            except Exception as e:
+                logger.debug(f"Background gas estimate failed for {shape}: {e}")
+            finally:
+                self._validating.pop(shape, None)
+
+        self._validating[shape] = loop.create_task(run())
+
+
+# Global instance
+gas_estimate_memo = GasEstimateMemo()
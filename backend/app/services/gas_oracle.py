@@ -0,0 +1,301 @@
+"""
+Gas price oracle.
+
+Keeps an EIP-1559 fee snapshot (base fee plus priority fee percentiles from
+``eth_feeHistory``) per chain, refreshed at most once per block. Transaction
+builders and portfolio queries read fees from memory instead of issuing
+their own ``eth_gasPrice`` round-trips.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+from app.config.chains import CHAINS, ChainType
+
+logger = logging.getLogger(__name__)
+
+# Reward percentiles requested from eth_feeHistory (slow / standard / fast)
+FEE_PERCENTILES = [10, 50, 90]
+SPEED_PERCENTILES = {"slow": 10, "standard": 50, "fast": 90}
+
+# Approximate block times (seconds); unknown chains default to Ethereum's
+BLOCK_TIMES: Dict[Any, float] = {
+    1: 12.0,
+    10: 2.0,
+    25: 6.0,
+    56: 3.0,
+    137: 2.0,
+    324: 1.0,
+    8453: 2.0,
+    42161: 0.25,
+    43114: 2.0,
+    59144: 2.0,
+    534352: 3.0,
+}
+DEFAULT_BLOCK_TIME = 12.0
+
+GWEI = 10 ** 9
+
+
+def _to_gwei(wei: int) -> float:
+    return round(wei / GWEI, 4)
+
+
+@dataclass
+class GasSnapshot:
+    """Fee data for one chain as of one block."""
+    chain_id: Any
+    block_number: int
+    base_fee_wei: int
+    next_base_fee_wei: int
+    priority_fees_wei: Dict[int, int] = field(default_factory=dict)
+    eip1559: bool = True
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def gas_price_wei(self) -> int:
+        """Effective legacy gas price (next base fee + median tip)."""
+        return self.next_base_fee_wei + self.priority_fees_wei.get(50, 0)
+
+    @property
+    def gas_price_gwei(self) -> float:
+        return _to_gwei(self.gas_price_wei)
+
+    def fee_params(self, speed: str = "standard") -> Dict[str, int]:
+        """
+        Transaction fee fields for the given speed.
+
+        EIP-1559 chains get ``maxFeePerGas`` with headroom for two full
+        base-fee increases; legacy chains get ``gasPrice``.
+        """
+        if not self.eip1559:
+            return {"gasPrice": self.gas_price_wei}
+        priority = self.priority_fees_wei.get(SPEED_PERCENTILES.get(speed, 50), 0)
+        return {
+            "maxFeePerGas": self.next_base_fee_wei * 2 + priority,
+            "maxPriorityFeePerGas": priority,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "chain_id": self.chain_id,
+            "block_number": self.block_number,
+            "eip1559": self.eip1559,
+            "base_fee_gwei": _to_gwei(self.base_fee_wei),
+            "next_base_fee_gwei": _to_gwei(self.next_base_fee_wei),
+            "priority_fee_gwei": {
+                speed: _to_gwei(self.priority_fees_wei.get(p, 0))
+                for speed, p in SPEED_PERCENTILES.items()
+            },
+            "gas_price_gwei": self.gas_price_gwei,
+            "updated_at": self.updated_at,
+        }
+
+
+class GasOracle:
+    """Per-chain gas fee cache refreshed once per block."""
+
+    def __init__(
+        self,
+        history_blocks: int = 5,
+        min_refresh_interval: float = 2.0,
+        active_window: float = 600.0,
+    ):
+        """
+        Initialize oracle.
+
+        Args:
+            history_blocks: Number of blocks of fee history to sample
+            min_refresh_interval: Lower bound on refresh period for fast chains (seconds)
+            active_window: Keep refreshing a chain in the background this long after its last read (seconds)
+        """
+        self.history_blocks = history_blocks
+        self.min_refresh_interval = min_refresh_interval
+        self.active_window = active_window
+
+        self._snapshots: Dict[Any, GasSnapshot] = {}
+        self._last_read: Dict[Any, float] = {}
+        self._refreshing: Dict[Any, asyncio.Task] = {}
+        self._scheduled: Set[asyncio.Task] = set()  # background refreshes (held so they are not GC'd)
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def is_supported(self, chain_id: Any) -> bool:
+        chain = CHAINS.get(chain_id)
+        return bool(chain and chain.type == ChainType.EVM and self._web3(chain_id))
+
+    def get_cached(self, chain_id: Any) -> Optional[GasSnapshot]:
+        """
+        Get the latest snapshot without any RPC call.
+
+        Marks the chain as active so the background loop keeps it warm.
+        """
+        self._last_read[chain_id] = time.time()
+        snapshot = self._snapshots.get(chain_id)
+        if snapshot is None or self._is_stale(snapshot):
+            self._schedule_refresh(chain_id)
+        return snapshot
+
+    async def get_fees(self, chain_id: Any) -> Optional[GasSnapshot]:
+        """Get a snapshot no older than one block, refreshing if needed."""
+        self._last_read[chain_id] = time.time()
+        snapshot = self._snapshots.get(chain_id)
+        if snapshot is not None and not self._is_stale(snapshot):
+            return snapshot
+        if not self.is_supported(chain_id):
+            return None
+        await self._refresh(chain_id)
+        return self._snapshots.get(chain_id)
+
+    async def start(self) -> None:
+        """Start the background refresh loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("Gas oracle started")
+
+    async def stop(self) -> None:
+        """Stop the background refresh loop."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for task in [*self._scheduled, *self._refreshing.values()]:
+            task.cancel()
+        self._scheduled.clear()
+        self._refreshing.clear()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _web3(chain_id: Any):
+        # Reuse Web3 instances from the singleton TokenQueryService
+        from app.services.token_query_service import token_query_service
+        return token_query_service.web3_instances.get(chain_id)
+
+    def _block_time(self, chain_id: Any) -> float:
+        return max(BLOCK_TIMES.get(chain_id, DEFAULT_BLOCK_TIME), self.min_refresh_interval)
+
+    def _is_stale(self, snapshot: GasSnapshot) -> bool:
+        return time.time() - snapshot.updated_at >= self._block_time(snapshot.chain_id)
+
+    def _schedule_refresh(self, chain_id: Any) -> None:
+        if not self.is_supported(chain_id):
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        if chain_id not in self._refreshing:
+            task = loop.create_task(self._refresh(chain_id))
+            self._scheduled.add(task)
+            task.add_done_callback(self._scheduled.discard)
+
+    async def _refresh(self, chain_id: Any) -> None:
+        """Refresh one chain; concurrent callers share the in-flight request."""
+        task = self._refreshing.get(chain_id)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(chain_id))
+            self._refreshing[chain_id] = task
+            task.add_done_callback(lambda _: self._refreshing.pop(chain_id, None))
+        try:
+            snapshot = await asyncio.shield(task)
+        except Exception as e:
+            logger.debug(f"Gas oracle refresh failed for chain {chain_id}: {e}")
+            return
+        if snapshot:
+            self._snapshots[chain_id] = snapshot
+
+    async def _fetch(self, chain_id: Any) -> Optional[GasSnapshot]:
+        w3 = self._web3(chain_id)
+        if not w3:
+            return None
+
+        history = None
+        try:
+            history = await asyncio.to_thread(
+                w3.eth.fee_history, self.history_blocks, "latest", FEE_PERCENTILES
+            )
+        except Exception as e:
+            logger.debug(f"eth_feeHistory unavailable on chain {chain_id}, using eth_gasPrice: {e}")
+        if history is not None and any(history["baseFeePerGas"]):
+            return self._snapshot_from_history(chain_id, history)
+
+        # Legacy chains (no base fee): eth_gasPrice, with the block number from
+        # the fee history when the node serves one
+        if history is not None:
+            gas_price = await asyncio.to_thread(lambda: w3.eth.gas_price)
+            block_number = self._latest_block(history)
+        else:
+            gas_price, block_number = await asyncio.gather(
+                asyncio.to_thread(lambda: w3.eth.gas_price),
+                asyncio.to_thread(lambda: w3.eth.block_number),
+            )
+        return GasSnapshot(
+            chain_id=chain_id,
+            block_number=block_number,
+            base_fee_wei=gas_price,
+            next_base_fee_wei=gas_price,
+            priority_fees_wei={p: 0 for p in FEE_PERCENTILES},
+            eip1559=False,
+        )
+
+    @staticmethod
+    def _latest_block(history: Dict[str, Any]) -> int:
+        """Newest block covered by an eth_feeHistory response."""
+        oldest_block = history["oldestBlock"]
+        if isinstance(oldest_block, str):
+            oldest_block = int(oldest_block, 16)
+        # baseFeePerGas has one extra entry: the next block's base fee
+        return oldest_block + max(len(history["baseFeePerGas"]) - 2, 0)
+
+    def _snapshot_from_history(self, chain_id: Any, history: Dict[str, Any]) -> GasSnapshot:
+        base_fees: List[int] = list(history["baseFeePerGas"])
+        rewards: List[List[int]] = list(history.get("reward") or [])
+
+        # Median over sampled blocks for each percentile, ignoring empty blocks
+        priority_fees = {}
+        for i, percentile in enumerate(FEE_PERCENTILES):
+            samples = sorted(r[i] for r in rewards if len(r) > i and r[i] > 0)
+            priority_fees[percentile] = samples[len(samples) // 2] if samples else 0
+
+        return GasSnapshot(
+            chain_id=chain_id,
+            block_number=self._latest_block(history),
+            # baseFeePerGas has one extra entry: the next block's base fee
+            base_fee_wei=base_fees[-2] if len(base_fees) > 1 else base_fees[-1],
+            next_base_fee_wei=base_fees[-1],
+            priority_fees_wei=priority_fees,
+        )
+
+    async def _run(self) -> None:
+        """Keep recently read chains refreshed once per block."""
+        while True:
+            try:
+                now = time.time()
+                for chain_id, last_read in list(self._last_read.items()):
+                    if now - last_read > self.active_window:
+                        self._last_read.pop(chain_id, None)
+                        continue
+                    snapshot = self._snapshots.get(chain_id)
+                    if snapshot is None or self._is_stale(snapshot):
+                        self._schedule_refresh(chain_id)
+                await asyncio.sleep(self.min_refresh_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Gas oracle loop error: {e}")
+                await asyncio.sleep(self.min_refresh_interval)
+
+
+# Global instance
+gas_oracle = GasOracle()
@@ -0,0 +1,302 @@
+"""
+Background IPFS pinning queue for Proof-of-Research.
+
+Research responses no longer wait on the Pinata upload: ``submit`` returns
+the content hash straight away and the pin happens in the background.
+Submissions are deduplicated by content hash, pinned in batches, retried
+with exponential backoff, and the resulting CID is pushed to the requesting
+wallets through the notifier. CIDs are cached by content hash (in process
+and in Redis) so content pinned before, such as a knowledge-base entry, is
+answered without an upload.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+from app.config.settings import get_settings
+from app.services.ipfs_service import IPFSService, ipfs_service
+
+logger = logging.getLogger(__name__)
+
+# Notifier signature: (wallet_address, pin_payload) -> None
+PinNotifier = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+PIN_PINNED = "pinned"
+PIN_PENDING = "pending"
+PIN_FAILED = "failed"
+PIN_DISABLED = "disabled"
+PIN_DROPPED = "dropped"
+
+
+def content_hash(data: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON encoding (key order does not matter)."""
+    encoded = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+@dataclass
+class PinJob:
+    """Content waiting to be pinned, and the wallets waiting for its CID."""
+    content_hash: str
+    data: Dict[str, Any]
+    filename: str
+    wallets: Set[str] = field(default_factory=set)
+    attempts: int = 0
+    next_attempt: float = 0.0
+
+
+class IPFSPinQueue:
+    """Deduplicating, batching, retrying pin queue with a CID cache."""
+
+    CID_KEY_PREFIX = "ipfs:cid:"
+    CID_TTL = 30 * 24 * 3600  # 30 days
+
+    def __init__(
+        self,
+        service: Optional[IPFSService] = None,
+        batch_size: int = 5,
+        batch_interval: float = 0.5,
+        max_attempts: int = 5,
+        base_backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        max_pending: int = 500,
+        max_cached_cids: int = 1024,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            service: IPFS service used for uploads (defaults to the global one)
+            batch_size: Pins uploaded concurrently per batch
+            batch_interval: Seconds to collect submissions before flushing a batch
+            max_attempts: Upload attempts before a pin is reported as failed
+            base_backoff: Delay before the first retry (doubles per attempt)
+            max_backoff: Upper bound on the retry delay
+            max_pending: Distinct pins queued before new content is dropped
+            max_cached_cids: CIDs kept in the in-process cache
+        """
+        self.service = service or ipfs_service
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_pending = max_pending
+        self.max_cached_cids = max_cached_cids
+
+        self._jobs: "OrderedDict[str, PinJob]" = OrderedDict()
+        self._cids: "OrderedDict[str, str]" = OrderedDict()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._redis: Optional[redis.Redis] = None
+        self._notifier: Optional[PinNotifier] = None
+        self.stats = {
+            "submitted": 0, "cache_hits": 0, "deduplicated": 0,
+            "pinned": 0, "retries": 0, "failed": 0, "dropped": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def set_notifier(self, notifier: Optional[PinNotifier]) -> None:
+        """Set the callback used to push pin results to users."""
+        self._notifier = notifier
+
+    async def start(self) -> None:
+        """Connect the shared CID cache and start the pinning loop."""
+        if self._task and not self._task.done():
+            return
+
+        try:
+            settings = get_settings()
+            self._redis = redis.from_url(
+                settings.database.redis_url,
+                db=settings.database.redis_db,
+                decode_responses=True,
+            )
+            await self._redis.ping()
+        except Exception as e:
+            logger.warning(f"IPFS pin queue running without Redis CID cache: {e}")
+            self._redis = None
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("IPFS pin queue started")
+
+    async def stop(self) -> None:
+        """Stop the pinning loop; queued pins are abandoned."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._jobs:
+            logger.warning(f"IPFS pin queue stopped with {len(self._jobs)} pins outstanding")
+        if self._redis:
+            await self._redis.close()
+            self._redis = None
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    async def submit(
+        self,
+        data: Dict[str, Any],
+        filename: str = "research_log.json",
+        wallet_address: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Queue content for pinning without waiting for the upload.
+
+        Args:
+            data: JSON-serializable content to pin
+            filename: Pin metadata name
+            wallet_address: Wallet notified with the CID once pinned
+
+        Returns:
+            Dict with content_hash, cid (set when already pinned) and status
+        """
+        digest = content_hash(data)
+        self.stats["submitted"] += 1
+
+        cid = await self.get_cid(digest)
+        if cid:
+            self.stats["cache_hits"] += 1
+            return {"content_hash": digest, "cid": cid, "status": PIN_PINNED}
+
+        if not self.service.enabled:
+            return {"content_hash": digest, "cid": None, "status": PIN_DISABLED}
+
+        job = self._jobs.get(digest)
+        if job is not None:
+            self.stats["deduplicated"] += 1
+        elif len(self._jobs) >= self.max_pending:
+            self.stats["dropped"] += 1
+            logger.warning(f"IPFS pin queue full ({self.max_pending}); not pinning {filename}")
+            return {"content_hash": digest, "cid": None, "status": PIN_DROPPED}
+        else:
+            job = PinJob(content_hash=digest, data=data, filename=filename)
+            self._jobs[digest] = job
+            self._wake.set()
+
+        if wallet_address:
+            job.wallets.add(wallet_address)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return {"content_hash": digest, "cid": None, "status": PIN_PENDING}
+
+    async def get_cid(self, digest: str) -> Optional[str]:
+        """CID previously pinned for a content hash, if any."""
+        cid = self._cids.get(digest)
+        if cid:
+            self._cids.move_to_end(digest)
+            return cid
+        if self._redis is None:
+            return None
+        try:
+            cid = await self._redis.get(f"{self.CID_KEY_PREFIX}{digest}")
+        except Exception as e:
+            logger.debug(f"CID cache lookup failed: {e}")
+            return None
+        if cid:
+            self._remember_local(digest, cid)
+        return cid
+
+    def _remember_local(self, digest: str, cid: str) -> None:
+        self._cids[digest] = cid
+        self._cids.move_to_end(digest)
+        while len(self._cids) > self.max_cached_cids:
+            self._cids.popitem(last=False)
+
+    async def _remember(self, digest: str, cid: str) -> None:
+        self._remember_local(digest, cid)
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(f"{self.CID_KEY_PREFIX}{digest}", cid, ex=self.CID_TTL)
+        except Exception as e:
+            logger.debug(f"CID cache write failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Pinning loop
+    # ------------------------------------------------------------------
+
+    def _due_jobs(self) -> List[PinJob]:
+        now = time.monotonic()
+        return [job for job in self._jobs.values() if job.next_attempt <= now][:self.batch_size]
+
+    def _next_wakeup(self) -> Optional[float]:
+        if not self._jobs:
+            return None
+        return max(0.0, min(job.next_attempt for job in self._jobs.values()) - time.monotonic())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                batch = self._due_jobs()
+                if not batch:
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=self._next_wakeup())
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    # Let submissions arriving together go out as one batch
+                    await asyncio.sleep(self.batch_interval)
+                    continue
+                await asyncio.gather(*(self._pin(job) for job in batch))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"IPFS pin loop error: {e}")
+                await asyncio.sleep(self.base_backoff)
+
+    async def _pin(self, job: PinJob) -> None:
+        job.attempts += 1
+        try:
+            cid = await self.service.upload_json(job.data, filename=job.filename)
+        except Exception as e:
+            logger.warning(f"IPFS pin of {job.filename} failed: {e}")
+            cid = None
+
+        if cid:
+            self._jobs.pop(job.content_hash, None)
+            self.stats["pinned"] += 1
+            await self._remember(job.content_hash, cid)
+            await self._notify(job, {"content_hash": job.content_hash, "cid": cid, "status": PIN_PINNED})
+        elif job.attempts >= self.max_attempts:
+            self._jobs.pop(job.content_hash, None)
+            self.stats["failed"] += 1
+            logger.error(f"Giving up on IPFS pin of {job.filename} after {job.attempts} attempts")
+            await self._notify(job, {"content_hash": job.content_hash, "cid": None, "status": PIN_FAILED})
+        else:
+            self.stats["retries"] += 1
+            delay = min(self.base_backoff * 2 ** (job.attempts - 1), self.max_backoff)
+            job.next_attempt = time.monotonic() + delay
+            logger.info(f"Retrying IPFS pin of {job.filename} in {delay:.1f}s (attempt {job.attempts})")
+
+    async def _notify(self, job: PinJob, payload: Dict[str, Any]) -> None:
+        if not self._notifier:
+            return
+        for wallet_address in job.wallets:
+            try:
+                await self._notifier(wallet_address, payload)
+            except Exception as e:
+                logger.warning(f"Failed to push IPFS pin result to {wallet_address}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue counters plus current queue and cache sizes."""
+        return {**self.stats, "pending": len(self._jobs), "cached_cids": len(self._cids)}
+
+
+# Global instance
+ipfs_pin_queue = IPFSPinQueue()
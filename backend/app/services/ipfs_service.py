@@ -27,6 +27,11 @@ class IPFSService:
         if not self.pinata_api_key:
             logger.warning("PINATA_API_KEY not set. IPFS pinning will be unavailable.")
 
+    @property
+    def enabled(self) -> bool:
+        """Whether Pinata credentials are configured."""
+        return bool(self.pinata_api_key and self.pinata_secret_key)
+
     async def upload_json(self, data: Dict[str, Any], filename: str = "research_log.json") -> Optional[str]:
         """
         Upload JSON data to IPFS via Pinata.
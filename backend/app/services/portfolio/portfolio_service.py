@@ -16,6 +16,7 @@ PORTFOLIO_CACHE = {}
 CACHE_TTL = 300  # Cache time-to-live in seconds (5 minutes)
 
 from app.services.token_query_service import token_query_service
+from app.services.gas_oracle import gas_oracle
 
 class Web3Helper:
     def __init__(self, supported_chains: Dict[int, str], max_api_calls: int = 40):
@@ -192,12 +193,20 @@ class Web3Helper:
                         "chain_id": cid
                     }
 
-                    # Get chain-specific data
-                    portfolio_data["chain_data"][chain_name] = {
-                        "chain_id": cid,
-                        "latest_block": w3.eth.block_number,
-                        "gas_price": float(w3.from_wei(w3.eth.gas_price, 'gwei'))
-                    }
+                    # Get chain-specific data (block and gas price come from the gas oracle)
+                    gas_snapshot = await gas_oracle.get_fees(cid)
+                    if gas_snapshot and gas_snapshot.block_number:
+                        portfolio_data["chain_data"][chain_name] = {
+                            "chain_id": cid,
+                            "latest_block": gas_snapshot.block_number,
+                            "gas_price": gas_snapshot.gas_price_gwei
+                        }
+                    else:
+                        portfolio_data["chain_data"][chain_name] = {
+                            "chain_id": cid,
+                            "latest_block": w3.eth.block_number,
+                            "gas_price": float(w3.from_wei(w3.eth.gas_price, 'gwei'))
+                        }
 
                 # Get token balances using Alchemy
                 token_balances = await self.get_token_balances_alchemy(wallet_address, cid)
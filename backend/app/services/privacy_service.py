@@ -1,20 +1,89 @@
 """
 Privacy Service - Chain-aware privacy routing and management
 """
-from typing import Dict, Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from decimal import Decimal
 from app.config.chains import (
+    CHAINS,
+    PrivacyCapabilities,
     get_privacy_capabilities,
     is_x402_privacy_supported,
     is_gmp_privacy_supported,
     is_compliance_supported
 )
 from app.models.unified_models import PrivacyLevel, ChainPrivacyRoute
-from app.core.config_manager import ConfigurationManager
+from app.core.config_manager import ConfigurationManager, config_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
+# (method, estimated_latency, capabilities) for a resolved privacy route
+PrivacyRouteSpec = Tuple[str, str, Dict[str, bool]]
+
+
+def _resolve_privacy_route(
+    capabilities: PrivacyCapabilities,
+    is_zcash_destination: bool,
+    privacy_level: PrivacyLevel
+) -> Optional[PrivacyRouteSpec]:
+    """Route selection logic for one chain/destination/privacy level."""
+    if is_zcash_destination:
+        # Direct Zcash route
+        if capabilities.direct_zcash:
+            return ("direct_zcash", "5-10min", {
+                "compliance": capabilities.compliance_support,
+                "fallback": False
+            })
+        elif capabilities.gmp_privacy:
+            return ("gmp_privacy", "2-5min", {
+                "compliance": capabilities.compliance_support,
+                "fallback": True
+            })
+    else:
+        # Starknet-native ZK privacy
+        if capabilities.starknet_privacy:
+            return ("starknet_privacy", "<1min", {
+                "compliance": capabilities.compliance_support,
+                "fallback": False,
+                "starknet_native": True
+            })
+        # Cross-chain privacy route
+        if capabilities.x402_support and privacy_level != PrivacyLevel.COMPLIANCE:
+            return ("x402_privacy", "1-2min", {
+                "compliance": False,
+                "fallback": False
+            })
+        elif capabilities.gmp_privacy:
+            return ("gmp_privacy", "2-5min", {
+                "compliance": capabilities.compliance_support,
+                "fallback": True
+            })
+    return None
+
+
+def build_privacy_route_table() -> Dict[Tuple[Any, bool, PrivacyLevel], PrivacyRouteSpec]:
+    """Precompute the privacy route for every chain, destination type and privacy level."""
+    table = {}
+    for chain_id, chain in CHAINS.items():
+        for is_zcash_destination in (True, False):
+            for privacy_level in PrivacyLevel:
+                route = _resolve_privacy_route(chain.privacy, is_zcash_destination, privacy_level)
+                if route:
+                    table[(chain_id, is_zcash_destination, privacy_level)] = route
+    return table
+
+
+_privacy_routes = build_privacy_route_table()
+
+
+def rebuild_privacy_routes():
+    """Rebuild the privacy route table (called on configuration reload)."""
+    global _privacy_routes
+    _privacy_routes = build_privacy_route_table()
+
+
+config_manager.add_reload_listener(rebuild_privacy_routes)
+
 class PrivacyService:
     """Chain-aware privacy service for routing transactions through optimal privacy paths."""
     
@@ -32,68 +101,17 @@ class PrivacyService:
         """
         # Determine if destination is Zcash (direct privacy)
         is_zcash_destination = destination.startswith(('zcash:', 'zcash:', 'u1', 't1', 't3'))
-        
-        # Check chain capabilities
-        capabilities = get_privacy_capabilities(source_chain_id)
-        
-        # Route selection logic
-        if is_zcash_destination:
-            # Direct Zcash route
-            if capabilities.direct_zcash:
-                return ChainPrivacyRoute(
-                    method="direct_zcash",
-                    privacy_level=privacy_level,
-                    estimated_latency="5-10min",
-                    capabilities={
-                        "compliance": capabilities.compliance_support,
-                        "fallback": False
-                    }
-                )
-            elif capabilities.gmp_privacy:
-                return ChainPrivacyRoute(
-                    method="gmp_privacy",
-                    privacy_level=privacy_level,
-                    estimated_latency="2-5min",
-                    capabilities={
-                        "compliance": capabilities.compliance_support,
-                        "fallback": True
-                    }
-                )
-        else:
-            # Starknet-native ZK privacy
-            if capabilities.starknet_privacy:
-                return ChainPrivacyRoute(
-                    method="starknet_privacy",
-                    privacy_level=privacy_level,
-                    estimated_latency="<1min",
-                    capabilities={
-                        "compliance": capabilities.compliance_support,
-                        "fallback": False,
-                        "starknet_native": True
-                    }
-                )
-            # Cross-chain privacy route
-            if capabilities.x402_support and privacy_level != PrivacyLevel.COMPLIANCE:
-                return ChainPrivacyRoute(
-                    method="x402_privacy",
-                    privacy_level=privacy_level,
-                    estimated_latency="1-2min",
-                    capabilities={
-                        "compliance": False,
-                        "fallback": False
-                    }
-                )
-            elif capabilities.gmp_privacy:
-                return ChainPrivacyRoute(
-                    method="gmp_privacy",
-                    privacy_level=privacy_level,
-                    estimated_latency="2-5min",
-                    capabilities={
-                        "compliance": capabilities.compliance_support,
-                        "fallback": True
-                    }
-                )
-        
+
+        route = _privacy_routes.get((source_chain_id, is_zcash_destination, privacy_level))
+        if route:
+            method, estimated_latency, capabilities = route
+            return ChainPrivacyRoute(
+                method=method,
+                privacy_level=privacy_level,
+                estimated_latency=estimated_latency,
+                capabilities=dict(capabilities)
+            )
+
         # No privacy available
         raise PrivacyRoutingError(
             f"No privacy route available from chain {source_chain_id} "
@@ -3,7 +3,7 @@ Bridge command processor.
 Handles cross-chain bridging operations.
 """
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from app.models.unified_models import (
     UnifiedCommand, UnifiedResponse, AgentType, TransactionData, CommandType
@@ -16,6 +16,42 @@ from .base_processor import BaseProcessor
 logger = logging.getLogger(__name__)
 
 
+async def _register_bridge_flow(
+    processor: BaseProcessor,
+    unified_command: UnifiedCommand,
+    chain_id: int,
+    steps: List[Dict[str, Any]],
+    bridge_id: Optional[str],
+) -> None:
+    """
+    Register the bridge steps as a transaction flow.
+
+    The flow carries the tracked bridge_id and each step's type, so submitted
+    hashes are attached to this transfer when the steps complete.
+    """
+    if not processor.transaction_flow_service or not bridge_id:
+        return
+    try:
+        await processor.transaction_flow_service.create_flow(
+            wallet_address=unified_command.wallet_address,
+            chain_id=chain_id,
+            operation_type="bridge",
+            steps_data=[
+                {
+                    "to": step.get("to", ""),
+                    "data": step.get("data", ""),
+                    "value": step.get("value", "0"),
+                    "gasLimit": step.get("gas_limit", "500000"),
+                    "metadata": {"type": step.get("type")},
+                }
+                for step in steps
+            ],
+            metadata={"bridge_id": bridge_id},
+        )
+    except Exception as e:
+        logger.error(f"Failed to register bridge flow {bridge_id}: {e}")
+
+
 class BridgeProcessor(BaseProcessor):
     """Processes bridge commands."""
     
@@ -155,11 +191,15 @@ class BridgeProcessor(BaseProcessor):
                 chain_id=from_chain,
                 gas_limit=first_step.get("gas_limit", "500000")
             )
+            await _register_bridge_flow(
+                self, unified_command, from_chain, steps, gmp_result.get("bridge_id")
+            )
             
             return self._create_success_response(
                 content={
                     "message": f"Ready to bridge {amount} {token} via Axelar",
                     "type": "bridge_ready",
+                    "bridge_id": gmp_result.get("bridge_id"),
                     "flow_info": {
                         "current_step": 1,
                         "total_steps": len(steps),
@@ -263,9 +303,12 @@ class PrivacyBridgeProcessor(BaseProcessor):
             if not first_step:
                 raise BusinessLogicError("No transaction steps generated")
             
-            # Generate unique bridge ID for status tracking
-            import uuid
-            bridge_id = str(uuid.uuid4())
+            # Bridge ID is registered with the status tracker when the steps are built
+            bridge_id = gmp_result.get("bridge_id")
+            await _register_bridge_flow(self, unified_command, from_chain, steps, bridge_id)
+            if not bridge_id:
+                import uuid
+                bridge_id = str(uuid.uuid4())
 
             transaction = TransactionData(
                 to=first_step.get("to"),
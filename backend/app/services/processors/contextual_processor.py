@@ -39,10 +39,10 @@ class ContextualProcessor(BaseProcessor):
         """Handle simple greetings with fast cached responses."""
         try:
             # Get recent conversation context
-            context = chat_history_service.get_recent_context(
+            context = await chat_history_service.get_context(
                 unified_command.wallet_address,
                 unified_command.user_name,
-                num_messages=5
+                max_tokens=600
             )
             
             # If it's a simple greeting (one or two words), use canned responses for speed
@@ -91,10 +91,10 @@ class ContextualProcessor(BaseProcessor):
                 )
             
             # Get recent conversation context
-            context = chat_history_service.get_recent_context(
+            context = await chat_history_service.get_context(
                 unified_command.wallet_address,
                 unified_command.user_name,
-                num_messages=5
+                max_tokens=600
             )
             
             # Get LLM client (Venice primary, OpenAI fallback)
@@ -175,10 +175,10 @@ Keep your response brief (1-2 sentences) and friendly.
                 )
             
             # Get recent conversation context
-            context = chat_history_service.get_recent_context(
+            context = await chat_history_service.get_context(
                 unified_command.wallet_address,
                 unified_command.user_name,
-                num_messages=10
+                max_tokens=1200
             )
             
             # Set of facts about SNEL for the LLM
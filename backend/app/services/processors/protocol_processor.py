@@ -12,16 +12,15 @@ from app.models.unified_models import (
     UnifiedCommand, UnifiedResponse, AgentType, CommandType
 )
 from app.services.error_guidance_service import ErrorContext
-from app.services.external.firecrawl_service import (
-    get_protocol_details,
-)
 from app.services.external.firecrawl_client import FirecrawlClient, FirecrawlError
 from app.services.research.router import ResearchRouter, Intent
 from app.services.research.research_logger import research_logger
+from app.services.research.cache_manager import research_cache
+from app.services.research.deep_research import DeepResearchPipeline
 from app.services.knowledge_base import get_protocol_kb, ProtocolMetrics
 from app.services.analysis import ProtocolAnalyzer
 from app.services.protocol import ProtocolResponseBuilder
-from app.services.ipfs_service import ipfs_service
+from app.services.ipfs_pin_queue import ipfs_pin_queue
 from .base_processor import BaseProcessor
 
 logger = logging.getLogger(__name__)
@@ -38,19 +37,25 @@ class ProtocolProcessor(BaseProcessor):
         super().__init__(**kwargs)
         self.router = ResearchRouter()
     
-    async def _upload_to_ipfs(self, protocol_name: str, content: Dict[str, Any]) -> Optional[str]:
+    async def _pin_to_ipfs(
+        self,
+        protocol_name: str,
+        content: Dict[str, Any],
+        wallet_address: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
-        Helper to upload research content to IPFS for Proof-of-Research.
+        Queue research content for IPFS pinning (Proof-of-Research).
+        Returns immediately with the content hash; the CID is included when the
+        content was pinned before, otherwise it is pushed to the wallet once pinned.
         """
         try:
             filename = f"research_{protocol_name.lower().replace(' ', '_')}.json"
-            cid = await ipfs_service.upload_json(content, filename=filename)
-            if cid:
-                logger.info(f"Proof-of-Research uploaded to IPFS: {cid}")
-            return cid
+            pin = await ipfs_pin_queue.submit(content, filename=filename, wallet_address=wallet_address)
+            logger.info(f"Proof-of-Research {pin['status']}: {pin['cid'] or pin['content_hash']}")
+            return pin
         except Exception as e:
-            logger.error(f"Failed to upload research to IPFS: {e}")
-            return None
+            logger.error(f"Failed to queue research for IPFS: {e}")
+            return {"content_hash": None, "cid": None, "status": "failed"}
 
     async def process(self, unified_command: UnifiedCommand, status_callback: Optional[callable] = None) -> UnifiedResponse:
         """
@@ -117,10 +122,11 @@ class ProtocolProcessor(BaseProcessor):
                 
                 if status_callback: await status_callback(f"Generating report and pinning to IPFS...", 80)
                 
-                # Proof-of-Research: Upload to IPFS
-                cid = await self._upload_to_ipfs(matched_key, content)
+                # Proof-of-Research: pinned in the background, CID pushed to the wallet
+                pin = await self._pin_to_ipfs(matched_key, content, unified_command.wallet_address)
+                cid = pin["cid"]
                 
-                if status_callback: await status_callback(f"Research complete. CID: {cid}", 100)
+                if status_callback: await status_callback(f"Research complete. CID: {cid or 'pinning in background'}", 100)
                 
                 return self._create_success_response(
                     content=content,
@@ -134,6 +140,8 @@ class ProtocolProcessor(BaseProcessor):
                             "source": "snel_built_in_knowledge_base",
                             "guaranteed_accuracy": True,
                             "ipfs_cid": cid,
+                            "ipfs_content_hash": pin["content_hash"],
+                            "ipfs_status": pin["status"],
                         }
                     }
                 )
@@ -143,7 +151,9 @@ class ProtocolProcessor(BaseProcessor):
             return await self._handle_research_error(
                 concept_name,
                 unified_command.openai_api_key,
-                "concept"
+                "concept",
+                wallet_address=unified_command.wallet_address,
+                cache_subject=self.router.cache_subject(routing_decision)
             )
             
         except Exception as e:
@@ -152,7 +162,8 @@ class ProtocolProcessor(BaseProcessor):
                 routing_decision.original_query,
                 unified_command.openai_api_key,
                 "concept",
-                error=e
+                error=e,
+                wallet_address=unified_command.wallet_address
             )
     
     async def _handle_depth_query(
@@ -200,10 +211,11 @@ class ProtocolProcessor(BaseProcessor):
                 
                 if status_callback: await status_callback(f"Compiling verified report to IPFS memory...", 80)
                 
-                # Proof-of-Research: Upload to IPFS
-                cid = await self._upload_to_ipfs(matched_key, content)
+                # Proof-of-Research: pinned in the background, CID pushed to the wallet
+                pin = await self._pin_to_ipfs(matched_key, content, unified_command.wallet_address)
+                cid = pin["cid"]
                 
-                if status_callback: await status_callback(f"Research complete. CID: {cid}", 100)
+                if status_callback: await status_callback(f"Research complete. CID: {cid or 'pinning in background'}", 100)
                 
                 return self._create_success_response(
                     content=content,
@@ -219,6 +231,8 @@ class ProtocolProcessor(BaseProcessor):
                             "guaranteed_accuracy": True,
                             "duration_ms": duration_ms,
                             "ipfs_cid": cid,
+                            "ipfs_content_hash": pin["content_hash"],
+                            "ipfs_status": pin["status"],
                         }
                     }
                 )
@@ -234,7 +248,9 @@ class ProtocolProcessor(BaseProcessor):
                     "quick",
                     user_id=unified_command.user_name,
                     start_time=start_time,
-                    status_callback=status_callback
+                    status_callback=status_callback,
+                    wallet_address=unified_command.wallet_address,
+                    cache_subject=self.router.cache_subject(routing_decision)
                 )
             else:
                 # Deep mode: Use Firecrawl for detailed research
@@ -244,7 +260,9 @@ class ProtocolProcessor(BaseProcessor):
                     unified_command.openai_api_key,
                     user_id=unified_command.user_name,
                     start_time=start_time,
-                    status_callback=status_callback
+                    status_callback=status_callback,
+                    wallet_address=unified_command.wallet_address,
+                    cache_subject=self.router.cache_subject(routing_decision)
                 )
                 
         except Exception as e:
@@ -256,7 +274,8 @@ class ProtocolProcessor(BaseProcessor):
                 research_mode,
                 user_id=unified_command.user_name,
                 start_time=start_time,
-                error=e
+                error=e,
+                wallet_address=unified_command.wallet_address
             )
     
     async def _handle_deep_research(
@@ -265,11 +284,15 @@ class ProtocolProcessor(BaseProcessor):
         openai_key: Optional[str],
         user_id: Optional[str] = None,
         start_time: Optional[float] = None,
-        status_callback: Optional[callable] = None
+        status_callback: Optional[callable] = None,
+        wallet_address: Optional[str] = None,
+        cache_subject: Optional[str] = None
     ) -> UnifiedResponse:
         """
         Perform deep research using Firecrawl Search+Scrape + AI analysis.
         Only called when quick research (KB + AI) is insufficient.
+        ``cache_subject`` (ResearchRouter.cache_subject) keys the shared
+        result cache; defaults to the protocol name.
         """
         try:
             logger.info(f"Starting deep research for {protocol_name} via Firecrawl")
@@ -281,76 +304,91 @@ class ProtocolProcessor(BaseProcessor):
             
             container = get_service_container(get_settings())
             firecrawl_client = container.get_firecrawl_client()
+            scraped = False
+            
+            async def research() -> Dict[str, Any]:
+                nonlocal scraped
+                scraped = True
+                analyzer = ProtocolAnalyzer(openai_key or os.getenv("OPENAI_API_KEY"))
+                pipeline = DeepResearchPipeline(firecrawl_client, analyzer)
+                result = await pipeline.run(protocol_name, status_callback=status_callback)
+                findings = result["findings"]
+                if not findings:
+                    raise FirecrawlError(f"No usable sources found for {protocol_name}")
+                
+                # Best source is the primary report; all findings are listed as sources
+                best = findings[0]
+                content = ProtocolResponseBuilder.from_firecrawl(
+                    protocol_name,
+                    {"source_url": best.source_url, "raw_content": best.raw_content},
+                    {"ai_summary": best.ai_summary, "analysis_success": True},
+                )
+                content["sources"] = [
+                    {"url": f.source_url, "confidence": f.confidence, "ai_summary": f.ai_summary}
+                    for f in findings
+                ]
+                return {
+                    "content": content,
+                    "source_urls": [f.source_url for f in findings],
+                    "sources_scraped": result["sources_scraped"],
+                    "stopped_early": result["stopped_early"],
+                }
             
-            scrape_result = await get_protocol_details(
-                firecrawl_client,
-                protocol_name,
-                use_llm_extraction=True,
+            # Concurrent requests for the same protocol share one scrape; results are cached
+            research_result = await research_cache.get_or_compute(
+                "depth", cache_subject or protocol_name, research, tool="firecrawl"
             )
+            content = research_result["content"]
             
-            if scrape_result.get("scraping_success", False):
-                # Analyze scraped content with AI
-                openai_key = openai_key or os.getenv("OPENAI_API_KEY")
-                logger.info(f"Starting AI analysis for {protocol_name}")
-                
-                if status_callback: await status_callback(f"Analyzing {len(scrape_result.get('raw_content', ''))} bytes of data with AI...", 80)
-                
-                analyzer = ProtocolAnalyzer(openai_key)
-                ai_result = await analyzer.analyze_scraped_content(
-                    protocol_name=protocol_name,
-                    raw_content=scrape_result.get("raw_content", ""),
-                    source_url=scrape_result.get("source_url", ""),
-                )
-                
-                content = ProtocolResponseBuilder.from_firecrawl(protocol_name, scrape_result, ai_result)
-                
-                # Calculate duration and cost
-                duration_ms = research_logger.calculate_duration_ms(start_time) if start_time else 0
-                source_urls = scrape_result.get("full_response", {}).get("urls", [])
-                firecrawl_cost = research_logger.calculate_firecrawl_cost(len(source_urls))
-                
-                # Log successful deep research
-                research_logger.log_research(
-                    protocol_name=protocol_name,
-                    research_mode="deep",
-                    source="firecrawl",
-                    duration_ms=duration_ms,
-                    user_id=user_id,
-                    firecrawl_cost=firecrawl_cost,
-                    source_urls=source_urls,
-                    success=True,
-                )
-                
-                if status_callback: await status_callback(f"Finalizing deep research and pinning to IPFS...", 95)
-                
-                # Proof-of-Research: Upload to IPFS
-                cid = await self._upload_to_ipfs(protocol_name, content)
-                
-                if status_callback: await status_callback(f"Deep research complete. CID: {cid}", 100)
-                
-                return self._create_success_response(
-                    content=content,
-                    agent_type=AgentType.PROTOCOL_RESEARCH,
-                    metadata={
-                        "parsed_command": {
-                            "protocol": protocol_name,
-                            "command_type": "protocol_research"
-                        },
-                        "ipfs_proof": cid,
-                        "research_details": {
-                            "scraping_success": True,
-                            "source": "firecrawl",
-                            "research_mode": "deep",
-                            "duration_ms": duration_ms,
-                            "firecrawl_cost": firecrawl_cost,
-                            "ipfs_cid": cid,
-                        }
+            # Calculate duration and cost (a cache hit costs no scrape)
+            duration_ms = research_logger.calculate_duration_ms(start_time) if start_time else 0
+            source_urls = research_result["source_urls"]
+            firecrawl_cost = research_logger.calculate_firecrawl_cost(research_result.get("sources_scraped", len(source_urls))) if scraped else 0.0
+            
+            # Log successful deep research
+            research_logger.log_research(
+                protocol_name=protocol_name,
+                research_mode="deep",
+                source="firecrawl",
+                duration_ms=duration_ms,
+                user_id=user_id,
+                firecrawl_cost=firecrawl_cost,
+                source_urls=source_urls,
+                success=True,
+            )
+            
+            if status_callback: await status_callback(f"Finalizing deep research and pinning to IPFS...", 95)
+            
+            # Proof-of-Research: pinned in the background, CID pushed to the wallet
+            pin = await self._pin_to_ipfs(protocol_name, content, wallet_address)
+            cid = pin["cid"]
+            
+            if status_callback: await status_callback(f"Deep research complete. CID: {cid or 'pinning in background'}", 100)
+            
+            return self._create_success_response(
+                content=content,
+                agent_type=AgentType.PROTOCOL_RESEARCH,
+                metadata={
+                    "parsed_command": {
+                        "protocol": protocol_name,
+                        "command_type": "protocol_research"
+                    },
+                    "ipfs_proof": cid,
+                    "research_details": {
+                        "scraping_success": True,
+                        "source": "firecrawl",
+                        "research_mode": "deep",
+                        "duration_ms": duration_ms,
+                        "firecrawl_cost": firecrawl_cost,
+                        "sources_analyzed": len(source_urls),
+                        "stopped_early": research_result.get("stopped_early", False),
+                        "cached": not scraped,
+                        "ipfs_cid": cid,
+                        "ipfs_content_hash": pin["content_hash"],
+                        "ipfs_status": pin["status"],
                     }
-                )
-            else:
-                error_msg = scrape_result.get("error", "Firecrawl scraping failed")
-                logger.warning(f"Deep research failed for {protocol_name}: {error_msg}")
-                raise FirecrawlError(error_msg)
+                }
+            )
                 
         except FirecrawlError as e:
             logger.warning(f"Deep research (Firecrawl) failed: {e}, falling back to AI")
@@ -361,7 +399,9 @@ class ProtocolProcessor(BaseProcessor):
                 user_id=user_id,
                 start_time=start_time,
                 error=e,
-                status_callback=status_callback
+                status_callback=status_callback,
+                wallet_address=wallet_address,
+                cache_subject=cache_subject
             )
     
     async def _handle_discovery_query(
@@ -477,7 +517,9 @@ class ProtocolProcessor(BaseProcessor):
         user_id: Optional[str] = None,
         start_time: Optional[float] = None,
         error: Optional[Exception] = None,
-        status_callback: Optional[callable] = None
+        status_callback: Optional[callable] = None,
+        wallet_address: Optional[str] = None,
+        cache_subject: Optional[str] = None
     ) -> UnifiedResponse:
         """
         Centralized error handling for research queries.
@@ -491,6 +533,8 @@ class ProtocolProcessor(BaseProcessor):
             start_time: Optional start time for duration calculation
             error: Optional exception that triggered the fallback
             status_callback: Optional callback for status updates
+            wallet_address: Optional wallet notified when the IPFS pin completes
+            cache_subject: Canonical subject keying the shared AI result (defaults to protocol_name)
             
         Returns:
             UnifiedResponse with AI fallback or error message
@@ -520,7 +564,13 @@ class ProtocolProcessor(BaseProcessor):
             
             logger.info(f"Using AI fallback for {protocol_name} ({query_type} query)")
             analyzer = ProtocolAnalyzer(openai_key)
-            ai_result = await analyzer.generate_fallback_summary(protocol_name)
+            ai_result = await research_cache.get_or_compute(
+                "concept" if query_type == "concept" else "depth",
+                cache_subject or protocol_name,
+                lambda: analyzer.generate_fallback_summary(protocol_name),
+                tool="ai_general",
+                cacheable=lambda result: bool(result.get("analysis_success")),
+            )
             
             if ai_result.get("analysis_success"):
                 if status_callback: await status_callback(f"Synthesizing fallback report for {protocol_name}...", 85)
@@ -540,10 +590,11 @@ class ProtocolProcessor(BaseProcessor):
                 
                 if status_callback: await status_callback(f"Finalizing report and pinning CID to IPFS...", 95)
                 
-                # Proof-of-Research: Upload to IPFS
-                cid = await self._upload_to_ipfs(protocol_name, content)
+                # Proof-of-Research: pinned in the background, CID pushed to the wallet
+                pin = await self._pin_to_ipfs(protocol_name, content, wallet_address)
+                cid = pin["cid"]
                 
-                if status_callback: await status_callback(f"Fallback research complete. CID: {cid}", 100)
+                if status_callback: await status_callback(f"Fallback research complete. CID: {cid or 'pinning in background'}", 100)
                 
                 return self._create_success_response(
                     content=content,
@@ -557,6 +608,8 @@ class ProtocolProcessor(BaseProcessor):
                         "note": "Using AI general knowledge (KB and web research unavailable)",
                         "research_details": {
                             "ipfs_cid": cid,
+                            "ipfs_content_hash": pin["content_hash"],
+                            "ipfs_status": pin["status"],
                         }
                     }
                 )
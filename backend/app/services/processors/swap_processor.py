@@ -380,7 +380,7 @@ class SwapProcessor(BaseProcessor):
                         }
                     ]
                     
-                    self.transaction_flow_service.create_flow(
+                    await self.transaction_flow_service.create_flow(
                         wallet_address=unified_command.wallet_address,
                         chain_id=unified_command.chain_id,
                         operation_type="swap",
@@ -207,7 +207,9 @@ class TransferProcessor(BaseProcessor):
 
             # Estimate gas costs
             gas_estimate: dict[str, Any] = token_query_service.estimate_gas(
-                chain_id, transaction_type="erc20_transfer"
+                chain_id,
+                transaction_type="erc20_transfer",
+                transaction={**result, "from": wallet_address},
             )
 
             # Check if this transfer could benefit from batching
@@ -1,189 +1,382 @@
 """
 Cache management for research operations.
 Handles caching strategy across all three intent types.
+
+Two tiers: a bounded in-process LRU in front of Redis shared by all
+workers. Entries are keyed on the routing output (intent + canonical
+subject, see ResearchRouter.cache_subject), so different phrasings of the
+same question share one result. Concurrent misses for a key run a single
+research job: callers in this process await the same task, and workers
+coordinate through a short-lived Redis lock.
 """
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Optional, Dict, Any
-from app.services.research.router import Intent
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.services.research.router import Intent, normalize_subject
 
 logger = logging.getLogger(__name__)
 
+# Delete the lock only if this worker still owns it
+_RELEASE_LOCK = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
 
 class ResearchCacheManager:
     """
     Centralized cache management for research operations.
     Automatically determines cache TTL based on intent type.
     """
-    
+
     # Cache TTL by intent type (in seconds)
     CACHE_TTL = {
         "concept": 24 * 3600,      # 24 hours - static knowledge
         "depth": 6 * 3600,         # 6 hours - protocol data
         "discovery": 3600,         # 1 hour - yields change hourly
     }
-    
-    def __init__(self, redis_client: Optional[Any] = None):
+
+    KEY_PREFIX = "research"
+
+    def __init__(
+        self,
+        redis_client: Optional[Any] = None,
+        redis_url: Optional[str] = None,
+        max_local_entries: int = 512,
+        lock_timeout: float = 90.0,
+    ):
         """
         Initialize cache manager.
-        
+
         Args:
-            redis_client: Optional Redis client. If None, caching is disabled.
+            redis_client: Async Redis client (overrides redis_url)
+            redis_url: Redis URL (defaults to REDIS_URL; unset or "" keeps the cache in-process)
+            max_local_entries: Entries kept in the in-process tier (least recently used evicted)
+            lock_timeout: Seconds another worker's research job may hold a key before we run our own
         """
         self.redis_client = redis_client
-        self.enabled = redis_client is not None
-    
-    def get_cache_key(self, intent: Intent, query: str, tool: str = None) -> str:
+        self.redis_url = redis_url if redis_url is not None else os.getenv("REDIS_URL")
+        self.use_redis = redis_client is not None or bool(self.redis_url)
+        self.max_local_entries = max_local_entries
+        self.lock_timeout = lock_timeout
+
+        # key -> (expires_at, serialized result)
+        self.local: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "shared": 0}
+
+    async def _get_redis(self) -> Optional[Any]:
+        """Connect on first use; None means only the in-process tier is used."""
+        if not self.use_redis:
+            return None
+        if self.redis_client is None:
+            try:
+                client = redis.from_url(self.redis_url, decode_responses=True)
+                await client.ping()
+                self.redis_client = client
+            except Exception as e:
+                logger.warning(f"Redis unavailable for research cache ({e}); using in-process cache only")
+                self.use_redis = False
+                return None
+        return self.redis_client
+
+    def get_cache_key(self, intent: Intent, subject: str, tool: str = None) -> str:
         """
-        Generate cache key for a query.
-        
-        Format: research:{intent}:{tool}:{query_hash}
+        Generate cache key for a canonical subject.
+
+        Format: research:{intent}:{tool}:{subject_hash}
         """
-        import hashlib
-        query_hash = hashlib.md5(query.lower().encode()).hexdigest()[:8]
+        subject_hash = hashlib.sha1(normalize_subject(subject).encode()).hexdigest()[:16]
         tool_part = f":{tool}" if tool else ""
-        return f"research:{intent}{tool_part}:{query_hash}"
-    
+        return f"{self.KEY_PREFIX}:{intent}{tool_part}:{subject_hash}"
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str) -> Optional[str]:
+        item = self.local.get(key)
+        if item is None:
+            return None
+        if item[0] <= time.monotonic():
+            del self.local[key]
+            return None
+        self.local.move_to_end(key)
+        return item[1]
+
+    def _local_put(self, key: str, value: str, ttl: float) -> None:
+        self.local[key] = (time.monotonic() + ttl, value)
+        self.local.move_to_end(key)
+        while len(self.local) > self.max_local_entries:
+            self.local.popitem(last=False)
+
+    async def _lookup(self, key: str, intent: Intent) -> Optional[str]:
+        cached = self._local_get(key)
+        if cached is not None:
+            self.stats["local_hits"] += 1
+            return cached
+
+        client = await self._get_redis()
+        if client is None:
+            return None
+        try:
+            cached = await client.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get error: {e}")
+            return None
+        if cached is None:
+            return None
+
+        self.stats["redis_hits"] += 1
+        try:
+            remaining = await client.ttl(key)
+        except Exception:
+            remaining = -1
+        self._local_put(key, cached, remaining if remaining > 0 else self.get_ttl_for_intent(intent))
+        return cached
+
     async def get(
         self,
         intent: Intent,
-        query: str,
+        subject: str,
         tool: str = None,
     ) -> Optional[Dict[str, Any]]:
         """
         Get cached research result.
-        
+
         Args:
             intent: Research intent type
-            query: Original query string
+            subject: Canonical subject (ResearchRouter.cache_subject)
             tool: Optional tool name (firecrawl, exa, kb)
-            
+
         Returns:
             Cached result or None if not found
         """
-        if not self.enabled:
-            return None
-        
-        try:
-            cache_key = self.get_cache_key(intent, query, tool)
-            cached = self.redis_client.get(cache_key)
-            
-            if cached:
-                logger.info(f"Cache hit: {cache_key}")
-                return json.loads(cached)
-            
-            logger.debug(f"Cache miss: {cache_key}")
+        key = self.get_cache_key(intent, subject, tool)
+        cached = await self._lookup(key, intent)
+        if cached is None:
+            logger.debug(f"Cache miss: {key}")
             return None
-            
-        except Exception as e:
-            logger.warning(f"Cache get error: {e}")
-            return None
-    
+        logger.info(f"Cache hit: {key}")
+        return json.loads(cached)
+
     async def set(
         self,
         intent: Intent,
-        query: str,
+        subject: str,
         result: Dict[str, Any],
         tool: str = None,
     ) -> bool:
         """
         Cache a research result.
-        
+
         Args:
             intent: Research intent type
-            query: Original query string
+            subject: Canonical subject (ResearchRouter.cache_subject)
             result: Result to cache
             tool: Optional tool name (firecrawl, exa, kb)
-            
+
         Returns:
-            True if caching succeeded, False otherwise
+            True if the result reached Redis (or only the local tier is in use)
         """
-        if not self.enabled:
+        key = self.get_cache_key(intent, subject, tool)
+        ttl = self.get_ttl_for_intent(intent)
+        try:
+            serialized = json.dumps(result, default=str)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Cache set error: {e}")
             return False
-        
+        self._local_put(key, serialized, ttl)
+
+        client = await self._get_redis()
+        if client is None:
+            return True
         try:
-            cache_key = self.get_cache_key(intent, query, tool)
-            ttl = self.CACHE_TTL.get(intent, 3600)
-            
-            self.redis_client.setex(
-                cache_key,
-                ttl,
-                json.dumps(result),
-            )
-            
-            logger.info(f"Cached result: {cache_key} (TTL: {ttl}s)")
+            await client.set(key, serialized, ex=ttl)
+            logger.info(f"Cached result: {key} (TTL: {ttl}s)")
             return True
-            
         except Exception as e:
             logger.warning(f"Cache set error: {e}")
             return False
-    
+
+    # ------------------------------------------------------------------
+    # Single-flight
+    # ------------------------------------------------------------------
+
+    async def get_or_compute(
+        self,
+        intent: Intent,
+        subject: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        tool: str = None,
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+    ) -> Dict[str, Any]:
+        """
+        Return the cached result, or run ``compute`` once for all concurrent callers.
+
+        Args:
+            intent: Research intent type
+            subject: Canonical subject (ResearchRouter.cache_subject)
+            compute: Research job producing a JSON-serializable result
+            tool: Optional tool name (firecrawl, exa, kb)
+            cacheable: Results failing this check are shared with waiting callers but not stored
+
+        Raises:
+            Whatever ``compute`` raises (propagated to every waiting caller)
+        """
+        key = self.get_cache_key(intent, subject, tool)
+        cached = await self._lookup(key, intent)
+        if cached is not None:
+            return json.loads(cached)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.create_task(self._compute_once(key, intent, subject, compute, tool, cacheable))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.stats["shared"] += 1
+            logger.info(f"Joining in-flight research for {key}")
+
+        # A cancelled caller must not cancel the job other callers wait on
+        return json.loads(await asyncio.shield(task))
+
+    async def _compute_once(
+        self,
+        key: str,
+        intent: Intent,
+        subject: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        tool: Optional[str],
+        cacheable: Callable[[Dict[str, Any]], bool],
+    ) -> str:
+        client = await self._get_redis()
+        lock_key = f"{key}:lock"
+        token = uuid.uuid4().hex
+        locked = False
+
+        if client is not None:
+            try:
+                locked = bool(await client.set(lock_key, token, nx=True, ex=int(self.lock_timeout)))
+                if not locked:
+                    # Another worker is researching this key: wait for its result
+                    cached = await self._wait_for_result(client, key, lock_key, intent)
+                    if cached is not None:
+                        return cached
+            except Exception as e:
+                logger.warning(f"Research cache lock error for {key}: {e}")
+
+        try:
+            result = await compute()
+            serialized = json.dumps(result, default=str)
+            if cacheable(result):
+                await self.set(intent, subject, result, tool)
+            return serialized
+        finally:
+            if locked:
+                try:
+                    await client.eval(_RELEASE_LOCK, 1, lock_key, token)
+                except Exception as e:
+                    logger.debug(f"Research cache lock release failed for {key}: {e}")
+
+    async def _wait_for_result(self, client: Any, key: str, lock_key: str, intent: Intent) -> Optional[str]:
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.1
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 1.0)
+            cached = await self._lookup(key, intent)
+            if cached is not None:
+                return cached
+            if not await client.exists(lock_key):
+                return None  # Other job finished without a cacheable result
+        return None
+
     async def invalidate(
         self,
         intent: Intent = None,
-        query: str = None,
+        subject: str = None,
         tool: str = None,
     ) -> int:
         """
         Invalidate cache entries.
-        
+
         Args:
             intent: Optional intent type to filter
-            query: Optional query to filter
+            subject: Optional subject (requires intent)
             tool: Optional tool to filter
-            
+
         Returns:
             Number of keys deleted
         """
-        if not self.enabled:
-            return 0
-        
-        try:
-            # Build pattern
-            parts = ["research"]
+        if intent and subject:
+            pattern = self.get_cache_key(intent, subject, tool)
+        else:
+            parts = [self.KEY_PREFIX]
             if intent:
                 parts.append(intent)
             if tool:
                 parts.append(tool)
-            
             pattern = ":".join(parts) + ":*"
-            
-            # Find and delete matching keys
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                deleted = self.redis_client.delete(*keys)
-                logger.info(f"Invalidated {deleted} cache entries matching {pattern}")
-                return deleted
-            
-            return 0
-            
+
+        prefix = pattern.rstrip("*")
+        local_keys = [k for k in self.local if (k.startswith(prefix) if pattern.endswith("*") else k == pattern)]
+        for k in local_keys:
+            del self.local[k]
+
+        client = await self._get_redis()
+        if client is None:
+            return len(local_keys)
+        try:
+            keys = [k async for k in client.scan_iter(match=pattern) if not k.endswith(":lock")]
+            deleted = await client.delete(*keys) if keys else 0
+            logger.info(f"Invalidated {deleted} cache entries matching {pattern}")
+            return deleted
         except Exception as e:
             logger.warning(f"Cache invalidation error: {e}")
-            return 0
-    
+            return len(local_keys)
+
     async def get_stats(self) -> Dict[str, Any]:
         """
         Get cache statistics.
-        
+
         Returns:
-            Cache stats including total entries, size, hit rate
+            Hit/miss counters, local tier size and Redis memory usage
         """
-        if not self.enabled:
-            return {"enabled": False}
-        
+        stats = {
+            "enabled": True,
+            "redis": self.use_redis,
+            "local_entries": len(self.local),
+            "in_flight": len(self._inflight),
+            **self.stats,
+        }
+        client = await self._get_redis()
+        if client is None:
+            return stats
         try:
-            info = self.redis_client.info("memory")
-            
-            return {
-                "enabled": True,
+            info = await client.info("memory")
+            stats.update({
                 "memory_used": info.get("used_memory_human", "N/A"),
                 "total_memory": info.get("maxmemory_human", "N/A"),
                 "memory_usage_percent": self._calculate_memory_usage(info),
-            }
+            })
         except Exception as e:
             logger.warning(f"Cache stats error: {e}")
-            return {"enabled": True, "error": str(e)}
-    
+            stats["error"] = str(e)
+        return stats
+
     def _calculate_memory_usage(self, info: Dict) -> float:
         """Calculate memory usage percentage."""
         try:
@@ -194,7 +387,11 @@ class ResearchCacheManager:
         except Exception:
             pass
         return 0.0
-    
+
     def get_ttl_for_intent(self, intent: Intent) -> int:
         """Get cache TTL for a specific intent type."""
         return self.CACHE_TTL.get(intent, 3600)
+
+
+# Global instance
+research_cache = ResearchCacheManager()
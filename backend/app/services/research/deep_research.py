@@ -0,0 +1,215 @@
+"""
+Streaming deep-research pipeline.
+
+Candidate sources are scraped concurrently (bounded by ``scrape_budget``)
+and each document is analysed as soon as its scrape returns, so a slow
+URL no longer holds up the others. Findings are streamed through the
+status callback as they complete, and the pipeline stops once enough
+high-confidence sources have been summarised (or the time budget runs
+out), cancelling the remaining work.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+from app.services.external.firecrawl_client import FirecrawlClient
+from app.services.external.firecrawl_service import find_protocol_sources, scrape_protocol_source
+
+logger = logging.getLogger(__name__)
+
+# Status callback signature: (message, progress percent)
+StatusCallback = Callable[[str, int], Awaitable[None]]
+
+
+@dataclass
+class ResearchFinding:
+    """One analysed source."""
+    source_url: str
+    confidence: float
+    ai_summary: str
+    raw_content: str = ""
+    extracted_data: Dict[str, Any] = field(default_factory=dict)
+
+
+def score_source(url: str, raw_content: str, extracted_data: Optional[Dict[str, Any]] = None) -> float:
+    """
+    Confidence (0-1) that a scraped page is an authoritative source.
+
+    Official docs score highest, app pages lowest; thin pages are penalised
+    and structured extraction output adds a little weight.
+    """
+    url_lower = url.lower()
+    if "docs." in url_lower or "/docs" in url_lower or "/documentation" in url_lower:
+        score = 0.9
+    elif "about" in url_lower:
+        score = 0.75
+    elif "/app" in url_lower or "app." in url_lower:
+        score = 0.4
+    else:
+        score = 0.6
+
+    length = len((raw_content or "").strip())
+    if length < 500:
+        score *= 0.5
+    elif length < 1500:
+        score *= 0.85
+
+    if extracted_data and extracted_data.get("description"):
+        score += 0.05
+    return round(min(score, 1.0), 2)
+
+
+def _domain(url: str) -> str:
+    return urlparse(url).netloc or url
+
+
+class DeepResearchPipeline:
+    """Concurrent scrape → analyse pipeline with streamed findings and early stop."""
+
+    def __init__(
+        self,
+        firecrawl_client: FirecrawlClient,
+        analyzer: Any,
+        max_sources: int = 5,
+        scrape_budget: int = 3,
+        min_confident_sources: int = 2,
+        confidence_threshold: float = 0.75,
+        time_budget: float = 25.0,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            firecrawl_client: Client used for search and scrapes
+            analyzer: ProtocolAnalyzer (analyze_scraped_content)
+            max_sources: Candidate URLs taken from search
+            scrape_budget: Scrapes in flight at the same time
+            min_confident_sources: Stop once this many high-confidence sources are summarised
+            confidence_threshold: Minimum score counted as high confidence
+            time_budget: Seconds to wait for sources before using what has arrived
+        """
+        self.firecrawl_client = firecrawl_client
+        self.analyzer = analyzer
+        self.max_sources = max_sources
+        self.scrape_budget = scrape_budget
+        self.min_confident_sources = min_confident_sources
+        self.confidence_threshold = confidence_threshold
+        self.time_budget = time_budget
+
+    async def _research_source(
+        self,
+        protocol_name: str,
+        url: str,
+        semaphore: asyncio.Semaphore,
+        use_llm_extraction: bool,
+        counters: Dict[str, int],
+    ) -> Optional[ResearchFinding]:
+        async with semaphore:
+            counters["scraped"] += 1
+            source = await scrape_protocol_source(self.firecrawl_client, url, use_llm_extraction)
+        if source is None:
+            return None
+
+        # Analysis starts as soon as this document arrives; it does not hold a scrape slot
+        analysis = await self.analyzer.analyze_scraped_content(
+            protocol_name=protocol_name,
+            raw_content=source["raw_content"],
+            source_url=url,
+        )
+        if not analysis.get("analysis_success"):
+            logger.info(f"Skipping {url}: {analysis.get('error', 'analysis failed')}")
+            return None
+
+        return ResearchFinding(
+            source_url=url,
+            confidence=score_source(url, source["raw_content"], source["extracted_data"]),
+            ai_summary=analysis.get("ai_summary", ""),
+            raw_content=source["raw_content"],
+            extracted_data=source["extracted_data"],
+        )
+
+    async def run(
+        self,
+        protocol_name: str,
+        status_callback: Optional[StatusCallback] = None,
+        use_llm_extraction: bool = True,
+        progress_range: tuple = (60, 90),
+    ) -> Dict[str, Any]:
+        """
+        Research a protocol.
+
+        Args:
+            protocol_name: Protocol to research
+            status_callback: Receives each finding as it completes
+            use_llm_extraction: Whether scrapes request structured extraction
+            progress_range: Progress percentages spanned by the streamed updates
+
+        Returns:
+            Dict with findings (best first), sources_found, sources_scraped, stopped_early and duration_ms
+        """
+        start = time.monotonic()
+        urls = await find_protocol_sources(self.firecrawl_client, protocol_name, max_urls=self.max_sources)
+        if not urls:
+            return {"findings": [], "sources_found": 0, "sources_scraped": 0, "stopped_early": False, "duration_ms": 0}
+
+        low, high = progress_range
+        if status_callback:
+            await status_callback(f"Reading {len(urls)} sources for {protocol_name} in parallel...", low)
+
+        semaphore = asyncio.Semaphore(self.scrape_budget)
+        counters = {"scraped": 0}
+        tasks = [
+            asyncio.create_task(self._research_source(protocol_name, url, semaphore, use_llm_extraction, counters))
+            for url in urls
+        ]
+        findings: List[ResearchFinding] = []
+        finished = 0
+        stopped_early = False
+
+        try:
+            for next_done in asyncio.as_completed(tasks, timeout=self.time_budget):
+                try:
+                    finding = await next_done
+                except asyncio.TimeoutError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Source research failed for {protocol_name}: {e}")
+                    finding = None
+                finished += 1
+                if finding is None:
+                    continue
+
+                findings.append(finding)
+                if status_callback:
+                    headline = finding.ai_summary.strip().splitlines()[0][:160] if finding.ai_summary.strip() else ""
+                    progress = low + (high - low) * finished // len(tasks)
+                    await status_callback(f"Finding from {_domain(finding.source_url)}: {headline}", progress)
+
+                confident = sum(1 for f in findings if f.confidence >= self.confidence_threshold)
+                if confident >= self.min_confident_sources and finished < len(tasks):
+                    stopped_early = True
+                    break
+        except asyncio.TimeoutError:
+            stopped_early = True
+            logger.info(f"Deep research for {protocol_name} hit its {self.time_budget}s budget")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        findings.sort(key=lambda f: f.confidence, reverse=True)
+        duration_ms = int((time.monotonic() - start) * 1000)
+        logger.info(
+            f"Deep research for {protocol_name}: {len(findings)} findings from {len(urls)} sources "
+            f"in {duration_ms}ms{' (stopped early)' if stopped_early else ''}"
+        )
+        return {
+            "findings": findings,
+            "sources_found": len(urls),
+            "sources_scraped": counters["scraped"],
+            "stopped_early": stopped_early,
+            "duration_ms": duration_ms,
+        }
@@ -0,0 +1,118 @@
+"""
+SQL storage for protocol research logs (SQLAlchemy async).
+
+Works with PostgreSQL (asyncpg) in production and SQLite (aiosqlite)
+locally. Rows are written in bulk by ResearchLogger's batch writer.
+
+Schema: migrations/001_create_protocol_research_logs.sql
+"""
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import (
+    ARRAY,
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Index,
+    Integer,
+    MetaData,
+    Numeric,
+    String,
+    Table,
+    Text,
+    insert,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.models.protocol_research_log import ProtocolResearchLog
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+protocol_research_logs_table = Table(
+    "protocol_research_logs",
+    metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", UUID(as_uuid=False).with_variant(String(36), "sqlite"), nullable=True),
+    Column("protocol_name", String(255), nullable=False),
+    Column("research_mode", String(20), nullable=False),
+    Column("source", String(50), nullable=False),
+    Column("duration_ms", Integer, nullable=True),
+    Column("firecrawl_cost", Numeric(10, 4), nullable=True),
+    Column("source_urls", ARRAY(Text).with_variant(JSON(), "sqlite"), nullable=True),
+    Column("success", Boolean, nullable=True, default=True),
+    Column("error_message", Text, nullable=True),
+    Column("created_at", DateTime, nullable=True),
+    Column("updated_at", DateTime, nullable=True),
+    Index("idx_protocol_research_logs_user_id", "user_id"),
+    Index("idx_protocol_research_logs_created_at", "created_at"),
+    Index("idx_protocol_research_logs_research_mode", "research_mode"),
+    Index("idx_protocol_research_logs_user_created", "user_id", "created_at"),
+    Index("idx_protocol_research_logs_mode_created", "research_mode", "created_at"),
+)
+
+
+def _user_uuid(user_id: Optional[str]) -> Optional[str]:
+    """The column is a users(id) UUID; other identifiers (e.g. user names) are stored as NULL."""
+    if not user_id:
+        return None
+    try:
+        return str(uuid.UUID(str(user_id)))
+    except ValueError:
+        return None
+
+
+class ResearchLogStorage:
+    """Bulk writer for the protocol_research_logs table."""
+
+    def __init__(self, engine: AsyncEngine):
+        """
+        Initialize with an async engine.
+
+        Args:
+            engine: SQLAlchemy async engine (postgresql+asyncpg or sqlite+aiosqlite)
+        """
+        self.engine = engine
+
+    @classmethod
+    def from_url(cls, url: str) -> "ResearchLogStorage":
+        """Create storage from a database URL."""
+        return cls(create_async_engine(url, pool_pre_ping=True))
+
+    async def create_schema(self) -> None:
+        """Create the table and indexes if missing (dev/SQLite; production uses migrations)."""
+        async with self.engine.begin() as conn:
+            await conn.run_sync(metadata.create_all)
+
+    @staticmethod
+    def _row(log: ProtocolResearchLog) -> Dict[str, Any]:
+        return {
+            "user_id": _user_uuid(log.user_id),
+            "protocol_name": log.protocol_name,
+            "research_mode": log.research_mode,
+            "source": log.source,
+            "duration_ms": log.duration_ms,
+            "firecrawl_cost": log.firecrawl_cost,
+            "source_urls": log.source_urls,
+            "success": log.success,
+            "error_message": log.error_message,
+            "created_at": log.created_at,
+            "updated_at": log.updated_at,
+        }
+
+    async def insert_many(self, logs: List[ProtocolResearchLog]) -> int:
+        """Insert several log entries in one executemany; returns the number written."""
+        if not logs:
+            return 0
+        async with self.engine.begin() as conn:
+            await conn.execute(insert(protocol_research_logs_table), [self._row(log) for log in logs])
+        return len(logs)
+
+    async def close(self) -> None:
+        """Dispose of the connection pool."""
+        await self.engine.dispose()
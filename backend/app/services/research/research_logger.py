@@ -1,21 +1,115 @@
-"""Service for logging protocol research API calls."""
+"""
+Service for logging protocol research API calls.
+
+Log entries are buffered in memory and written to protocol_research_logs in
+bulk by a background task, flushed when a batch fills up or every
+``flush_interval`` seconds, so requests never wait on a database write.
+The buffer is bounded: when storage falls behind, new entries are dropped
+and counted. Analytics rollups (ResearchAnalytics) are updated as entries
+are logged, so they cover dropped entries too and need no query.
+"""
+import asyncio
 import logging
 import time
-from typing import Optional, List
+from collections import Counter
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 
-from app.models.protocol_research_log import ProtocolResearchLog
+from app.models.protocol_research_log import ProtocolResearchLog, ResearchAnalytics
 
 logger = logging.getLogger(__name__)
 
 
 class ResearchLogger:
     """Logs protocol research API calls for analytics and cost tracking."""
-    
-    def __init__(self):
-        """Initialize the research logger."""
+
+    def __init__(
+        self,
+        storage: Optional[Any] = None,
+        batch_size: int = 100,
+        flush_interval: float = 5.0,
+        max_buffer: int = 5000,
+    ):
+        """
+        Initialize the research logger.
+
+        Args:
+            storage: ResearchLogStorage (insert_many); connected from settings on start() when None
+            batch_size: Entries per bulk insert; a full batch triggers a flush
+            flush_interval: Maximum seconds an entry waits in the buffer
+            max_buffer: Buffered entries before new ones are dropped
+        """
+        self.storage = storage
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
         self.pending_logs: List[ProtocolResearchLog] = []
-    
+
+        self._flush_requested = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"logged": 0, "written": 0, "dropped": 0, "failed_batches": 0}
+
+        # Rollups for ResearchAnalytics
+        self._mode_counts: Counter = Counter()
+        self._source_counts: Counter = Counter()
+        self._protocol_counts: Counter = Counter()
+        self._successes = 0
+        self._total_duration_ms = 0
+        self._total_firecrawl_cost = 0.0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Connect storage (if configured) and start the batch writer."""
+        if self._task and not self._task.done():
+            return
+
+        if self.storage is None:
+            from app.config.settings import get_settings
+            url = get_settings().database.research_logs_database_url
+            if url:
+                try:
+                    # Optional dependency: SQLAlchemy async + driver (asyncpg / aiosqlite)
+                    from app.services.research.research_log_storage import ResearchLogStorage
+                    storage = ResearchLogStorage.from_url(url)
+                    if storage.engine.dialect.name == "sqlite":
+                        # Production databases are provisioned by migrations/001
+                        await storage.create_schema()
+                    self.storage = storage
+                except Exception as e:
+                    logger.warning(f"Research logs will not be persisted: {e}")
+
+        self._task = asyncio.create_task(self._run())
+        logger.info("Research log writer started")
+
+    async def stop(self) -> None:
+        """Stop the batch writer after a final flush."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.storage is not None and hasattr(self.storage, "close"):
+            await self.storage.close()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Research log flush error: {e}")
+
     def start_timer(self) -> float:
         """Start a timer for measuring research duration."""
         return time.time()
@@ -67,10 +161,20 @@ class ResearchLogger:
             created_at=datetime.utcnow(),
             updated_at=datetime.utcnow(),
         )
-        
-        # Store in pending logs
-        self.pending_logs.append(log_entry)
-        
+
+        self.stats["logged"] += 1
+        self._update_rollups(log_entry)
+
+        # Buffer for the batch writer; drop rather than grow without bound
+        if len(self.pending_logs) >= self.max_buffer:
+            self.stats["dropped"] += 1
+            if self.stats["dropped"] % 100 == 1:
+                logger.warning(f"Research log buffer full ({self.max_buffer}); {self.stats['dropped']} entries dropped")
+        else:
+            self.pending_logs.append(log_entry)
+            if len(self.pending_logs) >= self.batch_size:
+                self._flush_requested.set()
+
         logger.info(
             f"Research logged: {protocol_name} ({research_mode}) via {source} "
             f"(duration: {duration_ms}ms, success: {success})"
@@ -85,7 +189,74 @@ class ResearchLogger:
     def clear_pending_logs(self) -> None:
         """Clear pending logs after successful batch insert."""
         self.pending_logs.clear()
-    
+
+    async def flush(self) -> int:
+        """
+        Write buffered entries to storage in batches.
+
+        Without storage the buffer is simply released. A failed batch is put
+        back for the next flush as far as the buffer has room.
+
+        Returns:
+            Number of entries written
+        """
+        async with self._flush_lock:
+            logs, self.pending_logs = self.pending_logs, []
+            if not logs or self.storage is None:
+                return 0
+
+            written = 0
+            for i in range(0, len(logs), self.batch_size):
+                batch = logs[i:i + self.batch_size]
+                try:
+                    written += await self.storage.insert_many(batch)
+                except Exception as e:
+                    self.stats["failed_batches"] += 1
+                    logger.error(f"Failed to write {len(batch)} research logs: {e}")
+                    retry = logs[i:]
+                    room = max(self.max_buffer - len(self.pending_logs), 0)
+                    self.stats["dropped"] += max(len(retry) - room, 0)
+                    self.pending_logs[:0] = retry[:room]
+                    break
+
+            self.stats["written"] += written
+            if written:
+                logger.debug(f"Flushed {written} research logs")
+            return written
+
+    # ------------------------------------------------------------------
+    # Analytics
+    # ------------------------------------------------------------------
+
+    def _update_rollups(self, log_entry: ProtocolResearchLog) -> None:
+        self._mode_counts[log_entry.research_mode] += 1
+        self._source_counts[log_entry.source] += 1
+        self._protocol_counts[log_entry.protocol_name.lower()] += 1
+        if log_entry.success:
+            self._successes += 1
+        self._total_duration_ms += log_entry.duration_ms or 0
+        self._total_firecrawl_cost += log_entry.firecrawl_cost or 0.0
+
+    def get_analytics(self, top_protocols: int = 10) -> ResearchAnalytics:
+        """Analytics summary for research logged by this process."""
+        total = self.stats["logged"]
+        return ResearchAnalytics(
+            total_searches=total,
+            quick_searches=self._mode_counts["quick"],
+            deep_searches=self._mode_counts["deep"],
+            kb_hits=self._source_counts["knowledge_base"],
+            ai_fallbacks=self._source_counts["ai_general"],
+            firecrawl_uses=self._source_counts["firecrawl"],
+            success_rate=self._successes / total if total else 0.0,
+            avg_duration_ms=self._total_duration_ms / total if total else 0.0,
+            total_firecrawl_cost=round(self._total_firecrawl_cost, 4),
+            most_searched_protocols=self._protocol_counts.most_common(top_protocols),
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Writer counters plus current buffer size."""
+        return {**self.stats, "pending": len(self.pending_logs), "persisted": self.storage is not None}
+
     def calculate_firecrawl_cost(self, urls_scraped: int) -> float:
         """
         Calculate Firecrawl API cost based on URLs scraped.
@@ -13,6 +13,11 @@ logger = logging.getLogger(__name__)
 Intent = Literal["concept", "depth", "discovery"]
 
 
+def normalize_subject(subject: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s.-]", " ", subject.lower()).split())
+
+
 @dataclass
 class RoutingDecision:
     """Result of intent classification and routing decision."""
@@ -222,6 +227,20 @@ class ResearchRouter:
 
         return query
 
+    def cache_subject(self, decision: RoutingDecision) -> str:
+        """
+        Canonical subject of a query, shared by phrasings that research the same thing.
+
+        Examples:
+        - "what is aave" / "explain aave protocol" → "aave"
+        - "explain privacy" / "what is privacy" → "privacy"
+        """
+        if decision.intent == "depth" and decision.extracted_entity:
+            subject = decision.extracted_entity
+        else:
+            subject = self.transform_query_for_tool(decision)
+        return normalize_subject(subject)
+
     async def get_cache_ttl(self, decision: RoutingDecision) -> int:
         """Get cache TTL (in seconds) based on intent type."""
         cache_policy = {
@@ -6,6 +6,7 @@ creating new balance/transfer-specific APIs.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 from decimal import Decimal
@@ -13,6 +14,7 @@ from typing import Any, Dict, List, Optional, Tuple
 
 from app.config.chains import CHAINS, ChainType
 from app.models.token import TokenInfo
+from app.services.gas_estimate_memo import GasShape, gas_estimate_memo
 from app.services.starknet_service import starknet_service
 from eth_abi.abi import encode as abi_encode
 from web3 import Web3
@@ -344,10 +346,17 @@ class TokenQueryService:
             return {"transfers": [], "chain_id": chain_id, "source": "error"}
 
     def estimate_gas(
-        self, chain_id: int | str, transaction_type: str = "erc20_transfer"
+        self,
+        chain_id: int | str,
+        transaction_type: str = "erc20_transfer",
+        transaction: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Estimate gas for a transaction.
+
+        When the built transaction is passed, the gas limit comes from the
+        learned estimate for its calldata shape; unfamiliar shapes are
+        measured in the background rather than on the request path.
         """
         try:
             chain_info = CHAINS.get(chain_id)
@@ -359,18 +368,25 @@ class TokenQueryService:
                     "estimated": False,
                 }
 
-            w3 = self.web3_instances.get(chain_id)
-            if not w3 or not w3.is_connected():
-                return {
-                    "gas_limit": "100000"
-                    if transaction_type == "erc20_transfer"
-                    else "21000",
-                    "gas_price_gwei": "0",
-                    "estimated": False,
-                }
+            # Serve fees from the per-block gas oracle when it has this chain
+            from app.services.gas_oracle import gas_oracle
 
-            gas_price_wei = w3.eth.gas_price
-            gas_price_gwei = float(w3.from_wei(gas_price_wei, "gwei"))
+            snapshot = gas_oracle.get_cached(chain_id)
+            if snapshot:
+                gas_price_gwei = snapshot.gas_price_gwei
+            else:
+                w3 = self.web3_instances.get(chain_id)
+                if not w3 or not w3.is_connected():
+                    return {
+                        "gas_limit": "100000"
+                        if transaction_type == "erc20_transfer"
+                        else "21000",
+                        "gas_price_gwei": "0",
+                        "estimated": False,
+                    }
+
+                gas_price_wei = w3.eth.gas_price
+                gas_price_gwei = float(w3.from_wei(gas_price_wei, "gwei"))
 
             gas_limits = {
                 "erc20_transfer": 65000,
@@ -380,18 +396,42 @@ class TokenQueryService:
             }
 
             gas_limit = gas_limits.get(transaction_type, 100000)
+            if transaction and transaction.get("to") and transaction.get("data"):
+                shape = GasShape.from_calldata(chain_id, transaction["to"], transaction["data"])
+                gas_limit = gas_estimate_memo.lookup(shape) or gas_limit
+                gas_estimate_memo.schedule(
+                    shape, lambda: self._measure_gas(chain_id, transaction)
+                )
 
-            return {
+            result = {
                 "gas_limit": str(gas_limit),
                 "gas_price_gwei": str(round(gas_price_gwei, 2)),
                 "estimated_cost_usd": "0",
                 "estimated": True,
             }
+            if snapshot:
+                result["fee_params"] = snapshot.fee_params()
+            return result
 
         except Exception as e:
             logger.warning(f"Failed to estimate gas: {e}")
             return {"gas_limit": "100000", "gas_price_gwei": "0", "estimated": False}
 
+    async def _measure_gas(
+        self, chain_id: int | str, transaction: Dict[str, Any]
+    ) -> Optional[int]:
+        """Run a real eth_estimateGas for a built transaction."""
+        w3 = self.web3_instances.get(chain_id)
+        if not w3 or not transaction.get("from"):
+            return None
+        tx = {
+            "from": Web3.to_checksum_address(transaction["from"]),
+            "to": Web3.to_checksum_address(transaction["to"]),
+            "data": transaction["data"],
+            "value": int(transaction.get("value") or 0),
+        }
+        return await asyncio.to_thread(w3.eth.estimate_gas, tx)
+
     async def get_native_balance(
         self, wallet_address: str, chain_id: int | str
     ) -> float | None:
@@ -1,12 +1,27 @@
 """
 Transaction flow service for managing multi-step transactions.
+
+Flows live in Redis (``tx_flow:{flow_id}`` hash plus a
+``tx_flow:wallet:{wallet}`` pointer, both with a TTL) so any worker can
+advance a flow created by another. Step transitions are compare-and-set
+on the step index; each worker keeps a read-through cache validated by
+the flow's revision counter. Without Redis an in-process store with the
+same semantics is used.
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
+from collections import OrderedDict
+import copy
 import json
 import logging
-from datetime import datetime, timedelta
+import time
+import uuid
+from datetime import datetime
+
+import redis.asyncio as redis
+
+from app.config.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -66,15 +81,247 @@ class TransactionFlow:
         if self.metadata is None:
             self.metadata = {}
 
+    def to_json(self) -> str:
+        """Serialize for the flow store."""
+        return json.dumps(asdict(self), default=_json_default)
+
+    @classmethod
+    def from_json(cls, data: str) -> "TransactionFlow":
+        """Deserialize from the flow store."""
+        raw = json.loads(data)
+        raw["status"] = TransactionStatus(raw["status"])
+        raw["created_at"] = _parse_datetime(raw.get("created_at"))
+        raw["updated_at"] = _parse_datetime(raw.get("updated_at"))
+        raw["steps"] = [
+            TransactionStep(**{
+                **step,
+                "step_type": StepType(step["step_type"]),
+                "status": TransactionStatus(step["status"]),
+                "created_at": _parse_datetime(step.get("created_at")),
+                "completed_at": _parse_datetime(step.get("completed_at")),
+            })
+            for step in raw["steps"]
+        ]
+        return cls(**raw)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+# Compare-and-set on the step index; returns the new revision or -1.
+# Refreshes the TTL of the flow and of the wallet pointer (while it points here)
+_CAS_SCRIPT = """
+local current = redis.call('HGET', KEYS[1], 'step')
+if not current or tonumber(current) ~= tonumber(ARGV[1]) then
+    return -1
+end
+local rev = redis.call('HINCRBY', KEYS[1], 'rev', 1)
+redis.call('HSET', KEYS[1], 'step', ARGV[2], 'data', ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+if redis.call('GET', KEYS[2]) == ARGV[5] then
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+end
+return rev
+"""
+
+# Delete the wallet pointer only if it still points at the given flow
+_RELEASE_POINTER_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisFlowStore:
+    """Flow storage shared by all workers."""
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+        self._cas = client.register_script(_CAS_SCRIPT)
+        self._release = client.register_script(_RELEASE_POINTER_SCRIPT)
+
+    async def create(self, flow_id: str, wallet_address: str, step: int, data: str, ttl: int) -> int:
+        key = f"tx_flow:{flow_id}"
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"step": step, "rev": 1, "data": data})
+            pipe.expire(key, ttl)
+            pipe.set(f"tx_flow:wallet:{wallet_address}", flow_id, ex=ttl)
+            await pipe.execute()
+        return 1
+
+    async def get_flow_id(self, wallet_address: str) -> Optional[str]:
+        return await self.client.get(f"tx_flow:wallet:{wallet_address}")
+
+    async def get_rev(self, flow_id: str) -> Optional[int]:
+        rev = await self.client.hget(f"tx_flow:{flow_id}", "rev")
+        return int(rev) if rev is not None else None
+
+    async def get(self, flow_id: str) -> Optional[Tuple[int, str]]:
+        rev, data = await self.client.hmget(f"tx_flow:{flow_id}", ["rev", "data"])
+        return (int(rev), data) if data is not None else None
+
+    async def compare_and_set(
+        self, flow_id: str, wallet_address: str, expected_step: int, step: int, data: str, ttl: int
+    ) -> Optional[int]:
+        rev = await self._cas(
+            keys=[f"tx_flow:{flow_id}", f"tx_flow:wallet:{wallet_address}"],
+            args=[expected_step, step, data, ttl, flow_id],
+        )
+        return int(rev) if int(rev) >= 0 else None
+
+    async def release_pointer(self, wallet_address: str, flow_id: str) -> None:
+        await self._release(keys=[f"tx_flow:wallet:{wallet_address}"], args=[flow_id])
+
+
+class MemoryFlowStore:
+    """Single-process flow storage with the same semantics (dev / Redis unavailable)."""
+
+    def __init__(self, max_flows: int = 10000):
+        self.max_flows = max_flows
+        self._flows: "OrderedDict[str, Tuple[float, int, int, str]]" = OrderedDict()  # id -> (expires, step, rev, data)
+        self._pointers: Dict[str, Tuple[float, str]] = {}
+
+    def _live(self, flow_id: str) -> Optional[Tuple[float, int, int, str]]:
+        item = self._flows.get(flow_id)
+        if item is not None and item[0] < time.monotonic():
+            del self._flows[flow_id]
+            return None
+        return item
+
+    def purge(self) -> int:
+        """Drop expired flows and pointers."""
+        now = time.monotonic()
+        expired = [fid for fid, item in self._flows.items() if item[0] < now]
+        for fid in expired:
+            del self._flows[fid]
+        for wallet in [w for w, (exp, _) in self._pointers.items() if exp < now]:
+            del self._pointers[wallet]
+        return len(expired)
+
+    async def create(self, flow_id: str, wallet_address: str, step: int, data: str, ttl: int) -> int:
+        expires = time.monotonic() + ttl
+        self._flows[flow_id] = (expires, step, 1, data)
+        self._pointers[wallet_address] = (expires, flow_id)
+        if len(self._flows) > self.max_flows:
+            self.purge()
+            while len(self._flows) > self.max_flows:
+                self._flows.popitem(last=False)
+        return 1
+
+    async def get_flow_id(self, wallet_address: str) -> Optional[str]:
+        pointer = self._pointers.get(wallet_address)
+        if pointer is None or pointer[0] < time.monotonic():
+            return None
+        return pointer[1]
+
+    async def get_rev(self, flow_id: str) -> Optional[int]:
+        item = self._live(flow_id)
+        return item[2] if item else None
+
+    async def get(self, flow_id: str) -> Optional[Tuple[int, str]]:
+        item = self._live(flow_id)
+        return (item[2], item[3]) if item else None
+
+    async def compare_and_set(
+        self, flow_id: str, wallet_address: str, expected_step: int, step: int, data: str, ttl: int
+    ) -> Optional[int]:
+        item = self._live(flow_id)
+        if item is None or item[1] != expected_step:
+            return None
+        rev = item[2] + 1
+        expires = time.monotonic() + ttl
+        self._flows[flow_id] = (expires, step, rev, data)
+        pointer = self._pointers.get(wallet_address)
+        if pointer and pointer[1] == flow_id:
+            self._pointers[wallet_address] = (expires, flow_id)
+        return rev
+
+    async def release_pointer(self, wallet_address: str, flow_id: str) -> None:
+        pointer = self._pointers.get(wallet_address)
+        if pointer and pointer[1] == flow_id:
+            del self._pointers[wallet_address]
+
 class TransactionFlowService:
     """Service for managing multi-step transaction flows."""
     
-    def __init__(self):
-        # In-memory storage (could be replaced with Redis/DB)
-        self._flows: Dict[str, TransactionFlow] = {}
-        self._user_flows: Dict[str, str] = {}  # wallet_address -> flow_id
+    def __init__(
+        self,
+        store: Any = None,
+        ttl_seconds: int = 24 * 3600,
+        max_cached_flows: int = 1000,
+    ):
+        """
+        Initialize the flow service.
+        
+        Args:
+            store: RedisFlowStore/MemoryFlowStore (default: Redis, in-memory if unreachable)
+            ttl_seconds: Flows expire this long after their last update
+            max_cached_flows: Flows kept in this worker's read-through cache
+        """
+        self._store = store
+        self.ttl_seconds = ttl_seconds
+        self.max_cached_flows = max_cached_flows
+        self._cache: "OrderedDict[str, Tuple[int, TransactionFlow]]" = OrderedDict()  # id -> (rev, flow)
+    
+    async def _get_store(self):
+        """Connect to Redis on first use; fall back to the in-process store."""
+        if self._store is None:
+            try:
+                settings = get_settings()
+                client = redis.from_url(
+                    settings.database.redis_url,
+                    db=settings.database.redis_db,
+                    decode_responses=True,
+                )
+                await client.ping()
+                self._store = RedisFlowStore(client)
+            except Exception as e:
+                logger.warning(
+                    f"Redis unavailable for transaction flows ({e}); "
+                    "using in-process storage (single worker only)"
+                )
+                self._store = MemoryFlowStore()
+        return self._store
+    
+    def _cache_put(self, flow: TransactionFlow, rev: int) -> None:
+        self._cache[flow.flow_id] = (rev, flow)
+        self._cache.move_to_end(flow.flow_id)
+        while len(self._cache) > self.max_cached_flows:
+            self._cache.popitem(last=False)
+    
+    async def _load(self, flow_id: str) -> Optional[Tuple[int, TransactionFlow]]:
+        """Read-through: reuse the cached flow unless its revision changed."""
+        store = await self._get_store()
+        cached = self._cache.get(flow_id)
+        if cached is not None:
+            rev = await store.get_rev(flow_id)
+            if rev == cached[0]:
+                self._cache.move_to_end(flow_id)
+                return cached
+            if rev is None:
+                del self._cache[flow_id]
+                return None
         
-    def create_flow(
+        stored = await store.get(flow_id)
+        if stored is None:
+            self._cache.pop(flow_id, None)
+            return None
+        rev, data = stored
+        flow = TransactionFlow.from_json(data)
+        self._cache_put(flow, rev)
+        return rev, flow
+    
+    async def create_flow(
         self,
         wallet_address: str,
         chain_id: int,
@@ -84,8 +331,8 @@ class TransactionFlowService:
     ) -> TransactionFlow:
         """Create a new transaction flow from steps data."""
         
-        # Generate flow ID
-        flow_id = f"{wallet_address}_{operation_type}_{int(datetime.utcnow().timestamp())}"
+        # Generate flow ID (unique across workers)
+        flow_id = f"{wallet_address}_{operation_type}_{int(datetime.utcnow().timestamp())}_{uuid.uuid4().hex[:8]}"
         
         # Convert steps data to TransactionStep objects
         steps = []
@@ -115,86 +362,132 @@ class TransactionFlowService:
             metadata=metadata or {}
         )
         
-        # Store flow
-        self._flows[flow_id] = flow
-        self._user_flows[wallet_address] = flow_id
+        # Store flow; it becomes the wallet's current flow
+        store = await self._get_store()
+        rev = await store.create(flow_id, wallet_address, flow.current_step, flow.to_json(), self.ttl_seconds)
+        self._cache_put(flow, rev)
         
         logger.info(f"Created transaction flow {flow_id} with {len(steps)} steps")
         return flow
     
-    def get_current_flow(self, wallet_address: str) -> Optional[TransactionFlow]:
+    async def get_current_flow(self, wallet_address: str) -> Optional[TransactionFlow]:
         """Get the current active flow for a user."""
-        flow_id = self._user_flows.get(wallet_address)
+        store = await self._get_store()
+        flow_id = await store.get_flow_id(wallet_address)
         if not flow_id:
             return None
-        return self._flows.get(flow_id)
+        loaded = await self._load(flow_id)
+        return loaded[1] if loaded else None
     
-    def get_next_step(self, wallet_address: str) -> Optional[TransactionStep]:
+    async def get_next_step(self, wallet_address: str) -> Optional[TransactionStep]:
         """Get the next step to execute for a user."""
-        flow = self.get_current_flow(wallet_address)
+        flow = await self.get_current_flow(wallet_address)
         if not flow or flow.current_step >= len(flow.steps):
             return None
         
         return flow.steps[flow.current_step]
     
-    def complete_step(
+    async def complete_step(
         self,
         wallet_address: str,
         tx_hash: str,
         success: bool = True,
-        error: Optional[str] = None
+        error: Optional[str] = None,
+        max_attempts: int = 5,
     ) -> bool:
-        """Mark the current step as completed and advance to next."""
-        flow = self.get_current_flow(wallet_address)
-        if not flow or flow.current_step >= len(flow.steps):
-            return False
-        
-        # Update current step
-        current_step = flow.steps[flow.current_step]
-        current_step.tx_hash = tx_hash
-        current_step.completed_at = datetime.utcnow()
-        current_step.status = TransactionStatus.COMPLETED if success else TransactionStatus.FAILED
+        """
+        Mark the current step as completed and advance to next.
         
-        if error:
-            current_step.error = error
+        The transition is compare-and-set on the step index, so concurrent or
+        duplicate completions from different workers advance the flow once;
+        re-delivering the hash of the step just completed is a no-op.
+        """
+        store = await self._get_store()
+        flow_id = await store.get_flow_id(wallet_address)
+        if not flow_id:
+            return False
         
-        if success:
-            # Advance to next step
-            flow.current_step += 1
+        for _ in range(max_attempts):
+            loaded = await self._load(flow_id)
+            if not loaded:
+                return False
+            flow = copy.deepcopy(loaded[1])
             
-            # Check if flow is complete
+            # Duplicate delivery of the step that was just completed
+            if success and flow.current_step > 0 and flow.steps[flow.current_step - 1].tx_hash == tx_hash:
+                return True
             if flow.current_step >= len(flow.steps):
-                flow.status = TransactionStatus.COMPLETED
-                logger.info(f"Transaction flow {flow.flow_id} completed successfully")
+                return False
+            expected_step = flow.current_step
+            
+            # Update current step
+            current_step = flow.steps[flow.current_step]
+            current_step.tx_hash = tx_hash
+            current_step.completed_at = datetime.utcnow()
+            current_step.status = TransactionStatus.COMPLETED if success else TransactionStatus.FAILED
+            
+            if error:
+                current_step.error = error
+            
+            if success:
+                # Advance to next step
+                flow.current_step += 1
+                
+                # Check if flow is complete
+                if flow.current_step >= len(flow.steps):
+                    flow.status = TransactionStatus.COMPLETED
+                else:
+                    flow.status = TransactionStatus.IN_PROGRESS
             else:
-                flow.status = TransactionStatus.IN_PROGRESS
-        else:
-            # Mark flow as failed
-            flow.status = TransactionStatus.FAILED
-            logger.error(f"Transaction flow {flow.flow_id} failed at step {flow.current_step + 1}: {error}")
+                # Mark flow as failed
+                flow.status = TransactionStatus.FAILED
+            
+            flow.updated_at = datetime.utcnow()
+            
+            rev = await store.compare_and_set(
+                flow_id, flow.wallet_address, expected_step, flow.current_step, flow.to_json(), self.ttl_seconds
+            )
+            if rev is None:
+                # Another worker moved the flow first; re-read and re-evaluate
+                self._cache.pop(flow_id, None)
+                continue
+            
+            self._cache_put(flow, rev)
+            if flow.status == TransactionStatus.COMPLETED:
+                logger.info(f"Transaction flow {flow.flow_id} completed successfully")
+            elif flow.status == TransactionStatus.FAILED:
+                logger.error(f"Transaction flow {flow.flow_id} failed at step {flow.current_step + 1}: {error}")
+            return True
         
-        flow.updated_at = datetime.utcnow()
-        return True
+        logger.warning(f"Transaction flow {flow_id} step update lost {max_attempts} races")
+        return False
     
-    def cancel_flow(self, wallet_address: str) -> bool:
+    async def cancel_flow(self, wallet_address: str) -> bool:
         """Cancel the current flow for a user."""
-        flow = self.get_current_flow(wallet_address)
-        if not flow:
+        store = await self._get_store()
+        flow_id = await store.get_flow_id(wallet_address)
+        loaded = await self._load(flow_id) if flow_id else None
+        if not loaded:
             return False
         
+        flow = copy.deepcopy(loaded[1])
         flow.status = TransactionStatus.CANCELLED
         flow.updated_at = datetime.utcnow()
+        rev = await store.compare_and_set(
+            flow_id, flow.wallet_address, flow.current_step, flow.current_step, flow.to_json(), self.ttl_seconds
+        )
+        if rev is not None:
+            self._cache_put(flow, rev)
         
         # Remove from active flows
-        if wallet_address in self._user_flows:
-            del self._user_flows[wallet_address]
+        await store.release_pointer(wallet_address, flow_id)
         
         logger.info(f"Transaction flow {flow.flow_id} cancelled")
         return True
     
-    def get_flow_status(self, wallet_address: str) -> Optional[Dict[str, Any]]:
+    async def get_flow_status(self, wallet_address: str) -> Optional[Dict[str, Any]]:
         """Get the current status of a user's transaction flow."""
-        flow = self.get_current_flow(wallet_address)
+        flow = await self.get_current_flow(wallet_address)
         if not flow:
             return None
         
@@ -218,26 +511,18 @@ class TransactionFlowService:
             "metadata": flow.metadata
         }
     
-    def cleanup_old_flows(self, max_age_hours: int = 24):
-        """Clean up old completed/failed flows."""
-        cutoff_time = datetime.utcnow() - timedelta(hours=max_age_hours)
-        
-        flows_to_remove = []
-        for flow_id, flow in self._flows.items():
-            if (flow.status in [TransactionStatus.COMPLETED, TransactionStatus.FAILED, TransactionStatus.CANCELLED] 
-                and flow.updated_at < cutoff_time):
-                flows_to_remove.append(flow_id)
-        
-        for flow_id in flows_to_remove:
-            flow = self._flows[flow_id]
-            del self._flows[flow_id]
-            
-            # Remove from user flows if it's the current one
-            if self._user_flows.get(flow.wallet_address) == flow_id:
-                del self._user_flows[flow.wallet_address]
+    async def cleanup_old_flows(self) -> int:
+        """
+        Drop expired flows from the in-process store.
         
-        if flows_to_remove:
-            logger.info(f"Cleaned up {len(flows_to_remove)} old transaction flows")
+        Flows expire ttl_seconds after their last update; Redis expires them
+        on its own, so this only matters for the in-process fallback.
+        """
+        store = await self._get_store()
+        removed = store.purge() if isinstance(store, MemoryFlowStore) else 0
+        if removed:
+            logger.info(f"Cleaned up {removed} old transaction flows")
+        return removed
     
     def _detect_step_type(self, tx_data: str) -> StepType:
         """
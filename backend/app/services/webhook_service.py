@@ -1,7 +1,9 @@
 """Webhook service - handles webhook execution and event processing for payment actions."""
+import asyncio
+import hashlib
 import logging
 import json
-from typing import Dict, Any, Optional
+from typing import Awaitable, Callable, Dict, Any, List, Optional
 from decimal import Decimal
 from datetime import datetime
 
@@ -17,11 +19,22 @@ from app.domains.payment_actions.webhooks import (
 )
 from app.domains.payment_actions.service import get_payment_action_service
 from app.domains.payment_actions.executor import get_payment_executor
+from app.domains.payment_actions.execution_journal import (
+    SOURCE_WEBHOOK,
+    ExecutionJournal,
+    get_execution_journal,
+)
 from app.domains.payment_actions.models import PaymentAction, PaymentActionType
 
 
 logger = logging.getLogger(__name__)
 
+# Executions that count as a successful payout
+SUCCESS_STATUSES = ("submitted", "awaiting_signature")
+
+# (wallet_address, progress payload) -> None
+BatchNotifier = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
 
 class WebhookService:
     """
@@ -31,13 +44,29 @@ class WebhookService:
     - Signature validation for secure agent communication
     - Execute payment action endpoint
     - Batch payment execution
-    - Execution history and audit trail
+    - Execution history and audit trail (durable execution journal)
+    - Idempotency keys so duplicate deliveries run once
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        batch_concurrency: int = 10,
+        journal: Optional[ExecutionJournal] = None,
+    ):
         self.service = None
         self.executor = None
-        self.execution_history = {}  # In-memory, upgrade to DB later
+        self.journal = journal
+        self.batch_concurrency = batch_concurrency
+        # Payouts in flight in this process, "{wallet}:{batch_id}:{recipient}" -> future of the
+        # result, so concurrent retries here join them; the claims themselves and
+        # batch progress live in the execution journal, shared by all workers
+        self._batch_items: Dict[str, asyncio.Future] = {}
+        self._batch_tasks: set = set()
+        self._notifier: Optional[BatchNotifier] = None
+    
+    def set_notifier(self, notifier: Optional[BatchNotifier]) -> None:
+        """Set the callback used to push batch progress to users."""
+        self._notifier = notifier
     
     async def _init_services(self):
         """Lazy initialize services."""
@@ -45,11 +74,15 @@ class WebhookService:
             self.service = await get_payment_action_service()
         if self.executor is None:
             self.executor = await get_payment_executor()
+        if self.journal is None:
+            self.journal = await get_execution_journal()
     
     async def handle_webhook(
         self,
         request: WebhookRequest,
         agent_secret: Optional[str] = None,  # Secret for signature verification
+        idempotency_key: Optional[str] = None,  # Client key; duplicates return the first response
+        agent_id: Optional[str] = None,  # Calling agent (X-Agent-Id); scopes idempotency keys
     ) -> WebhookResponse:
         """
         Handle incoming webhook request.
@@ -57,6 +90,10 @@ class WebhookService:
         Args:
             request: Webhook request with event payload
             agent_secret: Shared secret for HMAC verification (optional for dev)
+            idempotency_key: Deliveries sharing a key (per event type, agent and
+                wallet) run once; failed requests release the key so they can be
+                retried, and reusing it for a different payload is rejected
+            agent_id: Agent that sent the request
         
         Returns:
             WebhookResponse with result or error
@@ -80,23 +117,9 @@ class WebhookService:
                         error="Unauthorized: Invalid signature",
                     )
             
-            # Route to handler based on event type
-            if request.event_type == WebhookEventType.EXECUTE_ACTION:
-                return await self._handle_execute_action(request)
-            
-            elif request.event_type == WebhookEventType.EXECUTE_BATCH:
-                return await self._handle_execute_batch(request)
-            
-            elif request.event_type == WebhookEventType.CREATE_ACTION:
-                return await self._handle_create_action(request)
-            
-            else:
-                return WebhookResponse(
-                    success=False,
-                    request_id=request.request_id,
-                    message="Unknown event type",
-                    error=f"Event type {request.event_type} not supported",
-                )
+            if idempotency_key:
+                return await self._handle_idempotent(request, idempotency_key, agent_id)
+            return await self._dispatch(request)
         
         except Exception as e:
             logger.exception(f"Webhook processing error for {request.request_id}")
@@ -107,6 +130,80 @@ class WebhookService:
                 error=str(e),
             )
     
+    async def _handle_idempotent(
+        self,
+        request: WebhookRequest,
+        idempotency_key: str,
+        agent_id: Optional[str] = None,
+    ) -> WebhookResponse:
+        """Run a request once per idempotency key; duplicates get the stored response."""
+        wallet_address = str(request.payload.get("wallet_address") or "").lower()
+        key = f"{request.event_type.value}:{agent_id or ''}:{wallet_address}:{idempotency_key}"
+        request_hash = hashlib.sha256(
+            json.dumps(request.payload, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        claim = await self.journal.claim(key, request.request_id, request_hash=request_hash)
+        
+        if not claim.acquired and claim.request_hash and claim.request_hash != request_hash:
+            logger.warning(f"Idempotency key {idempotency_key} reused by {request.request_id} with a different payload")
+            return WebhookResponse(
+                success=False,
+                request_id=request.request_id,
+                message="Idempotency key reused",
+                error="Idempotency key was already used with a different payload",
+            )
+        if claim.in_progress:
+            return WebhookResponse(
+                success=False,
+                request_id=request.request_id,
+                message="Duplicate webhook delivery",
+                error=f"Request {claim.request_id} with this idempotency key is still in progress",
+            )
+        if not claim.acquired:
+            logger.info(f"Duplicate webhook {request.request_id} answered from {claim.request_id}")
+            return WebhookResponse(**claim.response)
+        
+        renewer = asyncio.create_task(self._hold_claim(key, request.request_id))
+        try:
+            response = await self._dispatch(request)
+        except BaseException:
+            await self.journal.release(key)
+            raise
+        finally:
+            renewer.cancel()
+        if response.success:
+            await self.journal.complete(key, response.model_dump(mode="json"))
+        else:
+            await self.journal.release(key)
+        return response
+    
+    async def _hold_claim(self, key: str, request_id: str) -> None:
+        """Renew an in-progress idempotency claim while its request runs."""
+        while True:
+            await asyncio.sleep(self.journal.claim_lease / 3)
+            if not await self.journal.renew(key, request_id):
+                logger.warning(f"Lost idempotency claim {key} held by {request_id}")
+                return
+    
+    async def _dispatch(self, request: WebhookRequest) -> WebhookResponse:
+        """Route a verified request to its event handler."""
+        if request.event_type == WebhookEventType.EXECUTE_ACTION:
+            return await self._handle_execute_action(request)
+        
+        elif request.event_type == WebhookEventType.EXECUTE_BATCH:
+            return await self._handle_execute_batch(request)
+        
+        elif request.event_type == WebhookEventType.CREATE_ACTION:
+            return await self._handle_create_action(request)
+        
+        else:
+            return WebhookResponse(
+                success=False,
+                request_id=request.request_id,
+                message="Unknown event type",
+                error=f"Event type {request.event_type} not supported",
+            )
+    
     async def _handle_execute_action(self, request: WebhookRequest) -> WebhookResponse:
         """Handle execute_action webhook event."""
         try:
@@ -145,7 +242,7 @@ class WebhookService:
                     error=error_msg,
                     metadata=request.payload,
                 )
-                self._record_execution(record)
+                await self._record_execution(record)
                 
                 return WebhookResponse(
                     success=False,
@@ -168,7 +265,7 @@ class WebhookService:
                 error=result.error_message,
                 metadata=result.metadata,
             )
-            self._record_execution(record)
+            await self._record_execution(record)
             
             # Mark action as used
             await self.service.mark_used(payload.wallet_address, payload.action_id)
@@ -199,7 +296,7 @@ class WebhookService:
                 error=str(e),
                 metadata=request.payload,
             )
-            self._record_execution(record)
+            await self._record_execution(record)
             
             return WebhookResponse(
                 success=False,
@@ -234,64 +331,28 @@ class WebhookService:
                     error="Invalid recipient amounts/percentages",
                 )
             
-            # Execute batch payments (could be sequential or parallel)
-            execution_results = []
-            for recipient in splits:
-                try:
-                    # Create a temporary action for this recipient
-                    temp_action = PaymentAction(
-                        id=f"batch_{request.request_id}_{recipient['address'][:8]}",
-                        wallet_address=payload.wallet_address,
-                        name=f"Batch payment to {recipient.get('label', recipient['address'][:6])}",
-                        action_type=PaymentActionType.SEND,
-                        recipient_address=recipient["address"],
-                        amount=str(recipient["amount"]),
-                        token=payload.token,
-                        chain_id=payload.chain_id,
-                    )
-                    
-                    # Execute
-                    result = await self.executor.execute_action(temp_action, payload.wallet_address)
-                    execution_results.append({
-                        "recipient": recipient["address"],
-                        "amount": str(recipient["amount"]),
-                        "status": result.status.value,
-                        "ticket_id": result.ticket_id,
-                    })
-                
-                except Exception as e:
-                    logger.error(f"Batch payment to {recipient['address']} failed: {e}")
-                    execution_results.append({
-                        "recipient": recipient["address"],
-                        "amount": str(recipient["amount"]),
-                        "status": "failed",
-                        "error": str(e),
-                    })
+            # Batch IDs are chosen by the client, so they are only unique per wallet
+            batch_id = payload.batch_id or payload.metadata.get("batch_id") or request.request_id
+            batch = await self._start_batch(batch_id, payload.wallet_address, len(splits))
             
-            # Record execution
-            record = WebhookExecutionRecord(
-                request_id=request.request_id,
-                event_type=request.event_type,
-                wallet_address=payload.wallet_address,
-                status="submitted" if any(r["status"] == "submitted" for r in execution_results) else "failed",
-                metadata={
-                    "batch_results": execution_results,
-                    "total_recipients": len(payload.recipients),
-                },
-            )
-            self._record_execution(record)
-            
-            all_submitted = all(r.get("status") in ["submitted", "awaiting_signature"] for r in execution_results)
+            if not payload.wait:
+                # Respond before paying out; progress is pushed and pollable by batch_id
+                task = asyncio.create_task(self._run_batch(request, payload, batch, splits))
+                self._batch_tasks.add(task)
+                task.add_done_callback(self._batch_tasks.discard)
+                return WebhookResponse(
+                    success=True,
+                    request_id=request.request_id,
+                    message=f"Batch payment accepted ({len(splits)} recipients)",
+                    result=self._batch_summary(batch),
+                )
             
+            batch = await self._run_batch(request, payload, batch, splits)
             return WebhookResponse(
-                success=all_submitted,
+                success=batch["failed"] == 0,
                 request_id=request.request_id,
-                message=f"Batch payment processed ({len(execution_results)} recipients)",
-                result={
-                    "total_recipients": len(execution_results),
-                    "successful": len([r for r in execution_results if r["status"] in ["submitted", "awaiting_signature"]]),
-                    "results": execution_results,
-                },
+                message=f"Batch payment processed ({batch['total_recipients']} recipients)",
+                result=self._batch_summary(batch),
             )
         
         except Exception as e:
@@ -304,7 +365,7 @@ class WebhookService:
                 error=str(e),
                 metadata=request.payload,
             )
-            self._record_execution(record)
+            await self._record_execution(record)
             
             return WebhookResponse(
                 success=False,
@@ -313,6 +374,305 @@ class WebhookService:
                 error=str(e),
             )
     
+    async def _start_batch(self, batch_id: str, wallet_address: str, total: int) -> Dict[str, Any]:
+        """
+        Create the progress entry for a batch.
+        
+        A retry of a finished batch starts over; while an earlier run is still
+        processing (here or on another worker) its progress is continued.
+        """
+        stored = await self.journal.get_batch(wallet_address, batch_id)
+        if stored and stored["status"] == "processing" and stored["total_recipients"] == total:
+            return stored
+        batch = {
+            "batch_id": batch_id,
+            "wallet_address": wallet_address,
+            "status": "processing",
+            "total_recipients": total,
+            "completed": 0,
+            "successful": 0,
+            "failed": 0,
+            "results": [None] * total,
+        }
+        await self.journal.save_batch(batch)
+        return batch
+    
+    @staticmethod
+    def _recount(batch: Dict[str, Any]) -> None:
+        """Derive the progress counters from the per-recipient results."""
+        done = [r for r in batch["results"] if r is not None]
+        batch["completed"] = len(done)
+        batch["successful"] = sum(1 for r in done if r["status"] in SUCCESS_STATUSES)
+        batch["failed"] = batch["completed"] - batch["successful"]
+    
+    @classmethod
+    def _merge_progress(cls, stored: Optional[Dict[str, Any]], batch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Combine this run's progress with the stored progress of the same batch.
+        
+        Results of this run win, except an "in_progress" placeholder for a
+        recipient another run has already finished.
+        """
+        if stored is None or stored["total_recipients"] != batch["total_recipients"]:
+            return batch
+        results = [
+            theirs if mine is None or (mine["status"] == "in_progress" and theirs is not None) else mine
+            for mine, theirs in zip(batch["results"], stored["results"])
+        ]
+        final = all(r is not None and r["status"] != "in_progress" for r in results)
+        merged = {
+            **batch,
+            "results": results,
+            "status": "completed" if batch["status"] == "completed" or (stored["status"] == "completed" and final)
+            else "processing",
+        }
+        cls._recount(merged)
+        return merged
+    
+    @staticmethod
+    def _batch_summary(batch: Dict[str, Any]) -> Dict[str, Any]:
+        """Batch progress without the wallet, results in recipient order."""
+        summary = {k: v for k, v in batch.items() if k != "wallet_address"}
+        summary["results"] = [r for r in batch["results"] if r is not None]
+        return summary
+    
+    async def get_batch_status(self, wallet_address: str, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get progress and per-recipient results of a wallet's batch (from any worker)."""
+        await self._init_services()
+        batch = await self.journal.get_batch(wallet_address, batch_id)
+        return self._batch_summary(batch) if batch else None
+    
+    @staticmethod
+    def _idempotency_keys(wallet_address: str, batch_id: str, splits: list) -> List[str]:
+        """One key per (wallet, batch, recipient); repeated recipients get an ordinal suffix."""
+        keys, seen = [], {}
+        for recipient in splits:
+            address = recipient["address"].lower()
+            n = seen.get(address, 0)
+            seen[address] = n + 1
+            keys.append(f"{wallet_address.lower()}:{batch_id}:{address}" + (f"#{n}" if n else ""))
+        return keys
+    
+    async def _run_batch(
+        self,
+        request: WebhookRequest,
+        payload: WebhookPayloadExecuteBatch,
+        batch: Dict[str, Any],
+        splits: list,
+    ) -> Dict[str, Any]:
+        """
+        Pay out a batch concurrently, reusing results already produced for the same batch ID.
+        
+        Each recipient is claimed in the execution journal under its idempotency
+        key before it is paid, so a retry on any worker (or after a restart)
+        reuses submitted payouts instead of executing them again. Payouts still in
+        flight in this process are joined; ones claimed by another worker are
+        reported as in progress. Failed payouts release their claim so a retry
+        re-attempts them.
+        """
+        batch_id = batch["batch_id"]
+        keys = self._idempotency_keys(payload.wallet_address, batch_id, splits)
+        
+        owned: Dict[int, asyncio.Future] = {}
+        existing: Dict[int, asyncio.Future] = {}
+        claimed: Dict[int, Dict[str, Any]] = {}
+        loop = asyncio.get_running_loop()
+        for i, key in enumerate(keys):
+            future = self._batch_items.get(key)
+            if future is not None:
+                existing[i] = future
+                continue
+            future = self._batch_items[key] = loop.create_future()
+            try:
+                claim = await self.journal.claim(self._item_claim_key(key), request.request_id)
+            except BaseException:
+                future.cancel()
+                self._batch_items.pop(key, None)
+                for j, owned_future in owned.items():
+                    owned_future.cancel()
+                    self._batch_items.pop(keys[j], None)
+                    await self.journal.release(self._item_claim_key(keys[j]))
+                raise
+            if claim.acquired:
+                owned[i] = future
+                continue
+            if claim.in_progress:
+                entry = self._batch_entry(
+                    splits[i], "in_progress",
+                    error=f"Payout is in progress under request {claim.request_id}",
+                )
+            else:
+                entry = claim.response
+            future.set_result(entry)
+            self._batch_items.pop(key, None)
+            claimed[i] = entry
+        
+        async def finish(index: int, entry: Dict[str, Any]):
+            batch["results"][index] = entry
+            self._recount(batch)
+            await self._notify_progress(batch, entry)
+            await self._save_progress(batch)
+        
+        async def settle(index: int, entry: Dict[str, Any]):
+            future = owned[index]
+            if future.done():
+                return
+            future.set_result(entry)
+            item_key = self._item_claim_key(keys[index])
+            try:
+                if entry["status"] in SUCCESS_STATUSES:
+                    await self.journal.complete(item_key, entry)
+                else:
+                    await self.journal.release(item_key)
+            finally:
+                self._batch_items.pop(keys[index], None)
+            await finish(index, entry)
+        
+        async def reuse(index: int, future: asyncio.Future):
+            try:
+                entry = dict(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                entry = self._batch_entry(splits[index], "failed", error="Payout was cancelled")
+            if entry["status"] in SUCCESS_STATUSES:
+                entry["deduplicated"] = True
+            await finish(index, entry)
+        
+        for i, entry in claimed.items():
+            entry = dict(entry)
+            if entry["status"] in SUCCESS_STATUSES:
+                entry["deduplicated"] = True
+            await finish(i, entry)
+        
+        indexes, actions = [], []
+        now = datetime.utcnow()
+        for i in owned:
+            recipient = splits[i]
+            try:
+                actions.append(PaymentAction(
+                    id=f"batch_{batch_id}_{i}",
+                    wallet_address=payload.wallet_address,
+                    name=f"Batch payment to {recipient.get('label') or recipient['address'][:6]}",
+                    action_type=PaymentActionType.SEND,
+                    recipient_address=recipient["address"],
+                    amount=str(recipient["amount"]),
+                    token=payload.token,
+                    chain_id=payload.chain_id,
+                    created_at=now,
+                ))
+                indexes.append(i)
+            except Exception as e:
+                logger.error(f"Batch payment to {recipient['address']} failed: {e}")
+                await settle(i, self._batch_entry(recipient, "failed", error=str(e)))
+        
+        async def on_result(position: int, result):
+            i = indexes[position]
+            await settle(i, self._batch_entry(
+                splits[i], result.status.value, ticket_id=result.ticket_id, error=result.error_message,
+            ))
+        
+        renewer = asyncio.create_task(self._hold_item_claims(request.request_id, keys, owned))
+        try:
+            await asyncio.gather(
+                self.executor.execute_batch(
+                    actions, payload.wallet_address,
+                    max_concurrency=self.batch_concurrency, on_result=on_result,
+                ),
+                *(reuse(i, future) for i, future in existing.items()),
+            )
+        except Exception as e:
+            logger.exception(f"Batch {batch_id} execution error")
+            for i, future in owned.items():
+                if not future.done():
+                    await settle(i, self._batch_entry(splits[i], "failed", error=str(e)))
+        finally:
+            renewer.cancel()
+            for i, future in owned.items():
+                if not future.done():
+                    # Cancelled mid-payout: let a retry pick the recipient up
+                    future.cancel()
+                    self._batch_items.pop(keys[i], None)
+                    await self.journal.release(self._item_claim_key(keys[i]))
+        
+        batch["status"] = "completed"
+        await self._notify_progress(batch)
+        await self._save_progress(batch)
+        
+        record = WebhookExecutionRecord(
+            request_id=request.request_id,
+            event_type=request.event_type,
+            wallet_address=payload.wallet_address,
+            status="submitted" if batch["successful"] else "failed",
+            metadata={
+                "batch_id": batch_id,
+                "batch_results": batch["results"],
+                "total_recipients": len(payload.recipients),
+            },
+        )
+        await self._record_execution(record)
+        return batch
+    
+    @staticmethod
+    def _item_claim_key(key: str) -> str:
+        """Journal idempotency key for one recipient of a batch."""
+        return f"batch_item:{key}"
+    
+    async def _hold_item_claims(
+        self, request_id: str, keys: List[str], owned: Dict[int, asyncio.Future],
+    ) -> None:
+        """Renew the claims of a batch's unpaid recipients while it runs."""
+        while True:
+            await asyncio.sleep(self.journal.claim_lease / 3)
+            for i, future in owned.items():
+                if not future.done():
+                    await self.journal.renew(self._item_claim_key(keys[i]), request_id)
+    
+    async def _save_progress(self, batch: Dict[str, Any]) -> None:
+        """Merge batch progress into the journal so every worker can report it (best effort)."""
+        try:
+            stored = await self.journal.save_batch(batch, merge=self._merge_progress)
+        except Exception as e:
+            logger.warning(f"Failed to save progress of batch {batch['batch_id']}: {e}")
+            return
+        # Pick up recipients finished by a concurrent run of the batch
+        for i, entry in enumerate(stored["results"]):
+            if batch["results"][i] is None and entry is not None:
+                batch["results"][i] = entry
+        self._recount(batch)
+    
+    @staticmethod
+    def _batch_entry(
+        recipient: Dict[str, Any],
+        status: str,
+        ticket_id: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Per-recipient batch result."""
+        entry = {
+            "recipient": recipient["address"],
+            "amount": str(recipient["amount"]),
+            "status": status,
+            "ticket_id": ticket_id,
+        }
+        if error:
+            entry["error"] = error
+        return entry
+    
+    async def _notify_progress(self, batch: Dict[str, Any], entry: Optional[Dict[str, Any]] = None):
+        """Push batch progress to the wallet's websocket (best effort)."""
+        if self._notifier is None:
+            return
+        progress = {k: batch[k] for k in (
+            "batch_id", "status", "total_recipients", "completed", "successful", "failed",
+        )}
+        if entry is not None:
+            progress["result"] = entry
+        try:
+            await self._notifier(batch["wallet_address"], progress)
+        except Exception as e:
+            logger.warning(f"Batch progress push failed for {batch['batch_id']}: {e}")
+    
     async def _handle_create_action(self, request: WebhookRequest) -> WebhookResponse:
         """Handle create_action webhook event."""
         try:
@@ -341,7 +701,7 @@ class WebhookService:
                 status="completed",
                 metadata={"action": action.dict()},
             )
-            self._record_execution(record)
+            await self._record_execution(record)
             
             return WebhookResponse(
                 success=True,
@@ -364,7 +724,7 @@ class WebhookService:
                 error=str(e),
                 metadata=request.payload,
             )
-            self._record_execution(record)
+            await self._record_execution(record)
             
             return WebhookResponse(
                 success=False,
@@ -426,18 +786,31 @@ class WebhookService:
         
         return splits
     
-    def _record_execution(self, record: WebhookExecutionRecord):
+    async def _record_execution(self, record: WebhookExecutionRecord):
         """Record webhook execution for audit trail."""
-        self.execution_history[record.request_id] = record.to_dict()
+        await self.journal.append(SOURCE_WEBHOOK, record.to_dict(), request_id=record.request_id)
         logger.info(f"Webhook execution recorded: {record.request_id} - {record.status}")
     
-    def get_execution_history(self, wallet_address: str, limit: int = 100) -> list:
-        """Get execution history for a wallet."""
-        records = [
-            r for r in self.execution_history.values()
-            if r.get("wallet_address") == wallet_address
-        ]
-        return sorted(records, key=lambda x: x["created_at"], reverse=True)[:limit]
+    async def get_execution_history(self, wallet_address: str, limit: int = 100) -> list:
+        """Get execution history for a wallet (newest first)."""
+        await self._init_services()
+        return await self.journal.get_by_wallet(wallet_address, source=SOURCE_WEBHOOK, limit=limit)
+    
+    async def replay_journal(
+        self,
+        after_seq: int = 0,
+        wallet_address: Optional[str] = None,
+        limit: int = 500,
+    ) -> Dict[str, Any]:
+        """
+        Read webhook and keeper journal entries in order, resuming after ``after_seq``.
+        
+        Internal (recovery and auditing jobs): the journal spans every wallet,
+        so it is deliberately not exposed over HTTP.
+        """
+        await self._init_services()
+        entries, last_seq = await self.journal.replay(after_seq, wallet_address=wallet_address, limit=limit)
+        return {"entries": entries, "next_seq": last_seq, "has_more": len(entries) == limit}
 
 
 # Singleton instance
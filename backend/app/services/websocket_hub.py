@@ -0,0 +1,456 @@
+"""
+Websocket connection hub with cross-worker fan-out.
+
+Each worker keeps its own websocket connections (several per wallet, e.g.
+one per browser tab). Messages for a wallet are delivered to the local
+connections and published on the wallet's Redis channel
+(``ws:wallet:{wallet}``); every worker holding a connection for that wallet
+is subscribed to the channel and forwards the message to its sockets.
+Background jobs running outside the API process can push to a wallet with
+``publish_to_wallet``. Without Redis the hub degrades to local delivery
+and the listener keeps retrying the subscription. Replies to a command
+(``send_to``) go only to the connection that sent it, never through Redis.
+
+Sends never wait on the client: each connection has a bounded outbound
+queue drained by its own writer task. Progress-style frames are coalesced
+(a newer frame replaces a queued one with the same key) and are the only
+frames dropped when a slow client lets its queue fill up.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import orjson
+import redis.asyncio as redis
+from fastapi import WebSocket
+
+from app.config.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "ws:wallet:"
+
+# Overflow policies for a full send queue
+OVERFLOW_DROP_PROGRESS = "drop_progress"  # Drop queued progress; results always queue
+OVERFLOW_CLOSE = "close"  # Drop queued progress; close the connection if still full
+
+# Frame types superseded by a later frame with the same data field
+COALESCED_TYPES = {
+    "progress": "stage",
+    "agent_status": "stage",
+    "batch_progress": "batch_id",
+    "bridge_status": "bridge_id",
+}
+
+
+def _wallet_key(wallet_address: str) -> str:
+    return wallet_address.lower()
+
+
+def _dumps(value: Any) -> str:
+    return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _tag(message: Dict[str, Any], request_id: Optional[str]) -> Dict[str, Any]:
+    """Attach the client request id a frame answers, if any."""
+    if request_id is not None:
+        message["request_id"] = request_id
+    return message
+
+
+def _coalesce_key(message: Dict[str, Any]) -> Optional[str]:
+    """Key shared by frames that supersede each other (None for results)."""
+    field = COALESCED_TYPES.get(message.get("type"))
+    if field is None:
+        return None
+    data = message.get("data") or {}
+    return f"{message['type']}:{message.get('request_id')}:{data.get(field)}"
+
+
+class ConnectionWriter:
+    """Bounded outbound queue for one websocket, drained by its own writer task."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int = 100,
+        overflow_policy: str = OVERFLOW_DROP_PROGRESS,
+        on_closed: Optional[Callable[[WebSocket], Awaitable[None]]] = None,
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.closed = False
+        self.dropped = 0
+        self.coalesced = 0
+
+        self._on_closed = on_closed
+        self._queue: Deque[List[Any]] = deque()  # [coalesce key, frame]
+        self._queued_by_key: Dict[str, List[Any]] = {}
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, frame: str, key: Optional[str] = None) -> bool:
+        """Queue a serialized frame; returns False if it was dropped."""
+        if self.closed:
+            return False
+        if key is not None and key in self._queued_by_key:
+            self._queued_by_key[key][1] = frame
+            self.coalesced += 1
+            return True
+        if len(self._queue) >= self.max_queue and not self._make_room(key is not None):
+            return False
+
+        entry = [key, frame]
+        self._queue.append(entry)
+        if key is not None:
+            self._queued_by_key[key] = entry
+        self._ready.set()
+        return True
+
+    def _make_room(self, incoming_progress: bool) -> bool:
+        for entry in self._queue:
+            if entry[0] is not None:
+                # Oldest progress frame is the stalest
+                self._queue.remove(entry)
+                del self._queued_by_key[entry[0]]
+                self.dropped += 1
+                return True
+        if incoming_progress:
+            self.dropped += 1
+            return False
+        if self.overflow_policy == OVERFLOW_CLOSE:
+            logger.warning(f"Closing slow websocket consumer ({len(self._queue)} results queued)")
+            self.close()
+            asyncio.create_task(self._close_socket())
+            return False
+        return True
+
+    async def _run(self) -> None:
+        try:
+            while True:
+                if not self._queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                key, frame = self._queue.popleft()
+                if key is not None:
+                    del self._queued_by_key[key]
+                await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error sending to websocket: {e}")
+            self.closed = True
+            if self._on_closed:
+                await self._on_closed(self.websocket)
+
+    async def _close_socket(self) -> None:
+        try:
+            await self.websocket.close(code=1013)
+        except Exception:
+            pass
+        if self._on_closed:
+            await self._on_closed(self.websocket)
+
+    def close(self) -> None:
+        """Stop the writer; queued frames are discarded."""
+        self.closed = True
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+
+class WebSocketHub:
+    """Tracks websocket connections per wallet and routes messages between workers."""
+
+    def __init__(
+        self,
+        redis_retry_interval: float = 30.0,
+        max_queue: int = 100,
+        overflow_policy: str = OVERFLOW_DROP_PROGRESS,
+    ):
+        """
+        Initialize the hub.
+
+        Args:
+            redis_retry_interval: Seconds to wait before retrying an unreachable Redis
+            max_queue: Outbound frames queued per connection before overflow
+            overflow_policy: OVERFLOW_DROP_PROGRESS or OVERFLOW_CLOSE
+        """
+        if overflow_policy not in (OVERFLOW_DROP_PROGRESS, OVERFLOW_CLOSE):
+            raise ValueError(f"Unknown websocket overflow policy: {overflow_policy}")
+        self.redis_retry_interval = redis_retry_interval
+        self.max_queue = max_queue
+        self.overflow_policy = overflow_policy
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.active_connections: Dict[str, Dict[WebSocket, ConnectionWriter]] = {}
+
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def _get_redis(self) -> Optional[redis.Redis]:
+        """Connect to Redis on first use; retry after a pause if unreachable."""
+        if self._redis is None and time.monotonic() >= self._redis_retry_at:
+            try:
+                settings = get_settings()
+                client = redis.from_url(
+                    settings.database.redis_url,
+                    db=settings.database.redis_db,
+                    decode_responses=True,
+                )
+                await client.ping()
+                self._redis = client
+            except Exception as e:
+                logger.warning(f"Websocket hub running without Redis ({e}); delivering to local connections only")
+                self._redis_retry_at = time.monotonic() + self.redis_retry_interval
+        return self._redis
+
+    async def start(self) -> None:
+        """Start the listener; it subscribes to local connections' channels once Redis is reachable."""
+        if self._listener and not self._listener.done():
+            return
+        await self._ensure_pubsub()
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"Websocket hub started (worker {self.worker_id})")
+
+    async def _ensure_pubsub(self) -> bool:
+        """Create the subscription for local connections if Redis is reachable."""
+        if self._pubsub is not None:
+            return True
+        client = await self._get_redis()
+        if client is None:
+            return False
+
+        # Set first so connections made while subscribing subscribe themselves
+        self._pubsub = pubsub = client.pubsub(ignore_subscribe_messages=True)
+        channels = [CHANNEL_PREFIX + wallet for wallet in self.active_connections]
+        try:
+            if channels:
+                await pubsub.subscribe(*channels)
+                self._subscribed.set()
+        except Exception as e:
+            logger.warning(f"Websocket hub subscription failed: {e}")
+            self._pubsub = None
+            self._redis = None
+            self._redis_retry_at = time.monotonic() + self.redis_retry_interval
+            return False
+        return True
+
+    async def stop(self) -> None:
+        """Stop the listener and connection writers, and release Redis connections."""
+        for writers in self.active_connections.values():
+            for writer in writers.values():
+                writer.close()
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.close()
+            except Exception as e:
+                logger.debug(f"Error closing websocket hub pubsub: {e}")
+            self._pubsub = None
+        self._subscribed.clear()
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+    async def _listen(self) -> None:
+        """Forward messages published by other workers to local connections."""
+        while True:
+            if not await self._ensure_pubsub():
+                await asyncio.sleep(self.redis_retry_interval)
+                continue
+            await self._subscribed.wait()
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Websocket hub subscription error: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message and message.get("type") == "message":
+                await self._handle_published(message["channel"], message["data"])
+
+    async def _handle_published(self, channel: str, data: str) -> None:
+        try:
+            envelope = orjson.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed websocket hub message on {channel}")
+            return
+        if envelope.get("origin") == self.worker_id:
+            return  # Already delivered locally
+        self._enqueue_local(channel[len(CHANNEL_PREFIX):], envelope.get("frame"), envelope.get("key"))
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    async def connect(self, wallet_address: str, websocket: WebSocket):
+        await websocket.accept()
+        wallet = _wallet_key(wallet_address)
+        connections = self.active_connections.setdefault(wallet, {})
+        connections[websocket] = ConnectionWriter(
+            websocket,
+            max_queue=self.max_queue,
+            overflow_policy=self.overflow_policy,
+            on_closed=lambda ws: self.disconnect(wallet, ws),
+        )
+        if len(connections) == 1 and self._pubsub is not None:
+            try:
+                await self._pubsub.subscribe(CHANNEL_PREFIX + wallet)
+                self._subscribed.set()
+            except Exception as e:
+                logger.warning(f"Failed to subscribe websocket channel for {wallet_address}: {e}")
+        logger.info(f"WebSocket connected for wallet: {wallet_address} ({len(connections)} local connections)")
+
+    async def disconnect(self, wallet_address: str, websocket: Optional[WebSocket] = None):
+        """Remove one connection of a wallet (all of them if websocket is None)."""
+        wallet = _wallet_key(wallet_address)
+        connections = self.active_connections.get(wallet)
+        if connections is None:
+            return
+        for ws in list(connections) if websocket is None else [websocket]:
+            writer = connections.pop(ws, None)
+            if writer is not None:
+                writer.close()
+        if connections:
+            return
+
+        del self.active_connections[wallet]
+        logger.info(f"WebSocket disconnected for wallet: {wallet_address}")
+        if self._pubsub is not None:
+            if not self.active_connections:
+                self._subscribed.clear()
+            try:
+                await self._pubsub.unsubscribe(CHANNEL_PREFIX + wallet)
+            except Exception as e:
+                logger.warning(f"Failed to unsubscribe websocket channel for {wallet_address}: {e}")
+
+    def connection_count(self, wallet_address: str) -> int:
+        """Number of connections this worker holds for a wallet."""
+        return len(self.active_connections.get(_wallet_key(wallet_address), ()))
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _enqueue_local(self, wallet: str, frame: str, key: Optional[str]) -> None:
+        for writer in list(self.active_connections.get(wallet, {}).values()):
+            writer.enqueue(frame, key)
+
+    def send_to(self, wallet_address: str, websocket: WebSocket, message: Dict[str, Any]) -> bool:
+        """Deliver a message to one local connection only (e.g. the reply to its command)."""
+        writer = self.active_connections.get(_wallet_key(wallet_address), {}).get(websocket)
+        if writer is None:
+            return False
+        return writer.enqueue(_dumps(message), _coalesce_key(message))
+
+    async def _deliver(
+        self, wallet_address: str, message: Dict[str, Any], websocket: Optional[WebSocket],
+    ) -> None:
+        if websocket is not None:
+            self.send_to(wallet_address, websocket, message)
+        else:
+            await self.publish(wallet_address, message)
+
+    async def publish(self, wallet_address: str, message: Dict[str, Any]) -> None:
+        """Deliver a message to every connection of a wallet, on any worker."""
+        wallet = _wallet_key(wallet_address)
+        frame = _dumps(message)  # Serialized once for every connection and worker
+        key = _coalesce_key(message)
+        self._enqueue_local(wallet, frame, key)
+
+        client = await self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.publish(
+                CHANNEL_PREFIX + wallet,
+                _dumps({"origin": self.worker_id, "key": key, "frame": frame}),
+            )
+        except Exception as e:
+            logger.warning(f"Failed to publish websocket message for {wallet_address}: {e}")
+
+    async def send_progress(
+        self,
+        wallet_address: str,
+        stage: str,
+        completion: int,
+        details: str = "",
+        type: str = "progress",
+        request_id: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+    ):
+        """Send progress update to a wallet (or only to ``websocket``)"""
+        await self._deliver(wallet_address, _tag({
+            "type": type,
+            "data": {
+                "stage": stage,
+                "completion": completion,
+                "details": details,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        }, request_id), websocket)
+
+    async def send_data(
+        self,
+        wallet_address: str,
+        data: Dict[str, Any],
+        data_type: str = "result",
+        request_id: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+    ):
+        """Send data payload to a wallet (or only to ``websocket``)"""
+        await self._deliver(wallet_address, _tag({
+            "type": data_type,
+            "data": data
+        }, request_id), websocket)
+
+    async def send_error(
+        self,
+        wallet_address: str,
+        error_message: str,
+        error_code: str = "ERROR",
+        request_id: Optional[str] = None,
+        websocket: Optional[WebSocket] = None,
+    ):
+        """Send error message to a wallet (or only to ``websocket``)"""
+        await self._deliver(wallet_address, _tag({
+            "type": "error",
+            "data": {
+                "message": error_message,
+                "code": error_code,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        }, request_id), websocket)
+
+
+# Global instance
+websocket_hub = WebSocketHub(
+    max_queue=int(os.getenv("WS_SEND_QUEUE_SIZE", "100")),
+    overflow_policy=os.getenv("WS_OVERFLOW_POLICY", OVERFLOW_DROP_PROGRESS),
+)
+
+
+async def publish_to_wallet(wallet_address: str, data: Dict[str, Any], data_type: str = "result") -> None:
+    """Push a payload to a wallet's websocket connections from any worker or background job."""
+    await websocket_hub.send_data(wallet_address, data, data_type=data_type)
@@ -0,0 +1,29 @@
+-- Migration: Create payment_actions table
+-- Version: 002
+-- Date: 2026-10-18
+-- Description: Creates the payment_actions table backing SQLStorageBackend (app/domains/payment_actions/sql_storage.py)
+
+CREATE TABLE IF NOT EXISTS payment_actions (
+    id VARCHAR(64) PRIMARY KEY,
+    wallet_address VARCHAR(255) NOT NULL,
+    action_type VARCHAR(20) NOT NULL,  -- 'send' | 'recurring' | 'template' | 'shortcut'
+    is_enabled BOOLEAN NOT NULL DEFAULT TRUE,
+    next_run_at TIMESTAMP,  -- NULL for actions the keeper never runs
+    ticket_id VARCHAR(255),  -- Ticket of the latest execution
+    usage_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL,
+    last_used TIMESTAMP,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    data TEXT NOT NULL  -- Full PaymentAction JSON document
+);
+
+-- Create indices for common queries
+CREATE INDEX IF NOT EXISTS idx_payment_actions_wallet ON payment_actions(wallet_address, id);
+CREATE INDEX IF NOT EXISTS idx_payment_actions_due ON payment_actions(action_type, is_enabled, next_run_at);
+CREATE INDEX IF NOT EXISTS idx_payment_actions_ticket ON payment_actions(ticket_id);
+
+-- Add comment for documentation
+COMMENT ON TABLE payment_actions IS 'User payment actions (sends, recurring payments, templates, shortcuts)';
+COMMENT ON COLUMN payment_actions.next_run_at IS 'Next keeper execution time (UTC), maintained on every write';
+COMMENT ON COLUMN payment_actions.ticket_id IS 'Ticket ID of the most recent keeper execution';
+COMMENT ON COLUMN payment_actions.data IS 'Serialized PaymentAction model';
@@ -0,0 +1,42 @@
+"""Shared test fixtures."""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from app.domains.payment_actions.models import PaymentAction, PaymentActionType
+
+WALLET = "0xwallet"
+
+
+@pytest.fixture
+def make_action():
+    """Factory for payment actions: ``make_action(i, wallet=..., **fields)``, id ``action_{i}``."""
+    def make(i, wallet=WALLET, **fields):
+        values = {
+            "id": f"action_{i}",
+            "wallet_address": wallet,
+            "name": f"Action {i}",
+            "action_type": PaymentActionType.SEND,
+            "recipient_address": "0xrecipient",
+            "amount": "1",
+            "token": "USDC",
+            "chain_id": 8453,
+            "created_at": datetime.utcnow(),
+        }
+        values.update(fields)
+        return PaymentAction(**values)
+
+    return make
+
+
+@pytest.fixture
+def wait_for():
+    """Poll ``condition`` until it is truthy; fails after ``timeout`` seconds."""
+    async def wait(condition, timeout=2.0):
+        async def poll():
+            while not condition():
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(poll(), timeout)
+
+    return wait
@@ -0,0 +1,137 @@
+"""Test background bridge status tracking."""
+import time
+import pytest
+
+from app.services.bridge_status_tracker import (
+    BridgeStatusTracker,
+    MemoryTransferStore,
+    PROTOCOL_AXELAR_GMP,
+    PROTOCOL_CCTP,
+)
+from app.services.axelar_gmp_service import axelar_gmp_service
+from app.services.cctp_attestation_poller import cctp_attestation_poller
+
+
+WALLET = "0x1234567890abcdef1234567890abcdef12345678"
+
+
+def make_tracker(**kwargs):
+    return BridgeStatusTracker(store=MemoryTransferStore(), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_register_and_attach_by_bridge_id():
+    """Hashes attach to the transfer named by the bridge ID."""
+    tracker = make_tracker()
+    first = await tracker.register(WALLET, PROTOCOL_AXELAR_GMP, 8453, 42161)
+    second = await tracker.register(WALLET, PROTOCOL_CCTP, 8453, 42161)
+
+    assert (await tracker.get_status(first))["status"] == "awaiting_signature"
+    assert await tracker.attach_tx_hash(WALLET, "0xabc", first) == first
+    assert (await tracker.get_status(first))["source_tx_hash"] == "0xabc"
+    assert (await tracker.get_status(second))["source_tx_hash"] is None
+
+    # No bridge ID, no guessing
+    assert await tracker.attach_tx_hash(WALLET, "0xdef", None) is None
+    # Other wallets cannot attach to someone else's transfer
+    assert await tracker.attach_tx_hash("0xother", "0xdef", second) is None
+
+
+@pytest.mark.asyncio
+async def test_transfers_are_shared_through_the_store():
+    """A transfer registered by one worker is attached and checked by another."""
+    store = MemoryTransferStore()
+    worker_a = BridgeStatusTracker(store=store)
+    worker_b = BridgeStatusTracker(store=store)
+
+    bridge_id = await worker_a.register(WALLET, PROTOCOL_AXELAR_GMP, 8453, 42161)
+    assert await worker_b.attach_tx_hash(WALLET, "0xabc", bridge_id) == bridge_id
+    assert (await worker_a.get_status(bridge_id))["source_tx_hash"] == "0xabc"
+
+    # A due check is claimed by one worker only
+    later = time.time() + 60
+    claimed = await worker_a._due_transfers(later)
+    assert [t.bridge_id for t in claimed] == [bridge_id]
+    assert await worker_b._due_transfers(later) == []
+
+
+@pytest.mark.asyncio
+async def test_only_source_step_hashes_are_tracked(monkeypatch):
+    """Approve hashes are never registered with the attestation poller as burns."""
+    tracker = make_tracker()
+    bridge_id = await tracker.register(WALLET, PROTOCOL_CCTP, 8453, 42161)
+
+    assert await tracker.attach_tx_hash(WALLET, "0xapprove", bridge_id, step_type="approve") == bridge_id
+    assert (await tracker.get_status(bridge_id))["source_tx_hash"] is None
+
+    # Without a step type a later hash replaces (and untracks) the earlier one
+    monkeypatch.setattr(cctp_attestation_poller, "_ensure_running", lambda: None)
+    await tracker.attach_tx_hash(WALLET, "0xapprove", bridge_id)
+    cctp_attestation_poller.track_transaction(8453, "0xapprove")
+    await tracker.attach_tx_hash(WALLET, "0xburn", bridge_id, step_type="burn_and_mint")
+    assert (await tracker.get_status(bridge_id))["source_tx_hash"] == "0xburn"
+    assert "0xapprove" not in cctp_attestation_poller._pending_burns
+
+
+@pytest.mark.asyncio
+async def test_adaptive_interval_backs_off_when_overdue():
+    """Polling is dense near the expected time and backs off afterwards."""
+    tracker = make_tracker(min_poll_interval=1.0, max_poll_interval=300.0)
+    bridge_id = await tracker.register(WALLET, PROTOCOL_AXELAR_GMP, 8453, 42161, tx_hash="0xabc")
+    transfer = await tracker._load(bridge_id)
+    start = transfer.submitted_at
+
+    early = tracker._next_interval(transfer, start + 10)
+    around_expected = tracker._next_interval(transfer, start + transfer.expected_seconds)
+    transfer.last_interval = around_expected
+    overdue = tracker._next_interval(transfer, start + transfer.expected_seconds * 2)
+
+    assert around_expected < early
+    assert overdue == around_expected * 2
+
+
+@pytest.mark.asyncio
+async def test_axelar_transition_is_pushed(monkeypatch):
+    """Status transitions are pushed through the notifier."""
+    tracker = make_tracker()
+    pushed = []
+
+    async def notifier(wallet_address, payload):
+        pushed.append((wallet_address, payload))
+
+    async def fake_track(tx_hash, source_chain_id, dest_chain_id):
+        return {"success": True, "status": "executed", "executed": True, "dest_tx_hash": "0xdest"}
+
+    monkeypatch.setattr(axelar_gmp_service, "track_gmp_transaction", fake_track)
+    tracker.set_notifier(notifier)
+
+    bridge_id = await tracker.register(WALLET, PROTOCOL_AXELAR_GMP, 8453, 42161, tx_hash="0xabc")
+    await tracker._check(await tracker._load(bridge_id))
+
+    assert len(pushed) == 1
+    wallet, payload = pushed[0]
+    assert wallet == WALLET
+    assert payload["status"] == "completed"
+    assert payload["destination_tx_hash"] == "0xdest"
+    assert all(step["status"] == "confirmed" for step in payload["steps"])
+
+    # Terminal transfers are no longer due
+    assert await tracker._due_transfers(time.time() + 3600) == []
+
+
+@pytest.mark.asyncio
+async def test_cctp_attestation_completes_transfer(monkeypatch):
+    """A complete Circle attestation completes a CCTP transfer."""
+    tracker = make_tracker()
+
+    def fake_status(source_chain_id, tx_hash):
+        return {"status": "complete", "attestations": [{"attestation": "0xsig"}]}
+
+    monkeypatch.setattr(cctp_attestation_poller, "get_transaction_status", fake_status)
+
+    bridge_id = await tracker.register(WALLET, PROTOCOL_CCTP, 8453, 42161, tx_hash="0xburn")
+    await tracker._check(await tracker._load(bridge_id))
+
+    status = await tracker.get_status(bridge_id)
+    assert status["status"] == "completed"
+    assert status["current_step"] == 3
@@ -0,0 +1,125 @@
+"""Test the shared CCTP attestation poller."""
+import asyncio
+import pytest
+
+from app.services.cctp_attestation_poller import CCTPAttestationPoller, compute_message_hash
+from app.services.circle_cctp_service import circle_cctp_service
+
+
+MESSAGE = "0x" + "ab" * 64
+MESSAGE_HASH = compute_message_hash(MESSAGE)
+
+
+@pytest.fixture
+def poller(monkeypatch):
+    """Poller with an isolated cache and no Redis."""
+    poller = CCTPAttestationPoller(poll_interval=0.01)
+    poller._attestations = {}
+
+    async def no_redis():
+        return None
+
+    monkeypatch.setattr(poller, "_get_redis", no_redis)
+    return poller
+
+
+@pytest.mark.asyncio
+async def test_burn_lookup_completes_and_caches(poller, monkeypatch):
+    """One burn lookup resolves the transaction and caches the attestation."""
+    calls = []
+
+    async def fake_messages(source_chain_id, tx_hash):
+        calls.append((source_chain_id, tx_hash))
+        return [{"message": MESSAGE, "attestation": "0xsig", "status": "complete"}]
+
+    monkeypatch.setattr(circle_cctp_service, "get_transfer_messages", fake_messages)
+
+    # Registering the burn starts the shared loop
+    assert poller.get_transaction_status(8453, "0xBURN")["status"] == "pending"
+    await asyncio.sleep(0.05)
+
+    status = poller.get_transaction_status(8453, "0xburn")
+    assert status["status"] == "complete"
+    assert status["attestations"][0]["attestation"] == "0xsig"
+    assert poller.get_cached(MESSAGE_HASH)["message"] == MESSAGE
+
+    # Completed burns are not polled again
+    await asyncio.sleep(0.05)
+    assert len(calls) == 1
+    await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_one_lookup(poller, monkeypatch):
+    """Concurrent waiters for the same message share the polling loop."""
+    lookups = []
+
+    async def fake_attestation(message_hash):
+        lookups.append(message_hash)
+        if len(lookups) < 2:
+            return {"status": "pending_confirmations", "attestation": None}
+        return {"status": "complete", "attestation": "0xsig"}
+
+    monkeypatch.setattr(circle_cctp_service, "get_attestation", fake_attestation)
+
+    results = await asyncio.gather(
+        poller.wait_for_attestation(MESSAGE_HASH, timeout=2),
+        poller.wait_for_attestation(MESSAGE_HASH, timeout=2),
+        poller.wait_for_attestation(MESSAGE_HASH, timeout=2),
+    )
+
+    assert all(r["attestation"] == "0xsig" for r in results)
+    assert len(lookups) == 2
+
+    # Cached afterwards without another lookup
+    cached = await poller.wait_for_attestation(MESSAGE_HASH, timeout=0.1)
+    assert cached["attestation"] == "0xsig"
+    assert len(lookups) == 2
+    await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out(poller, monkeypatch):
+    """Waiting on a message that never gets attested times out."""
+    async def never(message_hash):
+        return None
+
+    monkeypatch.setattr(circle_cctp_service, "get_attestation", never)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await poller.wait_for_attestation(MESSAGE_HASH, timeout=0.05)
+    await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_abandoned_messages_stop_being_polled(poller, monkeypatch):
+    """A message is dropped once its last waiter times out."""
+    async def never(message_hash):
+        return None
+
+    monkeypatch.setattr(circle_cctp_service, "get_attestation", never)
+
+    first = asyncio.ensure_future(poller.wait_for_attestation(MESSAGE_HASH, timeout=0.2))
+    with pytest.raises(asyncio.TimeoutError):
+        await poller.wait_for_attestation(MESSAGE_HASH, timeout=0.05)
+    # Another caller is still waiting
+    assert MESSAGE_HASH in poller._pending_messages
+
+    with pytest.raises(asyncio.TimeoutError):
+        await first
+    assert poller._waiters == {} and poller._pending_messages == {}
+    await poller.stop()
+
+
+@pytest.mark.asyncio
+async def test_messages_give_up_after_pending_timeout(poller, monkeypatch):
+    async def never(message_hash):
+        return None
+
+    monkeypatch.setattr(circle_cctp_service, "get_attestation", never)
+    poller.pending_timeout = 0.05
+
+    with pytest.raises(asyncio.TimeoutError):
+        await poller.wait_for_attestation(MESSAGE_HASH, timeout=5)
+    assert poller._pending_messages == {}
+    await poller.stop()
@@ -0,0 +1,81 @@
+"""Test the rolling, token-budgeted conversation context."""
+import pytest
+
+from app.services.chat_history import (
+    ChatHistoryService,
+    ConversationContext,
+    estimate_tokens,
+    summarize_entry,
+)
+from tests.test_chat_history_store import FakeListRedis
+
+WALLET = "0xwallet"
+
+
+def _response(i):
+    return {
+        "content": {"type": "swap_confirmation", "message": f"Swap {i} ready"},
+        "transaction": {"data": "0x" + "ab" * 2000, "to": "0xrouter"},
+        "metadata": {"quote": list(range(200))},
+    }
+
+
+def test_summary_drops_payloads():
+    entry = {"command": "swap   1 ETH\nfor USDC", "response": _response(1)}
+    assert summarize_entry(entry) == "User: swap 1 ETH for USDC\nAssistant: Swap 1 ready\n---\n"
+    long = summarize_entry({"command": "x" * 5000, "response": {"content": "ok"}})
+    assert len(long) < 500
+
+
+def test_render_respects_budget_and_caches():
+    context = ConversationContext(max_turns=50)
+    for i in range(20):
+        context.append({"command": f"message {i}", "response": _response(i)})
+
+    rendered = context.render(60)
+    assert estimate_tokens(rendered) <= 60 + 2
+    assert rendered.startswith(ConversationContext.HEADER)
+    assert rendered.rstrip().endswith("Swap 19 ready\n---")
+    assert "message 0" not in rendered
+    assert context.render(60) is rendered
+
+    context.append({"command": "message 20", "response": {"content": "done"}})
+    assert "message 20" in context.render(60)
+    assert ConversationContext(5).render(100) == ""
+
+
+@pytest.mark.asyncio
+async def test_memory_context_updates_incrementally(monkeypatch):
+    service = ChatHistoryService(redis_url="")
+    await service.add_entry(WALLET, None, "swap", "message 0", _response(0))
+    assert "message 0" in await service.get_context(WALLET, None)
+
+    # Later turns update the rolling context without re-reading history
+    monkeypatch.setattr(service, "_tail", None)
+    await service.add_entry(WALLET, None, "swap", "message 1", _response(1))
+    assert "message 1" in await service.get_context(WALLET, None)
+    assert await service.get_context("0xnobody", None) == ""
+
+
+def _redis_service(client):
+    service = ChatHistoryService(redis_url="redis://fake")
+    service.redis = client
+    service._connected = True
+    return service
+
+
+@pytest.mark.asyncio
+async def test_redis_context_follows_other_workers():
+    shared = FakeListRedis()
+    worker_a, worker_b = _redis_service(shared), _redis_service(shared)
+
+    await worker_a.add_entry(WALLET, None, "swap", "message 0", _response(0))
+    assert "message 0" in await worker_a.get_context(WALLET, None)
+
+    shared.commands.clear()
+    await worker_a.add_entry(WALLET, None, "swap", "message 1", _response(1))
+    assert "message 1" in await worker_a.get_context(WALLET, None)
+    assert "lrange" not in shared.commands  # served from the rolling context
+
+    await worker_b.add_entry(WALLET, None, "swap", "message 2", _response(2))
+    assert "message 2" in await worker_a.get_context(WALLET, None)
@@ -0,0 +1,124 @@
+"""Test the async list-based chat history store and its in-memory fallback."""
+import pytest
+
+from app.services.chat_history import ChatHistoryService
+
+WALLET = "0xwallet"
+
+
+class FakeListRedis:
+    """Minimal async Redis with list commands; records every command issued."""
+
+    def __init__(self):
+        self.lists = {}
+        self.strings = {}
+        self.commands = []
+
+    async def lrange(self, key, start, end):
+        self.commands.append("lrange")
+        items = self.lists.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        return items[start:end] if start >= 0 else items[max(len(items) + start, 0):end]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def set(self, key, value, ex=None):
+        self.strings[key] = value
+
+    async def get(self, key):
+        self.commands.append("get")
+        return self.strings.get(key)
+
+    async def delete(self, key):
+        self.strings.pop(key, None)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.ops = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def rpush(self, key, value):
+        self.ops.append(("rpush", key, value))
+
+    def ltrim(self, key, start, end):
+        self.ops.append(("ltrim", key, start))
+
+    def expire(self, key, seconds):
+        self.ops.append(("expire", key, seconds))
+
+    def incr(self, key):
+        self.ops.append(("incr", key, None))
+
+    async def execute(self):
+        results = []
+        for op, key, arg in self.ops:
+            self.client.commands.append(op)
+            if op == "rpush":
+                self.client.lists.setdefault(key, []).append(arg)
+            elif op == "ltrim":
+                self.client.lists[key] = self.client.lists[key][arg:]
+            elif op == "incr":
+                self.client.strings[key] = str(int(self.client.strings.get(key, 0)) + 1)
+                results.append(int(self.client.strings[key]))
+                continue
+            results.append(True)
+        return results
+
+
+def _redis_service(**kwargs):
+    service = ChatHistoryService(redis_url="redis://fake", **kwargs)
+    service.redis = FakeListRedis()
+    service._connected = True
+    return service
+
+
+@pytest.mark.asyncio
+async def test_redis_appends_without_reading_history():
+    service = _redis_service(max_entries=3)
+    for i in range(5):
+        await service.add_entry(WALLET, None, "general", f"message {i}", {"content": f"reply {i}"})
+
+    # Writes never read the existing history back
+    assert "lrange" not in service.redis.commands
+    history = await service.get_history(WALLET, None)
+    assert [e["command"] for e in history] == ["message 2", "message 3", "message 4"]
+
+    context = await service.get_context(WALLET, None)
+    assert "message 1" not in context
+    assert "User: message 3\nAssistant: reply 3" in context
+
+
+@pytest.mark.asyncio
+async def test_memory_fallback_is_bounded():
+    service = ChatHistoryService(redis_url="", max_entries=2, max_conversations=2)
+    for wallet in ("0xa", "0xb", "0xc"):
+        for i in range(3):
+            await service.add_entry(wallet, None, "greeting" if i == 2 else "general", f"{wallet} {i}", {})
+
+    assert await service.get_history("0xa", None) == []  # evicted
+    assert [e["command"] for e in await service.get_history("0xc", None)] == ["0xc 1", "0xc 2"]
+    assert not await service.should_respond_to_greeting("0xc", None, "hi")
+
+
+@pytest.mark.asyncio
+async def test_memory_entries_expire():
+    service = ChatHistoryService(redis_url="", ttl_seconds=-1)
+    await service.add_entry(WALLET, None, "general", "hello", {})
+    assert await service.get_history(WALLET, None) == []
+
+
+@pytest.mark.asyncio
+async def test_pending_transaction_roundtrip():
+    for service in (ChatHistoryService(redis_url=""), _redis_service()):
+        await service.store_pending_transaction(WALLET, None, "swap", {"amount": "1"})
+        assert (await service.get_pending_transaction(WALLET, None))["data"] == {"amount": "1"}
+        await service.clear_pending_transaction(WALLET, None)
+        assert await service.get_pending_transaction(WALLET, None) is None
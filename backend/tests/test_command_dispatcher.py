@@ -0,0 +1,120 @@
+"""Test concurrent, cancellable per-connection command dispatch."""
+import asyncio
+import json
+import pytest
+
+from app.services.command_dispatcher import CommandDispatcher
+from app.services.websocket_hub import WebSocketHub
+
+
+@pytest.mark.asyncio
+async def test_quick_command_is_not_stuck_behind_slow_one():
+    dispatcher = CommandDispatcher(max_concurrent=2)
+    done = []
+    release = asyncio.Event()
+
+    async def research():
+        await release.wait()
+        done.append("research")
+
+    async def balance():
+        done.append("balance")
+
+    assert dispatcher.submit("r1", research)
+    assert dispatcher.submit("r2", balance)
+    await asyncio.sleep(0)
+    assert done == ["balance"]
+
+    release.set()
+    await asyncio.sleep(0)
+    assert done == ["balance", "research"]
+    assert len(dispatcher) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_pending_limit():
+    dispatcher = CommandDispatcher(max_concurrent=2, max_pending=3)
+    running, peak = 0, 0
+    release = asyncio.Event()
+
+    async def command():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await release.wait()
+        running -= 1
+
+    assert all(dispatcher.submit(f"r{i}", command) for i in range(3))
+    assert dispatcher.full
+    assert not dispatcher.submit("r3", command)
+    assert not dispatcher.submit("r0", command)  # duplicate id
+
+    await asyncio.sleep(0)
+    release.set()
+    while len(dispatcher):
+        await asyncio.sleep(0)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_cancel_in_flight_and_on_disconnect():
+    dispatcher = CommandDispatcher()
+    cancelled = []
+
+    async def slow(name):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(name)
+            raise
+
+    dispatcher.submit("a", lambda: slow("a"))
+    dispatcher.submit("b", lambda: slow("b"))
+    await asyncio.sleep(0)
+
+    assert dispatcher.cancel("a")
+    assert not dispatcher.cancel("missing")
+    await asyncio.sleep(0)
+    assert cancelled == ["a"]
+    assert "a" not in dispatcher
+
+    await dispatcher.cancel_all()
+    assert cancelled == ["a", "b"]
+    assert len(dispatcher) == 0
+
+
+class RecordingWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.unblocked = asyncio.Event()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await self.unblocked.wait()
+        self.sent.append(json.loads(frame))
+
+
+@pytest.mark.asyncio
+async def test_progress_of_concurrent_requests_is_not_merged():
+    hub = WebSocketHub()
+    hub._redis_retry_at = float("inf")
+    ws = RecordingWebSocket()
+    await hub.connect("0xwallet", ws)
+
+    await hub.send_data("0xwallet", {}, data_type="ack")  # Occupies the writer
+    await asyncio.sleep(0)
+    await hub.send_progress("0xwallet", "Thinking...", 10, type="agent_status", request_id="r1")
+    await hub.send_progress("0xwallet", "Thinking...", 10, type="agent_status", request_id="r2")
+    await hub.send_data("0xwallet", {"ok": True}, data_type="agent_response", request_id="r1")
+
+    ws.unblocked.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+    assert [(m["type"], m.get("request_id")) for m in ws.sent] == [
+        ("ack", None),
+        ("agent_status", "r1"),
+        ("agent_status", "r2"),
+        ("agent_response", "r1"),
+    ]
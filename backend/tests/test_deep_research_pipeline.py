@@ -0,0 +1,124 @@
+"""Test the concurrent, streaming deep-research pipeline."""
+import asyncio
+import pytest
+
+from app.services.external.firecrawl_service import get_multi_protocol_details
+from app.services.research.deep_research import DeepResearchPipeline, score_source
+
+DOC = "Aave is a decentralized lending protocol. " * 50
+
+
+class FakeFirecrawlClient:
+    """Scrapes take a per-URL delay; tracks concurrency and cancellations."""
+
+    def __init__(self, delays, content=DOC):
+        self.delays = delays
+        self.content = content
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.cancelled = []
+
+    async def search_urls(self, query, max_urls=3):
+        return list(self.delays)[:max_urls]
+
+    async def scrape(self, url, use_llm_extraction=False, extraction_schema=None, cache=True):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays[url])
+        except asyncio.CancelledError:
+            self.cancelled.append(url)
+            raise
+        finally:
+            self.in_flight -= 1
+        return {"success": True, "data": {"markdown": self.content}}
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.analyzed = []
+
+    async def analyze_scraped_content(self, protocol_name, raw_content, source_url=""):
+        self.analyzed.append(source_url)
+        return {"analysis_success": True, "ai_summary": f"Summary of {source_url}\nDetails..."}
+
+
+@pytest.mark.asyncio
+async def test_stops_early_once_confident_sources_are_summarised():
+    client = FakeFirecrawlClient({
+        "https://docs.aave.com": 0.01,
+        "https://aave.com/about": 0.02,
+        "https://blog.example.com/aave": 0.03,
+        "https://slow.example.com/aave": 5.0,
+    })
+    analyzer = FakeAnalyzer()
+    updates = []
+
+    async def status(message, progress):
+        updates.append(message)
+
+    pipeline = DeepResearchPipeline(client, analyzer, scrape_budget=4, min_confident_sources=2)
+    result = await asyncio.wait_for(pipeline.run("aave", status_callback=status), 1.0)
+
+    assert result["stopped_early"]
+    assert [f.source_url for f in result["findings"]] == ["https://docs.aave.com", "https://aave.com/about"]
+    assert "https://slow.example.com/aave" in client.cancelled
+    # Each finding is streamed as it completes
+    assert updates[1:] == [
+        "Finding from docs.aave.com: Summary of https://docs.aave.com",
+        "Finding from aave.com: Summary of https://aave.com/about",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_scrapes_respect_budget_and_analysis_does_not_wait_for_slowest():
+    delays = {f"https://site{i}.example.com": 0.05 for i in range(5)}
+    delays["https://site0.example.com"] = 0.3
+    client = FakeFirecrawlClient(delays)
+    analyzer = FakeAnalyzer()
+
+    pipeline = DeepResearchPipeline(client, analyzer, scrape_budget=2, min_confident_sources=10)
+    result = await pipeline.run("aave")
+
+    assert client.max_in_flight == 2
+    assert len(result["findings"]) == 5
+    assert result["sources_scraped"] == 5
+    # The slow source finished last; everything else was analysed before it
+    assert analyzer.analyzed[-1] == "https://site0.example.com"
+
+
+@pytest.mark.asyncio
+async def test_time_budget_returns_what_has_arrived():
+    client = FakeFirecrawlClient({"https://docs.aave.com": 0.01, "https://hang.example.com": 10})
+    pipeline = DeepResearchPipeline(client, FakeAnalyzer(), time_budget=0.2)
+
+    result = await pipeline.run("aave")
+    assert result["stopped_early"]
+    assert [f.source_url for f in result["findings"]] == ["https://docs.aave.com"]
+    assert client.cancelled == ["https://hang.example.com"]
+
+
+def test_score_source_prefers_substantial_docs():
+    assert score_source("https://docs.aave.com", DOC) > score_source("https://blog.example.com", DOC)
+    assert score_source("https://docs.aave.com", "short") < 0.75
+    assert score_source("https://app.aave.com", DOC) < score_source("https://aave.com/about", DOC)
+
+
+@pytest.mark.asyncio
+async def test_multi_protocol_details_run_concurrently(monkeypatch):
+    running, peak = 0, 0
+
+    async def fake_details(client, name, use_llm_extraction=True):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"protocol_name": name, "scraping_success": name != "bad"}
+
+    monkeypatch.setattr("app.services.external.firecrawl_service.get_protocol_details", fake_details)
+    result = await get_multi_protocol_details(None, ["aave", "bad", "curve", "lido"], max_concurrent=3)
+
+    assert peak == 3
+    assert [p["protocol_name"] for p in result["protocols"]] == ["aave", "bad", "curve", "lido"]
+    assert result["protocols_scraped"] == 3
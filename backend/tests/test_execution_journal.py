@@ -0,0 +1,198 @@
+"""Test the durable execution journal and idempotent webhook handling."""
+import asyncio
+import pytest
+
+from app.domains.payment_actions.execution_journal import (
+    SOURCE_KEEPER,
+    SOURCE_WEBHOOK,
+    ExecutionJournal,
+)
+from app.domains.payment_actions.webhooks import (
+    WebhookEventType,
+    WebhookExecutionRecord,
+    WebhookRequest,
+    WebhookResponse,
+)
+from app.services.webhook_service import WebhookService
+
+WALLET = "0xwallet"
+
+
+def _record(i, wallet=WALLET, action_id="action_1"):
+    return {"wallet_address": wallet, "action_id": action_id, "status": "submitted", "n": i}
+
+
+@pytest.mark.asyncio
+async def test_journal_survives_restart_and_indexes(tmp_path):
+    path = str(tmp_path / "journal.db")
+    journal = ExecutionJournal(db_path=path)
+    await asyncio.gather(*(journal.append(SOURCE_WEBHOOK, _record(i), request_id=f"req-{i}") for i in range(5)))
+    await journal.append(SOURCE_KEEPER, _record(5, action_id="action_2"))
+    await journal.append(SOURCE_WEBHOOK, _record(6, wallet="0xother"))
+    journal.close()
+
+    reopened = ExecutionJournal(db_path=path)
+    by_wallet = await reopened.get_by_wallet(WALLET, source=SOURCE_WEBHOOK, limit=3)
+    assert [r["n"] for r in by_wallet] == [4, 3, 2]
+    assert [r["n"] for r in await reopened.get_by_action("action_2")] == [5]
+
+    plan = reopened._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM execution_journal WHERE action_id = ? ORDER BY seq DESC",
+        ("action_2",),
+    ).fetchall()
+    assert "idx_execution_journal_action" in str(plan)
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_replay_resumes_from_cursor():
+    journal = ExecutionJournal()
+    for i in range(7):
+        await journal.append(SOURCE_WEBHOOK, _record(i))
+
+    seen, seq = [], 0
+    while True:
+        entries, seq = await journal.replay(after_seq=seq, limit=3)
+        if not entries:
+            break
+        seen.extend(e["record"]["n"] for e in entries)
+    assert seen == list(range(7))
+    assert (await journal.replay(after_seq=seq)) == ([], seq)
+
+
+@pytest.mark.asyncio
+async def test_claim_complete_release():
+    journal = ExecutionJournal()
+    assert (await journal.claim("k", "req-1")).acquired
+
+    pending = await journal.claim("k", "req-2")
+    assert pending.in_progress and pending.request_id == "req-1"
+
+    await journal.complete("k", {"ok": True})
+    done = await journal.claim("k", "req-3")
+    assert not done.acquired and done.response == {"ok": True}
+
+    await journal.release("k")
+    assert (await journal.claim("k", "req-4")).acquired
+
+    expired = ExecutionJournal(idempotency_ttl=0)
+    await expired.claim("k", "req-1")
+    await expired.complete("k", {"ok": True})
+    await asyncio.sleep(0.001)
+    assert (await expired.claim("k", "req-2")).acquired
+
+
+@pytest.mark.asyncio
+async def test_lapsed_in_progress_claims_are_taken_over():
+    journal = ExecutionJournal(claim_lease=0.2)
+    assert (await journal.claim("k", "req-1")).acquired
+    assert (await journal.claim("k", "req-2")).in_progress
+
+    # A long-running owner keeps its claim by renewing the lease
+    await asyncio.sleep(0.12)
+    assert await journal.renew("k", "req-1")
+    await asyncio.sleep(0.12)
+    assert (await journal.claim("k", "req-2")).in_progress
+
+    # The owner crashed: once the lease lapses a redelivery runs
+    await asyncio.sleep(0.15)
+    takeover = await journal.claim("k", "req-2")
+    assert takeover.acquired and takeover.request_id == "req-2"
+    assert not await journal.renew("k", "req-1")
+
+    # Completed responses outlive the lease (until idempotency_ttl)
+    await journal.complete("k", {"ok": True})
+    await asyncio.sleep(0.25)
+    assert (await journal.claim("k", "req-3")).response == {"ok": True}
+
+
+def test_journals_without_lease_column_are_upgraded(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "journal.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE webhook_idempotency (key TEXT PRIMARY KEY, request_id TEXT NOT NULL, "
+        "response TEXT, created_us INTEGER NOT NULL)"
+    )
+    conn.close()
+
+    journal = ExecutionJournal(db_path=path)
+    assert asyncio.run(journal.claim("k", "req-1")).acquired
+    journal.close()
+
+
+class CountingService(WebhookService):
+    def __init__(self, journal, succeed=True):
+        super().__init__(journal=journal)
+        self.service = self.executor = object()
+        self.calls = 0
+        self.succeed = succeed
+
+    async def _dispatch(self, request):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        await self._record_execution(WebhookExecutionRecord(
+            request_id=request.request_id,
+            event_type=request.event_type,
+            wallet_address=WALLET,
+            status="submitted",
+        ))
+        return WebhookResponse(success=self.succeed, request_id=request.request_id, message="done")
+
+
+def _request(request_id, wallet=WALLET, action_id="action_1"):
+    return WebhookRequest(
+        event_type=WebhookEventType.EXECUTE_ACTION,
+        request_id=request_id,
+        payload={"wallet_address": wallet, "action_id": action_id},
+    )
+
+
+@pytest.mark.asyncio
+async def test_duplicate_deliveries_run_once():
+    service = CountingService(ExecutionJournal())
+
+    first, concurrent = await asyncio.gather(
+        service.handle_webhook(_request("req-1"), idempotency_key="delivery-1"),
+        service.handle_webhook(_request("req-2"), idempotency_key="delivery-1"),
+    )
+    assert first.success and not concurrent.success
+    assert "in progress" in concurrent.error
+
+    redelivered = await service.handle_webhook(_request("req-3"), idempotency_key="delivery-1")
+    assert redelivered.success and redelivered.request_id == "req-1"
+    assert service.calls == 1
+    assert len(await service.get_execution_history(WALLET)) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_requests_can_be_retried():
+    service = CountingService(ExecutionJournal(), succeed=False)
+    await service.handle_webhook(_request("req-1"), idempotency_key="delivery-1")
+    service.succeed = True
+    retried = await service.handle_webhook(_request("req-2"), idempotency_key="delivery-1")
+    assert retried.success and service.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_idempotency_keys_are_scoped_by_agent_and_wallet():
+    service = CountingService(ExecutionJournal())
+    other_wallet = "0x" + "b" * 40
+
+    await service.handle_webhook(_request("req-1"), idempotency_key="delivery-1", agent_id="agent-a")
+    await service.handle_webhook(_request("req-2"), idempotency_key="delivery-1", agent_id="agent-b")
+    await service.handle_webhook(_request("req-3", wallet=other_wallet), idempotency_key="delivery-1", agent_id="agent-a")
+    assert service.calls == 3
+
+    redelivered = await service.handle_webhook(_request("req-4"), idempotency_key="delivery-1", agent_id="agent-a")
+    assert redelivered.request_id == "req-1" and service.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_reusing_a_key_with_a_different_payload_is_rejected():
+    service = CountingService(ExecutionJournal())
+    await service.handle_webhook(_request("req-1"), idempotency_key="delivery-1")
+
+    reused = await service.handle_webhook(_request("req-2", action_id="action_2"), idempotency_key="delivery-1")
+    assert not reused.success and "different payload" in reused.error
+    assert service.calls == 1
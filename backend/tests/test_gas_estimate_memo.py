@@ -0,0 +1,149 @@
+"""Test gas estimate memoization by calldata shape."""
+import pytest
+
+from app.services.gas_estimate_memo import GasEstimateMemo, GasShape
+
+ROUTER = "0x2626664c2603336E57B271c5C0b26F421741e481"
+
+
+def test_shape_from_calldata():
+    """Shapes key on the lower-cased contract and 4-byte selector."""
+    shape = GasShape.from_calldata(8453, ROUTER, "0x04E45AAF" + "00" * 64, path_length=1)
+    assert shape == GasShape(8453, ROUTER.lower(), "04e45aaf", 1)
+
+
+@pytest.mark.asyncio
+async def test_familiar_shapes_skip_estimation():
+    """After enough samples the memo answers without calling the estimator."""
+    memo = GasEstimateMemo(min_samples=3, percentile=0.95, safety_margin=1.2, validation_rate=0.0)
+    shape = GasShape(8453, ROUTER.lower(), "04e45aaf", 1)
+    calls = []
+
+    async def estimator():
+        calls.append(1)
+        return 100000 + len(calls) * 1000
+
+    for _ in range(3):
+        await memo.estimate(shape, estimator)
+    assert len(calls) == 3
+
+    limit = await memo.estimate(shape, estimator)
+    assert len(calls) == 3
+    assert limit == int(103000 * 1.2)
+
+    # A different path length is a different shape
+    assert memo.lookup(shape._replace(path_length=2)) is None
+
+
+@pytest.mark.asyncio
+async def test_failed_estimate_is_not_learned():
+    """Unfamiliar shapes whose estimate fails return None and stay unfamiliar."""
+    memo = GasEstimateMemo(min_samples=1)
+    shape = GasShape(1, "0xtoken", "a9059cbb")
+
+    async def failing():
+        return None
+
+    assert await memo.estimate(shape, failing) is None
+    assert memo.lookup(shape) is None
+
+
+@pytest.mark.asyncio
+async def test_memoized_swaps_are_still_simulated(monkeypatch):
+    """A memo hit skips eth_estimateGas but not the eth_call revert preflight."""
+    from types import SimpleNamespace
+    from app.core.config_manager import config_manager
+    from app.protocols import uniswap_adapter as module
+
+    memo = GasEstimateMemo(min_samples=1, validation_rate=0.0)
+    memo.observe(GasShape(8453, ROUTER.lower(), "04e45aaf", 1), 150000)
+    monkeypatch.setattr(module, "gas_estimate_memo", memo)
+
+    async def get_chain(chain_id):
+        return SimpleNamespace(rpc_urls=["http://rpc"])
+
+    async def get_fees(chain_id):
+        return None
+
+    monkeypatch.setattr(config_manager, "get_chain", get_chain)
+    monkeypatch.setattr(module.gas_oracle, "get_fees", get_fees)
+
+    adapter = module.UniswapAdapter()
+    methods = []
+    reverts = True
+
+    async def rpc_call(rpc_url, payload, timeout=10.0):
+        methods.append(payload["method"])
+        if reverts:
+            raise RuntimeError("execution reverted: STF")
+        return "0x"
+
+    monkeypatch.setattr(adapter, "_rpc_call", rpc_call)
+    quote = {
+        "success": True,
+        "from_address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+        "to_address": "0x4200000000000000000000000000000000000006",
+        "wallet_address": "0x000000000000000000000000000000000000dEaD",
+        "router_address": ROUTER,
+        "amount_in_wei": "1000000",
+        "amount_out_wei": "300000000000000",
+    }
+
+    failed = await adapter.build_transaction(quote, 8453, enable_permit2=False)
+    assert "error" in failed
+    assert methods == ["eth_call"]
+
+    reverts = False
+    built = await adapter.build_transaction(quote, 8453, enable_permit2=False)
+    assert built["gasLimit"] == hex(int(150000 * 1.2))
+    assert "eth_estimateGas" not in methods
+
+
+@pytest.mark.asyncio
+async def test_memoized_swaps_simulate_until_first_success(monkeypatch):
+    """The preflight returns on the first RPC that passes instead of waiting for slow ones."""
+    import asyncio
+    from types import SimpleNamespace
+    from app.core.config_manager import config_manager
+    from app.protocols import uniswap_adapter as module
+
+    memo = GasEstimateMemo(min_samples=1, validation_rate=0.0)
+    memo.observe(GasShape(8453, ROUTER.lower(), "04e45aaf", 1), 150000)
+    monkeypatch.setattr(module, "gas_estimate_memo", memo)
+
+    async def get_chain(chain_id):
+        return SimpleNamespace(rpc_urls=["http://slow", "http://fast"])
+
+    async def get_fees(chain_id):
+        return None
+
+    monkeypatch.setattr(config_manager, "get_chain", get_chain)
+    monkeypatch.setattr(module.gas_oracle, "get_fees", get_fees)
+
+    adapter = module.UniswapAdapter()
+    cancelled = []
+
+    async def rpc_call(rpc_url, payload, timeout=10.0):
+        if rpc_url == "http://slow":
+            try:
+                await asyncio.sleep(timeout)
+            except asyncio.CancelledError:
+                cancelled.append(rpc_url)
+                raise
+        return "0x"
+
+    monkeypatch.setattr(adapter, "_rpc_call", rpc_call)
+    quote = {
+        "success": True,
+        "from_address": "0x833589fCD6eDb6E08f4c7C32D4f71b54bdA02913",
+        "to_address": "0x4200000000000000000000000000000000000006",
+        "wallet_address": "0x000000000000000000000000000000000000dEaD",
+        "router_address": ROUTER,
+        "amount_in_wei": "1000000",
+        "amount_out_wei": "300000000000000",
+    }
+
+    built = await asyncio.wait_for(adapter.build_transaction(quote, 8453, enable_permit2=False), timeout=2.0)
+    assert built["gasLimit"] == hex(int(150000 * 1.2))
+    await asyncio.sleep(0)
+    assert cancelled == ["http://slow"]
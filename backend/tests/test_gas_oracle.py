@@ -0,0 +1,107 @@
+"""Test the per-block gas price oracle."""
+import asyncio
+import pytest
+
+from app.services.gas_oracle import GasOracle
+
+GWEI = 10 ** 9
+
+
+class FakeEth:
+    def __init__(self):
+        self.calls = 0
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        self.calls += 1
+        return {
+            "oldestBlock": 100,
+            "baseFeePerGas": [10 * GWEI, 11 * GWEI, 12 * GWEI],
+            "reward": [[1 * GWEI, 2 * GWEI, 3 * GWEI], [1 * GWEI, 2 * GWEI, 5 * GWEI]],
+            "gasUsedRatio": [0.5, 0.6],
+        }
+
+
+class FakeWeb3:
+    def __init__(self):
+        self.eth = FakeEth()
+
+
+@pytest.fixture
+def oracle(monkeypatch):
+    w3 = FakeWeb3()
+    monkeypatch.setattr(GasOracle, "_web3", staticmethod(lambda chain_id: w3 if chain_id == 1 else None))
+    return GasOracle(history_blocks=2), w3
+
+
+def test_snapshot_from_fee_history(oracle):
+    """Next base fee and median tips are taken from eth_feeHistory."""
+    gas_oracle, w3 = oracle
+    snapshot = gas_oracle._snapshot_from_history(1, w3.eth.fee_history(2, "latest", [10, 50, 90]))
+
+    assert snapshot.block_number == 101
+    assert snapshot.base_fee_wei == 11 * GWEI
+    assert snapshot.next_base_fee_wei == 12 * GWEI
+    assert snapshot.priority_fees_wei == {10: 1 * GWEI, 50: 2 * GWEI, 90: 5 * GWEI}
+    assert snapshot.gas_price_gwei == 14.0
+    assert snapshot.fee_params("fast") == {
+        "maxFeePerGas": 29 * GWEI,
+        "maxPriorityFeePerGas": 5 * GWEI,
+    }
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_share_one_fetch(oracle):
+    """Callers within one block are served by a single eth_feeHistory call."""
+    gas_oracle, w3 = oracle
+
+    results = await asyncio.gather(*(gas_oracle.get_fees(1) for _ in range(5)))
+    assert all(r is results[0] for r in results)
+    assert w3.eth.calls == 1
+
+    # Fresh snapshot is served from memory
+    assert gas_oracle.get_cached(1) is results[0]
+    await gas_oracle.get_fees(1)
+    assert w3.eth.calls == 1
+
+
+class LegacyEth:
+    """A chain without EIP-1559: zero base fees or no eth_feeHistory at all."""
+
+    def __init__(self, serves_history=True):
+        self.serves_history = serves_history
+        self.gas_price = 3 * GWEI
+        self.block_number = 777
+
+    def fee_history(self, block_count, newest_block, percentiles):
+        if not self.serves_history:
+            raise ValueError("the method eth_feeHistory does not exist")
+        return {"oldestBlock": "0x64", "baseFeePerGas": [0, 0, 0], "reward": [], "gasUsedRatio": [0.1, 0.2]}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("serves_history,block_number", [(True, 101), (False, 777)])
+async def test_legacy_chains_record_the_block_number(monkeypatch, serves_history, block_number):
+    """Legacy snapshots carry a block number so readers need no extra RPC."""
+    w3 = FakeWeb3()
+    w3.eth = LegacyEth(serves_history)
+    monkeypatch.setattr(GasOracle, "_web3", staticmethod(lambda chain_id: w3))
+    gas_oracle = GasOracle(history_blocks=2)
+
+    snapshot = await gas_oracle._fetch(56)
+    assert not snapshot.eip1559
+    assert snapshot.gas_price_wei == 3 * GWEI
+    assert snapshot.block_number == block_number
+
+
+@pytest.mark.asyncio
+async def test_scheduled_refreshes_are_held_until_done(oracle, monkeypatch):
+    """Background refreshes started from get_cached keep a task reference."""
+    gas_oracle, w3 = oracle
+    monkeypatch.setattr(GasOracle, "is_supported", lambda self, chain_id: True)
+
+    assert gas_oracle.get_cached(1) is None
+    assert len(gas_oracle._scheduled) == 1
+    await asyncio.gather(*gas_oracle._scheduled)
+    await asyncio.sleep(0)
+    assert not gas_oracle._scheduled
+    assert gas_oracle.get_cached(1).block_number == 101
@@ -103,7 +103,7 @@ class TestGMPCommandIntegration:
             
             # Mock chat history service
             with patch('app.services.command_processor.chat_history_service') as mock_chat:
-                mock_chat.get_recent_context.return_value = "No recent context"
+                mock_chat.get_context = AsyncMock(return_value="No recent context")
                 
                 result = await command_processor._classify_with_ai(command)
                 assert result == CommandType.CROSS_CHAIN_SWAP
@@ -0,0 +1,113 @@
+"""Test the background IPFS pinning queue."""
+import asyncio
+import pytest
+
+from app.services.ipfs_pin_queue import IPFSPinQueue, content_hash
+
+
+class FakeIPFSService:
+    def __init__(self, failures=0, delay=0.01, enabled=True):
+        self.failures = failures
+        self.delay = delay
+        self.enabled = enabled
+        self.uploads = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def upload_json(self, data, filename="research_log.json"):
+        self.uploads.append(filename)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if self.failures:
+            self.failures -= 1
+            return None
+        return f"Qm{content_hash(data)[:10]}"
+
+
+def make_queue(service, **kwargs):
+    queue = IPFSPinQueue(service=service, batch_interval=0.02, base_backoff=0.01, **kwargs)
+    pushed = []
+
+    async def notifier(wallet_address, payload):
+        pushed.append((wallet_address, payload))
+
+    queue.set_notifier(notifier)
+    return queue, pushed
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_hash_and_pushes_cid_later(wait_for):
+    service = FakeIPFSService(delay=0.05)
+    queue, pushed = make_queue(service)
+    content = {"protocol": "aave", "summary": "Lending"}
+
+    first = await queue.submit(content, filename="research_aave.json", wallet_address="0xA")
+    # Same content, different key order, different wallet: one pin, two notifications
+    second = await queue.submit({"summary": "Lending", "protocol": "aave"}, wallet_address="0xB")
+
+    assert first == {"content_hash": content_hash(content), "cid": None, "status": "pending"}
+    assert second["content_hash"] == first["content_hash"]
+    assert service.uploads == []
+
+    await wait_for(lambda: len(pushed) == 2)
+    assert service.uploads == ["research_aave.json"]
+    assert {wallet for wallet, _ in pushed} == {"0xA", "0xB"}
+    assert all(p["status"] == "pinned" and p["cid"] for _, p in pushed)
+
+    # Repeat pins of the same content are answered from the CID cache
+    again = await queue.submit(content, wallet_address="0xA")
+    assert again["status"] == "pinned"
+    assert again["cid"] == pushed[0][1]["cid"]
+    assert len(service.uploads) == 1
+    assert queue.get_stats()["cache_hits"] == 1
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_submissions_are_pinned_in_batches(wait_for):
+    service = FakeIPFSService(delay=0.05)
+    queue, pushed = make_queue(service, batch_size=2)
+
+    for i in range(5):
+        await queue.submit({"n": i}, wallet_address="0xA")
+    await wait_for(lambda: len(pushed) == 5)
+
+    assert service.max_in_flight == 2
+    assert len(service.uploads) == 5
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_pins_are_retried_then_reported(wait_for):
+    service = FakeIPFSService(failures=2)
+    queue, pushed = make_queue(service)
+    await queue.submit({"n": 1}, wallet_address="0xA")
+    await wait_for(lambda: pushed)
+    assert pushed[0][1]["status"] == "pinned"
+    assert len(service.uploads) == 3
+    assert queue.stats["retries"] == 2
+
+    service.failures = 10
+    await queue.submit({"n": 2}, wallet_address="0xA")
+    await wait_for(lambda: len(pushed) == 2)
+    assert pushed[1][1] == {"content_hash": content_hash({"n": 2}), "cid": None, "status": "failed"}
+    assert queue.stats["failed"] == 1
+    assert queue.get_stats()["pending"] == 0
+    await queue.stop()
+
+
+@pytest.mark.asyncio
+async def test_disabled_service_and_full_queue_skip_pinning():
+    queue, _ = make_queue(FakeIPFSService(enabled=False))
+    result = await queue.submit({"n": 1})
+    assert result["status"] == "disabled"
+    assert queue.get_stats()["pending"] == 0
+
+    queue, _ = make_queue(FakeIPFSService(delay=1.0), max_pending=1)
+    assert (await queue.submit({"n": 1}))["status"] == "pending"
+    assert (await queue.submit({"n": 2}))["status"] == "dropped"
+    await queue.stop()
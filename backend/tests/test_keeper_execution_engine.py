@@ -0,0 +1,159 @@
+"""Test concurrent keeper execution with shared per-action leases."""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+
+from app.domains.payment_actions.execution_engine import ActionLeaseManager, KeeperExecutionEngine
+from app.domains.payment_actions.models import (
+    PaymentAction,
+    PaymentActionFrequency,
+    PaymentActionSchedule,
+    PaymentActionType,
+)
+from app.domains.payment_actions.service import PaymentActionService
+from app.domains.payment_actions.storage import InMemoryStorageBackend
+
+
+class FakeLeaseRedis:
+    """SET NX EX plus compare-and-delete / compare-and-expire, shared by every keeper 'replica'."""
+
+    def __init__(self):
+        self.data = {}
+        self.renewals = 0
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, owner, *args):
+        if self.data.get(key) != owner:
+            return 0
+        if "expire" in script:
+            self.renewals += 1
+        else:
+            del self.data[key]
+        return 1
+
+
+class SlowExecutor:
+    """Records executions and the peak number running at once."""
+
+    def __init__(self, fail_ids=(), delay=0.01, on_execute=None):
+        self.executed = []
+        self.running = 0
+        self.peak = 0
+        self.fail_ids = set(fail_ids)
+        self.delay = delay
+        self.on_execute = on_execute
+
+    async def execute_action(self, action, wallet_address):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        if self.on_execute:
+            await self.on_execute(action)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        self.executed.append(action.id)
+        status = "failed" if action.id in self.fail_ids else "submitted"
+        return SimpleNamespace(
+            status=SimpleNamespace(value=status),
+            ticket_id=f"ticket_{action.id}",
+            error_message="boom" if status == "failed" else None,
+        )
+
+
+def _recurring(i):
+    return PaymentAction(
+        id=f"action_{i}",
+        wallet_address=f"0xwallet{i % 3}",
+        name=f"Action {i}",
+        action_type=PaymentActionType.RECURRING,
+        recipient_address="0xrecipient",
+        amount="1",
+        token="USDC",
+        chain_id=8453,
+        schedule=PaymentActionSchedule(frequency=PaymentActionFrequency.DAILY),
+        created_at=datetime.utcnow() - timedelta(days=1),
+    )
+
+
+async def _service_with(count):
+    service = PaymentActionService(InMemoryStorageBackend())
+    actions = [_recurring(i) for i in range(count)]
+    for action in actions:
+        await service._backend.create(action.wallet_address, action.id, action)
+    return service, actions
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded_and_outcomes_persisted():
+    service, actions = await _service_with(12)
+    executor = SlowExecutor(fail_ids={"action_0"})
+    leases = ActionLeaseManager(redis_client=FakeLeaseRedis())
+    engine = KeeperExecutionEngine(service, executor, leases=leases, max_concurrency=4)
+
+    result = await engine.run(actions)
+
+    assert executor.peak == 4
+    assert result.checked == 12
+    assert result.executed == 11
+    assert result.failed == 1
+    # Every lease is released once runs are recorded
+    assert leases._redis.data == {}
+    stored = await service.get_action("0xwallet1", "action_1")
+    assert stored.usage_count == 1 and stored.last_used is not None
+    assert stored.metadata["last_ticket_id"] == "ticket_action_1"
+    failed = await service.get_action("0xwallet0", "action_0")
+    assert failed.usage_count == 0
+    # Executed actions drop out of the due index
+    due = await service.get_due_actions()
+    assert [a.id for a in due] == ["action_0"]
+
+
+@pytest.mark.asyncio
+async def test_replicas_never_execute_the_same_action_twice():
+    service, actions = await _service_with(10)
+    shared = FakeLeaseRedis()
+    executors = [SlowExecutor(), SlowExecutor()]
+    engines = [
+        KeeperExecutionEngine(service, ex, leases=ActionLeaseManager(redis_client=shared), max_concurrency=3)
+        for ex in executors
+    ]
+
+    results = await asyncio.gather(*(engine.run(actions) for engine in engines))
+
+    executed = executors[0].executed + executors[1].executed
+    assert sorted(executed) == sorted(a.id for a in actions)
+    assert sum(r.executed for r in results) == 10
+    assert sum(r.skipped for r in results) == 10
+
+
+@pytest.mark.asyncio
+async def test_edits_made_during_execution_are_kept():
+    service, actions = await _service_with(1)
+
+    async def rename(action):
+        edited = action.model_copy(update={"name": "Renamed", "amount": "2"})
+        await service._backend.update(action.wallet_address, action.id, edited)
+
+    leases = ActionLeaseManager(redis_client=FakeLeaseRedis())
+    engine = KeeperExecutionEngine(service, SlowExecutor(on_execute=rename), leases=leases)
+    await engine.run(actions)
+
+    stored = await service.get_action("0xwallet0", "action_0")
+    assert (stored.name, stored.amount, stored.usage_count) == ("Renamed", "2", 1)
+
+
+@pytest.mark.asyncio
+async def test_leases_are_renewed_during_long_executions():
+    service, actions = await _service_with(1)
+    shared = FakeLeaseRedis()
+    leases = ActionLeaseManager(lease_seconds=0.06, redis_client=shared)
+    engine = KeeperExecutionEngine(service, SlowExecutor(delay=0.1), leases=leases)
+
+    await engine.run(actions)
+    assert shared.renewals >= 2
+    assert shared.data == {}
@@ -0,0 +1,144 @@
+"""Test the append-only log payment action backend: replay, group commit, compaction."""
+import asyncio
+import json
+import time
+import pytest
+
+from app.domains.payment_actions.storage import AppendLogStorageBackend
+
+WALLET = "0xwallet"
+
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines() if line]
+
+
+@pytest.mark.asyncio
+async def test_changes_survive_reopen(tmp_path, make_action):
+    path = tmp_path / "actions.log"
+    backend = AppendLogStorageBackend(str(path))
+    await backend.create_many([make_action(i) for i in range(3)])
+    await backend.update(WALLET, "action_1", make_action(1, name="Renamed"))
+    assert await backend.delete(WALLET, "action_2")
+    await backend.create("0xother", "action_9", make_action(9, wallet="0xother"))
+    assert await backend.delete_all("0xother") == 1
+
+    # Appends only: one line per operation (batch counts once)
+    assert [r["op"] for r in _lines(path)] == ["put"] * 4 + ["del", "put", "del_wallet"]
+
+    reopened = AppendLogStorageBackend(str(path))
+    actions = {a.id: a for a in await reopened.list(WALLET)}
+    assert set(actions) == {"action_0", "action_1"}
+    assert actions["action_1"].name == "Renamed"
+    assert await reopened.list_wallets() == [WALLET]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_are_group_committed(tmp_path, monkeypatch, make_action):
+    backend = AppendLogStorageBackend(str(tmp_path / "actions.log"))
+    batches = []
+    write = backend._write
+    monkeypatch.setattr(backend, "_write", lambda batch: (batches.append(len(batch)), write(batch)))
+
+    await asyncio.gather(*(backend.create(WALLET, f"action_{i}", make_action(i)) for i in range(20)))
+
+    assert sum(batches) == 20
+    assert len(batches) < 20
+    assert len(await backend.list(WALLET)) == 20
+
+
+@pytest.mark.asyncio
+async def test_compaction_and_torn_tail(tmp_path, make_action):
+    path = tmp_path / "actions.log"
+    backend = AppendLogStorageBackend(str(path), compact_min_records=10)
+    await backend.create(WALLET, "action_0", make_action(0))
+    for n in range(12):
+        await backend.update(WALLET, "action_0", make_action(0, name=f"v{n}"))
+
+    # Compaction rewrote 13 records down to the live action
+    assert len(_lines(path)) < 13
+
+    # A crash mid-append leaves a partial line; replay skips it
+    with open(path, "a") as f:
+        f.write('{"op": "put", "act')
+    reopened = AppendLogStorageBackend(str(path))
+    assert (await reopened.get(WALLET, "action_0")).name == "v11"
+
+
+@pytest.mark.asyncio
+async def test_imports_legacy_json_once(tmp_path, make_action):
+    legacy = tmp_path / "actions.json"
+    legacy.write_text(json.dumps({WALLET: {"action_0": make_action(0).model_dump(mode="json")}}))
+    path = tmp_path / "actions.log"
+
+    backend = AppendLogStorageBackend(str(path), legacy_json_path=str(legacy))
+    assert [a.id for a in await backend.list(WALLET)] == ["action_0"]
+    assert path.exists()
+
+
+@pytest.fixture
+def fresh_service(monkeypatch):
+    from app.config.settings import get_settings
+    from app.domains.payment_actions import service
+    monkeypatch.setattr(service, "_service_instance", None)
+    for name in ("PAYMENT_STORAGE_LOG_PATH", "PAYMENT_ACTIONS_BACKEND", "PAYMENT_ACTIONS_DATABASE_URL"):
+        monkeypatch.delenv(name, raising=False)
+    get_settings.cache_clear()
+    yield service
+    get_settings.cache_clear()
+
+
+@pytest.mark.asyncio
+async def test_service_imports_json_store_named_by_storage_path(tmp_path, monkeypatch, fresh_service, make_action):
+    # An existing deployment's JsonFileStorageBackend file (pretty-printed)
+    store = tmp_path / "actions.json"
+    original = json.dumps({WALLET: {"action_0": make_action(0).model_dump(mode="json")}}, indent=2)
+    store.write_text(original)
+    monkeypatch.setenv("PAYMENT_STORAGE_PATH", str(store))
+
+    service = await fresh_service.get_payment_action_service()
+    assert isinstance(service._backend, AppendLogStorageBackend)
+    assert [a.id for a in await service.get_actions(WALLET)] == ["action_0"]
+
+    # The log lives next to the store; the store itself is never appended to
+    assert [r["op"] for r in _lines(tmp_path / "actions.log")] == ["put"]
+    assert store.read_text() == original
+
+
+def test_refuses_to_append_to_unrecognised_log(tmp_path, monkeypatch, fresh_service):
+    not_a_log = tmp_path / "actions.log"
+    not_a_log.write_text(json.dumps({WALLET: {}}))
+    monkeypatch.setenv("PAYMENT_STORAGE_LOG_PATH", str(not_a_log))
+
+    with pytest.raises(ValueError):
+        asyncio.run(fresh_service.get_payment_action_service())
+    assert fresh_service._service_instance is None
+    assert not_a_log.read_text() == json.dumps({WALLET: {}})
+
+
+@pytest.mark.asyncio
+async def test_writes_during_compaction_are_kept(tmp_path, monkeypatch, make_action):
+    path = tmp_path / "actions.log"
+    backend = AppendLogStorageBackend(str(path), compact_min_records=1, compact_ratio=1.0)
+    compact = backend._compact
+    compacting = asyncio.Event()
+    loop = asyncio.get_running_loop()
+
+    def slow_compact(records=None):
+        # The snapshot was taken on the loop; the store changes while we write it
+        assert records is not None
+        loop.call_soon_threadsafe(compacting.set)
+        time.sleep(0.1)
+        compact(records)
+
+    monkeypatch.setattr(backend, "_compact", slow_compact)
+    await backend.create_many([make_action(i) for i in range(3)])
+    writes = asyncio.gather(*(backend.update(WALLET, "action_0", make_action(0, name=f"v{n}")) for n in range(3)))
+    await asyncio.wait_for(compacting.wait(), 2.0)
+    await backend.create(WALLET, "action_7", make_action(7))
+    await writes
+
+    reopened = AppendLogStorageBackend(str(path))
+    actions = {a.id: a for a in await reopened.list(WALLET)}
+    assert set(actions) == {"action_0", "action_1", "action_2", "action_7"}
+    assert actions["action_0"].name == "v2"
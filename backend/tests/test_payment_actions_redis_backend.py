@@ -0,0 +1,330 @@
+"""Test the Redis payment action backend's hash layout and round-trip counts."""
+import fnmatch
+from datetime import datetime, timedelta
+import pytest
+
+from app.domains.payment_actions.models import (
+    PaymentActionFrequency,
+    PaymentActionSchedule,
+    PaymentActionType,
+)
+from app.domains.payment_actions.next_run import next_run_at
+from app.domains.payment_actions.storage import _COMPARE_AND_SET_SCRIPT, _DELETE_SCRIPT, RedisStorageBackend
+
+
+class FakeRedis:
+    """Minimal decode_responses=True Redis double that counts round-trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    # Strings / keys
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def _hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    def _delete(self, *keys):
+        return sum(1 for k in keys if self.data.pop(k, None) is not None)
+
+    async def scan_iter(self, match):
+        self.round_trips += 1
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    # Hashes
+    def _hset(self, key, field=None, value=None, mapping=None):
+        h = self.data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(1 for f in items if f not in h)
+        h.update(items)
+        return added
+
+    def _hsetnx(self, key, field, value):
+        h = self.data.setdefault(key, {})
+        if field in h:
+            return 0
+        h[field] = value
+        return 1
+
+    def _hdel(self, key, *fields):
+        h = self.data.get(key, {})
+        removed = sum(1 for f in fields if h.pop(f, None) is not None)
+        if key in self.data and not h:
+            del self.data[key]
+        return removed
+
+    def _hlen(self, key):
+        return len(self.data.get(key, {}))
+
+    async def hset(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._hset(*args, **kwargs)
+
+    async def hget(self, key, field):
+        self.round_trips += 1
+        return self.data.get(key, {}).get(field)
+
+    async def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.data.get(key, {}))
+
+    async def hkeys(self, key):
+        self.round_trips += 1
+        return list(self.data.get(key, {}))
+
+    async def exists(self, key):
+        self.round_trips += 1
+        return int(key in self.data)
+
+    def _set(self, key, value):
+        self.data[key] = value
+
+    # Sorted sets
+    def _zadd(self, key, mapping):
+        z = self.data.setdefault(key, {})
+        added = sum(1 for m in mapping if m not in z)
+        z.update(mapping)
+        return added
+
+    def _zrem(self, key, *members):
+        z = self.data.get(key, {})
+        return sum(1 for m in members if z.pop(m, None) is not None)
+
+    async def zrem(self, key, *members):
+        self.round_trips += 1
+        return self._zrem(key, *members)
+
+    async def zrangebyscore(self, key, min, max, start=None, num=None):
+        self.round_trips += 1
+        z = self.data.get(key, {})
+        members = [m for m, score in sorted(z.items(), key=lambda i: i[1]) if score <= max]
+        if start is not None:
+            members = members[start:start + num]
+        return members
+
+    # Sets
+    def _sadd(self, key, *members):
+        s = self.data.setdefault(key, set())
+        before = len(s)
+        s.update(members)
+        return len(s) - before
+
+    def _srem(self, key, *members):
+        s = self.data.get(key, set())
+        removed = sum(1 for m in members if m in s)
+        s.difference_update(members)
+        return removed
+
+    async def smembers(self, key):
+        self.round_trips += 1
+        return set(self.data.get(key, set()))
+
+    async def sadd(self, key, *members):
+        self.round_trips += 1
+        return self._sadd(key, *members)
+
+    async def srem(self, key, *members):
+        self.round_trips += 1
+        return self._srem(key, *members)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    # Scripts
+    def register_script(self, script):
+        implementation = SCRIPTS[script]
+
+        async def run(keys, args):
+            self.round_trips += 1
+            return implementation(self, keys, args)
+
+        return run
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        method = getattr(self.client, f"_{name}")
+
+        def queue(*args, **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.client.round_trips += 1
+        return [method(*args, **kwargs) for method, args, kwargs in self.commands]
+
+
+def _compare_and_set(client, keys, args):
+    field, expected, value, score, member = args
+    if client._hget(keys[0], field) != expected:
+        return 0
+    client._hset(keys[0], field, value)
+    if score == "":
+        client._zrem(keys[1], member)
+    else:
+        client._zadd(keys[1], {member: score})
+    return 1
+
+
+def _delete(client, keys, args):
+    field, wallet_address, member = args
+    removed = client._hdel(keys[0], field)
+    client._zrem(keys[2], member)
+    if client._hlen(keys[0]) == 0:
+        client._srem(keys[1], wallet_address)
+    return removed
+
+
+SCRIPTS = {_COMPARE_AND_SET_SCRIPT: _compare_and_set, _DELETE_SCRIPT: _delete}
+
+WALLET = "0xwallet"
+
+
+@pytest.mark.asyncio
+async def test_list_is_single_round_trip(make_action):
+    """Listing 40 actions costs one HGETALL instead of 41 GETs."""
+    client = FakeRedis()
+    backend = RedisStorageBackend(client)
+    await backend.create_many([make_action(i) for i in range(40)])
+    await backend.list(WALLET)  # first call checks the legacy index once
+
+    client.round_trips = 0
+    actions = await backend.list(WALLET)
+    assert len(actions) == 40
+    assert client.round_trips == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_update_and_delete_all(make_action):
+    """Batch writes and bulk delete are pipelined."""
+    client = FakeRedis()
+    backend = RedisStorageBackend(client)
+    actions = [make_action(i) for i in range(5)] + [make_action(9, wallet="0xother")]
+
+    client.round_trips = 0
+    await backend.create_many(actions)
+    assert client.round_trips == 1
+    assert sorted(await backend.list_wallets()) == ["0xother", WALLET]
+
+    updated = [a.model_copy(update={"usage_count": 3}) for a in actions]
+    client.round_trips = 0
+    await backend.update_many(updated)
+    assert client.round_trips == 1
+    assert (await backend.get(WALLET, "action_2")).usage_count == 3
+
+    assert await backend.delete_all(WALLET) == 5
+    assert await backend.list(WALLET) == []
+    assert await backend.list_wallets() == ["0xother"]
+
+    await backend.list("0xother")  # first call checks the legacy index once
+    client.round_trips = 0
+    assert await backend.delete("0xother", "action_9") is True
+    assert client.round_trips == 1
+    assert await backend.list_wallets() == []
+    assert await backend.delete("0xother", "action_9") is False
+
+
+@pytest.mark.asyncio
+async def test_legacy_layout_is_migrated(make_action):
+    """Actions stored as one key per action are moved into the wallet hash."""
+    client = FakeRedis()
+    legacy = make_action(1)
+    client.data[f"payment_actions:{WALLET}:action_1"] = legacy.json()
+    client.data[f"payment_actions:{WALLET}:index"] = {"action_1"}
+
+    backend = RedisStorageBackend(client)
+    assert await backend.list_wallets() == [WALLET]
+    assert [a.id for a in await backend.list(WALLET)] == ["action_1"]
+    assert f"payment_actions:{WALLET}:action_1" not in client.data
+    assert f"payment_actions:{WALLET}:index" not in client.data
+
+
+def _recurring(action, last_used=None):
+    return action.model_copy(update={
+        "action_type": PaymentActionType.RECURRING,
+        "schedule": PaymentActionSchedule(frequency=PaymentActionFrequency.DAILY),
+        "last_used": last_used,
+    })
+
+
+@pytest.mark.asyncio
+async def test_due_index_returns_only_due_actions(make_action):
+    """A keeper tick reads only due ids from the sorted set."""
+    client = FakeRedis()
+    backend = RedisStorageBackend(client)
+    now = datetime.utcnow()
+
+    due = _recurring(make_action(1), last_used=now - timedelta(days=2))
+    not_due = _recurring(make_action(2), last_used=now - timedelta(hours=1))
+    one_off = make_action(3)
+    await backend.create_many([due, not_due, one_off])
+    await backend.get_due_actions(now)  # first call checks the backfill marker
+
+    client.round_trips = 0
+    assert [a.id for a in await backend.get_due_actions(now)] == ["action_1"]
+    assert client.round_trips == 2
+
+    # mark_used moves the action forward in the index
+    await backend.update(WALLET, "action_1", due.model_copy(update={"last_used": now}))
+    assert await backend.get_due_actions(now) == []
+    assert [a.id for a in await backend.get_due_actions(now + timedelta(days=1))] == ["action_2", "action_1"]
+
+    await backend.delete_all(WALLET)
+    assert client.data.get("payment_actions:due") == {}
+
+
+def test_next_run_weekly_waits_for_target_day(make_action):
+    """Weekly actions become due on the target weekday after 7 days, or after 14."""
+    last_used = datetime(2024, 1, 1, 9, 30)  # Monday
+    action = _recurring(make_action(1), last_used=last_used).model_copy(update={
+        "schedule": PaymentActionSchedule(frequency=PaymentActionFrequency.WEEKLY, day_of_week=2),
+    })
+    assert next_run_at(action) == datetime(2024, 1, 10)  # Wednesday after a full week
+    assert next_run_at(action.model_copy(update={"is_enabled": False})) is None
+
+
+@pytest.mark.asyncio
+async def test_mark_used_keeps_concurrent_edits(make_action):
+    """A rename saved between mark_used's read and write is retried, not overwritten."""
+    client = FakeRedis()
+    backend = RedisStorageBackend(client)
+    now = datetime.utcnow()
+    await backend.create(WALLET, "action_1", _recurring(make_action(1), last_used=now - timedelta(days=2)))
+
+    hget = client.hget
+    edited = []
+
+    async def hget_then_edit(key, field):
+        value = await hget(key, field)
+        if not edited:
+            edited.append(1)
+            renamed = (await backend.get(WALLET, "action_1")).model_copy(update={"name": "Renamed"})
+            await backend.update(WALLET, "action_1", renamed)
+        return value
+
+    client.hget = hget_then_edit
+    used = await backend.mark_used(WALLET, "action_1", now, ticket_id="ticket-1")
+
+    stored = await backend.get(WALLET, "action_1")
+    assert stored == used
+    assert stored.name == "Renamed" and stored.usage_count == 1
+    assert stored.metadata["last_ticket_id"] == "ticket-1"
+    assert await backend.get_due_actions(now) == []
+    assert await backend.mark_used(WALLET, "missing", now) is None
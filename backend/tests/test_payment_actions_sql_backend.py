@@ -0,0 +1,92 @@
+"""Test the SQL payment action backend against SQLite."""
+from datetime import datetime
+import pytest
+import pytest_asyncio
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("aiosqlite")
+
+from app.domains.payment_actions.models import (
+    PaymentActionFrequency,
+    PaymentActionSchedule,
+    PaymentActionType,
+)
+from app.domains.payment_actions.sql_storage import SQLStorageBackend
+
+WALLET = "0xwallet"
+
+
+def _recurring(action):
+    return action.model_copy(update={
+        "action_type": PaymentActionType.RECURRING,
+        "schedule": PaymentActionSchedule(frequency=PaymentActionFrequency.DAILY),
+    })
+
+
+@pytest_asyncio.fixture
+async def backend(tmp_path):
+    backend = SQLStorageBackend.from_url(f"sqlite+aiosqlite:///{tmp_path / 'actions.db'}", page_size=4)
+    await backend.create_schema()
+    yield backend
+    await backend.engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_crud_and_keyset_pages(backend, make_action):
+    await backend.create_many([make_action(i) for i in range(10)] + [make_action(99, wallet="0xother")])
+
+    page, cursor = await backend.list_page(WALLET, limit=4)
+    assert [a.id for a in page] == ["action_0", "action_1", "action_2", "action_3"]
+    page, cursor = await backend.list_page(WALLET, limit=4, after_id=cursor)
+    assert page[0].id == "action_4"
+
+    # list() walks every page
+    assert len(await backend.list(WALLET)) == 10
+    assert sorted(await backend.list_wallets()) == ["0xother", WALLET]
+
+    renamed = make_action(3).model_copy(update={"name": "Renamed"})
+    await backend.update_many([renamed, make_action(50)])  # missing rows are skipped
+    assert (await backend.get(WALLET, "action_3")).name == "Renamed"
+    assert await backend.get(WALLET, "action_50") is None
+
+    assert await backend.delete(WALLET, "action_0")
+    assert not await backend.delete(WALLET, "action_0")
+    assert await backend.delete_all(WALLET) == 9
+
+
+@pytest.mark.asyncio
+async def test_due_and_ticket_queries(backend, make_action):
+    await backend.create_many([_recurring(make_action(i)) for i in range(3)] + [make_action(9)])
+
+    due = await backend.get_due_actions(datetime.utcnow())
+    assert [a.id for a in due] == ["action_0", "action_1", "action_2"]
+
+    executed = await backend.mark_used(WALLET, "action_0", datetime.utcnow(), ticket_id="ticket_1")
+    assert executed.usage_count == 1
+
+    due = await backend.get_due_actions(datetime.utcnow())
+    assert [a.id for a in due] == ["action_1", "action_2"]
+    assert (await backend.get_by_ticket("ticket_1")).id == "action_0"
+    assert (await backend.count_by_type())["recurring"] == {"enabled": 3, "disabled": 0}
+
+
+@pytest.mark.asyncio
+async def test_database_url_selects_sql_backend(tmp_path, monkeypatch):
+    from app.config.settings import get_settings
+    from app.domains.payment_actions import service
+    from app.domains.payment_actions.backend_factory import get_payment_actions_backend
+
+    monkeypatch.delenv("PAYMENT_ACTIONS_BACKEND", raising=False)
+    monkeypatch.setenv("PAYMENT_ACTIONS_DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'actions.db'}")
+    monkeypatch.setattr(service, "_service_instance", None)
+    get_settings.cache_clear()
+    try:
+        backend = await get_payment_actions_backend()
+        assert isinstance(backend, SQLStorageBackend)
+        await backend.engine.dispose()
+
+        payment_service = await service.get_payment_action_service()
+        assert isinstance(payment_service._backend, SQLStorageBackend)
+        await payment_service._backend.engine.dispose()
+    finally:
+        get_settings.cache_clear()
@@ -0,0 +1,141 @@
+"""Test the two-tier, single-flight research result cache."""
+import asyncio
+import pytest
+
+from app.services.research.cache_manager import ResearchCacheManager
+from app.services.research.router import ResearchRouter
+
+
+class FakeRedis:
+    """Async Redis subset used by the cache, shared between 'workers'."""
+
+    def __init__(self):
+        self.data = {}
+        self.gets = 0
+
+    async def get(self, key):
+        self.gets += 1
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def ttl(self, key):
+        return 100 if key in self.data else -2
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            del self.data[key]
+            return 1
+        return 0
+
+
+class Research:
+    def __init__(self, delay=0.01):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"summary": f"research #{self.calls}"}
+
+
+@pytest.mark.asyncio
+async def test_phrasings_of_the_same_question_share_a_result():
+    router = ResearchRouter()
+    cache = ResearchCacheManager(redis_url="")
+    research = Research()
+
+    results = []
+    for query in ("what is aave", "explain aave protocol", "Research Aave?"):
+        decision = router.classify_intent(query)
+        results.append(await cache.get_or_compute(
+            decision.intent, router.cache_subject(decision), research, tool="firecrawl"
+        ))
+
+    assert research.calls == 1
+    assert results[0] == results[1] == results[2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_run_one_job():
+    cache = ResearchCacheManager(redis_url="")
+    research = Research(delay=0.05)
+
+    results = await asyncio.gather(*(
+        cache.get_or_compute("depth", "aave", research, tool="firecrawl") for _ in range(20)
+    ))
+    assert research.calls == 1
+    assert all(r == {"summary": "research #1"} for r in results)
+    assert cache.stats["shared"] == 19
+
+
+@pytest.mark.asyncio
+async def test_failures_are_shared_but_not_cached():
+    cache = ResearchCacheManager(redis_url="")
+    calls = 0
+
+    async def failing():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("scrape failed")
+
+    results = await asyncio.gather(
+        *(cache.get_or_compute("depth", "aave", failing) for _ in range(3)),
+        return_exceptions=True,
+    )
+    assert calls == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    unsuccessful = await cache.get_or_compute(
+        "depth", "aave", Research(), cacheable=lambda r: False
+    )
+    assert unsuccessful["summary"] == "research #1"
+    assert await cache.get("depth", "aave") is None
+
+
+@pytest.mark.asyncio
+async def test_workers_share_results_through_redis():
+    redis = FakeRedis()
+    worker_a = ResearchCacheManager(redis_client=redis)
+    worker_b = ResearchCacheManager(redis_client=redis)
+    research = Research(delay=0.2)
+
+    # Both workers miss at once: B waits for A's job instead of scraping again
+    a, b = await asyncio.gather(
+        worker_a.get_or_compute("depth", "aave", research, tool="firecrawl"),
+        worker_b.get_or_compute("depth", "aave", research, tool="firecrawl"),
+    )
+    assert research.calls == 1
+    assert a == b
+    assert not [k for k in redis.data if k.endswith(":lock")]
+
+    # Later hits are served from the local tier
+    gets = redis.gets
+    assert await worker_b.get("depth", "AAVE", tool="firecrawl") == a
+    assert redis.gets == gets
+
+
+@pytest.mark.asyncio
+async def test_local_tier_is_bounded_and_invalidated():
+    cache = ResearchCacheManager(redis_url="", max_local_entries=2)
+    for subject in ("aave", "curve", "lido"):
+        await cache.set("depth", subject, {"subject": subject})
+    assert await cache.get("depth", "aave") is None
+    assert await cache.get("depth", "lido") == {"subject": "lido"}
+
+    cache = ResearchCacheManager(redis_url="")
+    await cache.set("depth", "aave", {"n": 1})
+    await cache.set("depth", "curve", {"n": 2})
+    await cache.set("discovery", "yield on base", {"n": 3})
+    assert await cache.invalidate(intent="depth") == 2
+    assert await cache.get("depth", "aave") is None
+    assert await cache.get("discovery", "yield on base") == {"n": 3}
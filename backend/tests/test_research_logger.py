@@ -0,0 +1,110 @@
+"""Test batched research log writes and analytics rollups."""
+import pytest
+
+from app.services.research.research_logger import ResearchLogger
+
+
+class FakeStorage:
+    def __init__(self, fail=0):
+        self.batches = []
+        self.fail = fail
+
+    async def insert_many(self, logs):
+        if self.fail:
+            self.fail -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(logs))
+        return len(logs)
+
+
+def log(research_logger, protocol="aave", mode="quick", source="knowledge_base", **kwargs):
+    return research_logger.log_research(
+        protocol_name=protocol, research_mode=mode, source=source, duration_ms=100, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_flushes_on_batch_size_and_interval(wait_for):
+    storage = FakeStorage()
+    research_logger = ResearchLogger(storage=storage, batch_size=3, flush_interval=0.2)
+    await research_logger.start()
+
+    for _ in range(3):
+        log(research_logger)
+    await wait_for(lambda: storage.batches)
+    assert [len(b) for b in storage.batches] == [3]
+
+    # A partial batch goes out after the flush interval
+    log(research_logger)
+    await wait_for(lambda: len(storage.batches) == 2)
+    assert research_logger.get_stats()["written"] == 4
+    assert research_logger.get_stats()["pending"] == 0
+
+    log(research_logger)
+    await research_logger.stop()
+    assert research_logger.get_stats()["written"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_buffer_drops_and_failed_batches_are_retried():
+    storage = FakeStorage(fail=1)
+    research_logger = ResearchLogger(storage=storage, batch_size=10, max_buffer=3)
+
+    for _ in range(5):
+        log(research_logger)
+    assert len(research_logger.pending_logs) == 3
+    assert research_logger.stats["dropped"] == 2
+
+    assert await research_logger.flush() == 0
+    assert research_logger.stats["failed_batches"] == 1
+    assert len(research_logger.pending_logs) == 3
+
+    assert await research_logger.flush() == 3
+    assert research_logger.pending_logs == []
+
+
+@pytest.mark.asyncio
+async def test_buffer_is_released_without_storage():
+    research_logger = ResearchLogger()
+    log(research_logger)
+    assert await research_logger.flush() == 0
+    assert research_logger.pending_logs == []
+
+
+def test_analytics_rollups():
+    research_logger = ResearchLogger(max_buffer=1)
+    log(research_logger, protocol="Aave")
+    log(research_logger, protocol="aave", mode="deep", source="firecrawl", firecrawl_cost=0.15)
+    log(research_logger, protocol="curve", source="ai_general", success=False)
+
+    analytics = research_logger.get_analytics()
+    assert analytics.total_searches == 3
+    assert (analytics.quick_searches, analytics.deep_searches) == (2, 1)
+    assert (analytics.kb_hits, analytics.firecrawl_uses, analytics.ai_fallbacks) == (1, 1, 1)
+    assert analytics.success_rate == pytest.approx(2 / 3)
+    assert analytics.avg_duration_ms == 100
+    assert analytics.total_firecrawl_cost == 0.15
+    assert analytics.most_searched_protocols[0] == ("aave", 2)
+
+
+@pytest.mark.asyncio
+async def test_sql_storage_bulk_insert(tmp_path):
+    pytest.importorskip("sqlalchemy")
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy import func, select
+    from app.services.research.research_log_storage import ResearchLogStorage, protocol_research_logs_table
+
+    storage = ResearchLogStorage.from_url(f"sqlite+aiosqlite:///{tmp_path / 'logs.db'}")
+    await storage.create_schema()
+    research_logger = ResearchLogger(storage=storage, batch_size=2)
+    log(research_logger, user_id="alice")
+    log(research_logger, mode="deep", source="firecrawl", source_urls=["https://docs.aave.com"])
+    log(research_logger, user_id="6f1c1e5e-8a8c-4c1e-9d55-1b2f5b6f9a10")
+
+    assert await research_logger.flush() == 3
+    async with storage.engine.connect() as conn:
+        assert await conn.scalar(select(func.count()).select_from(protocol_research_logs_table)) == 3
+        user_ids = list(await conn.scalars(select(protocol_research_logs_table.c.user_id)))
+    # Non-UUID identifiers are not written to the users(id) column
+    assert user_ids == [None, None, "6f1c1e5e-8a8c-4c1e-9d55-1b2f5b6f9a10"]
+    await storage.close()
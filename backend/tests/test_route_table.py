@@ -0,0 +1,61 @@
+"""Test the precomputed protocol route table."""
+from app.protocols.registry import protocol_registry
+from app.protocols.route_table import RouteTable, TOKEN_ANY, TOKEN_USDC
+from app.models.unified_models import PrivacyLevel
+from app.services.privacy_service import _privacy_routes
+
+
+def _legacy_cross_chain(from_chain, to_chain, token_symbol):
+    """Per-call eligibility check the table replaces."""
+    if token_symbol == "USDC":
+        cctp = protocol_registry.get_protocol("cctp_v2")
+        if cctp and cctp.is_supported(from_chain) and cctp.is_supported(to_chain):
+            return "cctp_v2"
+    axelar = protocol_registry.get_protocol("axelar")
+    if axelar and axelar.is_supported(from_chain) and axelar.is_supported(to_chain):
+        return "axelar"
+    return None
+
+
+def test_cross_chain_routes_match_adapter_eligibility():
+    """Every chain pair (same-chain included) resolves to the same protocol as probing the adapters."""
+    table = protocol_registry.route_table
+    for from_chain in table.chain_ids:
+        for to_chain in table.chain_ids:
+            for token in ("USDC", "ETH"):
+                protocol = protocol_registry.get_cross_chain_protocol(from_chain, to_chain, token)
+                expected = _legacy_cross_chain(from_chain, to_chain, token)
+                assert protocol is (protocol_registry.get_protocol(expected) if expected else None)
+
+
+def test_same_chain_ordering():
+    """Cronos prefers MM Finance for USDC pairs and VVS otherwise."""
+    table = protocol_registry.route_table
+    assert table.routes(25, 25, TOKEN_USDC)[:2] == ("mm", "vvs")
+    assert table.routes(25, 25, TOKEN_ANY)[:2] == ("vvs", "mm")
+    assert protocol_registry.get_preferred_protocol(25) is protocol_registry.get_protocol("vvs")
+    assert table.routes(999999, 1) == ()
+
+
+def test_rebuild_replaces_table():
+    """Rebuilding swaps in a fresh snapshot."""
+    previous = protocol_registry.route_table
+    protocol_registry.rebuild_routes()
+    assert protocol_registry.route_table is not previous
+    assert isinstance(protocol_registry.route_table, RouteTable)
+
+
+def test_privacy_routes_precomputed():
+    """Privacy routes follow each chain's capabilities."""
+    expected = {
+        (1337, True, PrivacyLevel.PRIVATE): "direct_zcash",
+        (8453, True, PrivacyLevel.PRIVATE): "gmp_privacy",
+        (8453, False, PrivacyLevel.PRIVATE): "x402_privacy",
+        (8453, False, PrivacyLevel.COMPLIANCE): "gmp_privacy",
+        (534352, False, PrivacyLevel.PUBLIC): "gmp_privacy",
+        ("SN_MAIN", False, PrivacyLevel.COMPLIANCE): "starknet_privacy",
+    }
+    for key, method in expected.items():
+        assert _privacy_routes[key][0] == method
+    assert ("SN_MAIN", True, PrivacyLevel.PRIVATE) not in _privacy_routes
+    assert (1337, False, PrivacyLevel.PUBLIC) not in _privacy_routes
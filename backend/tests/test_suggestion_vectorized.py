@@ -0,0 +1,183 @@
+"""Test vectorized SuggestionEngine scoring against the per-action rules."""
+import random
+from datetime import datetime, timedelta
+import pytest
+
+from app.domains.payment_actions import suggestions
+from app.domains.payment_actions.models import (
+    CreatePaymentActionRequest,
+    PaymentAction,
+    PaymentActionFrequency,
+    PaymentActionSchedule,
+    PaymentActionType,
+)
+from app.domains.payment_actions.service import PaymentActionService
+from app.domains.payment_actions.suggestions import SuggestionEngine
+
+WALLET = "0xwallet"
+
+
+def _random_actions(count, seed=7):
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    actions = []
+    for i in range(count):
+        action_type = rng.choice(list(PaymentActionType))
+        schedule = None
+        if rng.random() < 0.6:
+            schedule = PaymentActionSchedule(
+                frequency=rng.choice(list(PaymentActionFrequency)),
+                day_of_week=rng.choice([None, 0, 3, 6]),
+            )
+        actions.append(PaymentAction(
+            id=f"action_{i}",
+            wallet_address=WALLET,
+            name=f"Action {i}",
+            action_type=action_type,
+            recipient_address="0xrecipient",
+            amount="1",
+            token="USDC",
+            chain_id=8453,
+            schedule=schedule,
+            created_at=now - timedelta(days=90),
+            last_used=rng.choice([None, now - timedelta(hours=rng.uniform(0, 24 * 60))]),
+            usage_count=rng.choice([0, 1, 2, 5, 10, 25]),
+            is_enabled=rng.random() < 0.9,
+            is_pinned=rng.random() < 0.3,
+        ))
+    return actions
+
+
+def _score_recency(days_ago):
+    if days_ago < 1:
+        return 1.0
+    if days_ago < 7:
+        return 0.8
+    if days_ago < 30:
+        return 0.5
+    return 0.2
+
+
+def _score_frequency(usage_count):
+    for threshold, score in ((20, 1.0), (10, 0.8), (5, 0.6), (2, 0.4)):
+        if usage_count >= threshold:
+            return score
+    return 0.2
+
+
+def _score_context(action, context):
+    score = 0.0
+    if action.action_type.value == "recurring" and not context.get("is_weekend"):
+        score += 0.1
+    if action.action_type.value == "shortcut" and context.get("is_evening"):
+        score += 0.1
+    if action.schedule and action.schedule.day_of_week is not None:
+        if action.schedule.day_of_week == context.get("day_of_week"):
+            score += 0.2
+    return score
+
+
+def _days_overdue(action, now):
+    if not action.schedule or not action.last_used:
+        return 0
+    interval_days = {"daily": 1, "weekly": 7, "monthly": 30}.get(action.schedule.frequency.value, 30)
+    return max(0, (now - action.last_used).days - interval_days)
+
+
+def _scalar_scores(engine, actions, context):
+    """The original one-action-at-a-time scoring."""
+    now = datetime.utcnow()
+    scores = []
+    for action in actions:
+        if not action.is_enabled:
+            continue
+        score = 0.0
+        if action.last_used:
+            score += _score_recency((now - action.last_used).days) * engine.weight_recent
+        if action.usage_count > 0:
+            score += _score_frequency(action.usage_count) * engine.weight_frequent
+        if action.is_pinned:
+            score += 0.1 * engine.weight_pinned
+        if action.action_type.value == "recurring":
+            score += 0.1
+        if context:
+            score += _score_context(action, context)
+        score = min(1.0, max(0.0, score))
+        if score > 0:
+            scores.append((action.id, score))
+    scores.sort(key=lambda s: -s[1])
+    return scores
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("hour,day", [(None, None), (20, 5), (9, 0)])
+async def test_vectorized_matches_scalar(hour, day):
+    engine = SuggestionEngine()
+    actions = _random_actions(200)
+
+    if hour is None:
+        result = await engine.suggest_actions(actions, limit=200)
+        context = None
+    else:
+        result = await engine.suggest_based_on_time(actions, hour=hour, day_of_week=day, limit=200)
+        context = {
+            "hour": hour, "day_of_week": day, "is_evening": hour >= 18,
+            "is_weekend": day >= 5, "is_monday": day == 0, "is_friday": day == 4,
+        }
+
+    assert [(s.action.id, s.score) for s in result] == _scalar_scores(engine, actions, context)
+
+
+@pytest.mark.asyncio
+async def test_overdue_matches_scalar():
+    engine = SuggestionEngine()
+    actions = _random_actions(200)
+    now = datetime.utcnow()
+
+    expected = [
+        (a.id, min(1.0, 0.5 + _days_overdue(a, now) * 0.1))
+        for a in actions
+        if a.is_enabled and a.schedule and a.action_type.value == "recurring"
+    ]
+    expected.sort(key=lambda s: -s[1])
+
+    result = await engine.suggest_overdue_recurring(actions, limit=200)
+    assert [(s.action.id, s.score) for s in result] == expected
+
+
+@pytest.mark.asyncio
+async def test_features_cached_until_mark_used(monkeypatch):
+    engine = SuggestionEngine()
+    monkeypatch.setattr(suggestions, "_engine_instance", engine)
+    service = PaymentActionService()
+    action = await service.create_action(WALLET, CreatePaymentActionRequest(
+        name="Coffee", action_type=PaymentActionType.SHORTCUT, amount="1", token="USDC", chain_id=8453,
+    ))
+
+    await engine.suggest_actions(await service.get_actions(WALLET), wallet_address=WALLET)
+    cached = engine._features[WALLET][1]
+    await engine.suggest_actions(await service.get_actions(WALLET), wallet_address=WALLET)
+    assert engine._features[WALLET][1] is cached
+
+    await service.mark_used(WALLET, action.id)
+    assert WALLET not in engine._features
+    [suggestion] = await engine.suggest_actions(await service.get_actions(WALLET), wallet_address=WALLET)
+    assert suggestion.reason.startswith("Used today.")
+
+
+@pytest.mark.asyncio
+async def test_cached_features_follow_the_action_list():
+    """Features are cached per wallet and rebuilt when the actions are not the cached ones."""
+    engine = SuggestionEngine()
+    actions = _random_actions(20)
+    await engine.suggest_actions(actions)
+    assert WALLET not in engine._features
+
+    await engine.suggest_actions(actions, wallet_address=WALLET)
+    cached = engine._features[WALLET][1]
+    await engine.suggest_overdue_recurring([a.model_copy() for a in actions], wallet_address=WALLET)
+    assert engine._features[WALLET][1] is cached
+
+    await engine.suggest_actions(actions[:-1], wallet_address=WALLET)
+    assert engine._features[WALLET][1] is not cached
+    assert len(engine._features[WALLET][1].actions) == 19
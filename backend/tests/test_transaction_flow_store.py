@@ -0,0 +1,96 @@
+"""Test shared transaction flow state: cross-worker steps, CAS transitions, cache."""
+import asyncio
+import time
+import pytest
+
+from app.services.transaction_flow_service import (
+    MemoryFlowStore,
+    TransactionFlow,
+    TransactionFlowService,
+    TransactionStatus,
+)
+
+WALLET = "0xwallet"
+STEPS = [
+    {"to": "0xtoken", "data": "0x095ea7b3" + "00" * 64},  # approve
+    {"to": "0xrouter", "data": "0x38ed1739" + "00" * 64},
+]
+
+
+def _workers(count=2, **kwargs):
+    store = MemoryFlowStore()
+    return store, [TransactionFlowService(store=store, **kwargs) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_flow_advances_on_another_worker():
+    _, (a, b) = _workers()
+    flow = await a.create_flow(WALLET, 1, "swap", STEPS, metadata={"quote": {"out": "1"}})
+
+    # Step completion lands on worker B, which never saw the flow
+    assert await b.complete_step(WALLET, "0xhash1")
+    next_step = await b.get_next_step(WALLET)
+    assert next_step.to == "0xrouter"
+
+    # Worker A's cached copy is revalidated, not served stale
+    assert (await a.get_next_step(WALLET)).to == "0xrouter"
+    assert await a.complete_step(WALLET, "0xhash2")
+    status = await b.get_flow_status(WALLET)
+    assert status["status"] == "completed"
+    assert [s["tx_hash"] for s in status["steps"]] == ["0xhash1", "0xhash2"]
+    assert status["flow_id"] == flow.flow_id and status["metadata"] == {"quote": {"out": "1"}}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicate_completions_advance_once():
+    _, workers = _workers(4)
+    await workers[0].create_flow(WALLET, 1, "swap", STEPS)
+    for w in workers:
+        await w.get_current_flow(WALLET)  # warm every cache at step 0
+
+    results = await asyncio.gather(*(w.complete_step(WALLET, "0xhash1") for w in workers))
+    assert all(results)
+    flow = await workers[1].get_current_flow(WALLET)
+    assert flow.current_step == 1
+    assert flow.steps[1].tx_hash is None
+
+
+@pytest.mark.asyncio
+async def test_failure_and_cancel():
+    _, (a, b) = _workers()
+    await a.create_flow(WALLET, 1, "swap", STEPS)
+    assert await b.complete_step(WALLET, "0xbad", success=False, error="reverted")
+    assert (await a.get_current_flow(WALLET)).status == TransactionStatus.FAILED
+
+    assert await a.cancel_flow(WALLET)
+    assert await b.get_current_flow(WALLET) is None
+    assert not await b.complete_step(WALLET, "0xhash")
+
+
+@pytest.mark.asyncio
+async def test_flows_expire():
+    store, (a,) = _workers(1, ttl_seconds=-1)
+    await a.create_flow(WALLET, 1, "swap", STEPS)
+    assert await a.get_current_flow(WALLET) is None
+    assert await a.cleanup_old_flows() == 1
+    assert not store._pointers
+
+
+@pytest.mark.asyncio
+async def test_step_completion_refreshes_wallet_pointer():
+    store, (a,) = _workers(1, ttl_seconds=600)
+    flow = await a.create_flow(WALLET, 1, "swap", STEPS)
+    store._pointers[WALLET] = (time.monotonic() + 1, flow.flow_id)
+
+    assert await a.complete_step(WALLET, "0xhash1")
+    assert store._pointers[WALLET][0] > time.monotonic() + 300
+    assert (await a.get_current_flow(WALLET)).current_step == 1
+
+
+@pytest.mark.asyncio
+async def test_flow_json_roundtrip():
+    service = TransactionFlowService(store=MemoryFlowStore())
+    flow = await service.create_flow(WALLET, 1, "swap", STEPS)
+    await service.complete_step(WALLET, "0xhash1")
+    flow = await service.get_current_flow(WALLET)
+    assert TransactionFlow.from_json(flow.to_json()) == flow
@@ -0,0 +1,106 @@
+"""Test the SQLite-backed TransactionHistoryService: persistence, cursors, retention."""
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+
+from app.domains.payment_actions.transaction_history import (
+    PaymentTransaction,
+    TransactionHistoryService,
+    TransactionStatus,
+)
+
+WALLET = "0xwallet"
+
+
+def _txn(i, created_at, status=TransactionStatus.CONFIRMED, wallet=WALLET):
+    return PaymentTransaction(
+        id=f"txn_{i:03d}",
+        wallet_address=wallet,
+        action_id=f"action_{i % 2}",
+        action_name="Payment",
+        status=status,
+        ticket_id=f"ticket-{i}",
+        from_address=wallet,
+        to_address="0xrecipient",
+        amount="1",
+        token="MNEE",
+        chain_id=236,
+        created_at=created_at,
+        updated_at=created_at,
+    )
+
+
+@pytest.mark.asyncio
+async def test_history_survives_restart(tmp_path):
+    path = str(tmp_path / "history.db")
+    service = TransactionHistoryService(db_path=path)
+    await service.record_transaction(WALLET, _txn(1, datetime.utcnow(), TransactionStatus.PENDING))
+    await service.update_transaction_status(WALLET, "txn_001", TransactionStatus.CONFIRMED, "0xhash")
+    service.close()
+
+    reopened = TransactionHistoryService(db_path=path)
+    txn = await reopened.get_transaction_by_ticket(WALLET, "ticket-1")
+    assert txn.status == TransactionStatus.CONFIRMED
+    assert txn.transaction_hash == "0xhash"
+    assert txn.confirmed_at is not None
+    reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_keyset_pages_newest_first():
+    service = TransactionHistoryService()
+    base = datetime(2026, 1, 1)
+    # Two transactions share a timestamp: the id breaks the tie
+    await asyncio.gather(*(
+        service.record_transaction(WALLET, _txn(i, base + timedelta(minutes=i // 2 * 2)))
+        for i in range(9)
+    ))
+    await service.record_transaction("0xother", _txn(50, base, wallet="0xother"))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = await service.get_transactions_page(WALLET, limit=4, cursor=cursor)
+        seen.extend(t.id for t in page)
+        if cursor is None:
+            break
+    assert seen == [f"txn_{i:03d}" for i in reversed(range(9))]
+
+    await service.update_transaction_status(WALLET, "txn_004", TransactionStatus.FAILED)
+    failed = await service.get_transactions(WALLET, status=TransactionStatus.FAILED)
+    assert [t.id for t in failed] == ["txn_004"]
+    assert await service.get_action_execution_count(WALLET, "action_0") == 4
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_share_commits(monkeypatch):
+    service = TransactionHistoryService()
+    batches = []
+    write = service._write
+    monkeypatch.setattr(service, "_write", lambda rows: (batches.append(len(rows)), write(rows)))
+
+    now = datetime.utcnow()
+    await asyncio.gather(*(service.record_transaction(WALLET, _txn(i, now)) for i in range(30)))
+
+    assert sum(batches) == 30 and len(batches) < 30
+    assert len(await service.get_transactions(WALLET, limit=100)) == 30
+
+
+@pytest.mark.asyncio
+async def test_retention_keeps_pending_and_recent():
+    service = TransactionHistoryService(retention_days=30)
+    now = datetime.utcnow()
+    await service.record_transaction(WALLET, _txn(1, now - timedelta(days=90)))
+    await service.record_transaction(WALLET, _txn(2, now - timedelta(days=90), TransactionStatus.PENDING))
+    await service.record_transaction(WALLET, _txn(3, now - timedelta(days=1)))
+
+    assert await service.apply_retention() == 1
+    assert [t.id for t in await service.get_transactions(WALLET)] == ["txn_003", "txn_002"]
+
+
+def test_queries_use_indexes():
+    service = TransactionHistoryService()
+    plan = service._conn.execute(
+        "EXPLAIN QUERY PLAN SELECT data FROM payment_transactions WHERE wallet_address = ? AND ticket_id = ?",
+        (WALLET, "ticket-1"),
+    ).fetchall()
+    assert "idx_payment_transactions_ticket" in str(plan)
@@ -0,0 +1,90 @@
+"""Test the indexed TriggerMatcher against brute-force scoring."""
+import pytest
+
+from app.domains.payment_actions.models import PaymentActionType
+from app.domains.payment_actions.triggers import TriggerMatcher, _trigrams
+
+WALLET = "0xwallet"
+
+TRIGGERS = [
+    ["coffee", "espresso", "latte"],
+    ["weekly rent", "rent payment", "pay rent"],
+    ["lunch", "food", "go"],
+    ["tip the barista", "coffee tip"],
+    ["gym membership", "pay the gym"],
+    ["send mom money", "mom"],
+]
+
+
+def _shortcut(make_action, i, triggers, **fields):
+    return make_action(i, action_type=PaymentActionType.SHORTCUT, triggers=triggers, **fields)
+
+
+def _brute_force(matcher, text, actions, threshold=0.6):
+    text = text.lower().strip()
+    found = {}
+    for action in actions:
+        if not action.is_enabled:
+            continue
+        for trigger in action.triggers:
+            confidence = matcher._calculate_similarity(text, trigger.lower())
+            if confidence >= threshold:
+                found[(action.id, trigger)] = confidence
+    return found
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("text", [
+    "coffee", "COFFEE", "time for rent", "rent", "coffee break", "lunch time",
+    "pay the rent", "espreso", "gym", "mo", "", "send money to mom",
+])
+async def test_matches_brute_force(text, make_action):
+    matcher = TriggerMatcher(top_k=100)
+    actions = [_shortcut(make_action, i, t) for i, t in enumerate(TRIGGERS)]
+
+    matches = await matcher.find_matching_actions(text, actions)
+    found = {(m.action.id, m.trigger): m.confidence for m in matches}
+    expected = _brute_force(matcher, text, actions)
+
+    # Every indexed match is scored exactly as before
+    for key, confidence in found.items():
+        assert expected[key] == pytest.approx(confidence)
+    # Nothing sharing a word or trigram with the input is missed
+    grams, words = _trigrams(text.lower()), set(text.lower().split())
+    for (action_id, trigger), confidence in expected.items():
+        lower = trigger.lower()
+        if len(text) < 3 or len(lower) < 3 or grams & _trigrams(lower) or words & set(lower.split()):
+            assert (action_id, trigger) in found
+
+
+@pytest.mark.asyncio
+async def test_index_updates_incrementally(make_action):
+    matcher = TriggerMatcher()
+    actions = [_shortcut(make_action, i, t) for i, t in enumerate(TRIGGERS)]
+    await matcher.find_matching_actions("coffee", actions)
+    index = matcher._indexes[WALLET]
+    gym_slots = list(index.by_action["action_4"][1])
+
+    # Change one action's triggers, disable another, drop a third
+    actions[0] = _shortcut(make_action, 0, ["flat white"])
+    actions[1] = _shortcut(make_action, 1, TRIGGERS[1], is_enabled=False)
+    del actions[5]
+
+    assert not await matcher.find_matching_actions("espresso", actions)
+    assert (await matcher.find_best_match("flat white", actions)).action.id == "action_0"
+    assert not await matcher.find_matching_actions("weekly rent", actions)
+    assert not await matcher.find_matching_actions("send mom money", actions)
+    # Untouched actions keep their slots
+    assert index.by_action["action_4"][1] == gym_slots
+    assert "action_5" not in index.by_action
+
+
+@pytest.mark.asyncio
+async def test_wallets_are_indexed_separately(make_action):
+    matcher = TriggerMatcher()
+    mine = [_shortcut(make_action, 0, ["coffee"])]
+    theirs = [_shortcut(make_action, 1, ["coffee"], wallet="0xother")]
+
+    assert [m.action.id for m in await matcher.find_matching_actions("coffee", mine)] == ["action_0"]
+    assert [m.action.id for m in await matcher.find_matching_actions("coffee", theirs)] == ["action_1"]
+    assert set(matcher._indexes) == {WALLET, "0xother"}
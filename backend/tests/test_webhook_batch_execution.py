@@ -0,0 +1,240 @@
+"""Test concurrent, idempotent webhook batch payouts."""
+import asyncio
+from decimal import Decimal
+import pytest
+
+from app.domains.payment_actions.execution_journal import ExecutionJournal
+from app.domains.payment_actions.executor import PaymentExecutor
+from app.domains.payment_actions.webhooks import WebhookEventType, WebhookRequest
+from app.protocols.mnee_adapter import MNEEAdapter
+from app.services.webhook_service import WebhookService
+
+WALLET = "0xpayer"
+
+
+@pytest.fixture(autouse=True)
+def eth_rpc_url(monkeypatch):
+    monkeypatch.setenv("ETH_RPC_URL", "http://localhost:8545")
+
+
+class FakeMNEEAdapter:
+    """Counts quote lookups and tracks concurrent transaction builds."""
+
+    def __init__(self, fail_for=()):
+        self.quotes = 0
+        self.built = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.fail_for = set(fail_for)
+        self.real = MNEEAdapter()
+
+    def is_supported(self, chain_id):
+        return True
+
+    async def get_quote(self, from_token, to_token, amount, chain_id, wallet_address):
+        self.quotes += 1
+        return {
+            "success": True,
+            "chain_id": chain_id,
+            "network": "MNEE",
+            "estimated_fee_atomic": 1000,
+            "metadata": {"mnee_price_usd": "1.0", "fee_source": "config"},
+        }
+
+    def quote_for_amount(self, quote, amount):
+        return self.real.quote_for_amount(quote, amount)
+
+    async def build_transaction(self, quote, chain_id, from_address, to_address):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if to_address in self.fail_for:
+            raise RuntimeError("upstream timeout")
+        self.built.append((to_address, quote["from_amount"]))
+        return {"to": to_address}
+
+
+def _service(adapter, concurrency=5, journal=None):
+    executor = PaymentExecutor()
+    executor.mnee_adapter = adapter
+    service = WebhookService(batch_concurrency=concurrency, journal=journal or ExecutionJournal())
+    service.service = object()
+    service.executor = executor
+    return service
+
+
+def _request(count, batch_id="payroll-1", request_id="req-1", wallet=WALLET, **extra):
+    return WebhookRequest(
+        event_type=WebhookEventType.EXECUTE_BATCH,
+        request_id=request_id,
+        payload={
+            "wallet_address": wallet,
+            "token": "MNEE",
+            "chain_id": 236,
+            "batch_id": batch_id,
+            "recipients": [{"address": f"0xr{i:03d}", "amount": "2.5"} for i in range(count)],
+            **extra,
+        },
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_concurrently_with_one_quote():
+    adapter = FakeMNEEAdapter()
+    service = _service(adapter, concurrency=5)
+    progress = []
+
+    async def notify(wallet, payload):
+        progress.append(payload)
+
+    service.set_notifier(notify)
+    response = await service._handle_execute_batch(_request(40))
+
+    assert response.success
+    assert response.result["successful"] == 40
+    assert adapter.quotes == 1
+    assert 1 < adapter.max_in_flight <= 5
+    # Shared quote is re-priced per recipient
+    assert adapter.built[0][1] == "2.5"
+    # One progress push per recipient, then completion
+    assert [p["completed"] for p in progress[:-1]] == list(range(1, 41))
+    assert progress[-1]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_retry_only_pays_failed_recipients():
+    adapter = FakeMNEEAdapter(fail_for={"0xr001"})
+    service = _service(adapter)
+
+    first = await service._handle_execute_batch(_request(3))
+    assert not first.success
+    assert first.result["failed"] == 1
+
+    adapter.fail_for.clear()
+    retry = await service._handle_execute_batch(_request(3, request_id="req-2"))
+
+    assert retry.success
+    assert sorted(to for to, _ in adapter.built) == ["0xr000", "0xr001", "0xr002"]
+    deduplicated = [r["recipient"] for r in retry.result["results"] if r.get("deduplicated")]
+    assert deduplicated == ["0xr000", "0xr002"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_share_in_flight_payouts():
+    adapter = FakeMNEEAdapter()
+    service = _service(adapter)
+
+    await asyncio.gather(
+        service._handle_execute_batch(_request(10)),
+        service._handle_execute_batch(_request(10, request_id="req-2")),
+    )
+    assert len(adapter.built) == 10
+
+
+@pytest.mark.asyncio
+async def test_no_wait_returns_immediately_and_is_pollable():
+    adapter = FakeMNEEAdapter()
+    service = _service(adapter)
+
+    response = await service._handle_execute_batch(_request(5, wait=False))
+    assert response.result["status"] == "processing"
+    assert response.result["completed"] == 0
+
+    await asyncio.gather(*service._batch_tasks)
+    status = await service.get_batch_status(WALLET, "payroll-1")
+    assert status["status"] == "completed"
+    assert status["successful"] == 5
+
+
+@pytest.mark.asyncio
+async def test_workers_sharing_a_journal_do_not_pay_twice(tmp_path):
+    path = str(tmp_path / "journal.db")
+    adapter = FakeMNEEAdapter(fail_for={"0xr002"})
+    first = _service(adapter, journal=ExecutionJournal(db_path=path))
+    await first._handle_execute_batch(_request(3))
+
+    # Another worker (or this one after a restart) receives the retry
+    adapter.fail_for.clear()
+    second = _service(adapter, journal=ExecutionJournal(db_path=path))
+    retry = await second._handle_execute_batch(_request(3, request_id="req-2"))
+
+    assert retry.success
+    assert sorted(to for to, _ in adapter.built) == ["0xr000", "0xr001", "0xr002"]
+    assert [r.get("deduplicated", False) for r in retry.result["results"]] == [True, True, False]
+    status = await first.get_batch_status(WALLET, "payroll-1")
+    assert (status["status"], status["successful"]) == ("completed", 3)
+
+
+@pytest.mark.asyncio
+async def test_recipients_claimed_by_another_worker_are_in_progress():
+    journal = ExecutionJournal()
+    await journal.claim(f"batch_item:{WALLET}:payroll-1:0xr001", "req-other")
+    adapter = FakeMNEEAdapter()
+    service = _service(adapter, journal=journal)
+
+    response = await service._handle_execute_batch(_request(2))
+    assert sorted(to for to, _ in adapter.built) == ["0xr000"]
+    assert response.result["results"][1]["status"] == "in_progress"
+
+
+@pytest.mark.asyncio
+async def test_wallets_sharing_a_batch_id_are_paid_separately():
+    adapter = FakeMNEEAdapter()
+    service = _service(adapter)
+
+    first = await service._handle_execute_batch(_request(2, wallet="0xwallet_a"))
+    second = await service._handle_execute_batch(_request(3, request_id="req-2", wallet="0xwallet_b"))
+
+    assert first.success and second.success
+    assert len(adapter.built) == 5
+    assert not any(r.get("deduplicated") for r in second.result["results"])
+    status_a = await service.get_batch_status("0xwallet_a", "payroll-1")
+    status_b = await service.get_batch_status("0xwallet_b", "payroll-1")
+    assert (status_a["total_recipients"], status_b["total_recipients"]) == (2, 3)
+    assert await service.get_batch_status(WALLET, "payroll-1") is None
+
+
+@pytest.mark.asyncio
+async def test_retry_continues_progress_of_a_running_batch():
+    journal = ExecutionJournal()
+    worker_a = _service(FakeMNEEAdapter(), journal=journal)
+    batch = await worker_a._start_batch("payroll-1", WALLET, 3)
+    recipients = [{"address": f"0xr{i:03d}", "amount": "2.5"} for i in range(3)]
+
+    # Worker A has paid 0xr000 and is still paying 0xr001
+    paid = worker_a._batch_entry(recipients[0], "submitted", ticket_id="t0")
+    await journal.claim(f"batch_item:{WALLET}:payroll-1:0xr000", "req-1")
+    await journal.complete(f"batch_item:{WALLET}:payroll-1:0xr000", paid)
+    await journal.claim(f"batch_item:{WALLET}:payroll-1:0xr001", "req-1")
+    batch["results"][0] = paid
+    await worker_a._save_progress(batch)
+
+    adapter = FakeMNEEAdapter()
+    worker_b = _service(adapter, journal=journal)
+    await worker_b._handle_execute_batch(_request(3, request_id="req-2"))
+    assert adapter.built == [("0xr002", "2.5")]
+    status = await worker_b.get_batch_status(WALLET, "payroll-1")
+    assert status["completed"] == 3
+
+    # Worker A finishes; its save does not roll back worker B's payout
+    batch["results"][1] = worker_a._batch_entry(recipients[1], "submitted", ticket_id="t1")
+    await worker_a._save_progress(batch)
+    status = await worker_a.get_batch_status(WALLET, "payroll-1")
+    assert [r["ticket_id"] for r in status["results"]][:2] == ["t0", "t1"]
+    assert (status["status"], status["successful"], status["failed"]) == ("completed", 3, 0)
+
+
+def test_quote_for_amount_recomputes_estimated_fee():
+    adapter = MNEEAdapter()
+    base = {
+        "success": True,
+        "chain_id": 236,
+        "network": "MNEE",
+        "from_amount": "1",
+        "estimated_fee_atomic": adapter._estimate_fee(adapter.to_atomic_amount(Decimal("1")), 236),
+        "metadata": {"mnee_price_usd": "1.0", "fee_source": "estimate"},
+    }
+    quote = adapter.quote_for_amount(base, Decimal("5000"))
+    assert quote["from_amount_atomic"] == adapter.to_atomic_amount(Decimal("5000"))
+    assert quote["estimated_fee_atomic"] == adapter._estimate_fee(quote["from_amount_atomic"], 236)
@@ -0,0 +1,270 @@
+"""Test websocket fan-out across connections and workers."""
+import asyncio
+import json
+import pytest
+
+from app.services.websocket_hub import OVERFLOW_CLOSE, WebSocketHub
+
+WALLET = "0xWallet"
+
+
+class FakeWebSocket:
+    def __init__(self, fail=False):
+        self.sent = []
+        self.fail = fail
+        self.closed_with = None
+        self.unblocked = asyncio.Event()
+        self.unblocked.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        await self.unblocked.wait()
+        if self.fail:
+            raise RuntimeError("connection closed")
+        self.sent.append(json.loads(frame))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+class FakeBroker:
+    """In-process stand-in for Redis pub/sub shared by several hubs."""
+
+    def __init__(self):
+        self.subscribers = []
+        self.published = []
+
+
+class FakePubSub:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = set()
+        self.queue = asyncio.Queue()
+        broker.subscribers.append(self)
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        pass
+
+
+class FakeRedis:
+    def __init__(self, broker):
+        self.broker = broker
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return FakePubSub(self.broker)
+
+    async def publish(self, channel, data):
+        self.broker.published.append(channel)
+        for sub in self.broker.subscribers:
+            if channel in sub.channels:
+                sub.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    async def close(self):
+        pass
+
+
+async def _hub(broker):
+    hub = WebSocketHub()
+    hub._redis = FakeRedis(broker)
+    await hub.start()
+    return hub
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_all_tabs_of_a_wallet_receive_messages():
+    hub = WebSocketHub()
+    hub._redis_retry_at = float("inf")  # local only
+    first, second = FakeWebSocket(), FakeWebSocket()
+    await hub.connect(WALLET, first)
+    await hub.connect(WALLET.lower(), second)
+
+    await hub.send_data(WALLET, {"ok": True})
+    await _drain()
+    assert first.sent == second.sent == [{"type": "result", "data": {"ok": True}}]
+
+    await hub.disconnect(WALLET, first)
+    await hub.send_error(WALLET, "boom")
+    await _drain()
+    assert len(first.sent) == 1
+    assert second.sent[-1]["type"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_messages_reach_connections_on_other_workers():
+    broker = FakeBroker()
+    api_worker, other_worker = await _hub(broker), await _hub(broker)
+    local, remote = FakeWebSocket(), FakeWebSocket()
+    await api_worker.connect(WALLET, local)
+    await other_worker.connect(WALLET, remote)
+
+    await api_worker.send_progress(WALLET, "Quoting", 50)
+    await _drain()
+
+    # Each connection gets the message exactly once
+    assert [m["data"]["stage"] for m in local.sent] == ["Quoting"]
+    assert [m["data"]["stage"] for m in remote.sent] == ["Quoting"]
+    assert broker.published == ["ws:wallet:0xwallet"]
+
+    await api_worker.stop()
+    await other_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_background_job_publishes_without_local_connections():
+    broker = FakeBroker()
+    api_worker = await _hub(broker)
+    job = WebSocketHub()
+    job._redis = FakeRedis(broker)  # publish-only, never started
+
+    socket = FakeWebSocket()
+    await api_worker.connect(WALLET, socket)
+    await job.send_data(WALLET, {"status": "submitted"}, data_type="recurring_payment")
+    await _drain()
+    assert socket.sent == [{"type": "recurring_payment", "data": {"status": "submitted"}}]
+
+    # Last connection closed: the worker stops listening for the wallet
+    await api_worker.disconnect(WALLET, socket)
+    assert not broker.subscribers[0].channels
+    await api_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_dead_connections_are_dropped():
+    hub = WebSocketHub()
+    hub._redis_retry_at = float("inf")
+    dead, alive = FakeWebSocket(fail=True), FakeWebSocket()
+    await hub.connect(WALLET, dead)
+    await hub.connect(WALLET, alive)
+
+    await hub.send_data(WALLET, {"n": 1})
+    await _drain()
+    assert hub.connection_count(WALLET) == 1
+    assert alive.sent == [{"type": "result", "data": {"n": 1}}]
+
+
+def _local_hub(**kwargs):
+    hub = WebSocketHub(**kwargs)
+    hub._redis_retry_at = float("inf")
+    return hub
+
+
+@pytest.mark.asyncio
+async def test_slow_client_does_not_block_sender_and_progress_coalesces():
+    hub = _local_hub()
+    slow = FakeWebSocket()
+    slow.unblocked.clear()
+    await hub.connect(WALLET, slow)
+
+    # Returns immediately although the client is not reading
+    for pct in range(0, 101, 10):
+        await asyncio.wait_for(hub.send_progress(WALLET, "Swapping", pct), 0.1)
+    await hub.send_progress(WALLET, "Bridging", 5)
+    await hub.send_data(WALLET, {"tx": "0xabc"})
+
+    # The first frame is already in flight; the remaining Swapping frames collapse into one
+    slow.unblocked.set()
+    await _drain()
+    frames = [(m["type"], m["data"].get("stage"), m["data"].get("completion")) for m in slow.sent]
+    assert frames == [
+        ("progress", "Swapping", 0),
+        ("progress", "Swapping", 100),
+        ("progress", "Bridging", 5),
+        ("result", None, None),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_overflow_drops_progress_but_never_results():
+    hub = _local_hub(max_queue=3)
+    slow = FakeWebSocket()
+    slow.unblocked.clear()
+    await hub.connect(WALLET, slow)
+    await hub.send_data(WALLET, {"n": 0})
+    await _drain()  # Frame 0 is in flight
+
+    for i in range(1, 4):
+        await hub.send_progress(WALLET, f"stage {i}", i)
+    for n in range(1, 6):
+        await hub.send_data(WALLET, {"n": n})
+
+    slow.unblocked.set()
+    await _drain()
+    assert [m["data"]["n"] for m in slow.sent if m["type"] == "result"] == [0, 1, 2, 3, 4, 5]
+    assert not [m for m in slow.sent if m["type"] == "progress"]
+
+
+@pytest.mark.asyncio
+async def test_close_policy_disconnects_slow_consumer():
+    hub = _local_hub(max_queue=2, overflow_policy=OVERFLOW_CLOSE)
+    slow = FakeWebSocket()
+    slow.unblocked.clear()
+    await hub.connect(WALLET, slow)
+
+    for n in range(4):
+        await hub.send_data(WALLET, {"n": n})
+    await _drain()
+    assert slow.closed_with == 1013
+    assert hub.connection_count(WALLET) == 0
+
+
+@pytest.mark.asyncio
+async def test_command_replies_go_only_to_the_originating_connection():
+    broker = FakeBroker()
+    api_worker, other_worker = await _hub(broker), await _hub(broker)
+    sender, other_tab, remote = FakeWebSocket(), FakeWebSocket(), FakeWebSocket()
+    await api_worker.connect(WALLET, sender)
+    await api_worker.connect(WALLET, other_tab)
+    await other_worker.connect(WALLET, remote)
+
+    await api_worker.send_progress(WALLET, "Thinking", 10, type="agent_status", request_id="r1", websocket=sender)
+    await api_worker.send_data(WALLET, {"ok": True}, data_type="agent_response", request_id="r1", websocket=sender)
+    await _drain()
+    assert [m["type"] for m in sender.sent] == ["agent_status", "agent_response"]
+    assert other_tab.sent == remote.sent == []
+    assert broker.published == []
+
+    await api_worker.stop()
+    await other_worker.stop()
+
+
+@pytest.mark.asyncio
+async def test_listener_subscribes_once_redis_comes_back():
+    broker = FakeBroker()
+    hub = WebSocketHub(redis_retry_interval=0.01)
+    hub._redis_retry_at = float("inf")  # Redis unreachable at startup
+    await hub.start()
+    socket = FakeWebSocket()
+    await hub.connect(WALLET, socket)
+    assert hub._pubsub is None
+
+    hub._redis, hub._redis_retry_at = FakeRedis(broker), 0.0
+    for _ in range(100):
+        if broker.subscribers and broker.subscribers[0].channels:
+            break
+        await asyncio.sleep(0.01)
+
+    job = WebSocketHub()
+    job._redis = FakeRedis(broker)
+    await job.send_data(WALLET, {"status": "pinned"}, data_type="ipfs_pin")
+    await _drain()
+    assert socket.sent == [{"type": "ipfs_pin", "data": {"status": "pinned"}}]
+    await hub.stop()